@@ -8,6 +8,7 @@
 
 import sys
 import os
+import asyncio
 import shutil
 import ctypes
 from PySide6.QtWidgets import (
@@ -18,11 +19,15 @@ from PySide6.QtCore import QTimer
 from PySide6.QtGui import QCloseEvent
 
 # 导入常量和工具
-from src.common.constants import APP_TITLE, APP_GEOMETRY, APP_DIR
+from src.common.constants import APP_TITLE, APP_GEOMETRY, APP_DIR, IMPORTANT_LOG_KEYWORDS
 
 # 导入管理器
 from src.managers.log_manager import LogManager
-from src.managers.server_manager import ServerManager
+from src.managers.fleet_manager import FleetManager
+from src.managers.restart_scheduler import RestartScheduler
+from src.managers.daemon_client import DaemonClient, DaemonError
+from src.managers.control_api import ControlApi
+from src.managers.async_core import QtEventBridge
 
 from src.managers.backup_manager import BackupManager
 from src.managers.launch_manager import LaunchManager
@@ -53,10 +58,25 @@ class SoulServerLauncher(QMainWindow):
         self.config_manager = ServerParamsManager()
         self.paths_manager = PathsManager()
         self.rcon_manager = RconManager()
-        self.server_manager = ServerManager()
+        # 多实例管理：窗口显示默认实例，其他实例从多实例配置文件加载
+        self.fleet_manager = FleetManager()
+        self.fleet_manager.load()
+        self.server_manager = self.fleet_manager.get_instance("default") or self.fleet_manager.add_instance("default")
+        self.restart_scheduler = RestartScheduler(scheduler=self.fleet_manager.scheduler)
+        for name in self.fleet_manager.instance_names():
+            self.restart_scheduler.add_server(name, self.fleet_manager.get_instance(name))
         self.steamcmd_manager = SteamCMDManager(config_manager=self.config_manager)
         self.backup_manager = BackupManager(config_manager=self.config_manager)
         self.log_manager = LogManager(config_manager=self.config_manager)
+        # 备份和SteamCMD使用默认实例的资源策略，避开服务器占用的CPU核心
+        self.backup_manager.resource_governor = self.server_manager.resource_governor
+        self.steamcmd_manager.resource_governor = self.server_manager.resource_governor
+        # 本机运行着无界面守护进程时，界面只作为客户端，服务器的启停和状态都通过守护进程；
+        # 检测需要连接守护进程，在窗口显示后进行，检测完成前不启动本地的定时重启、自动备份等任务
+        self.daemon_client = None
+        self.daemon_detected = False
+        self.event_bridge = QtEventBridge()
+        self.control_api = ControlApi(self.fleet_manager, self.backup_manager)
         
         # 连接信号
         self._connect_signals()
@@ -85,6 +105,9 @@ class SoulServerLauncher(QMainWindow):
         
         # 启动时自动检测安装状态
         self.auto_detect_installations()
+        
+        # 窗口显示后检测守护进程
+        QTimer.singleShot(0, self._detect_daemon)
     
     def closeEvent(self, event: QCloseEvent):
         """处理窗口关闭事件，检查未保存的更改"""
@@ -219,6 +242,11 @@ class SoulServerLauncher(QMainWindow):
         
         # 连接服务器管理器的日志信号到启动选项卡，这样启动命令就能在UI上显示
         self.server_manager.log_message.connect(self.on_server_log_message)
+        self.server_manager.log_batch.connect(self.on_server_log_batch)
+        self.restart_scheduler.log_message.connect(self.on_server_log_message)
+        self.control_api.log_message.connect(self.on_server_log_message)
+        self.fleet_manager.log_message.connect(self.on_fleet_log_message)
+        self.fleet_manager.log_batch.connect(self.on_fleet_log_batch)
         
         # log_manager不再直接使用GUI控件，只负责文件日志
         # 如果需要在GUI显示系统日志，通过专门的方法调用
@@ -271,17 +299,9 @@ class SoulServerLauncher(QMainWindow):
             self.config_tab.load_config(config)
             self.backup_tab.load_backup_settings(config)
             
-            # 将备份设置应用到备份管理器
-            if config.get('auto_backup', False):
-                self.backup_manager.set_auto_backup(
-                    enabled=True,
-                    interval_minutes=config.get('backup_interval', 30)
-                )
-            else:
-                self.backup_manager.set_auto_backup(enabled=False)
-            
             # 设置服务器管理器的完整配置
             self.server_manager.set_server_config(config)
+            self._apply_local_services(config)
             
             # 加载路径配置到路径选项卡
             if hasattr(self, 'paths_tab'):
@@ -295,6 +315,8 @@ class SoulServerLauncher(QMainWindow):
             self.config_manager.save_config(config)
             # 更新服务器管理器的配置
             self.server_manager.set_server_config(config)
+            if self.daemon_detected and not self.daemon_client:
+                self.control_api.apply_config(config)
             QMessageBox.information(self, "成功", "配置保存成功！")
         except Exception as e:
             error_msg = f"保存配置失败: {e}"
@@ -358,9 +380,75 @@ class SoulServerLauncher(QMainWindow):
             self.log_manager.add_error(error_msg)
             QMessageBox.critical(self, "错误", error_msg)
     
+    def _apply_local_services(self, config):
+        """应用自动备份和控制接口配置（守护进程检测完成且没有守护进程时才由界面执行）"""
+        if not self.daemon_detected or self.daemon_client:
+            self.backup_manager.set_auto_backup(enabled=False)
+            return
+        if config.get('auto_backup', False):
+            self.backup_manager.set_auto_backup(
+                enabled=True,
+                interval_minutes=config.get('backup_interval', 30)
+            )
+        else:
+            self.backup_manager.set_auto_backup(enabled=False)
+        self.control_api.apply_config(config)
+    
+    def _detect_daemon(self):
+        """在事件循环的工作线程中检测守护进程，结果排队回主线程，不阻塞窗口"""
+        async def detect():
+            try:
+                return await asyncio.get_running_loop().run_in_executor(None, lambda: DaemonClient.detect(timeout=5))
+            except Exception:
+                return None  # 无法检测时按没有守护进程处理，由界面管理服务器
+        self.event_bridge.deliver(self.fleet_manager.async_core.submit(detect(), name='daemon_detect'),
+                                  self._on_daemon_detected)
+    
+    def _on_daemon_detected(self, client):
+        """守护进程检测完成（主线程）：没有守护进程时由界面启动本地的定时任务并接管已运行的服务器"""
+        self.daemon_client = client
+        self.daemon_detected = True
+        # 服务器由守护进程管理时不再接管进程，避免界面和守护进程同时监视同一个服务器
+        if client:
+            self.launch_tab.add_log("🔗 检测到无界面守护进程，服务器的启动、停止和状态由守护进程管理")
+            return
+        # 定时重启、轮换日志归档、自动备份和控制接口只在没有守护进程时由界面执行
+        self.restart_scheduler.start()
+        self.fleet_manager.start_log_retention()
+        try:
+            self._apply_local_services(self.config_manager.load_config())
+        except Exception as e:
+            self.log_manager.add_error(f"应用自动备份和控制接口配置失败: {e}")
+        
+        # GUI完全初始化后，检查是否有已存在的服务器进程
+        if self.launch_manager.is_initialized:
+            self.server_manager._check_existing_process()
+    
     # 服务器控制方法
+    def _daemon_call(self, command):
+        """通过守护进程执行命令，守护进程不可用时切换回本地管理"""
+        try:
+            return getattr(self.daemon_client, command)()
+        except DaemonError as e:
+            self.daemon_client = None
+            self.launch_tab.add_log(f"⚠️ 守护进程不可用，切换为本地管理: {e}")
+            self.server_manager._check_existing_process()
+            return None
+    
+    def _get_server_status(self):
+        """获取默认实例的状态（有守护进程时从守护进程获取）"""
+        if self.daemon_client:
+            status = self._daemon_call('status')
+            if status is not None:
+                return status.get('default', {'running': False})
+        return self.server_manager.get_server_status()
+    
     def start_server(self):
         """启动服务器"""
+        if self.daemon_client:
+            self.launch_tab.add_log("正在通过守护进程启动服务器...")
+            self._daemon_call('start')
+            return
         try:
             config = self.config_manager.load_config()
             
@@ -381,13 +469,33 @@ class SoulServerLauncher(QMainWindow):
                 self.launch_tab.add_log("服务器启动失败，请检查路径设置和日志信息")
                 self.launch_tab.update_status("离线")
                 self.status_label.setText("服务器状态: 离线")
+                self._offer_port_reassignment()
         except Exception as e:
             error_msg = f"启动服务器失败: {e}"
             self.log_manager.add_error(error_msg)
             QMessageBox.critical(self, "错误", error_msg)
     
+    def _offer_port_reassignment(self):
+        """启动前检查发现端口被占用时，询问是否改用空闲端口并重新启动"""
+        suggested = (self.server_manager.get_preflight_result() or {}).get('suggested_ports')
+        if not suggested:
+            return
+        ports = '\n'.join(f"{key}: {self.server_manager.server_config.get(key)} → {port}"
+                          for key, port in suggested.items())
+        reply = QMessageBox.question(self, "端口被占用", f"以下端口已被占用，是否改用空闲端口并重新启动？\n\n{ports}",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        if reply != QMessageBox.Yes:
+            return
+        self.config_manager.save_config(self.server_manager.apply_suggested_ports(), show_message=False)
+        self.launch_tab.add_log("已改用空闲端口，正在重新启动服务器...")
+        self.start_server()
+    
     def stop_server(self):
         """停止服务器"""
+        if self.daemon_client:
+            self.launch_tab.add_log("正在通过守护进程停止服务器...")
+            self._daemon_call('stop')
+            return
         try:
             self.launch_tab.add_log("正在停止服务器...")
             self.server_manager.stop_server()
@@ -398,6 +506,10 @@ class SoulServerLauncher(QMainWindow):
     
     def restart_server(self):
         """重启服务器"""
+        if self.daemon_client:
+            self.launch_tab.add_log("正在通过守护进程重启服务器...")
+            self._daemon_call('restart')
+            return
         try:
             self.launch_tab.add_log("正在重启服务器...")
             self.server_manager.restart_server()
@@ -418,7 +530,7 @@ class SoulServerLauncher(QMainWindow):
     def update_server_status(self):
         """更新服务器状态"""
         try:
-            status = self.server_manager.get_server_status()
+            status = self._get_server_status()
             # 根据服务器状态设置显示文本
             if status.get('starting', False):
                 status_text = "启动中"
@@ -437,11 +549,23 @@ class SoulServerLauncher(QMainWindow):
                 # 更新内存使用
                 if 'memory' in status:
                     self.launch_tab.update_memory(status['memory'])
+                
+                # 更新CPU占用
+                if 'cpu' in status:
+                    self.launch_tab.update_cpu(status['cpu'])
+                
+                # 更新玩家数和帧率
+                if 'players' in status:
+                    self.launch_tab.update_players_count(status['players'])
+                if 'tick' in status:
+                    self.launch_tab.update_tick(status['tick'])
         except Exception as e:
             print(f"更新服务器状态失败: {e}")
     
     def update_server_status_display(self):
         """定时更新服务器状态显示（仅在服务器运行时更新运行时间和内存）"""
+        if self.daemon_client:
+            return  # 守护进程模式下由 update_server_status 定期刷新，避免每秒请求一次
         if self.server_manager.is_running:
             status = self.server_manager.get_server_status()
             
@@ -452,6 +576,16 @@ class SoulServerLauncher(QMainWindow):
             # 更新内存使用
             if 'memory' in status:
                 self.launch_tab.update_memory(status['memory'])
+            
+            # 更新CPU占用
+            if 'cpu' in status:
+                self.launch_tab.update_cpu(status['cpu'])
+            
+            # 更新玩家数和帧率
+            if 'players' in status:
+                self.launch_tab.update_players_count(status['players'])
+            if 'tick' in status:
+                self.launch_tab.update_tick(status['tick'])
     
     def auto_detect_installations(self):
         """启动时自动检测安装状态（静默检查，不输出日志）"""
@@ -654,6 +788,9 @@ class SoulServerLauncher(QMainWindow):
         # 重置运行时间和内存显示到默认状态
         self.launch_tab.update_uptime("--:--:--")
         self.launch_tab.update_memory("-- MB")
+        self.launch_tab.update_cpu("--%")
+        self.launch_tab.update_players_count("--")
+        self.launch_tab.update_tick("-- FPS")
         # 重置mod状态显示
         self.launch_tab.reset_mod_status()
     
@@ -663,15 +800,8 @@ class SoulServerLauncher(QMainWindow):
     
     def on_server_log_message(self, message):
         """处理服务器日志消息，过滤服务器输出流"""
-        # 检查是否为系统重要日志（包含特定关键字的消息）
-        important_keywords = [
-            '🚀', '✅', '❌', '⚠️', '🔍', '📍', '📋', '⏳', '🔗', '💡',  # 表情符号
-            '启动服务器', '停止服务器', '重启服务器', '服务器状态', '离线判断',
-            '错误:', '警告:', 'RCON', '进程已创建', '启动完成', '连接成功', '连接失败'
-        ]
-        
-        # 检查是否为重要的系统日志
-        is_important_log = any(keyword in message for keyword in important_keywords)
+        # 检查是否为重要的系统日志（包含特定关键字的消息）
+        is_important_log = any(keyword in message for keyword in IMPORTANT_LOG_KEYWORDS)
         
         if is_important_log:
             # 重要的系统日志：显示在GUI并记录到文件
@@ -682,6 +812,25 @@ class SoulServerLauncher(QMainWindow):
             if hasattr(self.server_manager, 'enable_gui_streaming') and self.server_manager.enable_gui_streaming:
                 self.launch_tab.add_log(message)
     
+    def on_server_log_batch(self, lines):
+        """批量处理WS.log原始日志：一次性追加到界面"""
+        important = [line for line in lines if any(keyword in line for keyword in IMPORTANT_LOG_KEYWORDS)]
+        self.log_manager.add_logs(important, save_to_file=True)
+        if getattr(self.server_manager, 'enable_gui_streaming', False):
+            self.launch_tab.add_log_batch(lines)
+        else:
+            self.launch_tab.add_log_batch(important)
+    
+    def on_fleet_log_batch(self, instance_name, lines):
+        """其他服务器实例的WS.log原始日志（默认实例由on_server_log_batch处理）"""
+        if instance_name != "default":
+            self.on_server_log_batch([f"[{instance_name}] {line}" for line in lines])
+    
+    def on_fleet_log_message(self, instance_name, message):
+        """其他服务器实例的日志消息（默认实例的日志由on_server_log_message处理）"""
+        if instance_name != "default":
+            self.on_server_log_message(f"[{instance_name}] {message}")
+    
     def on_path_changed(self, path_type, new_path):
         """路径变更处理"""
         # 路径更新信息只记录到文件，不显示在GUI
@@ -723,10 +872,7 @@ class SoulServerLauncher(QMainWindow):
     def on_initialization_complete(self):
         """应用程序初始化完成"""
         # 初始化完成，但不记录日志避免创建logs目录
-        # 可以在这里添加初始化完成后的逻辑
-        
-        # GUI完全初始化后，检查是否有已存在的服务器进程
-        self.server_manager._check_existing_process()
+        # 接管已存在的服务器进程要等守护进程检测完成（见 _on_daemon_detected）
         
     def on_initialization_error(self, error_message):
         """应用程序初始化错误"""
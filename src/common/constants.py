@@ -84,6 +84,31 @@ class PathConfig:
         """日志文件路径"""
         return os.path.join(self.logs_dir, "launcher.log")
     
+    @property
+    def data_dir(self):
+        """数据目录 - 放在exe执行目录下"""
+        return os.path.join(get_app_dir(), "data")
+    
+    @property
+    def startup_timeline_db(self):
+        """启动时间线数据库路径"""
+        return os.path.join(self.data_dir, "startup_timeline.db")
+    
+    @property
+    def log_archive_db(self):
+        """服务器日志归档数据库路径"""
+        return os.path.join(self.data_dir, "log_archive.db")
+    
+    @property
+    def log_offsets_file(self):
+        """WS.log读取位置检查点文件路径"""
+        return os.path.join(self.data_dir, "log_offsets.json")
+    
+    @property
+    def server_log_archive_dir(self):
+        """服务器轮换日志（WS-backup-*.log）压缩归档目录"""
+        return os.path.join(self.data_dir, "server_logs")
+    
     @property
     def configs_dir(self):
         """配置目录 - 放在exe执行目录下"""
@@ -94,6 +119,16 @@ class PathConfig:
         """配置文件路径"""
         return os.path.join(self.configs_dir, "server_config.json")
     
+    @property
+    def fleet_config_file(self):
+        """多实例配置文件路径"""
+        return os.path.join(self.configs_dir, "fleet.json")
+    
+    @property
+    def daemon_state_file(self):
+        """无界面守护进程状态文件路径（记录进程号、控制端口和令牌）"""
+        return os.path.join(self.data_dir, "daemon.json")
+    
     def get_all_paths(self):
         """获取所有路径的字典"""
         return {
@@ -105,8 +140,15 @@ class PathConfig:
             'backup_dir': self.backup_dir,
             'logs_dir': self.logs_dir,
             'log_file': self.log_file,
+            'data_dir': self.data_dir,
+            'startup_timeline_db': self.startup_timeline_db,
+            'log_archive_db': self.log_archive_db,
+            'log_offsets_file': self.log_offsets_file,
+            'server_log_archive_dir': self.server_log_archive_dir,
             'configs_dir': self.configs_dir,
-            'config_file': self.config_file
+            'config_file': self.config_file,
+            'fleet_config_file': self.fleet_config_file,
+            'daemon_state_file': self.daemon_state_file
         }
 
 # 默认路径配置实例
@@ -118,9 +160,16 @@ DEFAULT_STEAMCMD_DIR = DEFAULT_PATHS.steamcmd_dir
 DEFAULT_STEAMCMD_EXE = DEFAULT_PATHS.steamcmd_exe
 DEFAULT_server_path = DEFAULT_PATHS.game_install_dir
 DEFAULT_SERVER_EXE = "WSServer.exe"
+SHIPPING_PROCESS_NAME = "WSServer-Win64-Shipping.exe"  # 真正的服务器进程名
 DEFAULT_BACKUP_DIR = DEFAULT_PATHS.backup_dir
 DEFAULT_LOG_FILE = DEFAULT_PATHS.log_file
 DEFAULT_CONFIG_FILE = DEFAULT_PATHS.config_file
+DEFAULT_STARTUP_TIMELINE_DB = DEFAULT_PATHS.startup_timeline_db
+DEFAULT_LOG_ARCHIVE_DB = DEFAULT_PATHS.log_archive_db
+DEFAULT_LOG_OFFSETS_FILE = DEFAULT_PATHS.log_offsets_file
+DEFAULT_SERVER_LOG_ARCHIVE_DIR = DEFAULT_PATHS.server_log_archive_dir
+DEFAULT_FLEET_CONFIG_FILE = DEFAULT_PATHS.fleet_config_file
+DEFAULT_DAEMON_STATE_FILE = DEFAULT_PATHS.daemon_state_file
 
 # SteamCMD 相关
 STEAMCMD_DOWNLOAD_URLS = [
@@ -134,6 +183,8 @@ DEFAULT_SERVER_CONFIG = {
     "server_name": "灵魂面甲服务器",
     "max_players": 20,
     "port": 7777,
+    "query_port": 27015,  # Steam查询端口（A2S）
+    "echo_port": 18888,  # EchoPort
     "multihome": "0.0.0.0",  # 服务器监听地址
     "game_mode": "pve",  # 游戏模式：pve或pvp
     "auto_backup": True,
@@ -147,16 +198,148 @@ DEFAULT_SERVER_CONFIG = {
     "rcon_addr": "127.0.0.1",  # RCON地址
     "rcon_port": 25575,  # RCON端口
     "rcon_password": "",  # RCON密码
-    "extra_args": ""  # 额外启动参数
+    "extra_args": "",  # 额外启动参数
+    "stop_broadcast_message": "",  # 停止前通过RCON广播的消息，留空则不广播
+    "stop_save_command": "saveworld",  # 停止前执行的保存命令，留空则不保存
+    "stop_close_delay": 10,  # close命令的倒计时（秒）
+    "stop_save_timeout": 15,  # 保存/广播阶段超时（秒）
+    "stop_exit_timeout": 60,  # close后等待进程退出的超时（秒，不含倒计时）
+    "stop_terminate_timeout": 15,  # terminate后等待进程退出的超时（秒）
+    "stop_kill_timeout": 10,  # kill后等待进程退出的超时（秒）
+    "restart_ready_timeout": 120,  # 重启时等待端口释放和存档解锁的超时（秒）
+    "watchdog_enabled": True,  # 服务器崩溃后自动重启
+    "watchdog_backoff_initial": 10,  # 第一次自动重启前的等待时间（秒），之后每次翻倍
+    "watchdog_backoff_max": 300,  # 自动重启等待时间上限（秒）
+    "watchdog_crash_loop_count": 3,  # 时间窗口内崩溃达到该次数时判定为崩溃循环，停止自动重启
+    "watchdog_crash_loop_window": 10,  # 崩溃循环判定时间窗口（分钟）
+    "restart_schedule": "",  # 定时重启窗口开始时间（cron格式：分 时 日 月 周，如 "0 4 * * *"），为空表示不定时重启
+    "restart_window_minutes": 60,  # 定时重启窗口长度（分钟），窗口内优先在没有玩家时重启
+    "restart_countdown": [600, 300, 60, 30, 10],  # 有玩家在线时重启前的倒计时广播节点（秒）
+    "restart_countdown_message": "服务器将在 {time} 后重启，请及时下线",  # 倒计时广播内容，{time}为剩余时间
+    "control_api_enabled": False,  # 是否开启本地HTTP控制接口和Prometheus指标
+    "control_api_port": 27091,  # 本地HTTP控制接口端口（只监听127.0.0.1）
+    "control_api_token": "",  # 控制接口令牌，设置后请求需带 Authorization: Bearer <令牌>（/metrics 除外）；为空时POST操作使用自动生成的令牌
+    "cpu_affinity": "",  # 服务器进程使用的CPU核心（如 "2-7"），为空表示不限制
+    "background_cpu_affinity": "",  # 备份、SteamCMD使用的CPU核心，为空表示使用服务器没有占用的核心
+    "priority_startup": "high",  # 启动期间的进程优先级：idle/below_normal/normal/above_normal/high
+    "priority_running": "normal",  # 上线后的进程优先级
+    "memory_limit_mb": 0,  # 服务器进程内存上限（MB），0表示不限制
+    "resource_backend": "auto",  # 资源策略后端：auto/psutil/cgroup（Linux cgroup v2）
+    "preflight_min_free_mb": 2048,  # 启动前检查：存档目录和备份目录所在磁盘至少需要的剩余空间（MB）
+    "preflight_auto_reassign_ports": False,  # 多实例时端口被占用是否自动改用空闲端口
+    "log_archive_enabled": True,  # 是否把WS.log写入本地全文检索归档
+    "log_archive_retention_days": 14,  # 日志归档保留天数，0表示不清理
+    "log_retention_enabled": True,  # 是否把UE轮换出的WS-backup-*.log压缩归档并删除原文件
+    "log_retention_days": 30,  # 轮换日志压缩归档保留天数，0表示不按天数清理
+    "log_retention_max_mb": 2048  # 轮换日志压缩归档总大小上限（MB），0表示不限制
 }
 
+# 服务器进程发现相关
+SHIPPING_DISCOVERY_TIMEOUT = 60  # 等待WSServer-Win64-Shipping.exe出现的最长时间（秒）
+SHIPPING_DISCOVERY_MIN_DELAY = 0.1  # 进程树查找的初始退避间隔（秒）
+SHIPPING_DISCOVERY_MAX_DELAY = 1.0  # 进程树查找的最大退避间隔（秒）
+PROCESS_WAIT_SLICE = 0.5  # 没有pidfd时每次在线程中阻塞等待进程句柄的最长时间（秒），到时归还线程后继续等待
+PROCESS_WAIT_WORKERS = 8  # 等待进程退出专用的线程数，不占用事件循环的默认线程池
+
+# 启动时间线相关
+STARTUP_TIMEOUT = 600  # 等待服务器启动完成的最长时间（秒）
+STARTUP_PROBE_INTERVAL = 1.0  # 启动期间探测RCON/查询端口的间隔（秒）
+
+# 停止流程相关
+STOP_STAGES = ("save_broadcast", "rcon_close", "wait_exit", "terminate", "kill")  # 停止阶梯各阶段
+STOP_HISTORY_SIZE = 50  # 保留的停止/重启记录数量
+RESTART_READY_POLL_INTERVAL = 0.25  # 重启时检查端口和存档状态的间隔（秒）
+
+# 多实例相关
+FLEET_POLL_INTERVAL = 5  # 多实例状态汇总间隔（秒），每次只做一次系统进程扫描
+PROCESS_SNAPSHOT_MAX_AGE = 0.5  # 多实例共享的进程快照有效期（秒）
+# 自动分配的端口：配置项 -> (协议, 相邻实例间的步长)；游戏端口同时占用 port+1
+FLEET_PORT_KEYS = {
+    'port': ('udp', 2),
+    'query_port': ('udp', 1),
+    'rcon_port': ('tcp', 1),
+    'echo_port': ('tcp', 1)
+}
+
+# 定时重启相关
+RESTART_SCHEDULE_TICK = 1.0  # 定时重启调度检查间隔（秒）
+RESTART_PLAYER_POLL_INTERVAL = 30  # 重启窗口内查询在线玩家的间隔（秒）
+RESTART_STAGGER_SECONDS = 300  # 多个服务器实例之间定时重启的最小间隔（秒）
+SCHEDULED_RESTART_TIMEOUT = 900  # 等待定时重启的服务器重新上线的最长时间（秒）
+
+# 无界面守护进程相关
+DAEMON_CONTROL_HOST = "127.0.0.1"  # 本地控制接口地址（只监听本机）
+DAEMON_CONTROL_PORT = 27090  # 本地控制接口端口，被占用时使用系统分配的端口
+DAEMON_REQUEST_TIMEOUT = 30  # 控制命令等待执行结果的最长时间（秒）
+DAEMON_LOOP_INTERVAL = 0.5  # 守护进程主循环等待回调的间隔（秒）
+
+# 本地HTTP控制接口相关
+CONTROL_API_HOST = "127.0.0.1"  # 只监听本机
+CONTROL_API_SNAPSHOT_INTERVAL = 5  # 刷新接口快照（状态、备份列表）的间隔（秒）
+
+# 资源策略相关
+CGROUP_ROOT = "/sys/fs/cgroup"  # cgroup v2 挂载点
+CGROUP_GROUP_NAME = "smsl"  # 启动器创建的控制组目录名
+
+# 启动前检查
+PREFLIGHT_TIMEOUT = 2.0  # 所有启动前检查的最长等待时间（秒）
+
+# 后台任务调度相关
+TASK_STATS_HISTORY_SIZE = 256  # 一次性任务运行后按任务名保留累计统计的数量上限
+
+# 资源采样相关
+RESOURCE_SAMPLE_INTERVAL = 5  # 服务器进程资源采样间隔（秒）
+RESOURCE_HISTORY_HOURS = 72  # 资源采样历史保留时长（小时）
+
+# 服务器帧率遥测（从WS.log行首的时间和帧号推算）
+TICK_BUCKET_SECONDS = 10  # 帧率/卡顿按多少秒汇总为一个数据点
+TICK_HISTORY_HOURS = 72  # 帧率历史保留时长（小时）
+TICK_LONG_FRAME_MS = 250  # 单帧耗时超过多少毫秒计为长帧
+TICK_SUMMARY_WINDOW = 300  # 状态栏显示最近多少秒内的长帧和卡顿次数
+
 # RCON相关常量
 DEFAULT_RCON_PORT = 25575
 DEFAULT_RCON_PASSWORD = ""
 RCON_TIMEOUT = 10  # RCON连接超时时间（秒）
+PLAYER_RECONCILE_INTERVAL = 600  # 在线玩家由WS.log实时维护，RCON连接时每隔多久用lp校正一次（秒）
+PLAYER_RECONCILE_INITIAL_DELAY = 5  # RCON连接后第一次校正的延迟（秒），补上重新接管前错过的进入/断开事件
+PLAYER_LOGIN_PENDING_TTL = 300  # 登录请求后多久没有进入游戏就丢弃（秒）
+PLAYER_LOGIN_PENDING_MAX = 256  # 最多记住多少个尚未进入游戏的登录请求
 
 # 日志相关
 MAX_LOG_LINES = 1000  # 最大日志行数
+LOG_TAIL_CHUNK_SIZE = 64 * 1024  # 读取WS.log时每次系统调用读取的字节数
+LOG_TAIL_MAX_READ = 8 * 1024 * 1024  # 每轮最多读取的字节数，积压的日志分多轮读完，不长时间占用事件循环
+LOG_TAIL_MAX_LINE = 1024 * 1024  # 单行最大字节数
+LOG_TAIL_RESUME_WINDOW = 256 * 1024  # 重新接管服务器且没有有效检查点时，只读取WS.log末尾这么多字节
+LOG_IDENTITY_HEAD_BYTES = 4096  # 检查点中计算哈希的文件开头字节数，用于确认还是同一个日志文件
+LOG_OFFSET_SAVE_INTERVAL = 5.0  # 保存WS.log读取位置检查点的间隔（秒）
+LOG_POLL_MIN_INTERVAL = 0.02  # 无法使用文件变化通知时，读到新日志后的轮询间隔（秒）
+LOG_POLL_MAX_INTERVAL = 0.1  # 日志空闲时轮询间隔逐步放慢到的最大值（秒）
+LOG_NOTIFY_SAFETY_INTERVAL = 1.0  # 使用inotify时没有收到通知也至少每隔多久读取一次（秒）
+LOG_BATCH_INTERVAL = 0.05  # WS.log原始日志攒批发送给界面的最长等待时间（秒）
+LOG_BATCH_MAX_LINES = 500  # 攒满多少行立即发送
+LOG_ARCHIVE_BATCH_SIZE = 2000  # 日志归档攒满多少条立即写入数据库
+LOG_ARCHIVE_FLUSH_INTERVAL = 1.0  # 日志归档最长多久写入一次（秒）
+LOG_ARCHIVE_PRUNE_INTERVAL = 3600  # 日志归档清理过期记录的间隔（秒）
+LOG_ARCHIVE_SEARCH_LIMIT = 500  # 检索日志归档默认最多返回的记录数
+LOG_RATE_MAX_CATEGORIES = 200  # 日志速率统计最多区分的UE日志分类数，超出后归入"(其他)"
+LOG_RATE_BASELINE_ALPHA = 0.1  # 每分钟行数基线的指数加权系数
+LOG_RATE_ALERT_SIGMA = 4.0  # 最近1分钟行数超过 基线均值 + 4倍标准差 时告警
+LOG_RATE_ALERT_MIN_LINES = 300  # 最近1分钟少于这么多行时不告警
+LOG_RATE_WARMUP_MINUTES = 10  # 基线学习和服务器启动后暂停告警的时长（分钟）
+LOG_RATE_ALERT_COOLDOWN = 600  # 同一分类/级别两次告警的最小间隔（秒）
+LOG_RATE_TOP = 10  # 日志速率统计返回的最活跃分类数量
+LOG_RETENTION_INTERVAL = 1800  # 压缩归档轮换日志、清理旧归档的间隔（秒）
+LOG_RETENTION_INITIAL_DELAY = 120  # 启动器启动后第一次归档轮换日志的延迟（秒）
+LOG_RETENTION_MIN_AGE = 60  # 修改时间不到这么多秒的轮换日志暂不归档（秒）
+# 系统重要日志的关键字，其余服务器原始输出只在开启流式输出时显示
+IMPORTANT_LOG_KEYWORDS = (
+    '🚀', '✅', '❌', '⚠️', '🔍', '📍', '📋', '⏳', '🔗', '💡',  # 表情符号
+    '💥', '🛑', '🔁', '🔄', '⏰', '📢', '🚨', '🗜️',
+    '启动服务器', '停止服务器', '重启服务器', '服务器状态', '离线判断',
+    '错误:', '警告:', 'RCON', '进程已创建', '启动完成', '连接成功', '连接失败'
+)
 LOG_LEVELS = ["INFO", "WARNING", "ERROR", "SUCCESS"]
 
 # UI相关
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Qt兼容层 - 图形界面下使用PySide6的信号和定时器；无界面模式（SMSL_HEADLESS=1）
+或没有安装PySide6时使用纯Python实现，管理器模块不再直接依赖Qt
+"""
+
+import os
+import queue
+import threading
+import traceback
+
+HEADLESS = os.environ.get('SMSL_HEADLESS') == '1'
+QT_AVAILABLE = False
+
+if not HEADLESS:
+    try:
+        from PySide6.QtCore import QObject, Signal, Slot, QTimer, QThread
+        QT_AVAILABLE = True
+    except ImportError:
+        pass
+
+
+# 无界面模式下需要在主线程执行的回调（对应Qt的排队连接）
+_main_queue = queue.Queue()
+
+
+def post_to_main(func, *args):
+    """把回调排队到主线程执行（无界面模式，由 process_main_queue 处理）"""
+    _main_queue.put((func, args))
+
+
+def process_main_queue(timeout=None):
+    """在主线程中执行排队的回调（无界面模式的主循环调用）
+
+    Args:
+        timeout (float): 没有回调时最长等待时间，None表示一直等待
+
+    Returns:
+        int: 执行的回调数量
+    """
+    count = 0
+    try:
+        func, args = _main_queue.get(timeout=timeout)
+    except queue.Empty:
+        return 0
+    while True:
+        try:
+            func(*args)
+        except Exception:
+            traceback.print_exc()
+        count += 1
+        try:
+            func, args = _main_queue.get_nowait()
+        except queue.Empty:
+            return count
+
+
+if not QT_AVAILABLE:
+    class _BoundSignal:
+        """绑定到对象上的信号，emit 时在当前线程依次调用已连接的槽"""
+
+        def __init__(self):
+            self._slots = []
+            self._lock = threading.Lock()
+
+        def connect(self, slot):
+            with self._lock:
+                self._slots.append(slot)
+
+        def disconnect(self, slot=None):
+            with self._lock:
+                if slot is None:
+                    self._slots.clear()
+                elif slot in self._slots:
+                    self._slots.remove(slot)
+
+        def emit(self, *args):
+            with self._lock:
+                slots = list(self._slots)
+            for slot in slots:
+                try:
+                    slot(*args)
+                except Exception:
+                    traceback.print_exc()
+
+    class Signal:
+        """纯Python信号（类属性），每个对象拥有独立的连接列表"""
+
+        def __init__(self, *types):
+            self.types = types
+            self.name = None
+
+        def __set_name__(self, owner, name):
+            self.name = name
+
+        def __get__(self, instance, owner):
+            if instance is None:
+                return self
+            bound = instance.__dict__.get(self.name)
+            if bound is None:
+                bound = instance.__dict__.setdefault(self.name, _BoundSignal())
+            return bound
+
+    def Slot(*types):
+        """纯Python槽装饰器（不做任何处理）"""
+        def decorator(func):
+            return func
+        return decorator
+
+    class QObject:
+        """纯Python对象基类"""
+
+        def __init__(self, parent=None):
+            self._parent = parent
+
+    class QTimer(QObject):
+        """基于线程的周期定时器，timeout 信号在定时器线程中发射"""
+
+        timeout = Signal()
+
+        def __init__(self, parent=None):
+            super().__init__(parent)
+            self._stop_event = None
+
+        def start(self, msec):
+            self.stop()
+            stop_event = self._stop_event = threading.Event()
+
+            def run():
+                while not stop_event.wait(msec / 1000):
+                    self.timeout.emit()
+            threading.Thread(target=run, name="QTimer", daemon=True).start()
+
+        def stop(self):
+            if self._stop_event:
+                self._stop_event.set()
+                self._stop_event = None
+
+        def isActive(self):
+            return self._stop_event is not None
+
+    class QThread(QObject):
+        """基于threading的线程基类，子类重写 run()"""
+
+        def __init__(self, parent=None):
+            super().__init__(parent)
+            self._thread = None
+
+        def run(self):
+            pass
+
+        def start(self):
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+
+        def isRunning(self):
+            return self._thread is not None and self._thread.is_alive()
+
+        def wait(self, msec=None):
+            if self._thread:
+                self._thread.join(None if msec is None else msec / 1000)
+            return not self.isRunning()
@@ -7,6 +7,8 @@
 
 import os
 import sys
+import glob
+import socket
 import ipaddress
 from .constants import (DEFAULT_STEAMCMD_DIR, DEFAULT_STEAMCMD_EXE, DEFAULT_server_path, 
                         DEFAULT_SERVER_EXE, DEFAULT_BACKUP_DIR, DEFAULT_LOG_FILE, DEFAULT_CONFIG_FILE,
@@ -169,4 +171,37 @@ def validate_port(port):
         port_num = int(port)
         return 1 <= port_num <= 65535
     except (ValueError, TypeError):
-        return False
\ No newline at end of file
+        return False
+
+
+def is_port_free(port, host="0.0.0.0", protocol="tcp"):
+    """检查端口是否可以绑定（未被其他进程占用）"""
+    sock_type = socket.SOCK_DGRAM if protocol == "udp" else socket.SOCK_STREAM
+    sock = socket.socket(socket.AF_INET, sock_type)
+    try:
+        if protocol == "tcp" and os.name != "nt":
+            # 忽略TIME_WAIT状态的旧连接（Windows上该选项含义不同，不能设置）
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, int(port)))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def get_world_save_files(server_path):
+    """获取存档数据库文件列表（WS/Saved/Worlds 下的 *.db）"""
+    pattern = os.path.join(server_path, "WS", "Saved", "Worlds", "**", "*.db")
+    return glob.glob(pattern, recursive=True)
+
+
+def is_file_locked(file_path):
+    """检查文件是否被其他进程以独占方式打开（Windows下服务器运行时存档会被锁定）"""
+    try:
+        with open(file_path, "r+b"):
+            return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+无界面守护进程 - 不加载PySide6，在服务器主机上运行启动/停止、崩溃看门狗、定时重启、自动备份和RCON
+
+用法:
+    python -m src.daemon [--port 端口] [--no-start] [--verbose]
+
+守护进程在本机监听一个控制接口（每行一个JSON请求），图形界面启动时检测到守护进程会
+作为客户端通过该接口控制服务器，也可以用 src.managers.daemon_client.DaemonClient 编写脚本。
+"""
+
+import os
+import sys
+
+# 必须在导入管理器之前设置，管理器通过 qt_compat 选择纯Python的信号和定时器
+os.environ['SMSL_HEADLESS'] = '1'
+
+import json
+import signal
+import secrets
+import argparse
+import datetime
+import threading
+import socketserver
+import concurrent.futures
+
+from src.common.constants import (DEFAULT_DAEMON_STATE_FILE, DAEMON_CONTROL_HOST, DAEMON_CONTROL_PORT,
+                                  DAEMON_REQUEST_TIMEOUT, DAEMON_LOOP_INTERVAL, IMPORTANT_LOG_KEYWORDS,
+                                  APP_TITLE)
+from src.common.qt_compat import post_to_main, process_main_queue
+from src.managers.log_manager import LogManager
+from src.managers.fleet_manager import FleetManager
+from src.managers.restart_scheduler import RestartScheduler
+from src.managers.backup_manager import BackupManager
+from src.managers.control_api import ControlApi
+from src.managers.paths_manager import PathsManager
+from src.managers.server_params_manager import ServerParamsManager
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    """控制接口连接：逐行读取JSON请求并返回一行JSON响应"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line.decode('utf-8'))
+                result = self.server.daemon.handle_request(request)
+                response = {'ok': True, 'result': result}
+            except Exception as e:
+                response = {'ok': False, 'error': str(e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode('utf-8') + b'\n')
+
+
+class _ControlServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ServerDaemon:
+    """无界面守护进程
+
+    管理器的信号在发射线程中直接调用槽函数；需要在主线程执行的操作（启动、停止、重启、备份）
+    通过 post_to_main 排队，由主循环 process_main_queue 执行。
+    """
+
+    def __init__(self, control_port=DAEMON_CONTROL_PORT, state_file=DEFAULT_DAEMON_STATE_FILE, verbose=False):
+        self.control_port = control_port
+        self.state_file = state_file
+        self.verbose = verbose
+        self.token = secrets.token_hex(16)
+        self.running = False
+        self.control_server = None
+        self._print_lock = threading.Lock()
+
+        self.config_manager = ServerParamsManager()
+        self.paths_manager = PathsManager()
+        self.log_manager = LogManager(config_manager=self.config_manager)
+        self.fleet_manager = FleetManager()
+        self.fleet_manager.load()
+        self.server_manager = self.fleet_manager.get_instance("default") or self.fleet_manager.add_instance("default")
+        self.restart_scheduler = RestartScheduler(scheduler=self.fleet_manager.scheduler)
+        for name in self.fleet_manager.instance_names():
+            self.restart_scheduler.add_server(name, self.fleet_manager.get_instance(name))
+        self.backup_manager = BackupManager(config_manager=self.config_manager)
+        self.control_api = ControlApi(self.fleet_manager, self.backup_manager)
+        self.backup_manager.resource_governor = self.server_manager.resource_governor
+
+        self.log_manager.log_updated.connect(self._print)
+        self.fleet_manager.log_message.connect(self.on_fleet_log_message)
+        self.fleet_manager.log_batch.connect(self.on_fleet_log_batch)
+        self.restart_scheduler.log_message.connect(self.on_log_message)
+        self.backup_manager.log_message.connect(self.on_log_message)
+        self.control_api.log_message.connect(self.on_log_message)
+        self.backup_manager.backup_finished.connect(
+            lambda success, message: self.on_log_message(f"{'✅' if success else '❌'} {message}"))
+
+    def load_config(self):
+        """加载配置（与图形界面的加载方式相同）"""
+        config = self.config_manager.load_config()
+        if config.get('root_dir'):
+            self.paths_manager.set_root_directory(config['root_dir'])
+            server_path = self.paths_manager.get_path('game_install_dir')
+            self.backup_manager.set_backup_dir(self.paths_manager.get_path('backup_dir'))
+            self.log_manager.set_log_file_path(self.paths_manager.get_path('log_file'))
+        else:
+            server_path = config.get('server_path', '')
+            if config.get('backup_dir'):
+                self.backup_manager.set_backup_dir(config['backup_dir'])
+        if server_path:
+            self.server_manager.set_server_path(server_path)
+            self.backup_manager.set_server_path(server_path)
+        self.backup_manager.set_auto_backup(enabled=config.get('auto_backup', False),
+                                            interval_minutes=config.get('backup_interval', 30))
+        self.server_manager.set_server_config(config)
+        self.control_api.apply_config(config)
+        return config
+
+    def on_log_message(self, message):
+        """重要日志输出到终端并写入日志文件，服务器原始输出只在 --verbose 时输出到终端"""
+        if any(keyword in message for keyword in IMPORTANT_LOG_KEYWORDS):
+            self.log_manager.add_log(message)
+        elif self.verbose:
+            self._print(message)
+
+    def on_fleet_log_message(self, instance_name, message):
+        """服务器实例的日志（非默认实例加实例名前缀）"""
+        self.on_log_message(message if instance_name == "default" else f"[{instance_name}] {message}")
+
+    def on_fleet_log_batch(self, instance_name, lines):
+        """服务器实例的WS.log原始日志批次"""
+        for line in lines:
+            self.on_fleet_log_message(instance_name, line)
+
+    def _print(self, message):
+        with self._print_lock:
+            print(message, flush=True)
+
+    def call_in_main(self, func, *args):
+        """在主线程中执行并等待结果"""
+        future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+        post_to_main(run)
+        return future.result(timeout=DAEMON_REQUEST_TIMEOUT)
+
+    def _instance(self, name):
+        manager = self.fleet_manager.get_instance(name or "default")
+        if manager is None:
+            raise ValueError(f"实例不存在: {name}")
+        return manager
+
+    def _rcon_manager(self, name):
+        """获取实例，RCON未连接时先连接"""
+        manager = self._instance(name)
+        if manager.is_running and not manager.is_rcon_connected:
+            manager.connect_rcon()
+        return manager
+
+    def handle_request(self, request):
+        """处理控制接口请求（连接线程中调用）"""
+        if not secrets.compare_digest(str(request.get('token', "")), self.token):
+            raise PermissionError("令牌无效")
+        command = request.get('command')
+        instance = request.get('instance')
+        args = request.get('args') or {}
+
+        if command == 'ping':
+            return {'pid': os.getpid(), 'app': APP_TITLE, 'instances': self.fleet_manager.instance_names()}
+        if command == 'status':
+            if instance:
+                return self.call_in_main(self._instance(instance).get_server_status)
+            return self.call_in_main(lambda: {name: self._instance(name).get_server_status()
+                                              for name in self.fleet_manager.instance_names()})
+        if command == 'start':
+            manager = self._instance(instance)
+            if manager is self.server_manager:
+                self.call_in_main(self.load_config)
+            return self.call_in_main(manager.start_server)
+        if command == 'stop':
+            return self.call_in_main(self._instance(instance).stop_server)
+        if command == 'restart':
+            return self.call_in_main(self._instance(instance).restart_server)
+        if command == 'backup':
+            return self.call_in_main(self.backup_manager.create_backup)
+        if command == 'backups':
+            return self.backup_manager.get_backup_list()
+        if command == 'rcon':
+            return self._rcon_manager(instance).execute_rcon_command(str(args.get('command', '')))
+        if command == 'players':
+            return self._rcon_manager(instance).get_online_players()
+        if command == 'logs':
+            return self._instance(instance).search_logs(**args)
+        if command == 'log_rates':
+            return self._instance(instance).get_log_rates(**args)
+        if command == 'incidents':
+            return self._instance(instance).get_crash_incidents()
+        if command == 'schedule':
+            return self.restart_scheduler.get_status()
+        if command == 'shutdown':
+            post_to_main(self.shutdown)
+            return True
+        raise ValueError(f"未知命令: {command}")
+
+    def _start_control_server(self):
+        """启动本地控制接口，默认端口被占用时使用系统分配的端口"""
+        try:
+            self.control_server = _ControlServer((DAEMON_CONTROL_HOST, self.control_port), _ControlHandler)
+        except OSError:
+            self.control_server = _ControlServer((DAEMON_CONTROL_HOST, 0), _ControlHandler)
+        self.control_server.daemon = self
+        self.control_port = self.control_server.server_address[1]
+        threading.Thread(target=self.control_server.serve_forever, name="DaemonControl", daemon=True).start()
+
+    def _write_state_file(self):
+        """写入状态文件，客户端据此找到控制接口"""
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        state = {
+            'pid': os.getpid(),
+            'host': DAEMON_CONTROL_HOST,
+            'port': self.control_port,
+            'token': self.token,
+            'started_at': datetime.datetime.now().isoformat(timespec='seconds')
+        }
+        temp_file = self.state_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        if hasattr(os, 'chmod'):
+            os.chmod(temp_file, 0o600)  # 令牌只允许当前用户读取
+        os.replace(temp_file, self.state_file)
+
+    def _remove_state_file(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                if json.load(f).get('pid') != os.getpid():
+                    return  # 已被另一个守护进程接管
+            os.remove(self.state_file)
+        except (OSError, ValueError):
+            pass
+
+    def run(self, start_servers=True):
+        """运行守护进程直到收到退出信号"""
+        self.load_config()
+        self._start_control_server()
+        self._write_state_file()
+        self.restart_scheduler.start()
+        self.fleet_manager.start_log_retention()
+        self.log_manager.add_info(f"守护进程已启动 (PID {os.getpid()})，控制接口 {DAEMON_CONTROL_HOST}:{self.control_port}")
+
+        # 接管已在运行的服务器，否则按需启动所有实例
+        for name in self.fleet_manager.instance_names():
+            manager = self.fleet_manager.get_instance(name)
+            manager.auto_rcon_enabled = True  # 没有界面开关，服务器上线后总是自动连接RCON
+            manager._check_existing_process()
+            if start_servers and not manager.is_running and manager.server_path:
+                manager.start_server()
+
+        self.running = True
+        signal.signal(signal.SIGINT, lambda *_: post_to_main(self.shutdown))
+        signal.signal(signal.SIGTERM, lambda *_: post_to_main(self.shutdown))
+        try:
+            while self.running:
+                process_main_queue(timeout=DAEMON_LOOP_INTERVAL)
+        finally:
+            self._cleanup()
+
+    def shutdown(self):
+        """退出守护进程（服务器保持运行，下次启动守护进程时会重新接管）"""
+        self.running = False
+
+    def _cleanup(self):
+        self.log_manager.add_info("守护进程正在退出，服务器保持运行")
+        self.restart_scheduler.stop()
+        self.control_api.stop()
+        self.backup_manager.set_auto_backup(enabled=False)
+        if self.control_server:
+            self.control_server.shutdown()
+            self.control_server.server_close()
+        self._remove_state_file()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.daemon", description=f"{APP_TITLE} 无界面守护进程")
+    parser.add_argument('--port', type=int, default=DAEMON_CONTROL_PORT, help="本地控制接口端口")
+    parser.add_argument('--state-file', default=DEFAULT_DAEMON_STATE_FILE, help="守护进程状态文件")
+    parser.add_argument('--no-start', action='store_true', help="启动时不自动启动服务器，只接管已在运行的服务器")
+    parser.add_argument('--verbose', action='store_true', help="在终端输出服务器原始日志")
+    args = parser.parse_args(argv)
+
+    daemon = ServerDaemon(control_port=args.port, state_file=args.state_file, verbose=args.verbose)
+    daemon.run(start_servers=not args.no_start)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+异步核心模块 - 单线程asyncio事件循环及其与Qt主线程的桥接
+"""
+
+import os
+import asyncio
+import functools
+import threading
+import concurrent.futures
+from ..common.qt_compat import QObject, Signal, Slot, QT_AVAILABLE, post_to_main
+from ..common.constants import PROCESS_WAIT_SLICE, PROCESS_WAIT_WORKERS
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_process_wait_executor = None
+_process_wait_executor_lock = threading.Lock()
+
+
+def _get_process_wait_executor():
+    """等待进程退出专用的线程池（按需创建）"""
+    global _process_wait_executor
+    with _process_wait_executor_lock:
+        if _process_wait_executor is None:
+            _process_wait_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=PROCESS_WAIT_WORKERS, thread_name_prefix="ProcessWait")
+        return _process_wait_executor
+
+
+class AsyncLoopThread:
+    """在单个后台线程中运行的asyncio事件循环
+
+    进程等待、日志读取、RCON通信以及停止/重启流程都以协程形式在这里并发执行，
+    其他线程通过 submit()/run()/call() 把工作交给事件循环。
+    """
+
+    def __init__(self, name="AsyncLoop"):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._operations = {}  # name -> concurrent.futures.Future
+
+    @property
+    def loop(self):
+        """事件循环（按需启动）"""
+        self._ensure_started()
+        return self._loop
+
+    def in_loop_thread(self):
+        """当前是否处于事件循环线程中"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro, name=None):
+        """提交协程到事件循环，立即返回 concurrent.futures.Future
+
+        Args:
+            coro: 协程对象
+            name (str): 操作名称；同名的未完成操作会先被取消，避免重复执行
+
+        Returns:
+            concurrent.futures.Future: 协程结果
+        """
+        self._ensure_started()
+        with self._lock:
+            if name:
+                previous = self._operations.get(name)
+                if previous and not previous.done():
+                    previous.cancel()
+            future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+            if name:
+                self._operations[name] = future
+        return future
+
+    def run(self, coro, timeout=None):
+        """提交协程并阻塞等待结果（不能在事件循环线程中调用）"""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("不能在事件循环线程中同步等待协程")
+        return self.submit(coro).result(timeout)
+
+    def call(self, func, *args):
+        """在事件循环线程中执行普通函数并返回结果（在循环线程中调用时直接执行）"""
+        if self.in_loop_thread():
+            return func(*args)
+
+        async def invoke():
+            return func(*args)
+        return self.run(invoke())
+
+    def cancel(self, name):
+        """取消指定名称的操作
+
+        Returns:
+            bool: 存在未完成的操作并已取消返回True
+        """
+        with self._lock:
+            future = self._operations.get(name)
+            if future and not future.done():
+                future.cancel()
+                return True
+            return False
+
+    def is_active(self, name):
+        """检查指定名称的操作是否仍在执行"""
+        with self._lock:
+            future = self._operations.get(name)
+            return bool(future and not future.done())
+
+    def live_operations(self):
+        """获取所有未完成操作的名称列表"""
+        with self._lock:
+            return sorted(name for name, future in self._operations.items() if not future.done())
+
+    def scoped(self, prefix):
+        """获取带名称前缀的事件循环视图，多个服务器实例共享同一个事件循环时操作名互不冲突"""
+        return ScopedLoop(self, prefix)
+
+    def stop(self):
+        """停止事件循环"""
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def _ensure_started(self):
+        """按需启动事件循环线程"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._started.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._started.wait()
+
+    def _run(self):
+        """事件循环线程主函数"""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+
+class ScopedLoop:
+    """共享事件循环的命名空间视图
+
+    接口与 AsyncLoopThread 相同，操作名自动加上 "<前缀>:"，stop 只取消本视图的操作。
+    """
+
+    def __init__(self, core, prefix):
+        self.core = core
+        self.prefix = f"{prefix}:"
+
+    def _name(self, name):
+        return self.prefix + name if name else name
+
+    @property
+    def loop(self):
+        return self.core.loop
+
+    def in_loop_thread(self):
+        return self.core.in_loop_thread()
+
+    def submit(self, coro, name=None):
+        return self.core.submit(coro, name=self._name(name))
+
+    def run(self, coro, timeout=None):
+        return self.core.run(coro, timeout)
+
+    def call(self, func, *args):
+        return self.core.call(func, *args)
+
+    def cancel(self, name):
+        return self.core.cancel(self._name(name))
+
+    def is_active(self, name):
+        return self.core.is_active(self._name(name))
+
+    def live_operations(self):
+        return [name[len(self.prefix):] for name in self.core.live_operations() if name.startswith(self.prefix)]
+
+    def stop(self):
+        """取消本视图的所有操作（共享的事件循环继续运行）"""
+        for name in self.live_operations():
+            self.cancel(name)
+
+
+class QtEventBridge(QObject):
+    """事件循环到Qt主线程的桥接
+
+    桥接对象在主线程中创建，事件循环线程通过内部信号把回调排队到主线程执行；
+    现有的 status_changed / log_message / players_updated 等信号在跨线程发射时
+    同样由Qt自动排队投递到主线程。无界面模式下回调进入 qt_compat 的主线程队列。
+    """
+
+    _invoke = Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._invoke.connect(self._run_callback)
+
+    def call_in_main_thread(self, func, *args):
+        """把回调排队到主线程执行"""
+        if QT_AVAILABLE:
+            self._invoke.emit(functools.partial(func, *args))
+        else:
+            post_to_main(func, *args)
+
+    def deliver(self, future, callback):
+        """协程完成后在主线程中用其结果调用回调（被取消或出错时不调用）"""
+        def on_done(done_future):
+            if done_future.cancelled() or done_future.exception() is not None:
+                return
+            self.call_in_main_thread(callback, done_future.result())
+        future.add_done_callback(on_done)
+
+    @Slot(object)
+    def _run_callback(self, callback):
+        """在主线程中执行回调"""
+        callback()
+
+
+async def wait_for_process_exit(pid, timeout=None, create_time=None):
+    """等待进程退出，由进程退出事件唤醒而不是轮询
+
+    Linux 上使用 pidfd 注册到事件循环；其他平台在专用线程池中分段阻塞等待进程句柄，
+    每段最多 PROCESS_WAIT_SLICE 秒，这样长时间等待（看门狗）或被取消的等待都不会一直占住线程。
+
+    Args:
+        pid (int): 进程PID
+        timeout (float): 最长等待秒数，None表示一直等待
+        create_time (float): 进程创建时间，用于识别PID复用
+
+    Returns:
+        bool: 进程已退出返回True，超时返回False
+    """
+    if not pid:
+        return True
+    loop = asyncio.get_running_loop()
+
+    process = None
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            if create_time is not None and abs(process.create_time() - create_time) > 0.01:
+                return True  # PID已被其他进程复用，原进程早已退出
+        except psutil.NoSuchProcess:
+            return True
+        except psutil.AccessDenied:
+            pass
+
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pidfd = None
+        if pidfd is not None:
+            exited = loop.create_future()
+            loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(True))
+            try:
+                await asyncio.wait_for(exited, timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                loop.remove_reader(pidfd)
+                os.close(pidfd)
+
+    if process is None:
+        raise RuntimeError("未安装psutil模块，无法等待进程退出")
+    executor = _get_process_wait_executor()
+    deadline = None if timeout is None else loop.time() + timeout
+    while True:
+        wait = PROCESS_WAIT_SLICE if deadline is None else min(PROCESS_WAIT_SLICE, deadline - loop.time())
+        if wait <= 0:
+            return False
+        try:
+            await loop.run_in_executor(executor, process.wait, wait)
+            return True
+        except psutil.TimeoutExpired:
+            continue
+        except psutil.NoSuchProcess:
+            return True
+
+
+async def wait_for_processes_exit(identities, timeout=None):
+    """并发等待多个进程全部退出
+
+    Args:
+        identities (list): (pid, create_time) 列表，create_time 可以为None
+        timeout (float): 最长等待秒数
+
+    Returns:
+        bool: 全部退出返回True
+    """
+    if not identities:
+        return True
+    results = await asyncio.gather(*(wait_for_process_exit(pid, timeout, create_time)
+                                     for pid, create_time in identities))
+    return all(results)
+
+
+def signal_processes(identities, kill=False):
+    """向仍在运行的进程发送terminate或kill（会校验创建时间，避免误杀复用PID的进程）
+
+    Returns:
+        list: 已发送信号的进程PID
+    """
+    signalled = []
+    if psutil is None:
+        return signalled
+    for pid, create_time in identities:
+        try:
+            process = psutil.Process(pid)
+            if create_time is not None and abs(process.create_time() - create_time) > 0.01:
+                continue
+            if kill:
+                process.kill()
+            else:
+                process.terminate()
+            signalled.append(pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return signalled
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+异步RCON客户端模块 - 基于asyncio流的RCON协议实现
+"""
+
+import struct
+import asyncio
+
+# RCON数据包类型
+RCON_PACKET_COMMAND = 2
+RCON_PACKET_AUTH = 3
+
+# 单个数据包大小上限，防止恶意数据
+RCON_MAX_PACKET_SIZE = 4096
+
+
+def encode_rcon_packet(request_id, packet_type, payload):
+    """编码RCON数据包
+
+    数据包格式: [长度(4)][请求ID(4)][类型(4)][载荷(变长)][0(1)][0(1)]
+    长度是指从请求ID开始到结尾的长度，不包括长度字段本身
+    """
+    if not isinstance(payload, str):
+        payload = str(payload)
+    payload_bytes = payload.encode('utf-8')
+    packet_size = 4 + 4 + len(payload_bytes) + 2
+    return struct.pack('<III', packet_size, request_id, packet_type) + payload_bytes + b'\x00\x00'
+
+
+def decode_rcon_packet(packet_data):
+    """解析RCON数据包（不含长度字段）
+
+    Returns:
+        dict or None: {'id', 'type', 'body'}，数据不足时返回None
+    """
+    if len(packet_data) < 8:
+        return None
+    response_id, response_type = struct.unpack('<II', packet_data[0:8])
+    response_body = ""
+    if len(packet_data) > 8:
+        # 去除末尾的两个空字节
+        try:
+            response_body = packet_data[8:-2].decode('utf-8')
+        except UnicodeDecodeError:
+            # latin-1 可以解码任何字节序列
+            response_body = packet_data[8:-2].decode('latin-1')
+    return {
+        'id': response_id,
+        'type': response_type,
+        'body': response_body
+    }
+
+
+class AsyncRconClient:
+    """异步RCON客户端，所有方法都必须在同一个事件循环中调用
+
+    请求ID固定，响应只能按顺序对应请求：每次"发送+接收"的往返（包括认证）都在 request() 中持有 lock 完成。
+    往返中超时或收到异常数据包时连接已无法与后续请求对应，会直接关闭连接并抛出异常。
+    """
+
+    def __init__(self, request_id=1):
+        self.request_id = request_id  # 简化处理，使用固定ID
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+
+    @property
+    def connected(self):
+        """TCP连接是否仍然打开"""
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self, host, port, timeout=5):
+        """建立TCP连接（不做认证）"""
+        self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(host, int(port)), timeout)
+
+    async def send_packet(self, packet_type, payload, timeout=5):
+        """发送RCON数据包"""
+        if not self.connected:
+            raise ConnectionError("RCON未连接")
+        self.writer.write(encode_rcon_packet(self.request_id, packet_type, payload))
+        await asyncio.wait_for(self.writer.drain(), timeout)
+
+    async def read_packet(self, timeout=5):
+        """接收一个RCON数据包
+
+        Returns:
+            dict: 解析后的数据包
+        """
+        if not self.connected:
+            raise ConnectionError("RCON未连接")
+        size_data = await asyncio.wait_for(self.reader.readexactly(4), timeout)
+        packet_size = struct.unpack('<i', size_data)[0]
+        if packet_size < 8 or packet_size > RCON_MAX_PACKET_SIZE:
+            self.close()  # 数据包剩余部分留在流中，连接已无法继续使用
+            raise ConnectionError(f"RCON数据包大小异常: {packet_size}")
+        packet_data = await asyncio.wait_for(self.reader.readexactly(packet_size), timeout)
+        return decode_rcon_packet(packet_data)
+
+    async def request(self, packet_type, payload, timeout=5):
+        """在连接锁内完成一次发送和接收
+
+        Returns:
+            dict: 响应数据包
+
+        Raises:
+            ConnectionError, OSError, asyncio.TimeoutError: 往返失败，连接已关闭
+        """
+        async with self.lock:
+            try:
+                await self.send_packet(packet_type, payload, timeout)
+                return await self.read_packet(timeout)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError, asyncio.CancelledError):
+                # 迟到的响应会被当作下一个请求的响应（往返被取消时也是如此），不能继续使用这个连接
+                self.close()
+                raise
+
+    async def authenticate(self, password, timeout=5):
+        """发送认证请求，认证响应ID与请求ID一致即视为成功"""
+        response = await self.request(RCON_PACKET_AUTH, password, timeout)
+        return response['id'] == self.request_id
+
+    async def command(self, command, timeout=5):
+        """执行命令并返回响应内容"""
+        response = await self.request(RCON_PACKET_COMMAND, command, timeout)
+        return response['body']
+
+    def close(self):
+        """关闭连接（需在事件循环线程中调用）"""
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            except Exception:
+                pass
+        self.reader = None
+        self.writer = None
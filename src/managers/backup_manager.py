@@ -11,9 +11,10 @@ import zipfile
 from datetime import datetime
 import threading
 import time
-from PySide6.QtCore import QObject, Signal, QTimer
+from ..common.qt_compat import QObject, Signal, QTimer
 from ..common.utils import get_app_dir
 from ..common.constants import DEFAULT_BACKUP_DIR, DEFAULT_BACKUP_INTERVAL, DEFAULT_KEEP_BACKUPS_COUNT
+from .log_retention import is_rotated_log
 
 
 class BackupManager(QObject):
@@ -33,6 +34,8 @@ class BackupManager(QObject):
         self.auto_backup_enabled = False
         self.backup_interval = DEFAULT_BACKUP_INTERVAL
         self.server_path = ""
+        self.last_backup = None  # 最近一次备份的结果（文件、开始时间、耗时、大小、是否成功）
+        self.resource_governor = None  # 资源策略，设置后备份线程运行在后台核心上并降低I/O优先级
         
         # 如果有配置管理器，从配置中更新路径
         if self.config_manager:
@@ -93,6 +96,9 @@ class BackupManager(QObject):
     
     def _create_backup_thread(self, backup_file, include_logs):
         """备份线程函数"""
+        started_at = time.time()
+        if self.resource_governor:
+            self.resource_governor.apply_background_to_current_thread()
         try:
             with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 # 备份整个WS\Saved目录（包含世界存档）
@@ -100,6 +106,9 @@ class BackupManager(QObject):
                 if os.path.exists(saved_dir):
                     self.backup_progress.emit("正在备份世界存档文件...")
                     for root, dirs, files in os.walk(saved_dir):
+                        # 服务器日志不属于世界存档，由下面的 include_logs 单独处理
+                        if root == saved_dir and 'Logs' in dirs:
+                            dirs.remove('Logs')
                         for file in files:
                             file_path = os.path.join(root, file)
                             # 保持相对路径结构
@@ -134,7 +143,8 @@ class BackupManager(QObject):
                     if os.path.exists(logs_dir):
                         for root, dirs, files in os.walk(logs_dir):
                             for file in files:
-                                if file.endswith('.log') or file.endswith('.txt'):
+                                # 轮换出的WS-backup-*.log由日志保留任务压缩归档，不放进备份
+                                if (file.endswith('.log') or file.endswith('.txt')) and not is_rotated_log(file):
                                     file_path = os.path.join(root, file)
                                     arc_path = os.path.relpath(file_path, self.server_path)
                                     zipf.write(file_path, arc_path)
@@ -146,6 +156,7 @@ class BackupManager(QObject):
             
             success_msg = f"备份创建成功: {os.path.basename(backup_file)} ({size_mb:.2f} MB)"
             self.log_message.emit(success_msg)
+            self._record_backup(backup_file, started_at, True, backup_size)
             
             # 清理旧备份
             self._cleanup_old_backups()
@@ -155,8 +166,19 @@ class BackupManager(QObject):
         except Exception as e:
             error_msg = f"备份过程中出错: {str(e)}"
             self.log_message.emit(error_msg)
+            self._record_backup(backup_file, started_at, False, 0)
             self.backup_finished.emit(False, error_msg)
     
+    def _record_backup(self, backup_file, started_at, success, size):
+        """记录最近一次备份的结果"""
+        self.last_backup = {
+            'file': os.path.basename(backup_file),
+            'started_at': started_at,
+            'duration': time.time() - started_at,
+            'size': size,
+            'success': success
+        }
+    
     def restore_backup(self, backup_file):
         """恢复备份（会先自动保存当前存档）"""
         # 如果传入的是文件名而不是完整路径，则构建完整路径
@@ -192,6 +214,8 @@ class BackupManager(QObject):
     
     def _restore_backup_thread(self, backup_file):
         """恢复备份线程函数（先保存当前存档）"""
+        if self.resource_governor:
+            self.resource_governor.apply_background_to_current_thread()
         try:
             # 第一步：先保存当前存档
             self.backup_progress.emit("正在保存当前存档...")
@@ -210,12 +234,16 @@ class BackupManager(QObject):
                 # 只备份WS/Saved目录
                 saved_dir = os.path.join(self.server_path, "WS", "Saved")
                 if os.path.exists(saved_dir):
-                    # 先统计文件总数
+                    # 先统计文件总数（不包含服务器日志）
                     for root, dirs, files in os.walk(saved_dir):
+                        if root == saved_dir and 'Logs' in dirs:
+                            dirs.remove('Logs')
                         file_count += len(files)
                     
                     # 备份文件并显示进度
                     for root, dirs, files in os.walk(saved_dir):
+                        if root == saved_dir and 'Logs' in dirs:
+                            dirs.remove('Logs')
                         for file in files:
                             file_path = os.path.join(root, file)
                             arcname = os.path.relpath(file_path, self.server_path)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地HTTP控制接口模块 - 以JSON提供服务器状态、玩家、备份和启停操作，并提供Prometheus格式的 /metrics
+
+接口只读取后台定期刷新的快照，抓取指标不会触发进程扫描或RCON命令。
+"""
+
+import json
+import time
+import secrets
+import threading
+import concurrent.futures
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from ..common.qt_compat import QObject, Signal
+from ..common.constants import (DEFAULT_SERVER_CONFIG, CONTROL_API_HOST, CONTROL_API_SNAPSHOT_INTERVAL,
+                                DAEMON_REQUEST_TIMEOUT, LOG_ARCHIVE_SEARCH_LIMIT)
+from .async_core import QtEventBridge
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """HTTP请求处理（每个请求一个线程）"""
+
+    server_version = "SMSL"
+
+    def do_GET(self):
+        self.server.api.handle(self, 'GET')
+
+    def do_POST(self):
+        self.server.api.handle(self, 'POST')
+
+    def log_message(self, format, *args):
+        pass  # 不输出访问日志
+
+    def send(self, code, body, content_type='application/json; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ControlApi(QObject):
+    """本地HTTP控制接口
+
+    GET  /api/status            所有实例的状态和最近一次备份结果
+    GET  /api/players           在线玩家（?instance=实例名）
+    GET  /api/backups           备份列表
+    GET  /api/logs              检索归档的服务器日志（?instance=&q=&category=&verbosity=Error,Fatal&since=7d&limit=）
+    GET  /api/log_rates         各分类/级别的日志速率、最活跃的分类和最近的告警（?instance=&top=）
+    POST /api/start|stop|restart 启动/停止/重启服务器（?instance=实例名，默认default）
+    POST /api/backup            开始创建备份（返回202，结果见 /api/status 的 last_backup）
+    GET  /metrics               Prometheus文本格式指标
+
+    POST 请求总是需要令牌（未配置时启动接口会生成一个随机令牌并输出到日志）；
+    带 Origin 头的请求（来自浏览器网页）一律拒绝，避免网页跨站调用本机接口。
+    """
+
+    log_message = Signal(str)  # 日志消息信号
+
+    def __init__(self, fleet_manager, backup_manager):
+        super().__init__()
+        self.fleet_manager = fleet_manager
+        self.backup_manager = backup_manager
+        self.scheduler = fleet_manager.scheduler
+        self.event_bridge = QtEventBridge()  # 在主线程创建，启停操作排队到主线程执行
+        self.port = None
+        self.token = ""
+        self._generated_token = None  # 未配置令牌时生成的随机令牌（本进程内保持不变）
+        self.httpd = None
+        self._snapshot = {}
+        self._lock = threading.Lock()
+
+    def apply_config(self, config):
+        """根据配置开启、关闭或重启接口"""
+        enabled = config.get('control_api_enabled', DEFAULT_SERVER_CONFIG['control_api_enabled'])
+        port = int(config.get('control_api_port', DEFAULT_SERVER_CONFIG['control_api_port']))
+        self.token = config.get('control_api_token', DEFAULT_SERVER_CONFIG['control_api_token'])
+        if enabled and not self.token:
+            if self._generated_token is None:
+                self._generated_token = secrets.token_hex(16)
+                self.log_message.emit(f"🔑 未配置 control_api_token，已生成控制接口令牌: {self._generated_token}")
+            self.token = self._generated_token
+        if not enabled:
+            self.stop()
+        elif self.httpd is None or port != self.port:
+            self.stop()
+            self.start(port)
+
+    def start(self, port):
+        """开始监听"""
+        try:
+            self.httpd = ThreadingHTTPServer((CONTROL_API_HOST, port), _ApiHandler)
+        except OSError as e:
+            self.log_message.emit(f"❌ 控制接口启动失败，端口 {port} 不可用: {str(e)}")
+            return False
+        self.httpd.daemon_threads = True
+        self.httpd.api = self
+        self.port = port
+        self._refresh_snapshot()
+        self.scheduler.call_every(CONTROL_API_SNAPSHOT_INTERVAL, self._refresh_snapshot, name='control_api_snapshot')
+        threading.Thread(target=self.httpd.serve_forever, name="ControlApi", daemon=True).start()
+        self.log_message.emit(f"🔗 控制接口已启动: http://{CONTROL_API_HOST}:{port}/api/status")
+        return True
+
+    def stop(self):
+        """停止监听"""
+        if self.httpd is None:
+            return
+        self.scheduler.cancel('control_api_snapshot')
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.httpd = None
+        self.port = None
+        self.log_message.emit("控制接口已关闭")
+
+    def _refresh_snapshot(self):
+        """刷新快照（调度器线程）：实例状态来自多实例汇总缓存，不在这里扫描进程"""
+        instances = self.fleet_manager.get_fleet_status()
+        players = {}
+        for name in self.fleet_manager.instance_names():
+            manager = self.fleet_manager.get_instance(name)
+            if manager is not None:
+                players[name] = {'players': list(manager.online_players), 'updated_at': manager.players_updated_at}
+        backups = [dict(backup, created=backup['created'].isoformat(), modified=backup['modified'].isoformat())
+                   for backup in self.backup_manager.get_backup_list()]
+        with self._lock:
+            self._snapshot = {
+                'updated_at': time.time(),
+                'instances': instances,
+                'players': players,
+                'backups': backups,
+                'last_backup': self.backup_manager.last_backup
+            }
+        return True
+
+    def snapshot(self):
+        """最近一次快照"""
+        with self._lock:
+            return dict(self._snapshot)
+
+    def _call_in_main(self, func, *args):
+        """在主线程中执行并等待结果"""
+        future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+        self.event_bridge.call_in_main_thread(run)
+        return future.result(timeout=DAEMON_REQUEST_TIMEOUT)
+
+    def handle(self, request, method):
+        """分发请求（请求线程）"""
+        url = urlparse(request.path)
+        query = parse_qs(url.query)
+        instance = query.get('instance', ["default"])[0]
+        try:
+            if request.headers.get('Origin') is not None:
+                request.send(403, json.dumps({'error': "不接受来自网页的请求"}, ensure_ascii=False))
+                return
+            if url.path == '/metrics' and method == 'GET':
+                request.send(200, self.render_metrics(), 'text/plain; version=0.0.4; charset=utf-8')
+                return
+            if (self.token or method == 'POST') and not (self.token and secrets.compare_digest(
+                    request.headers.get('Authorization') or "", f"Bearer {self.token}")):
+                request.send(401, json.dumps({'error': "令牌无效"}, ensure_ascii=False))
+                return
+            result = self._route(url.path, method, instance, query)
+            code = 200
+            if isinstance(result, tuple):
+                code, result = result
+            if result is None:
+                request.send(404, json.dumps({'error': "未知接口"}, ensure_ascii=False))
+            else:
+                request.send(code, json.dumps(result, ensure_ascii=False, default=str))
+        except Exception as e:
+            request.send(500, json.dumps({'error': str(e)}, ensure_ascii=False))
+
+    def _route(self, path, method, instance, query):
+        """返回接口结果（或 (状态码, 结果)），未知接口返回None"""
+        snapshot = self.snapshot()
+        if method == 'GET':
+            if path == '/api/status':
+                return {key: snapshot.get(key) for key in ('updated_at', 'instances', 'last_backup')}
+            if path == '/api/players':
+                return snapshot.get('players', {}).get(instance, {'players': [], 'updated_at': None})
+            if path == '/api/backups':
+                return snapshot.get('backups', [])
+            if path == '/api/logs':
+                return self._search_logs(instance, query)
+            if path == '/api/log_rates':
+                manager = self.fleet_manager.get_instance(instance)
+                if manager is None:
+                    raise ValueError(f"实例不存在: {instance}")
+                return manager.get_log_rates(**{key: values[0] for key, values in query.items() if key == 'top'})
+            return None
+
+        if path == '/api/backup':
+            # 备份可能需要很长时间，不等待结果，调用方通过 /api/status 的 last_backup 查看
+            self.event_bridge.call_in_main_thread(self.backup_manager.create_backup)
+            return 202, {'accepted': True, 'last_backup': snapshot.get('last_backup')}
+        if path in ('/api/start', '/api/stop', '/api/restart'):
+            manager = self.fleet_manager.get_instance(instance)
+            if manager is None:
+                raise ValueError(f"实例不存在: {instance}")
+            action = {'/api/start': manager.start_server, '/api/stop': manager.stop_server,
+                      '/api/restart': manager.restart_server}[path]
+            return {'ok': self._call_in_main(action)}
+        return None
+
+    def _search_logs(self, instance, query):
+        """检索日志归档（直接在请求线程中查询数据库）"""
+        manager = self.fleet_manager.get_instance(instance)
+        if manager is None:
+            raise ValueError(f"实例不存在: {instance}")
+        params = {key: values[0] for key, values in query.items()}
+        verbosity = params.get('verbosity')
+        return manager.search_logs(text=params.get('q'), category=params.get('category'),
+                                   verbosity=verbosity.split(',') if verbosity else None,
+                                   since=params.get('since'), until=params.get('until'),
+                                   limit=int(params.get('limit') or LOG_ARCHIVE_SEARCH_LIMIT))
+
+    def render_metrics(self):
+        """生成Prometheus文本格式指标（只读取快照）"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, help_text, samples, metric_type='gauge'):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_text = ','.join(f'{key}="{value_}"' for key, value_ in labels.items())
+                lines.append(f"{name}{{{label_text}}} {float(value)!r}" if label_text else f"{name} {float(value)!r}")
+
+        instances = snapshot.get('instances', {})
+        players = snapshot.get('players', {})
+        metric('smsl_server_up', "服务器是否在线", [({'instance': name}, 1 if status.get('running') else 0)
+                                                     for name, status in instances.items()])
+        metric('smsl_server_uptime_seconds', "服务器运行时间",
+               [({'instance': name}, status.get('uptime_seconds')) for name, status in instances.items()])
+        metric('smsl_server_rss_bytes', "服务器进程常驻内存",
+               [({'instance': name}, status.get('rss')) for name, status in instances.items()])
+        metric('smsl_server_cpu_percent', "服务器进程CPU占用",
+               [({'instance': name}, status.get('cpu_percent')) for name, status in instances.items()])
+        metric('smsl_players_online', "在线玩家数量",
+               [({'instance': name}, len(players.get(name, {}).get('players', []))) for name in instances])
+        metric('smsl_server_fps', "服务器帧率（由WS.log帧号推算）",
+               [({'instance': name}, status.get('server_fps')) for name, status in instances.items()])
+        metric('smsl_server_max_frame_milliseconds', "最近一段时间内最长的帧耗时",
+               [({'instance': name}, status.get('max_frame_ms')) for name, status in instances.items()])
+        metric('smsl_server_hitches', "最近一段时间内WS.log中的卡顿次数",
+               [({'instance': name}, status.get('hitches')) for name, status in instances.items()])
+        metric('smsl_server_long_frames', "最近一段时间内的长帧次数",
+               [({'instance': name}, status.get('long_frames')) for name, status in instances.items()])
+        metric('smsl_rcon_latency_seconds', "最近一次RCON命令往返耗时",
+               [({'instance': name}, status.get('rcon_latency')) for name, status in instances.items()])
+
+        last_backup = snapshot.get('last_backup') or {}
+        metric('smsl_backup_last_duration_seconds', "最近一次备份耗时", [({}, last_backup.get('duration'))])
+        metric('smsl_backup_last_success', "最近一次备份是否成功",
+               [({}, None if not last_backup else int(last_backup['success']))])
+        metric('smsl_backup_last_timestamp_seconds', "最近一次备份开始时间", [({}, last_backup.get('started_at'))])
+        metric('smsl_backups', "备份文件数量", [({}, len(snapshot.get('backups', [])))])
+        metric('smsl_snapshot_timestamp_seconds', "快照刷新时间", [({}, snapshot.get('updated_at'))])
+        return '\n'.join(lines) + '\n'
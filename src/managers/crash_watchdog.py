@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+崩溃看门狗模块 - 检测服务器异常退出，按指数退避自动重启并识别崩溃循环
+"""
+
+import os
+import time
+import asyncio
+import collections
+
+# 看门狗状态
+WATCHDOG_IDLE = 'idle'              # 未监视（服务器未运行或已手动停止）
+WATCHDOG_WATCHING = 'watching'      # 正在监视服务器进程
+WATCHDOG_BACKOFF = 'backoff'        # 检测到崩溃，等待退避时间后重启
+WATCHDOG_RESTARTING = 'restarting'  # 已发起自动重启，等待服务器上线
+WATCHDOG_CRASH_LOOP = 'crash_loop'  # 短时间内崩溃次数过多，已停止自动重启
+
+# 日志中的崩溃特征
+CRASH_SIGNATURES = (
+    'Fatal error',
+    'Unhandled Exception',
+    'LowLevelFatalError',
+    '=== Critical error: ===',
+    'Assertion failed',
+    'appError called'
+)
+
+# 正常退出时UE写入的日志
+CLEAN_EXIT_MARKERS = ('LogExit: Exiting',)
+
+
+def read_log_tail(path, max_bytes=16384, max_lines=40):
+    """读取日志文件末尾若干行"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - max_bytes))
+            data = f.read()
+    except OSError:
+        return []
+    lines = data.decode('utf-8', errors='ignore').splitlines()
+    if size > max_bytes and lines:
+        lines = lines[1:]  # 第一行可能不完整
+    return [line.strip() for line in lines[-max_lines:] if line.strip()]
+
+
+def classify_exit(exit_code, log_tail):
+    """判断进程退出是否异常
+
+    Args:
+        exit_code (int): 退出码，无法获取时为None
+        log_tail (list): 退出时的日志末尾
+
+    Returns:
+        tuple: (是否异常, 原因)
+    """
+    for line in reversed(log_tail):
+        if any(signature in line for signature in CRASH_SIGNATURES):
+            return True, line[-200:]
+    if exit_code not in (None, 0):
+        return True, f"退出码 {exit_code}"
+    if any(marker in line for line in log_tail for marker in CLEAN_EXIT_MARKERS):
+        return False, "正常退出"
+    return True, "进程意外退出（日志中没有正常退出记录）"
+
+
+class CrashWatchdog:
+    """服务器崩溃看门狗
+
+    手动停止/重启前调用 expect_exit()，之后的进程退出不视为崩溃；
+    异常退出后按指数退避调用 restart_callback 重新启动，
+    在 crash_loop_window 秒内崩溃达到 crash_loop_count 次时进入崩溃循环状态，不再自动重启，
+    直到下一次手动启动。每次事故记录检测时间、原因和恢复耗时。
+    """
+
+    def __init__(self, restart_callback, log_callback, state_callback=None):
+        self.restart_callback = restart_callback
+        self.log = log_callback
+        self.state_callback = state_callback
+        self.enabled = True
+        self.backoff_initial = 10.0
+        self.backoff_max = 300.0
+        self.crash_loop_count = 3
+        self.crash_loop_window = 600.0
+        self.state = WATCHDOG_IDLE
+        self.expected_exit = False
+        self.crash_times = collections.deque()
+        self.incidents = collections.deque(maxlen=50)
+        self.current_incident = None
+
+    def configure(self, enabled=None, backoff_initial=None, backoff_max=None,
+                  crash_loop_count=None, crash_loop_window=None):
+        """更新看门狗参数（None表示保持不变）"""
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if backoff_initial is not None:
+            self.backoff_initial = float(backoff_initial)
+        if backoff_max is not None:
+            self.backoff_max = float(backoff_max)
+        if crash_loop_count is not None:
+            self.crash_loop_count = max(1, int(crash_loop_count))
+        if crash_loop_window is not None:
+            self.crash_loop_window = float(crash_loop_window)
+
+    def arm(self):
+        """服务器启动时调用：开始监视
+
+        手动启动会清除崩溃循环状态和崩溃计数；由看门狗发起的启动保留当前事故记录。
+        """
+        self.expected_exit = False
+        if self.state != WATCHDOG_RESTARTING:
+            # 手动启动
+            self.crash_times.clear()
+            self.current_incident = None
+        self._set_state(WATCHDOG_WATCHING)
+
+    def expect_exit(self):
+        """手动停止或重启前调用，之后的退出不触发自动重启"""
+        self.expected_exit = True
+        if self.state == WATCHDOG_CRASH_LOOP:
+            return  # 保持崩溃循环状态，直到下一次手动启动
+        if self.state in (WATCHDOG_BACKOFF, WATCHDOG_RESTARTING):
+            self.current_incident = None
+        self._set_state(WATCHDOG_IDLE)
+
+    async def handle_exit(self, exit_code=None, log_tail=None, reason=None):
+        """处理服务器退出或启动失败（在事件循环中调用）
+
+        Args:
+            exit_code (int): 退出码
+            log_tail (list): 退出时的日志末尾
+            reason (str): 已知的失败原因（如启动失败），指定时不再根据日志判断
+
+        Returns:
+            dict or None: 事故记录，正常退出或无需处理时返回None
+        """
+        log_tail = log_tail or []
+        if self.expected_exit or self.state not in (WATCHDOG_WATCHING, WATCHDOG_RESTARTING):
+            return None
+        if reason is None:
+            abnormal, reason = classify_exit(exit_code, log_tail)
+            if not abnormal:
+                self.log(f"ℹ️ 服务器进程已退出（{reason}），看门狗不做处理")
+                self._set_state(WATCHDOG_IDLE)
+                return None
+
+        now = time.time()
+        self.crash_times.append(now)
+        while self.crash_times and now - self.crash_times[0] > self.crash_loop_window:
+            self.crash_times.popleft()
+
+        incident = {
+            'detected_at': now,
+            'exit_code': exit_code,
+            'reason': reason,
+            'log_tail': log_tail[-10:],
+            'crashes_in_window': len(self.crash_times),
+            'restarted_at': None,
+            'recovered_at': None,
+            'time_to_recovery': None,
+            'outcome': None
+        }
+        if self.current_incident is None:
+            self.current_incident = incident
+        else:
+            # 自动重启后再次失败，仍属于同一事故，恢复耗时从第一次检测开始计算
+            incident['detected_at'] = self.current_incident['detected_at']
+            self.current_incident['outcome'] = 'failed'
+            self.current_incident = incident
+        self.incidents.append(incident)
+        self.log(f"💥 检测到服务器异常退出: {reason}")
+
+        if not self.enabled:
+            incident['outcome'] = 'disabled'
+            self.current_incident = None
+            self.log("ℹ️ 自动重启已关闭，服务器保持离线")
+            self._set_state(WATCHDOG_IDLE)
+            return incident
+
+        if len(self.crash_times) >= self.crash_loop_count:
+            incident['outcome'] = 'crash_loop'
+            self.current_incident = None
+            self.log(f"🛑 检测到崩溃循环：{self.crash_loop_window / 60:.0f} 分钟内崩溃 {len(self.crash_times)} 次，"
+                     f"已停止自动重启，请检查服务器后手动启动")
+            self._set_state(WATCHDOG_CRASH_LOOP)
+            return incident
+
+        delay = min(self.backoff_initial * 2 ** (len(self.crash_times) - 1), self.backoff_max)
+        self.log(f"🔁 {delay:.0f} 秒后自动重启服务器（{self.crash_loop_window / 60:.0f} 分钟内第 {len(self.crash_times)} 次崩溃）")
+        self._set_state(WATCHDOG_BACKOFF)
+        await asyncio.sleep(delay)
+        if self.state != WATCHDOG_BACKOFF or self.current_incident is not incident:
+            return incident  # 等待期间被手动停止或启动
+
+        incident['restarted_at'] = time.time()
+        self._set_state(WATCHDOG_RESTARTING)
+        self.restart_callback()
+        return incident
+
+    def on_server_online(self):
+        """服务器上线时调用，记录恢复耗时"""
+        incident = self.current_incident
+        if incident is not None:
+            incident['recovered_at'] = time.time()
+            incident['time_to_recovery'] = incident['recovered_at'] - incident['detected_at']
+            incident['outcome'] = 'recovered'
+            self.current_incident = None
+            self.log(f"✅ 服务器已自动恢复，恢复耗时 {incident['time_to_recovery']:.1f} 秒")
+        if self.state == WATCHDOG_RESTARTING:
+            self._set_state(WATCHDOG_WATCHING)
+
+    def get_incidents(self):
+        """获取最近的事故记录"""
+        return list(self.incidents)
+
+    def _set_state(self, state):
+        """切换状态并通知"""
+        if state == self.state:
+            return
+        self.state = state
+        if self.state_callback:
+            self.state_callback(state)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+守护进程客户端模块 - 通过本地控制接口操作无界面守护进程（python -m src.daemon）
+"""
+
+import os
+import json
+import socket
+from ..common.constants import DEFAULT_DAEMON_STATE_FILE, DAEMON_REQUEST_TIMEOUT
+
+
+class DaemonError(Exception):
+    """守护进程不可用或命令执行失败"""
+
+
+def read_daemon_state(state_file=DEFAULT_DAEMON_STATE_FILE):
+    """读取守护进程状态文件，进程已不存在时返回None"""
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    pid = state.get('pid')
+    if not isinstance(pid, int) or not _pid_alive(pid):
+        return None
+    return state
+
+
+def _pid_alive(pid):
+    """进程是否存在"""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class DaemonClient:
+    """守护进程控制接口客户端
+
+    协议：每个请求和响应都是一行JSON。
+    请求 {"token": ..., "command": ..., "instance": ..., "args": {...}}，
+    响应 {"ok": true, "result": ...} 或 {"ok": false, "error": ...}。
+    """
+
+    def __init__(self, host, port, token="", timeout=DAEMON_REQUEST_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.timeout = timeout
+
+    @classmethod
+    def detect(cls, state_file=DEFAULT_DAEMON_STATE_FILE, timeout=DAEMON_REQUEST_TIMEOUT):
+        """查找正在运行的守护进程
+
+        Returns:
+            DaemonClient or None: 守护进程可连接时返回客户端
+        """
+        state = read_daemon_state(state_file)
+        if state is None:
+            return None
+        client = cls(state.get('host', '127.0.0.1'), state.get('port'), state.get('token', ""), timeout)
+        try:
+            client.request('ping', timeout=2)
+        except DaemonError:
+            return None
+        return client
+
+    def request(self, command, instance=None, args=None, timeout=None):
+        """发送命令并返回结果
+
+        Raises:
+            DaemonError: 连接失败或命令执行失败
+        """
+        message = {'token': self.token, 'command': command, 'instance': instance, 'args': args or {}}
+        try:
+            with socket.create_connection((self.host, self.port), timeout=timeout or self.timeout) as sock:
+                sock.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+                with sock.makefile('rb') as reader:
+                    line = reader.readline()
+        except OSError as e:
+            raise DaemonError(f"无法连接守护进程: {str(e)}")
+        if not line:
+            raise DaemonError("守护进程没有返回结果")
+        try:
+            response = json.loads(line.decode('utf-8'))
+        except ValueError:
+            raise DaemonError("守护进程返回了无效的数据")
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', "命令执行失败"))
+        return response.get('result')
+
+    def status(self, instance=None):
+        """获取服务器状态（未指定实例时返回所有实例）"""
+        return self.request('status', instance)
+
+    def start(self, instance="default"):
+        """启动服务器"""
+        return self.request('start', instance)
+
+    def stop(self, instance="default"):
+        """停止服务器"""
+        return self.request('stop', instance)
+
+    def restart(self, instance="default"):
+        """重启服务器"""
+        return self.request('restart', instance)
+
+    def backup(self):
+        """创建备份"""
+        return self.request('backup')
+
+    def rcon(self, command, instance="default"):
+        """执行RCON命令"""
+        return self.request('rcon', instance, {'command': command})
+
+    def players(self, instance="default"):
+        """获取在线玩家列表"""
+        return self.request('players', instance)
+
+    def logs(self, instance="default", **filters):
+        """检索归档的服务器日志（参数见 ServerManager.search_logs）"""
+        return self.request('logs', instance, filters)
+
+    def log_rates(self, instance="default", top=None):
+        """获取日志速率统计（参数见 ServerManager.get_log_rates）"""
+        return self.request('log_rates', instance, {'top': top} if top else None)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多实例管理模块 - 在一个启动器中管理多个服务器实例，自动分配端口，共享调度线程、事件循环和进程扫描
+"""
+
+import os
+import json
+import threading
+from ..common.qt_compat import QObject, Signal
+from ..common.constants import (DEFAULT_SERVER_CONFIG, DEFAULT_FLEET_CONFIG_FILE, FLEET_POLL_INTERVAL,
+                                FLEET_PORT_KEYS, PROCESS_SNAPSHOT_MAX_AGE)
+from ..common.utils import is_port_free
+from .server_manager import ServerManager
+from .process_registry import ProcessScanner
+from .task_scheduler import TaskScheduler
+from .async_core import AsyncLoopThread
+
+
+class FleetManager(QObject):
+    """服务器实例集合
+
+    每个实例是一个独立路径、独立配置的 ServerManager，但所有实例共享：
+    - 一个任务调度线程（任务名按实例加前缀）
+    - 一个asyncio事件循环（RCON、进程等待、日志读取、停止/重启流程）
+    - 一个系统进程快照（有效期内多个实例查找进程只做一次全量扫描）
+    - 一个周期汇总任务（一次调度同时采集所有实例的资源数据和状态）
+    """
+
+    log_message = Signal(str, str)   # 日志消息信号(实例名称, 消息)
+    log_batch = Signal(str, list)    # WS.log原始日志批量信号(实例名称, 行列表)
+    instances_changed = Signal()     # 实例增删信号
+
+    def __init__(self, config_file=DEFAULT_FLEET_CONFIG_FILE):
+        super().__init__()
+        self.config_file = config_file
+        self.scheduler = TaskScheduler(name="FleetScheduler")
+        self.async_core = AsyncLoopThread(name="FleetLoop")
+        self.process_scanner = ProcessScanner(max_age=PROCESS_SNAPSHOT_MAX_AGE)
+        self.instances = {}  # 实例名称 -> ServerManager（保持添加顺序）
+        self._lock = threading.RLock()
+        self._status = {}    # 最近一次汇总的各实例状态
+        self._log_retention = False  # 是否为各实例定期归档轮换日志
+        self.scheduler.call_every(FLEET_POLL_INTERVAL, self._poll, name='fleet_poll')
+
+    def add_instance(self, name, server_path="", config=None, allocate_ports=True, check_host=False):
+        """添加服务器实例
+
+        Args:
+            name (str): 实例名称
+            server_path (str): 服务端安装目录
+            config (dict): 实例配置，未指定的项使用默认值
+            allocate_ports (bool): 端口与其他实例冲突时是否自动分配新端口
+            check_host (bool): 分配端口时是否同时检查端口在本机上可以绑定
+
+        Returns:
+            ServerManager: 新实例
+        """
+        with self._lock:
+            if name in self.instances:
+                raise ValueError(f"实例已存在: {name}")
+            server_config = DEFAULT_SERVER_CONFIG.copy()
+            server_config.update(config or {})
+            if allocate_ports:
+                server_config.update(self.allocate_ports(server_config, exclude=name, check_host=check_host))
+
+            manager = ServerManager(instance_name=name, scheduler=self.scheduler, async_core=self.async_core,
+                                    process_scanner=self.process_scanner)
+            manager.set_server_path(server_path)
+            manager.set_server_config(server_config)
+            manager.log_message.connect(lambda message, name=name: self.log_message.emit(name, message))
+            manager.log_batch.connect(lambda lines, name=name: self.log_batch.emit(name, lines))
+            # 启动前检查发现端口被占用时，从这里获取不与其他实例冲突的空闲端口
+            manager.port_allocator = lambda config, name=name: self.allocate_ports(config, exclude=name,
+                                                                                   check_host=True)
+            self.instances[name] = manager
+            if self._log_retention:
+                manager.start_log_retention()
+        self.instances_changed.emit()
+        return manager
+
+    def remove_instance(self, name):
+        """移除已停止的实例
+
+        Returns:
+            bool: 移除成功返回True
+        """
+        with self._lock:
+            manager = self.instances.get(name)
+            if manager is None:
+                return False
+            if manager.is_running or getattr(manager, 'startup_in_progress', False):
+                raise RuntimeError(f"实例 {name} 仍在运行，请先停止")
+            manager.scheduler.shutdown()
+            manager.async_core.stop()
+            del self.instances[name]
+            self._status.pop(name, None)
+        self.instances_changed.emit()
+        return True
+
+    def get_instance(self, name):
+        """按名称获取实例，不存在时返回None"""
+        with self._lock:
+            return self.instances.get(name)
+
+    def instance_names(self):
+        """所有实例名称"""
+        with self._lock:
+            return list(self.instances)
+
+    def allocate_ports(self, config, exclude=None, check_host=False):
+        """为实例分配不与其他实例冲突的端口
+
+        从配置中的端口开始，按 FLEET_PORT_KEYS 中的步长向上查找。
+
+        Args:
+            config (dict): 实例配置
+            exclude (str): 不参与冲突检查的实例（通常是实例自身）
+            check_host (bool): 是否同时要求端口在本机上可以绑定
+
+        Returns:
+            dict: 端口配置项 -> 端口
+        """
+        taken = {'udp': set(), 'tcp': set()}
+        with self._lock:
+            for name, manager in self.instances.items():
+                if name != exclude:
+                    for key, (protocol, _) in FLEET_PORT_KEYS.items():
+                        taken[protocol].update(self._ports_for(key, manager.server_config))
+
+        allocated = {}
+        for key, (protocol, step) in FLEET_PORT_KEYS.items():
+            port = int(config.get(key, DEFAULT_SERVER_CONFIG[key]))
+            while port < 65535:
+                ports = self._ports_for(key, {key: port})
+                if not taken[protocol] & ports and (not check_host or all(is_port_free(p, protocol=protocol)
+                                                                          for p in ports)):
+                    break
+                port += step
+            allocated[key] = port
+            taken[protocol].update(self._ports_for(key, allocated))
+        return allocated
+
+    @staticmethod
+    def _ports_for(key, config):
+        """某个端口配置项实际占用的端口（游戏端口同时占用 port+1）"""
+        port = int(config.get(key, DEFAULT_SERVER_CONFIG[key]))
+        return {port, port + 1} if key == 'port' else {port}
+
+    def load(self):
+        """从配置文件加载实例列表（已存在的实例不会重复添加）"""
+        if not os.path.exists(self.config_file):
+            return
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('instances', [])
+        except (OSError, ValueError) as e:
+            self.log_message.emit("fleet", f"❌ 读取多实例配置失败: {str(e)}")
+            return
+        for entry in entries:
+            name = entry.get('name')
+            if name and self.get_instance(name) is None:
+                self.add_instance(name, entry.get('server_path', ""), entry.get('config'))
+
+    def save(self):
+        """保存实例列表到配置文件"""
+        with self._lock:
+            entries = [{
+                'name': name,
+                'server_path': manager.server_path,
+                'config': manager.server_config
+            } for name, manager in self.instances.items()]
+        os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            json.dump({'instances': entries}, f, ensure_ascii=False, indent=2)
+
+    def start_log_retention(self):
+        """为所有实例（包括之后添加的实例）定期归档轮换日志，只在管理服务器的进程中调用"""
+        with self._lock:
+            self._log_retention = True
+            for manager in self.instances.values():
+                manager.start_log_retention()
+
+    def start_all(self):
+        """启动所有未运行的实例"""
+        for name in self.instance_names():
+            manager = self.get_instance(name)
+            if manager and not manager.is_running:
+                manager.start_server()
+
+    def stop_all(self):
+        """停止所有运行中的实例"""
+        for name in self.instance_names():
+            manager = self.get_instance(name)
+            if manager and manager.is_running:
+                manager.stop_server()
+
+    def get_fleet_status(self):
+        """获取最近一次汇总的各实例状态（不触发进程扫描）"""
+        with self._lock:
+            return dict(self._status)
+
+    def _poll(self):
+        """周期汇总：一次调度中为所有实例采集资源数据并缓存状态"""
+        for name in self.instance_names():
+            manager = self.get_instance(name)
+            if manager is None:
+                continue
+            try:
+                if manager.is_running or getattr(manager, 'startup_in_progress', False):
+                    manager._sample_resources()
+                status = manager.get_server_status()
+            except Exception as e:
+                status = {'error': str(e)}
+            with self._lock:
+                if name in self.instances:
+                    self._status[name] = status
+        return True
@@ -5,7 +5,7 @@
 启动管理器模块 - 负责管理应用程序启动相关的逻辑
 """
 
-from PySide6.QtCore import QObject, Signal
+from ..common.qt_compat import QObject, Signal
 from ..common.constants import APP_NAME, APP_VERSION, APP_TITLE
 from ..common.utils import ensure_dir_exists, get_backup_dir, get_log_file_path
 import os
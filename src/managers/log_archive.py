@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+日志归档模块 - 把解析后的WS.log记录写入本地SQLite全文索引，跨多次运行检索服务器日志
+
+每条记录包含时间、帧号、UE日志分类、级别、内容和所属运行会话；
+写入先在内存中攒批，再在一个事务中批量插入，超过保留天数的记录定期清理。
+内容使用FTS5（SQLite 3.34及以上使用trigram分词，中文和路径也能按子串检索；
+不保存词位置（detail=none），索引约为原始日志的2/3，子串检索用LIKE走trigram索引）。
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from ..common.constants import (LOG_ARCHIVE_BATCH_SIZE, LOG_ARCHIVE_FLUSH_INTERVAL, LOG_ARCHIVE_PRUNE_INTERVAL,
+                                LOG_ARCHIVE_SEARCH_LIMIT, DEFAULT_SERVER_CONFIG)
+from .startup_timeline import parse_log_timestamp
+
+# UE日志级别（不写级别的行为Log）
+LOG_VERBOSITIES = ('Fatal', 'Error', 'Warning', 'Display', 'Log', 'Verbose', 'VeryVerbose')
+
+# [时间][帧号]分类: 级别: 内容
+_UE_LOG_RECORD = re.compile(r'^\[[^\]]*\]\[\s*(\d+)\]([A-Za-z_]\w*):\s?(?:(' + '|'.join(LOG_VERBOSITIES) +
+                            r'):\s?)?(.*)$')
+
+# 相对时间，例如 7d / 12h / 30m
+_RELATIVE_TIME = re.compile(r'^(\d+(?:\.\d+)?)([dhm])$')
+_RELATIVE_UNITS = {'d': 86400, 'h': 3600, 'm': 60}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instance TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    log_path TEXT
+);
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    ts REAL NOT NULL,
+    frame INTEGER,
+    category TEXT,
+    verbosity TEXT,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_ts ON records(ts);
+CREATE INDEX IF NOT EXISTS records_category_ts ON records(category, ts);
+CREATE INDEX IF NOT EXISTS records_session ON records(session_id);
+"""
+
+# 外部内容FTS表，由触发器与records表保持同步
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(message, content='records', content_rowid='id',
+                                                          {options});
+CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records BEGIN
+    INSERT INTO records_fts(rowid, message) VALUES (new.id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN
+    INSERT INTO records_fts(records_fts, rowid, message) VALUES ('delete', old.id, old.message);
+END;
+"""
+
+
+def parse_log_record(line, observed_at=None):
+    """解析一行WS.log
+
+    Args:
+        line (str): 日志行
+        observed_at (float): 读取到该行的时间戳，行首没有时间时作为记录时间
+
+    Returns:
+        tuple: (时间戳, 帧号, 分类, 级别, 内容)，不是UE格式的行帧号/分类/级别为None，内容为整行
+    """
+    observed_at = observed_at or time.time()
+    match = _UE_LOG_RECORD.match(line)
+    if not match:
+        return observed_at, None, None, None, line
+    frame, category, verbosity, message = match.groups()
+    timestamp = parse_log_timestamp(line, observed_at) or observed_at
+    return timestamp, int(frame), category, verbosity or 'Log', message
+
+
+def parse_since(value, now=None):
+    """把查询参数中的起始时间转换为时间戳
+
+    Args:
+        value (str or float): Unix时间戳，或 7d / 12h / 30m 这样的相对时间
+
+    Returns:
+        float or None
+    """
+    if value in (None, ''):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _RELATIVE_TIME.match(str(value).strip())
+    if match:
+        return (now or time.time()) - float(match.group(1)) * _RELATIVE_UNITS[match.group(2)]
+    return float(value)
+
+
+class LogArchive:
+    """WS.log全文归档
+
+    add() 只在内存中攒批，由调用方在 flush_due() 为True时调用 flush()（可以放到工作线程执行）；
+    同一数据库文件可以被多个实例的归档同时使用（WAL模式）。
+    """
+
+    def __init__(self, db_path, retention_days=DEFAULT_SERVER_CONFIG['log_archive_retention_days']):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.fts_enabled = False
+        self.tokenizer = None
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._conn = None
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._last_prune = 0.0
+
+    def begin_session(self, instance, log_path=None, started_at=None):
+        """开始一次运行会话
+
+        Returns:
+            int: 会话ID
+        """
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute("INSERT INTO sessions (instance, started_at, log_path) VALUES (?, ?, ?)",
+                                  (instance, started_at or time.time(), log_path))
+            conn.commit()
+            return cursor.lastrowid
+
+    def end_session(self, session_id):
+        """写入剩余记录并结束会话"""
+        self.flush()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE sessions SET ended_at = ? WHERE id = ?", (time.time(), session_id))
+            conn.commit()
+
+    def add(self, session_id, line, observed_at=None):
+        """解析一行日志并加入待写入批次"""
+        record = (session_id,) + parse_log_record(line, observed_at)
+        with self._pending_lock:
+            self._pending.append(record)
+
+    @property
+    def pending_count(self):
+        """待写入的记录数"""
+        return len(self._pending)
+
+    def flush_due(self):
+        """是否应该写入：攒满 LOG_ARCHIVE_BATCH_SIZE 条或距上次写入超过 LOG_ARCHIVE_FLUSH_INTERVAL 秒"""
+        return bool(self._pending) and (len(self._pending) >= LOG_ARCHIVE_BATCH_SIZE or
+                                        time.monotonic() - self._last_flush >= LOG_ARCHIVE_FLUSH_INTERVAL)
+
+    def flush(self):
+        """在一个事务中写入待写入的记录，并按间隔清理过期记录
+
+        Returns:
+            int: 写入的记录数
+        """
+        with self._pending_lock:
+            records, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if records:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany("INSERT INTO records (session_id, ts, frame, category, verbosity, message) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)", records)
+        if time.monotonic() - self._last_prune >= LOG_ARCHIVE_PRUNE_INTERVAL:
+            self.prune()
+        return len(records)
+
+    def prune(self, retention_days=None):
+        """删除超过保留天数的记录和已没有记录的旧会话
+
+        Returns:
+            int: 删除的记录数
+        """
+        retention_days = self.retention_days if retention_days is None else retention_days
+        self._last_prune = time.monotonic()
+        if not retention_days or retention_days <= 0:
+            return 0
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                deleted = conn.execute("DELETE FROM records WHERE ts < ?", (cutoff,)).rowcount
+                conn.execute("DELETE FROM sessions WHERE started_at < ? AND ended_at IS NOT NULL AND "
+                             "NOT EXISTS (SELECT 1 FROM records WHERE records.session_id = sessions.id)", (cutoff,))
+            return deleted
+
+    def search(self, text=None, category=None, verbosity=None, since=None, until=None, instance=None,
+               session_id=None, limit=LOG_ARCHIVE_SEARCH_LIMIT):
+        """检索归档的日志，按时间从新到旧返回
+
+        Args:
+            text (str): 内容包含的文本（大小写不敏感）
+            category (str): UE日志分类，例如 LogNet
+            verbosity (str or tuple): 级别，例如 Error 或 ('Error', 'Fatal')
+            since (float): 起始时间戳
+            until (float): 结束时间戳
+            instance (str): 实例名称
+            session_id (int): 运行会话ID
+            limit (int): 最多返回的记录数
+
+        Returns:
+            list: 记录字典列表
+        """
+        with self._lock:
+            self._connect()  # 打开数据库后才知道是否支持FTS
+        tables = "records r JOIN sessions s ON s.id = r.session_id"
+        conditions = []
+        params = []
+        if text:
+            if self.tokenizer == 'trigram':
+                # trigram表上的LIKE直接使用索引（带ESCAPE时不能使用索引，少于3个字符时退化为扫描）；
+                # 文本中的 % _ 会被当作通配符，再用instr精确过滤一次
+                tables = "records_fts f JOIN records r ON r.id = f.rowid JOIN sessions s ON s.id = r.session_id"
+                conditions.append("f.message LIKE ?")
+                params.append(f"%{text}%")
+                if '%' in text or '_' in text:
+                    conditions.append("instr(lower(r.message), lower(?)) > 0")
+                    params.append(text)
+            elif self.fts_enabled:
+                tables = "records_fts f JOIN records r ON r.id = f.rowid JOIN sessions s ON s.id = r.session_id"
+                conditions.append("records_fts MATCH ?")
+                params.append('"' + text.replace('"', '""') + '"')
+            else:
+                conditions.append("r.message LIKE ? ESCAPE '\\'")
+                params.append('%' + re.sub(r'([%_\\])', r'\\\1', text) + '%')
+        if category:
+            conditions.append("r.category = ?")
+            params.append(category)
+        if verbosity:
+            verbosities = (verbosity,) if isinstance(verbosity, str) else tuple(verbosity)
+            conditions.append(f"r.verbosity IN ({', '.join('?' * len(verbosities))})")
+            params.extend(verbosities)
+        if since is not None:
+            conditions.append("r.ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("r.ts < ?")
+            params.append(until)
+        if instance:
+            conditions.append("s.instance = ?")
+            params.append(instance)
+        if session_id is not None:
+            conditions.append("r.session_id = ?")
+            params.append(session_id)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (f"SELECT r.id, r.session_id, s.instance, r.ts, r.frame, r.category, r.verbosity, r.message "
+               f"FROM {tables}{where} ORDER BY r.ts DESC, r.id DESC LIMIT ?")
+        params.append(int(limit))
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [{
+            'id': row[0],
+            'session_id': row[1],
+            'instance': row[2],
+            'ts': row[3],
+            'frame': row[4],
+            'category': row[5],
+            'verbosity': row[6],
+            'message': row[7]
+        } for row in rows]
+
+    def recent_sessions(self, instance=None, limit=20):
+        """获取最近的运行会话及其记录数"""
+        sql = ("SELECT s.id, s.instance, s.started_at, s.ended_at, s.log_path, "
+               "(SELECT COUNT(*) FROM records r WHERE r.session_id = s.id) FROM sessions s")
+        params = []
+        if instance:
+            sql += " WHERE s.instance = ?"
+            params.append(instance)
+        sql += " ORDER BY s.id DESC LIMIT ?"
+        params.append(int(limit))
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [{
+            'id': row[0],
+            'instance': row[1],
+            'started_at': row[2],
+            'ended_at': row[3],
+            'log_path': row[4],
+            'records': row[5]
+        } for row in rows]
+
+    def close(self):
+        """写入剩余记录并关闭数据库"""
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self):
+        """按需打开数据库（调用方需持有锁）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            # trigram分词需要SQLite 3.34，更早的版本使用unicode61（按词组检索）；没有编译FTS5时只能按LIKE扫描
+            if sqlite3.sqlite_version_info >= (3, 34, 0):
+                options = "tokenize='trigram', detail=none"
+            else:
+                options = "tokenize='unicode61'"
+            try:
+                conn.executescript(_FTS_SCHEMA.format(options=options))
+                row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'records_fts'").fetchone()
+                self.tokenizer = 'trigram' if row and 'trigram' in row[0] else 'unicode61'
+                self.fts_enabled = True
+            except sqlite3.OperationalError:
+                self.fts_enabled = False
+            self._conn = conn
+        return self._conn
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+日志事件模块 - 用声明式规则表识别WS.log中的事件
+
+每行只解析一次UE日志分类，只检查该分类下的规则（外加不限分类的规则）；
+每条规则先做字面量过滤，命中后才执行预编译的正则表达式。
+新增事件只需要在 LOG_EVENT_RULES 中加一行。
+"""
+
+import re
+from .crash_watchdog import CRASH_SIGNATURES
+
+# 事件类型
+EVENT_MOD_LOADED = 'mod_loaded'              # MOD加载：mod_name, mod_id
+EVENT_STARTUP_COMPLETE = 'startup_complete'  # 服务器启动完成（地下城创建完成）
+EVENT_PLAYER_LOGIN = 'player_login'          # 玩家登录请求：name, player_id
+EVENT_PLAYER_JOIN = 'player_join'            # 玩家进入游戏：name
+EVENT_PLAYER_LEAVE = 'player_leave'          # 玩家断开连接：player_id
+EVENT_SAVE_COMPLETE = 'save_complete'        # 世界保存完成
+EVENT_FATAL_ERROR = 'fatal_error'            # 崩溃/致命错误
+EVENT_SERVER_HITCH = 'server_hitch'          # 服务器卡顿：duration_ms
+
+STARTUP_COMPLETE_MARKER = 'Create Dungeon Successed: DiXiaChengLv50, Index = 2'
+
+# 玩家名：登录请求URL中 ?Name= 到下一个 ? 之间的内容（可以包含空格），进入游戏行使用同样的写法，两边才能对上
+_PLAYER_NAME = r'(?P<name>[^?]+?)'
+
+# 规则表：(事件类型, UE日志分类（None表示任意分类）, 字面量（或字面量元组，任一出现即通过过滤）, 正则（None表示只靠字面量）)
+# 正则的命名分组作为事件字段
+LOG_EVENT_RULES = (
+    (EVENT_MOD_LOADED, 'LogUGCRegistry', 'LoadModulesForEnabledPluginsBegin',
+     r'ModName:(?P<mod_name>[^,]+), ModID:(?P<mod_id>\d+)'),
+    (EVENT_STARTUP_COMPLETE, None, STARTUP_COMPLETE_MARKER, None),
+    (EVENT_PLAYER_LOGIN, 'LogNet', 'Login request:', r'\?Name=' + _PLAYER_NAME + r'(?:\?.*?)?\s+userId: (?P<player_id>\S+)'),
+    (EVENT_PLAYER_JOIN, 'LogNet', 'Join succeeded:', r'Join succeeded: ' + _PLAYER_NAME + r'\s*$'),
+    (EVENT_PLAYER_LEAVE, 'LogNet', 'UNetConnection::Close', r'UniqueId: (?P<player_id>[^,\s]+)'),
+    (EVENT_SAVE_COMPLETE, None, 'SaveWorld finished', None),
+    (EVENT_FATAL_ERROR, None, CRASH_SIGNATURES, None),
+    (EVENT_SERVER_HITCH, None, ('hitch', 'Hitch', 'HITCH'), r'(?i)hitch.*?(?P<duration_ms>\d+(?:\.\d+)?)\s*ms\b'),
+)
+
+
+# 行首的 [时间][帧号] 之后第一个冒号前的标识符就是日志分类
+_LOG_CATEGORY = re.compile(r'(?:\[[^\]]*\])*([A-Za-z_]\w*):')
+
+
+def parse_log_category(line):
+    """解析UE日志分类
+
+    Returns:
+        str or None: 例如 'LogNet'，不是UE格式的行返回None
+    """
+    match = _LOG_CATEGORY.match(line)
+    return match.group(1) if match else None
+
+
+class LogEventEngine:
+    """按规则表匹配日志行"""
+
+    def __init__(self, rules=LOG_EVENT_RULES):
+        self._by_category = {}  # 分类 -> [(事件类型, 字面量元组, 正则)]
+        self._any_category = []
+        all_literals = set()
+        for event_type, category, literals, pattern in rules:
+            if isinstance(literals, str):
+                literals = (literals,)
+            all_literals.update(literals)
+            rule = (event_type, tuple(literals), re.compile(pattern) if pattern else None)
+            if category is None:
+                self._any_category.append(rule)
+            else:
+                self._by_category.setdefault(category, []).append(rule)
+        # 所有规则的字面量合并为一个预编译的多选正则：不含任何字面量的行（绝大多数）只需一次C层面的查找
+        self._prefilter = re.compile('|'.join(re.escape(literal)
+                                              for literal in sorted(all_literals, key=len, reverse=True)))
+
+    def match(self, line):
+        """匹配一行日志
+
+        Returns:
+            list: [(事件类型, 字段字典)]，没有事件时为空
+        """
+        if self._prefilter.search(line) is None:
+            return []
+        events = []
+        for rules in (self._by_category.get(parse_log_category(line), ()), self._any_category):
+            for event_type, literals, compiled in rules:
+                # 字面量过滤（子串查找比正则快得多），全部不出现时跳过正则
+                for literal in literals:
+                    if literal in line:
+                        break
+                else:
+                    continue
+                if compiled is None:
+                    events.append((event_type, {}))
+                    continue
+                found = compiled.search(line)
+                if found:
+                    events.append((event_type, found.groupdict()))
+        return events
@@ -7,8 +7,7 @@
 
 import os
 import datetime
-from PySide6.QtCore import QObject, Signal
-from PySide6.QtWidgets import QTextEdit, QApplication
+from ..common.qt_compat import QObject, Signal
 from ..common.utils import get_app_dir
 from ..common.constants import DEFAULT_LOG_FILE, MAX_LOG_LINES
 
@@ -33,6 +32,7 @@ class LogManager(QObject):
     
     def set_log_widget(self, widget):
         """设置日志显示控件"""
+        from PySide6.QtWidgets import QTextEdit  # 只有图形界面会设置控件，无界面模式不加载Qt
         self.log_widget = widget
         if isinstance(widget, QTextEdit):
             widget.setReadOnly(True)
@@ -48,6 +48,7 @@ class LogManager(QObject):
         
         # 显示到控件
         if self.log_widget:
+            from PySide6.QtWidgets import QApplication
             self.log_widget.append(formatted_message)
             # 自动滚动到底部
             cursor = self.log_widget.textCursor()
@@ -66,6 +67,24 @@ class LogManager(QObject):
             except Exception as e:
                 print(f"写入日志文件时出错: {str(e)}")
     
+    def add_logs(self, messages, level="INFO", save_to_file=True):
+        """批量添加日志（只打开一次日志文件）"""
+        if not messages:
+            return
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        formatted_messages = [f"[{timestamp}] [{level}] {message}" for message in messages]
+        for formatted_message in formatted_messages:
+            self.log_updated.emit(formatted_message)
+        if self.log_widget:
+            self.log_widget.append('\n'.join(formatted_messages))
+        if save_to_file:
+            try:
+                self._ensure_log_file_exists()
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write('\n'.join(formatted_messages) + '\n')
+            except Exception as e:
+                print(f"写入日志文件时出错: {str(e)}")
+    
     def add_info(self, message):
         """添加信息日志"""
         self.add_log(message, "INFO")
@@ -206,8 +225,10 @@ class LogManager(QObject):
     def set_max_log_lines(self, max_lines):
         """设置最大日志行数"""
         self.max_log_lines = max_lines
-        if self.log_widget and isinstance(self.log_widget, QTextEdit):
-            self.log_widget.document().setMaximumBlockCount(max_lines)
+        if self.log_widget:
+            from PySide6.QtWidgets import QTextEdit
+            if isinstance(self.log_widget, QTextEdit):
+                self.log_widget.document().setMaximumBlockCount(max_lines)
     
     def filter_logs(self, level=None, keyword=None):
         """过滤日志"""
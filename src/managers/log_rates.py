@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+日志速率模块 - 按UE日志分类和级别统计WS.log在1秒/1分钟/15分钟滑动窗口内的行数和字节数，
+用每分钟行数的指数加权均值/方差学习基线，速率明显高于基线时发出告警
+"""
+
+import re
+import time
+import math
+import threading
+import collections
+
+from .log_archive import LOG_VERBOSITIES
+
+_CATEGORY_VERBOSITY = re.compile(r'^(?:\[[^\]]*\])*([A-Za-z_]\w*):\s?(?:(' + '|'.join(LOG_VERBOSITIES) + r'):)?')
+
+KIND_CATEGORY = 'category'
+KIND_VERBOSITY = 'verbosity'
+OTHER_CATEGORY = '(其他)'  # 不是UE格式的行，以及分类数量超过上限后新出现的分类
+
+
+class LogRateMonitor:
+    """日志速率统计和异常检测
+
+    当前一秒的计数累加在一个字典中，跨秒时并入1分钟窗口（保留最近60个秒级计数），
+    跨分钟时并入15分钟窗口（保留最近15个分钟级计数），窗口总数随进出增量维护，
+    查询时不需要重新求和。键为 (类型, 名称)，分类数量有上限，内存占用不随运行时间增长。
+    """
+
+    WINDOWS = (('1s', 1), ('1m', 60), ('15m', 900))
+
+    def __init__(self, max_keys=200, alpha=0.1, sigma=4.0, min_lines=300, warmup_minutes=10, cooldown=600):
+        self.max_keys = max_keys
+        self.alpha = alpha  # 基线EWMA系数，每分钟更新一次
+        self.sigma = sigma  # 最近1分钟行数超过 基线均值 + sigma * 标准差 时告警
+        self.min_lines = min_lines  # 最近1分钟少于这么多行时不告警
+        self.warmup_minutes = warmup_minutes  # 基线至少学习这么多分钟后才告警
+        self.cooldown = cooldown  # 同一个键两次告警的最小间隔（秒）
+        self._lock = threading.Lock()
+        self._categories = set()
+        self._second = None  # 当前秒（整数时间戳）
+        self._current = {}  # 当前秒：键 -> [行数, 字节数]
+        self._last_second = (None, {})  # 最近一个完整的秒
+        self._seconds = collections.deque()  # [(秒, 计数)]，最近60秒
+        self._minute = {}  # 当前分钟已经结束的秒的合计
+        self._minutes = collections.deque()  # [(分钟, 计数)]，最近15分钟
+        self._totals_1m = {}
+        self._totals_15m = {}
+        self._baseline = {}  # 键 -> [均值, 方差, 已学习分钟数]
+        self._minutes_learned = 0  # 基线总共学习过的分钟数
+        self._alerted_at = {}  # 键 -> 最近一次告警时间
+        self._quiet_until = 0.0
+        self.alerts = collections.deque(maxlen=50)  # 最近的告警
+
+    def add(self, line, now=None):
+        """统计一行日志
+
+        Returns:
+            list: 这一行触发的秒切换中产生的告警（通常为空）
+        """
+        match = _CATEGORY_VERBOSITY.match(line)
+        if match:
+            category, verbosity = match.group(1), match.group(2) or 'Log'
+        else:
+            category, verbosity = OTHER_CATEGORY, 'Log'
+        size = len(line)
+        now = time.time() if now is None else now
+        second = int(now)
+        with self._lock:
+            alerts = self._advance(second, now) if second != self._second else []
+            if category not in self._categories:
+                if len(self._categories) >= self.max_keys:
+                    category = OTHER_CATEGORY
+                self._categories.add(category)
+            for key in ((KIND_CATEGORY, category), (KIND_VERBOSITY, verbosity)):
+                counts = self._current.get(key)
+                if counts is None:
+                    self._current[key] = [1, size]
+                else:
+                    counts[0] += 1
+                    counts[1] += size
+        return alerts
+
+    def reset(self, now=None):
+        """新的日志流开始：清空滑动窗口，保留已学习的基线，并在预热时间内暂停告警
+        （服务器启动期间的大量日志不算异常）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._second = None
+            self._current = {}
+            self._last_second = (None, {})
+            self._seconds.clear()
+            self._minute = {}
+            self._minutes.clear()
+            self._totals_1m = {}
+            self._totals_15m = {}
+            self._quiet_until = now + self.warmup_minutes * 60
+
+    def stats(self, top=10, now=None):
+        """各窗口的行数/字节数和最活跃的分类
+
+        Returns:
+            dict: {'windows': {'1s'|'1m'|'15m': {'lines', 'bytes', 'categories', 'verbosities'}},
+                   'top': [{'category', 'lines_15m', 'bytes_15m', 'lines_1m', 'baseline'}], 'alerts': [...],
+                   'new_alerts': 这次查询结束上一秒时产生的告警（需要由调用方输出）}
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            # 只有当前秒已经过去时才结束它，查询不会把正在进行的一秒拆成两段
+            new_alerts = self._advance(int(now), now) if self._second is not None and int(now) > self._second else []
+            last_second, last_counts = self._last_second
+            windows = {
+                '1s': last_counts if last_second == int(now) - 1 else {},
+                '1m': self._totals_1m,
+                '15m': self._merge(self._totals_15m, self._minute)
+            }
+            result = {'windows': {name: self._window(counts, top) for name, counts in windows.items()}}
+            ranked = sorted(((key[1], counts) for key, counts in windows['15m'].items() if key[0] == KIND_CATEGORY),
+                            key=lambda item: item[1][0], reverse=True)[:top]
+            result['top'] = [{
+                'category': name,
+                'lines_15m': counts[0],
+                'bytes_15m': counts[1],
+                'lines_1m': self._totals_1m.get((KIND_CATEGORY, name), (0, 0))[0],
+                'baseline': round(self._baseline[(KIND_CATEGORY, name)][0], 1)
+                if (KIND_CATEGORY, name) in self._baseline else None
+            } for name, counts in ranked]
+            result['alerts'] = list(self.alerts)
+            result['new_alerts'] = new_alerts
+        return result
+
+    def _advance(self, second, now):
+        """进入新的一秒：把当前秒并入窗口，移出过期的秒和分钟，跨分钟时更新基线（调用方持有锁）"""
+        alerts = []
+        if self._second is not None and second < self._second:
+            return alerts  # 系统时间回拨，继续累加到当前秒
+        if self._second is not None:
+            finished, counts = self._second, self._current
+            self._last_second = (finished, counts)
+            if counts:
+                self._seconds.append((finished, counts))
+                self._add(self._totals_1m, counts)
+                self._add(self._minute, counts)
+            if finished // 60 != second // 60:
+                self._close_minute(finished // 60, second // 60)
+            if counts and now >= self._quiet_until:
+                alerts = self._check(counts, now)
+        while self._seconds and self._seconds[0][0] <= second - 60:
+            self._subtract(self._totals_1m, self._seconds.popleft()[1])
+        while self._minutes and self._minutes[0][0] <= second // 60 - 15:
+            self._subtract(self._totals_15m, self._minutes.popleft()[1])
+        self._second = second
+        self._current = {}
+        return alerts
+
+    def _close_minute(self, minute, next_minute):
+        """一分钟结束：并入15分钟窗口并用这一分钟的行数更新基线（中间没有日志的分钟按0行计）"""
+        counts, self._minute = self._minute, {}
+        self._minutes.append((minute, counts))
+        self._add(self._totals_15m, counts)
+        idle_minutes = min(next_minute - minute - 1, 60)
+        self._minutes_learned += 1 + idle_minutes
+        for key, baseline in self._baseline.items():
+            for _ in range(idle_minutes):
+                self._update_baseline(baseline, 0)
+            if key not in counts:
+                self._update_baseline(baseline, 0)
+        for key, (lines, _) in counts.items():
+            baseline = self._baseline.get(key)
+            if baseline is None:
+                # 新出现的键：预热期内直接以这一分钟为基线，之后视为以前一直是0行
+                if self._minutes_learned <= self.warmup_minutes:
+                    self._baseline[key] = [float(lines), 0.0, 1]
+                    continue
+                baseline = self._baseline[key] = [0.0, 0.0, self._minutes_learned]
+            self._update_baseline(baseline, lines)
+
+    def _update_baseline(self, baseline, lines):
+        """指数加权更新均值和方差"""
+        diff = lines - baseline[0]
+        increment = self.alpha * diff
+        baseline[0] += increment
+        baseline[1] = (1 - self.alpha) * (baseline[1] + diff * increment)
+        baseline[2] += 1
+
+    def _check(self, counts, now):
+        """检查刚结束的一秒中出现过的键，最近1分钟行数是否明显高于基线"""
+        alerts = []
+        for key in counts:
+            baseline = self._baseline.get(key) or (0.0, 0.0, self._minutes_learned)
+            if baseline[2] < self.warmup_minutes:
+                continue
+            lines, size = self._totals_1m.get(key, (0, 0))
+            mean, variance = baseline[0], baseline[1]
+            # 方差很小时按泊松分布的标准差 sqrt(均值) 兜底，避免稳定的小流量一点波动就告警
+            limit = max(self.min_lines, mean + self.sigma * max(math.sqrt(variance), math.sqrt(mean)))
+            if lines <= limit or now - self._alerted_at.get(key, 0) < self.cooldown:
+                continue
+            self._alerted_at[key] = now
+            alert = {
+                'time': now,
+                'kind': key[0],
+                'name': key[1],
+                'lines_1m': lines,
+                'bytes_1m': size,
+                'baseline': round(mean, 1)
+            }
+            self.alerts.append(alert)
+            alerts.append(alert)
+        return alerts
+
+    @staticmethod
+    def _window(counts, top):
+        """把一个窗口的计数整理为输出格式"""
+        categories = sorted(((key[1], value) for key, value in counts.items() if key[0] == KIND_CATEGORY),
+                            key=lambda item: item[1][0], reverse=True)
+        return {
+            'lines': sum(value[0] for _, value in categories),
+            'bytes': sum(value[1] for _, value in categories),
+            'categories': {name: {'lines': value[0], 'bytes': value[1]} for name, value in categories[:top]},
+            'verbosities': {key[1]: value[0] for key, value in counts.items() if key[0] == KIND_VERBOSITY}
+        }
+
+    @staticmethod
+    def _merge(first, second):
+        merged = {key: list(value) for key, value in first.items()}
+        LogRateMonitor._add(merged, second)
+        return merged
+
+    @staticmethod
+    def _add(totals, counts):
+        for key, (lines, size) in counts.items():
+            value = totals.get(key)
+            if value is None:
+                totals[key] = [lines, size]
+            else:
+                value[0] += lines
+                value[1] += size
+
+    @staticmethod
+    def _subtract(totals, counts):
+        for key, (lines, size) in counts.items():
+            value = totals[key]
+            value[0] -= lines
+            value[1] -= size
+            if value[0] <= 0:
+                del totals[key]
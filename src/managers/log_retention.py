@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+服务器日志保留模块 - 把UE轮换出的 WS-backup-*.log 压缩到按日期分的归档中并删除原文件，
+按保留天数和总大小清理旧归档
+
+每天一个归档文件 WS-logs-YYYY-MM-DD.gz，每个轮换日志是其中独立的一个gzip成员（头部带原文件名），
+旁边的 .idx.json 记录每个成员的偏移和长度，读取某个日志时只解压对应的一段。
+"""
+
+import os
+import re
+import json
+import zlib
+import time
+import struct
+import datetime
+import contextlib
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+ROTATED_LOG_PATTERN = re.compile(r'^WS-backup-.*\.log$')
+ARCHIVE_PATTERN = re.compile(r'^WS-logs-(\d{4}-\d{2}-\d{2})\.gz$')
+
+_CHUNK_SIZE = 1024 * 1024
+_HEADER_PEEK = 4096
+_LOCK_FILE = '.retention.lock'
+
+
+def is_rotated_log(name):
+    """是否为UE轮换出的旧日志（WS-backup-*.log）"""
+    return bool(ROTATED_LOG_PATTERN.match(name))
+
+
+def _gzip_header(name, mtime):
+    """带原文件名（FNAME）的gzip成员头"""
+    return b'\x1f\x8b\x08\x08' + struct.pack('<I', int(mtime) & 0xffffffff) + b'\x00\xff' + \
+        name.encode('utf-8', 'replace').replace(b'\x00', b'') + b'\x00'
+
+
+def _member_name(header):
+    """从gzip成员头中读取原文件名，没有时返回None"""
+    flags = header[3]
+    pos = 10
+    if flags & 0x04:  # FEXTRA
+        pos += 2 + struct.unpack('<H', header[pos:pos + 2])[0]
+    if not flags & 0x08:  # FNAME
+        return None
+    end = header.find(b'\x00', pos)
+    return header[pos:end].decode('utf-8', 'replace') if end >= 0 else None
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """跨进程的独占文件锁（界面和守护进程不会同时改写同一个归档）"""
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # 约10秒内拿不到锁时抛出OSError
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class LogRetention:
+    """轮换日志的压缩归档和保留策略
+
+    先把压缩数据追加到当天的归档，再用临时文件替换的方式更新索引（均落盘），最后删除原日志；
+    中途中断时，索引之后多出的数据会在下次追加前截掉，原日志保留到下次重新归档。
+    索引丢失或损坏时按归档中的gzip成员重建，不会截掉已归档的日志。
+    所有改写都在归档目录的文件锁内进行。
+    """
+
+    def __init__(self, archive_dir, retention_days=30, max_bytes=2 * 1024 ** 3, min_age=60, compress_level=6):
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days  # 0表示不按天数清理
+        self.max_bytes = max_bytes  # 0表示不按大小清理
+        self.min_age = min_age  # 修改时间不到这么多秒的轮换日志暂不处理，避免UE还在改名或写入
+        self.compress_level = compress_level
+
+    def run(self, logs_dir, now=None):
+        """归档 logs_dir 下的轮换日志并清理旧归档
+
+        Returns:
+            dict: {'archived': 归档的日志数, 'original_bytes', 'compressed_bytes', 'removed': 清理的归档数,
+                   'failed': 归档失败（例如仍被占用）的日志数}
+        """
+        now = time.time() if now is None else now
+        result = {'archived': 0, 'original_bytes': 0, 'compressed_bytes': 0, 'removed': 0, 'failed': 0}
+        if logs_dir and os.path.isdir(logs_dir):
+            for name in sorted(os.listdir(logs_dir)):
+                if not is_rotated_log(name):
+                    continue
+                path = os.path.join(logs_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime < self.min_age:
+                    continue
+                try:
+                    entry = self.archive(path, stat)
+                    os.remove(path)
+                except OSError:
+                    result['failed'] += 1  # 例如UE仍占用该文件，下次再处理
+                    continue
+                result['archived'] += 1
+                result['original_bytes'] += entry['size']
+                result['compressed_bytes'] += entry['length']
+        result['removed'] = self.prune(now)
+        return result
+
+    def archive(self, path, stat=None):
+        """把一个日志文件压缩追加到其修改日期对应的归档
+
+        Returns:
+            dict: 索引条目
+        """
+        stat = stat or os.stat(path)
+        day = datetime.date.fromtimestamp(stat.st_mtime).isoformat()
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with _file_lock(os.path.join(self.archive_dir, _LOCK_FILE)):
+            return self._archive_locked(path, stat, day)
+
+    def _archive_locked(self, path, stat, day):
+        archive_path = self._archive_path(day)
+        entries = self._load_index(day)
+        name = os.path.basename(path)
+        if any(entry['name'] == name and entry['size'] == stat.st_size for entry in entries):
+            return next(entry for entry in entries if entry['name'] == name)  # 上次已归档但没来得及删除原文件
+        offset = entries[-1]['offset'] + entries[-1]['length'] if entries else 0
+        with open(archive_path, 'ab') as out:
+            out.truncate(offset)
+            out.seek(offset)
+            out.write(_gzip_header(name, stat.st_mtime))
+            compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, -15)
+            crc = 0
+            with open(path, 'rb') as source:
+                while True:
+                    chunk = source.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    crc = zlib.crc32(chunk, crc)
+                    out.write(compressor.compress(chunk))
+            out.write(compressor.flush())
+            out.write(struct.pack('<II', crc, stat.st_size & 0xffffffff))
+            out.flush()
+            os.fsync(out.fileno())
+            length = out.tell() - offset
+        entry = {
+            'name': name,
+            'offset': offset,
+            'length': length,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'archived_at': time.time()
+        }
+        entries.append(entry)
+        self._save_index(day, entries)
+        return entry
+
+    def entries(self):
+        """所有归档中的日志（按日期排序）
+
+        Returns:
+            list: 索引条目，额外带有 'day'
+        """
+        result = []
+        for day in self._days():
+            result.extend(dict(entry, day=day) for entry in self._load_index(day))
+        return result
+
+    def read(self, day, name):
+        """读取某个归档日志的内容（只解压索引中对应的一段）
+
+        Returns:
+            bytes or None: 找不到时返回None
+        """
+        for entry in self._load_index(day):
+            if entry['name'] == name:
+                with open(self._archive_path(day), 'rb') as f:
+                    f.seek(entry['offset'])
+                    return zlib.decompress(f.read(entry['length']), 31)
+        return None
+
+    def prune(self, now=None):
+        """按保留天数和总大小删除最旧的归档（以天为单位）
+
+        Returns:
+            int: 删除的归档数
+        """
+        now = time.time() if now is None else now
+        if not os.path.isdir(self.archive_dir):
+            return 0
+        with _file_lock(os.path.join(self.archive_dir, _LOCK_FILE)):
+            return self._prune_locked(now)
+
+    def _prune_locked(self, now):
+        days = self._days()
+        sizes = {day: self._archive_size(day) for day in days}
+        total = sum(sizes.values())
+        cutoff = (datetime.date.fromtimestamp(now) - datetime.timedelta(days=self.retention_days)).isoformat()
+        removed = 0
+        for day in days:
+            expired = self.retention_days and day < cutoff
+            oversized = self.max_bytes and total > self.max_bytes and day != days[-1]
+            if not expired and not oversized:
+                break
+            for path in (self._archive_path(day), self._index_path(day)):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= sizes[day]
+            removed += 1
+        return removed
+
+    def total_size(self):
+        """所有归档的总大小（字节）"""
+        return sum(self._archive_size(day) for day in self._days())
+
+    def _days(self):
+        """已有归档的日期（升序）"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(match.group(1) for match in map(ARCHIVE_PATTERN.match, os.listdir(self.archive_dir)) if match)
+
+    def _archive_size(self, day):
+        try:
+            return os.path.getsize(self._archive_path(day))
+        except OSError:
+            return 0
+
+    def _archive_path(self, day):
+        return os.path.join(self.archive_dir, f"WS-logs-{day}.gz")
+
+    def _index_path(self, day):
+        return os.path.join(self.archive_dir, f"WS-logs-{day}.idx.json")
+
+    def _load_index(self, day):
+        """读取索引；索引丢失、为空或损坏但归档中有数据时按gzip成员重建"""
+        try:
+            with open(self._index_path(day), 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            if isinstance(entries, list) and (entries or not self._archive_size(day)):
+                return entries
+        except (OSError, ValueError):
+            pass
+        return self._rebuild_index(day)
+
+    def _rebuild_index(self, day):
+        """逐个解压归档中的gzip成员重建索引，遇到不完整的成员（追加时中断）为止
+
+        Returns:
+            list: 索引条目，成员头中没有文件名时使用 recovered-N.log
+        """
+        entries = []
+        try:
+            with open(self._archive_path(day), 'rb') as f:
+                offset = 0
+                while True:
+                    f.seek(offset)
+                    header = f.read(_HEADER_PEEK)
+                    if len(header) < 10 or header[:2] != b'\x1f\x8b':
+                        break
+                    f.seek(offset)
+                    decompressor = zlib.decompressobj(31)
+                    size = length = 0
+                    while not decompressor.eof:
+                        chunk = f.read(_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        size += len(decompressor.decompress(chunk))
+                        length += len(chunk) - len(decompressor.unused_data)
+                    if not decompressor.eof:
+                        break
+                    mtime = struct.unpack('<I', header[4:8])[0]
+                    entries.append({
+                        'name': _member_name(header) or f"recovered-{len(entries) + 1}.log",
+                        'offset': offset,
+                        'length': length,
+                        'size': size,
+                        'mtime': mtime,
+                        'archived_at': None
+                    })
+                    offset += length
+        except (OSError, zlib.error, struct.error):
+            pass
+        return entries
+
+    def _save_index(self, day, entries):
+        path = self._index_path(day)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())  # 落盘后才会删除原日志
+        os.replace(temp_path, path)
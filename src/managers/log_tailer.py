@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+日志增量读取模块 - 保持WS.log的二进制句柄，按块读取新增内容并切分成行，
+通过文件身份和大小识别日志轮换和截断
+
+读取位置可以连同文件身份（路径、大小、设备号/文件号、开头一块内容的哈希）保存为检查点，
+启动器重新接管服务器时从检查点继续读取，检查点失效时只读取末尾一段。
+"""
+
+import os
+import json
+import codecs
+import hashlib
+from ..common.constants import (LOG_TAIL_CHUNK_SIZE, LOG_TAIL_MAX_READ, LOG_TAIL_MAX_LINE, LOG_IDENTITY_HEAD_BYTES)
+
+# 重新从头读取的原因
+RESET_ROTATED = 'rotated'      # 日志文件被替换（服务器重启时UE会把旧日志改名为WS-backup-*.log）
+RESET_TRUNCATED = 'truncated'  # 同一文件被截断
+
+# 第一次打开文件时的起始位置
+START_BEGINNING = 'beginning'    # 从头读取
+START_END = 'end'                # 跳过启动前就存在的旧日志
+START_CHECKPOINT = 'checkpoint'  # 从检查点继续读取
+START_TAIL = 'tail'              # 检查点无效，只读取末尾一段
+
+
+def _open_shared(path):
+    """以二进制只读方式打开文件
+
+    Windows下额外允许删除共享，否则服务器重启时无法把正在读取的WS.log改名轮换。
+    """
+    if os.name != 'nt':
+        return open(path, 'rb', buffering=0)
+
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.CreateFileW.argtypes = (wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                     wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE)
+    GENERIC_READ = 0x80000000
+    FILE_SHARE_ALL = 0x1 | 0x2 | 0x4  # READ | WRITE | DELETE
+    OPEN_EXISTING = 3
+    handle = kernel32.CreateFileW(path, GENERIC_READ, FILE_SHARE_ALL, None, OPEN_EXISTING, 0x80, None)
+    if handle == wintypes.HANDLE(-1).value:
+        raise ctypes.WinError(ctypes.get_last_error())
+    fd = msvcrt.open_osfhandle(handle, os.O_RDONLY | os.O_BINARY)
+    return os.fdopen(fd, 'rb', buffering=0)
+
+
+def _file_identity(stat_result):
+    """文件身份（设备号, 文件号）"""
+    return stat_result.st_dev, stat_result.st_ino
+
+
+def file_identity(path):
+    """文件身份，文件不存在时返回None"""
+    try:
+        return _file_identity(os.stat(path))
+    except OSError:
+        return None
+
+
+class CheckpointStore:
+    """按名称（实例名）保存日志检查点的JSON文件，写入时先写临时文件再替换"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, name):
+        """读取检查点，不存在或文件损坏时返回None"""
+        return self._read().get(name)
+
+    def save(self, name, checkpoint):
+        """保存检查点（None表示删除）"""
+        checkpoints = self._read()
+        if checkpoint is None:
+            checkpoints.pop(name, None)
+        else:
+            checkpoints[name] = checkpoint
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_file = self.path + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(checkpoints, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.path)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                checkpoints = json.load(f)
+            return checkpoints if isinstance(checkpoints, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+
+class LogTailer:
+    """日志文件增量读取器
+
+    句柄在两次读取之间保持打开，每次读取复用同一块缓冲区，跨块的半行留到下次拼接，
+    完整的行用增量解码器解码。文件被替换时先读完旧文件剩余内容再切换到新文件，
+    文件变小时视为截断并从头读取。
+    """
+
+    def __init__(self, path, encoding='utf-8', chunk_size=LOG_TAIL_CHUNK_SIZE, max_read=LOG_TAIL_MAX_READ,
+                 max_line=LOG_TAIL_MAX_LINE, on_reset=None, skip_identity=None, resume=None, tail_window=None):
+        """
+        Args:
+            path (str): 日志文件路径
+            encoding (str): 日志编码
+            chunk_size (int): 每次系统调用读取的字节数
+            max_read (int): 每次 read_lines 最多读取的字节数，剩余内容留到下次（见 has_more）
+            max_line (int): 单行最大字节数，超过时直接作为一行输出，避免缓冲区无限增长
+            on_reset (callable): 从头读取时的回调，参数为原因（RESET_ROTATED / RESET_TRUNCATED）
+            skip_identity (tuple): 打开的文件是这个身份时从末尾开始读取（启动服务器前已存在的旧日志）
+            resume (dict): 第一次打开文件时尝试恢复的检查点（见 checkpoint()）
+            tail_window (int): 检查点无效时第一次打开只读取末尾这么多字节（从其中第一个完整行开始），
+                为None时从头读取
+        """
+        self.path = path
+        self.encoding = encoding
+        self.max_read = max_read
+        self.max_line = max_line
+        self.on_reset = on_reset
+        self.skip_identity = skip_identity
+        self.resume = resume
+        self.tail_window = tail_window
+        self.start_mode = None  # 第一次打开文件时的起始位置（START_*），还没打开过时为None
+        self.position = 0       # 当前句柄已读取到的偏移
+        self.has_more = False   # 上次读取因达到 max_read 而提前结束
+        self.last_read = 0      # 上次读取的字节数
+        self._file = None
+        self._identity = None
+        self._head = None  # (已计算哈希的开头字节数, 哈希)
+        self._buffer = bytearray(chunk_size)
+        self._view = memoryview(self._buffer)
+        self._partial = bytearray()
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    @property
+    def is_open(self):
+        """日志文件是否已打开"""
+        return self._file is not None
+
+    def close(self):
+        """关闭句柄"""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._identity = None
+        self._head = None
+
+    def checkpoint(self):
+        """当前读取位置的检查点（只包含已输出的完整行），文件未打开时返回None
+
+        Returns:
+            dict: path, size, identity, head_size, head_hash, position
+        """
+        if self._file is None:
+            return None
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if self._head is None or (self._head[0] < LOG_IDENTITY_HEAD_BYTES and size > self._head[0]):
+                self._head = self._hash_head(size)
+        except OSError:
+            return None
+        return {
+            'path': os.path.abspath(self.path),
+            'size': size,
+            'identity': list(self._identity),
+            'head_size': self._head[0],
+            'head_hash': self._head[1],
+            'position': self.position - len(self._partial)
+        }
+
+    def _hash_head(self, size):
+        """计算文件开头（至多 LOG_IDENTITY_HEAD_BYTES 字节）的哈希，不改变读取位置
+
+        Returns:
+            tuple: (实际计算的字节数, 哈希)
+        """
+        offset = self._file.tell()
+        try:
+            self._file.seek(0)
+            data = self._file.read(min(size, LOG_IDENTITY_HEAD_BYTES)) or b''
+        finally:
+            self._file.seek(offset)
+        return len(data), hashlib.sha1(data).hexdigest()
+
+    def _checkpoint_matches(self, checkpoint, size):
+        """检查点是否属于当前打开的文件：路径、身份一致，文件没有变小，开头内容没有变化"""
+        try:
+            if os.path.normcase(checkpoint['path']) != os.path.normcase(os.path.abspath(self.path)):
+                return False
+            if tuple(checkpoint['identity']) != self._identity:
+                return False
+            position = int(checkpoint['position'])
+            head_size = int(checkpoint['head_size'])
+            if size < int(checkpoint['size']) or not 0 <= position <= size or head_size > size:
+                return False
+            return self._hash_head(head_size) == (head_size, checkpoint['head_hash'])
+        except (KeyError, TypeError, ValueError, OSError):
+            return False
+
+    def _line_start_after(self, offset):
+        """offset之后第一个完整行的起始位置（之后没有换行时返回文件末尾）"""
+        self._file.seek(offset)
+        while True:
+            count = self._file.readinto(self._view)
+            if not count:
+                return offset
+            end = self._buffer.find(b'\n', 0, count)
+            if end >= 0:
+                return offset + end + 1
+            offset += count
+
+    def _first_start_position(self):
+        """第一次打开文件时的起始位置：跳过旧日志 > 检查点 > 末尾一段 > 从头读取"""
+        size = os.fstat(self._file.fileno()).st_size
+        checkpoint, self.resume = self.resume, None
+        if self._identity == self.skip_identity:
+            self.start_mode = START_END
+            return size
+        if checkpoint and self._checkpoint_matches(checkpoint, size):
+            self.start_mode = START_CHECKPOINT
+            return int(checkpoint['position'])
+        if self.tail_window is not None and size > self.tail_window:
+            self.start_mode = START_TAIL
+            return self._line_start_after(size - self.tail_window)
+        self.start_mode = START_BEGINNING
+        return 0
+
+    def _open(self, start_position=0):
+        """打开日志文件，成功返回True（第一次打开时由 _first_start_position 确定起始位置）"""
+        try:
+            self._file = _open_shared(self.path)
+            self._identity = _file_identity(os.fstat(self._file.fileno()))
+            if self.start_mode is None:
+                start_position = self._first_start_position()
+            elif self._identity == self.skip_identity:
+                start_position = os.fstat(self._file.fileno()).st_size
+            self._file.seek(start_position)
+        except OSError:
+            self.close()
+            return False
+        self.position = start_position
+        self._reset_decoder()
+        return True
+
+    def _reset_decoder(self):
+        """丢弃半行和解码器状态"""
+        self._partial.clear()
+        self._decoder.reset()
+
+    def _check_file(self):
+        """检查文件是否被替换或截断
+
+        Returns:
+            str or None: RESET_ROTATED / RESET_TRUNCATED，文件未变化（或暂时不存在）时为None
+        """
+        try:
+            current = os.stat(self.path)
+        except OSError:
+            return None  # 轮换过程中文件可能短暂不存在，继续读完旧句柄
+        if _file_identity(current) != self._identity:
+            return RESET_ROTATED
+        if current.st_size < self.position:
+            return RESET_TRUNCATED
+        return None
+
+    def read_lines(self):
+        """读取新增的完整行（不含换行符）
+
+        Returns:
+            list: 新增的行，文件不存在或没有新内容时为空
+        """
+        if self._file is None and not self._open():
+            self.last_read = 0
+            return []
+
+        reset = self._check_file()
+        if reset == RESET_TRUNCATED:
+            self._file.seek(0)
+            self.position = 0
+            self._reset_decoder()
+            if self.on_reset:
+                self.on_reset(reset)
+
+        lines = self._read_available()
+        if reset == RESET_ROTATED and not self.has_more:
+            # 旧文件已读完，末尾没有换行的内容也一并输出
+            lines.extend(self._flush_partial())
+            self.close()
+            if self.on_reset:
+                self.on_reset(reset)
+            if self._open():
+                lines.extend(self._read_available())
+        return lines
+
+    def _read_available(self):
+        """从当前句柄读取至多 max_read 字节并切分成行"""
+        lines = []
+        total = 0
+        self.has_more = False
+        while total < self.max_read:
+            try:
+                count = self._file.readinto(self._view)
+            except OSError:
+                break
+            if not count:
+                break
+            total += count
+            self.position += count
+            self._split(count, lines)
+        else:
+            self.has_more = True
+        self.last_read = total
+        return lines
+
+    def _split(self, count, lines):
+        """把缓冲区中的一块数据与上次留下的半行拼接，解码其中的完整行"""
+        end = self._buffer.rfind(b'\n', 0, count)
+        if end < 0:
+            self._partial += self._view[:count]
+            if len(self._partial) > self.max_line:
+                lines.extend(self._flush_partial())
+            return
+        if self._partial:
+            self._partial += self._view[:end + 1]
+            data = bytes(self._partial)
+            self._partial.clear()
+        else:
+            data = bytes(self._view[:end + 1])
+        self._partial += self._view[end + 1:count]
+        text = self._decoder.decode(data)
+        lines.extend(line[:-1] if line.endswith('\r') else line for line in text.split('\n')[:-1])
+
+    def _flush_partial(self):
+        """把没有换行结尾的剩余内容作为一行输出"""
+        if not self._partial:
+            return []
+        text = self._decoder.decode(bytes(self._partial), final=True)
+        self._reset_decoder()
+        return [text.rstrip('\r')]
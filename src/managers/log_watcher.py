@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+日志变化通知模块 - 在事件循环中等待WS.log发生变化
+
+Linux下通过ctypes使用inotify监视日志目录（文件创建、写入、改名都能立即收到），
+其他平台或inotify不可用时使用自适应轮询：有新内容时以最短间隔轮询，空闲时逐步放慢。
+"""
+
+import os
+import sys
+import ctypes
+import ctypes.util
+import struct
+import asyncio
+from ..common.constants import LOG_POLL_MIN_INTERVAL, LOG_POLL_MAX_INTERVAL, LOG_NOTIFY_SAFETY_INTERVAL
+
+# inotify常量（<sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+_libc = None
+
+
+def _load_libc():
+    """加载libc，不支持inotify时返回None"""
+    global _libc
+    if _libc is None:
+        _libc = False
+        if sys.platform.startswith('linux'):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+                libc.inotify_init1.argtypes = (ctypes.c_int,)
+                libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+                _libc = libc
+            except (OSError, AttributeError):
+                pass
+    return _libc or None
+
+
+class PollingWatcher:
+    """自适应轮询：读到新内容后间隔恢复到最短，连续空闲时间隔翻倍直到最长"""
+
+    kind = 'poll'
+
+    def __init__(self, path, min_interval=LOG_POLL_MIN_INTERVAL, max_interval=LOG_POLL_MAX_INTERVAL):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+
+    async def wait(self, active):
+        """等待下一次读取
+
+        Args:
+            active (bool): 上一次读取是否读到了新内容
+        """
+        self.interval = self.min_interval if active else min(self.interval * 2, self.max_interval)
+        await asyncio.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """inotify监视日志所在目录，只关心与日志文件同名的事件
+
+    目录还不存在时按最短间隔轮询并重试添加监视；为防止漏掉事件，
+    即使没有通知也会每隔 LOG_NOTIFY_SAFETY_INTERVAL 秒读取一次。
+    """
+
+    kind = 'inotify'
+
+    def __init__(self, path, libc):
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.name = os.fsencode(os.path.basename(path))
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watching = False
+        self._loop = None
+        self._event = None
+
+    def _add_watch(self):
+        """添加目录监视，目录不存在时返回False"""
+        if not self._watching:
+            self._watching = self._libc.inotify_add_watch(self._fd, os.fsencode(self.directory), WATCH_MASK) >= 0
+        return self._watching
+
+    def _on_readable(self):
+        """读取并解析所有待处理事件（事件循环线程）"""
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        offset = 0
+        changed = not data
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_IGNORED:
+                self._watching = False  # 目录被删除，下次等待时重新添加监视
+                changed = True
+            elif name == self.name or mask & IN_Q_OVERFLOW:
+                changed = True
+        if changed:
+            self._event.set()
+
+    async def wait(self, active):
+        """等待日志文件变化
+
+        Args:
+            active (bool): 上一次读取是否读到了新内容（inotify不需要，保持接口一致）
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+            self._loop.add_reader(self._fd, self._on_readable)
+        if not self._add_watch():
+            await asyncio.sleep(LOG_POLL_MIN_INTERVAL)
+            return
+        try:
+            await asyncio.wait_for(self._event.wait(), LOG_NOTIFY_SAFETY_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+
+    def close(self):
+        """关闭inotify（需在事件循环线程中调用）"""
+        if self._fd is None:
+            return
+        if self._loop is not None:
+            self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = None
+
+
+def create_log_watcher(path):
+    """创建日志变化通知器：优先使用inotify，不可用时使用自适应轮询"""
+    libc = _load_libc()
+    if libc is not None:
+        try:
+            return InotifyWatcher(path, libc)
+        except OSError:
+            pass
+    return PollingWatcher(path)
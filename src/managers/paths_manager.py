@@ -5,7 +5,7 @@
 """
 
 import os
-from PySide6.QtCore import QObject, Signal
+from ..common.qt_compat import QObject, Signal
 from ..common.constants import DEFAULT_PATHS, PathConfig
 from ..common.utils import ensure_dir_exists, is_valid_path
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+在线玩家名单模块 - 根据WS.log中的登录/进入/断开事件增量维护在线玩家，
+再用低频的RCON lp 结果校正（例如重新接管服务器时错过的事件）
+"""
+
+import time
+import threading
+import collections
+
+
+def normalize_account(player_id):
+    """把日志中的 Steam:7656... 转换为 lp 表格中的账号（去掉平台前缀）"""
+    return str(player_id).split(':', 1)[-1].strip()
+
+
+class PlayerRoster:
+    """在线玩家名单
+
+    登录请求行带有玩家名和账号，进入游戏行只有玩家名，断开连接行只有账号，
+    因此先按玩家名记下登录请求，进入游戏时再以账号为键加入名单。
+    登录后一直没有进入游戏的请求超过 pending_ttl 秒或超过 max_pending 个时丢弃最早的。
+    所有修改方法在名单实际变化时返回True，调用方据此决定是否发出更新信号。
+    """
+
+    def __init__(self, pending_ttl=300, max_pending=256):
+        self.pending_ttl = pending_ttl
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._logins = collections.OrderedDict()  # 玩家名 -> (账号, 登录时间)（已发出登录请求、还没进入游戏）
+        self._players = {}  # 账号 -> 玩家信息
+
+    def login(self, name, player_id, now=None):
+        """记录登录请求"""
+        now = time.time() if now is None else now
+        with self._lock:
+            name = name.strip()
+            self._logins.pop(name, None)
+            self._logins[name] = (normalize_account(player_id), now)
+            self._expire_logins(now)
+
+    def join(self, name, at=None, now=None):
+        """玩家进入游戏（没有对应的登录请求时以玩家名临时作为键，等待lp校正）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            name = name.strip()
+            self._expire_logins(now)
+            pending = self._logins.pop(name, None)
+            account = pending[0] if pending else f"name:{name}"
+            if account in self._players:
+                return False
+            self._players[account] = self._entry(name, account, joined_at=at)
+            return True
+
+    def leave(self, player_id):
+        """玩家断开连接
+
+        Returns:
+            dict or None: 离开的玩家信息，不在名单中时返回None
+        """
+        with self._lock:
+            return self._players.pop(normalize_account(player_id), None)
+
+    def reconcile(self, players):
+        """用RCON lp 查询到的完整列表校正名单（保留已知玩家的进入时间）
+
+        Args:
+            players (list): get_online_players 解析出的玩家字典（name, account_id, pawn_id）
+        """
+        with self._lock:
+            current = {}
+            for player in players:
+                account = normalize_account(player['account_id'])
+                known = self._players.get(account) or self._players.get(f"name:{player['name']}")
+                entry = self._entry(player['name'], account, known['joined_at'] if known else None)
+                entry['pawn_id'] = player.get('pawn_id', '')
+                current[account] = entry
+            changed = self._summary(current) != self._summary(self._players)
+            self._players = current
+            return changed
+
+    def clear(self):
+        """清空名单（服务器停止）"""
+        with self._lock:
+            self._logins.clear()
+            changed = bool(self._players)
+            self._players = {}
+            return changed
+
+    def players(self):
+        """按进入时间排序的在线玩家列表（副本）"""
+        with self._lock:
+            return sorted((dict(player) for player in self._players.values()), key=lambda p: p['joined_at'])
+
+    def __len__(self):
+        return len(self._players)
+
+    def _expire_logins(self, now):
+        """丢弃过期或超出数量上限的登录请求（调用方持有锁，按登录时间从早到晚排列）"""
+        while self._logins and (len(self._logins) > self.max_pending or
+                                now - next(iter(self._logins.values()))[1] > self.pending_ttl):
+            self._logins.popitem(last=False)
+
+    @staticmethod
+    def _entry(name, account, joined_at=None):
+        return {
+            'name': name,
+            'account_id': '' if account.startswith('name:') else account,
+            'pawn_id': '',
+            'status': 'online',
+            'joined_at': joined_at or time.time()
+        }
+
+    @staticmethod
+    def _summary(players):
+        """用于判断名单是否变化的 (账号, 玩家名) 集合"""
+        return {(account, player['name']) for account, player in players.items()}
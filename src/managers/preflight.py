@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+启动前检查模块 - 启动服务器前并行检查端口、磁盘空间、残留进程和存档锁定，
+在毫秒级给出具体的失败原因，而不是等到启动超时
+"""
+
+import os
+import time
+import shutil
+import concurrent.futures
+from ..common.constants import PREFLIGHT_TIMEOUT
+from ..common.utils import is_port_free, get_world_save_files, is_file_locked
+from .process_registry import process_confirmed_in
+
+# 命令行参数 -> (端口名称, 协议)，与服务端绑定的端口一致
+LAUNCH_PORT_ARGS = {
+    'port': ('game', 'udp'),
+    'queryport': ('query', 'udp'),
+    'rconport': ('rcon', 'tcp'),
+    'echoport': ('echo', 'tcp')
+}
+
+
+def parse_launch_args(cmd):
+    """解析启动命令中的 -Key=Value 参数（键不区分大小写，重复时以最后一个为准）"""
+    options = {}
+    for arg in cmd[1:]:
+        if arg.startswith('-') and '=' in arg:
+            key, value = arg[1:].split('=', 1)
+            options[key.lower()] = value.strip('"')
+    return options
+
+
+def launch_ports(cmd):
+    """启动命令将要绑定的端口：(名称, 端口, 协议, 地址) 列表；游戏端口同时占用 port+1"""
+    options = parse_launch_args(cmd)
+    game_host = options.get('multihome') or '0.0.0.0'
+    ports = []
+    for arg, (name, protocol) in LAUNCH_PORT_ARGS.items():
+        if arg not in options:
+            continue
+        try:
+            port = int(options[arg])
+        except ValueError:
+            continue
+        host = (options.get('rconaddr') or '127.0.0.1') if name == 'rcon' else game_host
+        ports.append((name, port, protocol, host))
+        if name == 'game':
+            ports.append(('game+1', port + 1, protocol, host))
+    return ports
+
+
+def check_port(name, port, protocol, host):
+    """检查端口是否可以绑定"""
+    if is_port_free(port, host, protocol):
+        return None
+    return f"{name}端口 {port}/{protocol} 已被占用"
+
+
+def check_disk_space(path, min_free_mb, label):
+    """检查路径所在磁盘的剩余空间（路径不存在时检查最近的已存在的上级目录）"""
+    while path and not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    if not path:
+        return None
+    free_mb = shutil.disk_usage(path).free / 1024 / 1024
+    if free_mb < min_free_mb:
+        return f"{label}所在磁盘剩余空间不足: {free_mb:.0f} MB（至少需要 {min_free_mb} MB）"
+    return None
+
+
+def check_leftover_process(registry, server_path):
+    """检查本服务器目录下是否残留服务器进程
+
+    注册表在无法读取进程路径时会退回按名称匹配，这里只报告可执行文件、命令行或工作目录
+    确认位于本实例服务器目录下的进程，避免把其他实例或无关的同名进程当作残留进程。
+    """
+    proc = registry.find(force_rescan=True)
+    if proc is None or not process_confirmed_in(proc, server_path):
+        return None
+    return f"已有服务器进程在运行 (PID {proc.pid})，请先停止或重新加载服务器状态"
+
+
+def check_save_locks(server_path):
+    """检查存档是否被其他进程锁定"""
+    locked = [os.path.basename(path) for path in get_world_save_files(server_path) if is_file_locked(path)]
+    if locked:
+        return f"存档被锁定: {', '.join(locked)}"
+    return None
+
+
+def run_preflight(checks, timeout=PREFLIGHT_TIMEOUT):
+    """并行执行检查
+
+    Args:
+        checks (list): (名称, 函数, 参数元组) 列表，函数通过时返回None，失败时返回原因
+        timeout (float): 所有检查的最长等待时间（秒）
+
+    Returns:
+        dict: {'ok': 是否全部通过, 'duration': 总耗时, 'failures': [(名称, 原因)], 'checks': 检查数量}
+    """
+    started = time.monotonic()
+    failures = []
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(checks)),
+                                                     thread_name_prefix="Preflight")
+    try:
+        futures = {executor.submit(func, *args): name for name, func, args in checks}
+        done, pending = concurrent.futures.wait(futures, timeout=timeout)
+        for future in done:
+            try:
+                reason = future.result()
+            except Exception as e:
+                reason = f"检查出错: {str(e)}"
+            if reason:
+                failures.append((futures[future], reason))
+        for future in pending:
+            failures.append((futures[future], f"检查超时（{timeout} 秒）"))
+    finally:
+        executor.shutdown(wait=False)
+    failures.sort(key=lambda failure: failure[0])
+    return {
+        'ok': not failures,
+        'duration': time.monotonic() - started,
+        'failures': failures,
+        'checks': len(checks)
+    }
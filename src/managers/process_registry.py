@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+进程注册表模块 - 缓存服务器进程身份，避免反复全量扫描系统进程
+"""
+
+import os
+import time
+import threading
+from ..common.constants import SHIPPING_PROCESS_NAME
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class ProcessScanner:
+    """系统进程快照，由多个进程注册表共享
+
+    一次 process_iter 读取所有进程的 pid/ppid/name/create_time，在 max_age 秒内重复使用，
+    多个服务器实例同时查找进程时只需一次全量扫描。
+    """
+
+    def __init__(self, max_age=0.5):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshot = []
+        self._taken_at = 0.0
+        self.scan_count = 0  # 实际全量扫描次数
+
+    def snapshot(self, max_age=None):
+        """获取进程快照
+
+        Args:
+            max_age (float): 可接受的快照最大年龄（秒），0表示强制重新扫描
+
+        Returns:
+            list: psutil.Process 列表，进程信息在 proc.info 中
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            if psutil is not None and time.monotonic() - self._taken_at >= max_age:
+                self._snapshot = list(psutil.process_iter(['pid', 'ppid', 'name', 'create_time']))
+                self._taken_at = time.monotonic()
+                self.scan_count += 1
+            return self._snapshot
+
+    def descendants(self, root_pid, snapshot=None):
+        """从快照中找出根进程的所有后代进程（根进程已退出时仍可按ppid找到其子进程）"""
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        children = {}
+        for proc in snapshot:
+            children.setdefault(proc.info['ppid'], []).append(proc)
+        result = []
+        pending = [root_pid]
+        while pending:
+            for proc in children.get(pending.pop(), ()):
+                result.append(proc)
+                pending.append(proc.info['pid'])
+        return result
+
+
+def _path_under(path, root):
+    """path 是否为 root 或位于 root 下（root 已规范化）"""
+    if not path or not os.path.isabs(path):
+        return False
+    path = os.path.normcase(os.path.abspath(path))
+    return path == root or path.startswith(root + os.sep)
+
+
+def process_belongs_to(proc, server_path):
+    """判断进程是否属于某个服务器安装目录（可执行文件或命令行参数位于该目录下）
+
+    无法读取进程信息时返回None
+    """
+    root = os.path.normcase(os.path.abspath(server_path))
+    try:
+        paths = [proc.exe()] + proc.cmdline()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+    return any(_path_under(path, root) for path in paths)
+
+
+def process_confirmed_in(proc, server_path):
+    """进程的可执行文件、命令行参数或工作目录是否确认位于服务器目录下
+
+    与 process_belongs_to 不同，无法读取进程信息时视为未确认（返回False），
+    用于只能针对本实例进程的判断（例如启动前的残留进程检查）。
+    """
+    if process_belongs_to(proc, server_path):
+        return True
+    try:
+        return _path_under(proc.cwd(), os.path.normcase(os.path.abspath(server_path)))
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return False
+
+
+class ProcessRegistry:
+    """服务器进程注册表
+
+    找到 WSServer-Win64-Shipping.exe 后记录其 (pid, create_time) 身份，
+    之后只做 O(1) 的身份校验；只有身份丢失（进程退出或PID被复用）时才重新全量扫描。
+    多实例时各注册表共享同一个 ProcessScanner，按服务器目录区分各自的进程。
+    """
+
+    def __init__(self, process_name=SHIPPING_PROCESS_NAME, rescan_interval=0.5, scanner=None, server_path=None):
+        self.process_name = process_name
+        self.rescan_interval = rescan_interval  # 两次全量扫描之间的最小间隔（秒）
+        self.scanner = scanner or ProcessScanner(max_age=0)
+        self.server_path = server_path  # 按名称查找时只接受该目录下的进程
+        self._lock = threading.RLock()
+        self._process = None
+        self._identity = None  # (pid, create_time)
+        self._last_scan_time = 0.0
+        self.scan_count = 0  # 全量扫描次数，便于观察缓存效果
+
+    @property
+    def pid(self):
+        """当前缓存的进程PID"""
+        identity = self._identity
+        return identity[0] if identity else None
+
+    @property
+    def create_time(self):
+        """当前缓存的进程创建时间（时间戳）"""
+        identity = self._identity
+        return identity[1] if identity else None
+
+    @property
+    def process(self):
+        """当前缓存的进程对象（不做存活校验）"""
+        return self._process
+
+    @property
+    def identity(self):
+        """当前缓存的进程身份 (pid, create_time)"""
+        return self._identity
+
+    def is_alive(self):
+        """O(1) 校验缓存的进程身份是否仍然有效"""
+        with self._lock:
+            if self._process is None or psutil is None:
+                return False
+            try:
+                # is_running() 会同时比较PID和创建时间，能识别PID复用
+                if self._process.is_running() and self._process.status() != psutil.STATUS_ZOMBIE:
+                    return True
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+            self._clear()
+            return False
+
+    def find(self, root_pid=None, force_rescan=False):
+        """获取服务器进程，身份有效时直接返回缓存，否则重新查找一次
+
+        Args:
+            root_pid (int): 启动器创建的根进程PID；指定时只在其后代进程中查找，
+                避免同一主机上的多个服务器互相抢占PID
+            force_rescan (bool): 忽略扫描间隔限制，强制重新查找
+
+        Returns:
+            psutil.Process or None: 找到的进程对象
+        """
+        with self._lock:
+            if self.is_alive():
+                return self._process
+            if not force_rescan and time.monotonic() - self._last_scan_time < self.rescan_interval:
+                return None
+            if root_pid:
+                return self._scan_tree(root_pid)
+            return self._scan()
+
+    def attach(self, pid):
+        """直接按PID登记进程身份（例如从进程树中找到的子进程）
+
+        Returns:
+            bool: 登记成功返回True
+        """
+        if psutil is None or not pid:
+            return False
+        with self._lock:
+            try:
+                process = psutil.Process(pid)
+                self._process = process
+                self._identity = (process.pid, process.create_time())
+                return True
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                self._clear()
+                return False
+
+    def invalidate(self):
+        """清除缓存的进程身份，下次查询时重新扫描"""
+        with self._lock:
+            self._clear()
+            self._last_scan_time = 0.0
+
+    def _clear(self):
+        """清除身份（调用方需持有锁）"""
+        self._process = None
+        self._identity = None
+
+    def _scan_tree(self, root_pid):
+        """在根进程的后代进程树中查找服务器进程（调用方需持有锁）"""
+        self._last_scan_time = time.monotonic()
+        self.scan_count += 1
+        if psutil is None:
+            return None
+        for proc in self.scanner.descendants(root_pid):
+            if proc.info['name'] == self.process_name:
+                self._process = proc
+                self._identity = (proc.info['pid'], proc.info['create_time'])
+                return proc
+        self._clear()
+        return None
+
+    def _scan(self):
+        """全量扫描系统进程（调用方需持有锁）"""
+        self._last_scan_time = time.monotonic()
+        self.scan_count += 1
+        if psutil is None:
+            return None
+        fallback = None
+        for proc in self.scanner.snapshot():
+            if proc.info['name'] != self.process_name:
+                continue
+            belongs = process_belongs_to(proc, self.server_path) if self.server_path else True
+            if belongs:
+                fallback = proc
+                break
+            if belongs is None and fallback is None:
+                fallback = proc  # 无法读取路径时退回按名称匹配
+        if fallback is not None:
+            self._process = fallback
+            self._identity = (fallback.info['pid'], fallback.info['create_time'])
+            return fallback
+        self._clear()
+        return None
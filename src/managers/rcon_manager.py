@@ -8,7 +8,7 @@ import socket
 import struct
 import threading
 import time
-from PySide6.QtCore import QObject, Signal
+from ..common.qt_compat import QObject, Signal
 from ..common.constants import DEFAULT_RCON_PORT, DEFAULT_RCON_PASSWORD, RCON_TIMEOUT
 from ..common.utils import validate_ip_address, validate_port
 
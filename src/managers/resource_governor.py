@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+资源策略模块 - 为服务器进程设置CPU亲和性、优先级和内存上限，并把备份、SteamCMD等后台工作
+放到其他CPU核心上以较低的I/O优先级运行
+
+后端：
+- psutil：亲和性和优先级通过psutil设置；Windows上内存上限使用作业对象（Job Object）
+- cgroup：Linux cgroup v2，每个实例一个控制组（cpuset.cpus / cpu.weight / memory.max），
+  后台工作使用单独的控制组（较低的 cpu.weight 和 io.weight）
+"""
+
+import os
+import sys
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from ..common.constants import DEFAULT_SERVER_CONFIG, CGROUP_ROOT, CGROUP_GROUP_NAME
+
+# 优先级名称 -> (Windows优先级类名, POSIX nice值, cgroup cpu.weight)
+PRIORITY_LEVELS = {
+    'idle': ('IDLE_PRIORITY_CLASS', 19, 1),
+    'below_normal': ('BELOW_NORMAL_PRIORITY_CLASS', 10, 50),
+    'normal': ('NORMAL_PRIORITY_CLASS', 0, 100),
+    'above_normal': ('ABOVE_NORMAL_PRIORITY_CLASS', -5, 200),
+    'high': ('HIGH_PRIORITY_CLASS', -10, 400)
+}
+BACKGROUND_PRIORITY = 'below_normal'
+BACKGROUND_IO_WEIGHT = 10  # 后台控制组的 io.weight（1-10000，默认100）
+
+# 服务器阶段：启动中 / 已上线
+PHASE_STARTUP = 'startup'
+PHASE_RUNNING = 'running'
+
+
+def parse_cpu_list(text):
+    """解析CPU列表，如 "0-3,6" -> [0, 1, 2, 3, 6]，空字符串返回空列表
+
+    Raises:
+        ValueError: 格式错误
+    """
+    if isinstance(text, (list, tuple)):
+        return sorted({int(cpu) for cpu in text})
+    cpus = set()
+    for part in str(text or "").replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            start, end = int(start), int(end)
+            if start > end:
+                raise ValueError(f"无效的CPU范围: {part}")
+            cpus.update(range(start, end + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def format_cpu_list(cpus):
+    """把CPU列表格式化为 "0-3,6" 形式（cpuset.cpus 的格式）"""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ','.join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+
+
+def detect_cgroup_root(root=CGROUP_ROOT):
+    """查找cgroup v2挂载点（纯v2挂载在 /sys/fs/cgroup，混合模式在 /sys/fs/cgroup/unified）"""
+    for path in (root, os.path.join(root, 'unified')):
+        if os.path.isfile(os.path.join(path, 'cgroup.controllers')):
+            return path
+    return None
+
+
+class CgroupBackend:
+    """cgroup v2 后端：<根>/smsl/<实例名> 和 <根>/smsl/background"""
+
+    def __init__(self, root):
+        self.root = root
+        self.base = os.path.join(root, CGROUP_GROUP_NAME)
+
+    @classmethod
+    def available(cls, root):
+        """根目录可写且提供了 cpuset、cpu、memory 控制器"""
+        if not root or not os.access(root, os.W_OK):
+            return False
+        try:
+            with open(os.path.join(root, 'cgroup.controllers'), 'r') as f:
+                controllers = f.read().split()
+        except OSError:
+            return False
+        return all(controller in controllers for controller in ('cpuset', 'cpu', 'memory'))
+
+    def group(self, name):
+        """创建（如不存在）并返回控制组目录"""
+        path = os.path.join(self.base, name)
+        if not os.path.isdir(path):
+            os.makedirs(self.base, exist_ok=True)
+            for parent in (self.root, self.base):
+                # 子控制组只能使用父控制组在 subtree_control 中开启的控制器
+                self._write(parent, 'cgroup.subtree_control', "+cpuset +cpu +memory +io", required=False)
+            os.makedirs(path, exist_ok=True)
+        return path
+
+    def configure(self, name, cpus=None, weight=None, memory_limit=None, io_weight=None):
+        """写入控制组参数，None表示不修改；memory_limit为0表示不限制"""
+        path = self.group(name)
+        if cpus is not None:
+            self._write(path, 'cpuset.cpus', format_cpu_list(cpus))
+        if weight is not None:
+            self._write(path, 'cpu.weight', str(weight))
+        if memory_limit is not None:
+            self._write(path, 'memory.max', str(memory_limit) if memory_limit > 0 else 'max')
+        if io_weight is not None:
+            self._write(path, 'io.weight', f"default {io_weight}", required=False)
+
+    def attach(self, name, pid):
+        """把进程（及其之后创建的子进程）移入控制组"""
+        self._write(self.group(name), 'cgroup.procs', str(pid))
+
+    @staticmethod
+    def _write(path, filename, value, required=True):
+        try:
+            with open(os.path.join(path, filename), 'w') as f:
+                f.write(value)
+        except OSError:
+            if required:
+                raise
+
+
+class _WindowsJob:
+    """Windows作业对象，用于限制进程的提交内存"""
+
+    JOB_OBJECT_LIMIT_PROCESS_MEMORY = 0x100
+    JobObjectExtendedLimitInformation = 9
+    PROCESS_SET_QUOTA = 0x0100
+    PROCESS_TERMINATE = 0x0001
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class IO_COUNTERS(ctypes.Structure):
+            _fields_ = [(name, ctypes.c_ulonglong) for name in (
+                'ReadOperationCount', 'WriteOperationCount', 'OtherOperationCount',
+                'ReadTransferCount', 'WriteTransferCount', 'OtherTransferCount')]
+
+        class JOBOBJECT_BASIC_LIMIT_INFORMATION(ctypes.Structure):
+            _fields_ = [('PerProcessUserTimeLimit', ctypes.c_int64),
+                        ('PerJobUserTimeLimit', ctypes.c_int64),
+                        ('LimitFlags', wintypes.DWORD),
+                        ('MinimumWorkingSetSize', ctypes.c_size_t),
+                        ('MaximumWorkingSetSize', ctypes.c_size_t),
+                        ('ActiveProcessLimit', wintypes.DWORD),
+                        ('Affinity', ctypes.c_size_t),
+                        ('PriorityClass', wintypes.DWORD),
+                        ('SchedulingClass', wintypes.DWORD)]
+
+        class JOBOBJECT_EXTENDED_LIMIT_INFORMATION(ctypes.Structure):
+            _fields_ = [('BasicLimitInformation', JOBOBJECT_BASIC_LIMIT_INFORMATION),
+                        ('IoInfo', IO_COUNTERS),
+                        ('ProcessMemoryLimit', ctypes.c_size_t),
+                        ('JobMemoryLimit', ctypes.c_size_t),
+                        ('PeakProcessMemoryUsed', ctypes.c_size_t),
+                        ('PeakJobMemoryUsed', ctypes.c_size_t)]
+
+        self.ctypes = ctypes
+        self.kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self.kernel32.CreateJobObjectW.restype = wintypes.HANDLE  # 64位句柄，默认的int返回类型会截断
+        self.kernel32.OpenProcess.restype = wintypes.HANDLE
+        self.kernel32.SetInformationJobObject.argtypes = [wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p,
+                                                          wintypes.DWORD]
+        self.kernel32.AssignProcessToJobObject.argtypes = [wintypes.HANDLE, wintypes.HANDLE]
+        self.kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self.info_type = JOBOBJECT_EXTENDED_LIMIT_INFORMATION
+        self.handle = self.kernel32.CreateJobObjectW(None, None)
+        if not self.handle:
+            raise OSError(ctypes.get_last_error(), "CreateJobObject失败")
+
+    def set_memory_limit(self, limit):
+        info = self.info_type()
+        if limit > 0:
+            info.BasicLimitInformation.LimitFlags = self.JOB_OBJECT_LIMIT_PROCESS_MEMORY
+            info.ProcessMemoryLimit = limit
+        if not self.kernel32.SetInformationJobObject(self.handle, self.JobObjectExtendedLimitInformation,
+                                                     self.ctypes.byref(info), self.ctypes.sizeof(info)):
+            raise OSError(self.ctypes.get_last_error(), "SetInformationJobObject失败")
+
+    def assign(self, pid):
+        process = self.kernel32.OpenProcess(self.PROCESS_SET_QUOTA | self.PROCESS_TERMINATE, False, pid)
+        if not process:
+            raise OSError(self.ctypes.get_last_error(), "OpenProcess失败")
+        try:
+            if not self.kernel32.AssignProcessToJobObject(self.handle, process):
+                raise OSError(self.ctypes.get_last_error(), "AssignProcessToJobObject失败")
+        finally:
+            self.kernel32.CloseHandle(process)
+
+
+class ResourceGovernor:
+    """单个服务器实例的资源策略
+
+    找到服务器进程后调用 apply_server()，启动期间使用 priority_startup，
+    上线后调用 set_phase(PHASE_RUNNING) 切换为 priority_running。
+    备份、SteamCMD 等后台工作调用 apply_background() / apply_background_to_current_thread()。
+    """
+
+    def __init__(self, instance_name="default", log_callback=None, cgroup_root=None):
+        self.instance_name = instance_name
+        self.log = log_callback or (lambda message: None)
+        self.cgroup_root = cgroup_root
+        self.config = {}
+        self.backend = None
+        self.cgroup = None
+        self.server_pid = None
+        self.phase = None
+        self._job = None
+        self._lock = threading.Lock()
+
+    def _option(self, key):
+        return self.config.get(key, DEFAULT_SERVER_CONFIG[key])
+
+    def configure(self, config):
+        """更新策略并选择后端"""
+        with self._lock:
+            self.config = dict(config)
+            backend = str(self._option('resource_backend')).lower()
+            root = self.cgroup_root or (detect_cgroup_root() if sys.platform.startswith('linux') else None)
+            if backend == 'cgroup' or (backend == 'auto' and CgroupBackend.available(root)):
+                if root:
+                    self.cgroup = CgroupBackend(root)
+                    self.backend = 'cgroup'
+                    return
+                self.log("⚠️ 未找到cgroup v2挂载点，资源策略改用psutil")
+            self.cgroup = None
+            self.backend = 'psutil'
+
+    @property
+    def enabled(self):
+        """是否配置了任何资源策略"""
+        return bool(self._option('cpu_affinity') or self._option('memory_limit_mb')
+                    or self._option('priority_startup') != 'normal' or self._option('priority_running') != 'normal'
+                    or self._option('background_cpu_affinity'))
+
+    def server_cpus(self):
+        """服务器进程使用的CPU（未配置时返回None）"""
+        return self._valid_cpus(self._option('cpu_affinity'))
+
+    def background_cpus(self):
+        """后台工作使用的CPU：未配置时使用服务器没有占用的核心，全部被占用时返回None"""
+        cpus = self._valid_cpus(self._option('background_cpu_affinity'))
+        if cpus:
+            return cpus
+        server_cpus = self.server_cpus()
+        if not server_cpus:
+            return None
+        rest = [cpu for cpu in self._all_cpus() if cpu not in server_cpus]
+        return rest or None
+
+    def _all_cpus(self):
+        count = (psutil.cpu_count() if psutil else None) or os.cpu_count() or 1
+        return list(range(count))
+
+    def _valid_cpus(self, text):
+        try:
+            cpus = parse_cpu_list(text)
+        except ValueError as e:
+            self.log(f"⚠️ CPU亲和性配置无效: {str(e)}")
+            return None
+        available = set(self._all_cpus())
+        cpus = [cpu for cpu in cpus if cpu in available]
+        return cpus or None
+
+    def _priority(self, phase):
+        key = 'priority_startup' if phase == PHASE_STARTUP else 'priority_running'
+        level = str(self._option(key)).lower()
+        if level not in PRIORITY_LEVELS:
+            self.log(f"⚠️ 未知的优先级: {level}，使用normal")
+            level = 'normal'
+        return level
+
+    def apply_server(self, pid, phase=PHASE_STARTUP):
+        """对服务器进程应用亲和性、优先级和内存上限"""
+        if self.backend is None or not self.enabled:
+            return
+        with self._lock:
+            self.server_pid = pid
+            self.phase = phase
+            cpus = self.server_cpus()
+            level = self._priority(phase)
+            memory_limit = int(float(self._option('memory_limit_mb')) * 1024 * 1024)
+            try:
+                if self.backend == 'cgroup':
+                    self.cgroup.configure(self.instance_name, cpus=cpus or self._all_cpus(),
+                                          weight=PRIORITY_LEVELS[level][2], memory_limit=memory_limit)
+                    self.cgroup.attach(self.instance_name, pid)
+                else:
+                    self._set_affinity(pid, cpus)
+                    self._set_priority(pid, level)
+                    if memory_limit > 0:
+                        self._set_memory_limit(pid, memory_limit)
+            except Exception as e:
+                self.log(f"⚠️ 应用资源策略失败: {str(e)}")
+                return
+        parts = [f"优先级 {level}"]
+        if cpus:
+            parts.append(f"CPU {format_cpu_list(cpus)}")
+        if memory_limit > 0:
+            parts.append(f"内存上限 {memory_limit // 1024 // 1024} MB")
+        self.log(f"⚙️ 已应用资源策略（{self.backend}）: {'，'.join(parts)}")
+
+    def set_phase(self, phase):
+        """切换服务器阶段，按阶段调整优先级"""
+        if self.server_pid is None or phase == self.phase or not self.enabled:
+            return
+        with self._lock:
+            self.phase = phase
+            level = self._priority(phase)
+            try:
+                if self.backend == 'cgroup':
+                    self.cgroup.configure(self.instance_name, weight=PRIORITY_LEVELS[level][2])
+                else:
+                    self._set_priority(self.server_pid, level)
+            except Exception as e:
+                self.log(f"⚠️ 调整服务器优先级失败: {str(e)}")
+                return
+        self.log(f"⚙️ 服务器优先级已调整为 {level}")
+
+    def reset(self):
+        """服务器退出后清除记录的进程"""
+        with self._lock:
+            self.server_pid = None
+            self.phase = None
+
+    def apply_background(self, pid):
+        """把后台子进程（如SteamCMD）放到后台核心并降低CPU和I/O优先级"""
+        if self.backend is None or not self.enabled:
+            return
+        cpus = self.background_cpus()
+        try:
+            if self.backend == 'cgroup':
+                self.cgroup.configure('background', cpus=cpus or self._all_cpus(),
+                                      weight=PRIORITY_LEVELS[BACKGROUND_PRIORITY][2], io_weight=BACKGROUND_IO_WEIGHT)
+                self.cgroup.attach('background', pid)
+            else:
+                self._set_affinity(pid, cpus)
+                self._set_priority(pid, BACKGROUND_PRIORITY)
+                self._set_low_io_priority(pid)
+        except Exception as e:
+            self.log(f"⚠️ 设置后台进程资源策略失败: {str(e)}")
+
+    def apply_background_to_current_thread(self):
+        """把当前线程（如备份线程）放到后台核心并降低I/O优先级
+
+        备份和SteamCMD线程每次新建，结束后线程销毁，不需要恢复设置。
+        """
+        if self.backend is None or not self.enabled:
+            return
+        cpus = self.background_cpus()
+        try:
+            if sys.platform == 'win32':
+                self._windows_background_thread(cpus)
+            elif psutil and sys.platform.startswith('linux'):
+                # Linux上线程有自己的ID，亲和性、nice值和I/O优先级都可以按线程设置
+                thread = psutil.Process(threading.get_native_id())
+                self._set_affinity(thread.pid, cpus)
+                self._set_priority(thread.pid, BACKGROUND_PRIORITY)
+                self._set_low_io_priority(thread.pid)
+        except Exception as e:
+            self.log(f"⚠️ 设置后台线程资源策略失败: {str(e)}")
+
+    @staticmethod
+    def _set_affinity(pid, cpus):
+        if cpus and psutil:
+            psutil.Process(pid).cpu_affinity(cpus)
+
+    def _set_priority(self, pid, level):
+        if psutil is None:
+            return
+        windows_class, nice_value, _ = PRIORITY_LEVELS[level]
+        process = psutil.Process(pid)
+        if sys.platform == 'win32':
+            process.nice(getattr(psutil, windows_class))
+        else:
+            try:
+                process.nice(nice_value)
+            except psutil.AccessDenied:
+                # 非root用户不能提高优先级（降低nice值），保持当前值
+                if nice_value < process.nice():
+                    self.log(f"⚠️ 没有权限把优先级提高到 {level}")
+                else:
+                    raise
+
+    @staticmethod
+    def _set_low_io_priority(pid):
+        if psutil is None:
+            return
+        process = psutil.Process(pid)
+        if sys.platform == 'win32':
+            process.ionice(psutil.IOPRIO_VERYLOW)
+        elif hasattr(process, 'ionice'):
+            process.ionice(psutil.IOPRIO_CLASS_IDLE)
+
+    def _set_memory_limit(self, pid, limit):
+        if sys.platform == 'win32':
+            if self._job is None:
+                self._job = _WindowsJob()
+            self._job.set_memory_limit(limit)
+            self._job.assign(pid)
+        else:
+            self.log("⚠️ 内存上限需要cgroup后端（resource_backend设为cgroup），psutil后端不支持")
+
+    @staticmethod
+    def _windows_background_thread(cpus):
+        import ctypes
+        from ctypes import wintypes
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.GetCurrentThread.restype = wintypes.HANDLE
+        kernel32.SetThreadPriority.argtypes = [wintypes.HANDLE, ctypes.c_int]
+        kernel32.SetThreadAffinityMask.argtypes = [wintypes.HANDLE, ctypes.c_size_t]
+        thread = kernel32.GetCurrentThread()
+        kernel32.SetThreadPriority(thread, 0x00010000)  # THREAD_MODE_BACKGROUND_BEGIN：降低CPU、I/O和内存优先级
+        if cpus:
+            mask = 0
+            for cpu in cpus:
+                mask |= 1 << cpu
+            kernel32.SetThreadAffinityMask(thread, mask)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+资源采样模块 - 定时采集服务器进程资源占用，保存在定长环形缓冲区中
+"""
+
+import time
+import threading
+from array import array
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class RingBuffer:
+    """定长数值环形缓冲区，写满后覆盖最旧的数据"""
+
+    def __init__(self, capacity, typecode='d'):
+        self.capacity = capacity
+        self._data = array(typecode, [0]) * capacity
+        self._next = 0  # 下一个写入位置
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        """追加一个值"""
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def latest(self):
+        """最新的值，缓冲区为空时返回None"""
+        if not self._count:
+            return None
+        return self._data[self._next - 1]
+
+    def values(self, last=None):
+        """按时间顺序返回缓冲区中的值
+
+        Args:
+            last (int): 只返回最近的若干个值，None表示全部
+        """
+        count = self._count if last is None else min(last, self._count)
+        start = (self._next - count) % self.capacity
+        if start + count <= self.capacity:
+            return self._data[start:start + count].tolist()
+        return self._data[start:].tolist() + self._data[:self._next].tolist()
+
+    def clear(self):
+        """清空缓冲区"""
+        self._next = 0
+        self._count = 0
+
+
+class ResourceSampler:
+    """服务器进程资源采样器
+
+    每次采样在 Process.oneshot() 中一次性读取CPU、内存、线程/句柄数和I/O计数，
+    每个指标保存在独立的环形缓冲区中，容量按采样间隔和保留时长计算，
+    状态查询只读取最近一次样本，不再访问操作系统。
+    """
+
+    FIELDS = ('timestamp', 'cpu_percent', 'rss', 'private_bytes', 'threads', 'handles',
+              'read_bytes', 'write_bytes', 'read_count', 'write_count')
+
+    def __init__(self, interval=5.0, history_hours=72):
+        self.interval = interval
+        self.capacity = max(1, int(history_hours * 3600 / interval))
+        self._lock = threading.Lock()
+        self._buffers = {field: RingBuffer(self.capacity) for field in self.FIELDS}
+        self._process_identity = None  # 当前采样进程的 (pid, create_time)
+        self.cpu_count = (psutil.cpu_count() if psutil else None) or 1
+        self.total_memory = psutil.virtual_memory().total if psutil else 0
+
+    def sample(self, process):
+        """采集一次资源数据
+
+        Args:
+            process (psutil.Process): 要采样的进程，同一进程应传入同一个对象，CPU占用率依赖上一次的读数
+
+        Returns:
+            bool: 采样成功返回True，进程已不存在返回False
+        """
+        if psutil is None or process is None:
+            return False
+        try:
+            with process.oneshot():
+                identity = (process.pid, process.create_time())
+                cpu_percent = process.cpu_percent(None) / self.cpu_count  # 换算为占整机CPU的百分比
+                memory = process.memory_info()
+                threads = process.num_threads()
+                # Windows下为句柄数，其他平台为文件描述符数
+                handles = process.num_handles() if hasattr(process, 'num_handles') else process.num_fds()
+                try:
+                    io = process.io_counters()
+                except (psutil.AccessDenied, AttributeError):
+                    io = None
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return False
+        except psutil.AccessDenied:
+            return True  # 权限不足时跳过本次采样，继续尝试
+
+        # Windows提供私有字节数；其他平台用常驻内存减去共享内存近似
+        private_bytes = getattr(memory, 'private', memory.rss - getattr(memory, 'shared', 0))
+
+        with self._lock:
+            if identity != self._process_identity:
+                # 新的进程，第一次CPU读数没有参考值
+                self._process_identity = identity
+                cpu_percent = 0.0
+            values = {
+                'timestamp': time.time(),
+                'cpu_percent': cpu_percent,
+                'rss': memory.rss,
+                'private_bytes': private_bytes,
+                'threads': threads,
+                'handles': handles,
+                'read_bytes': io.read_bytes if io else 0,
+                'write_bytes': io.write_bytes if io else 0,
+                'read_count': io.read_count if io else 0,
+                'write_count': io.write_count if io else 0
+            }
+            for field, value in values.items():
+                self._buffers[field].append(value)
+        return True
+
+    def latest(self):
+        """获取最近一次样本
+
+        Returns:
+            dict or None: 字段名 -> 数值，没有样本时返回None
+        """
+        with self._lock:
+            if not len(self._buffers['timestamp']):
+                return None
+            sample = {field: buffer.latest() for field, buffer in self._buffers.items()}
+        sample['memory_percent'] = sample['rss'] / self.total_memory * 100 if self.total_memory else 0.0
+        return sample
+
+    def history(self, field, last=None):
+        """获取某个指标的历史数据（按时间顺序）
+
+        Args:
+            field (str): 指标名称，见 FIELDS
+            last (int): 只返回最近的若干个样本
+
+        Returns:
+            list: (时间戳, 数值) 列表
+        """
+        with self._lock:
+            timestamps = self._buffers['timestamp'].values(last)
+            values = self._buffers[field].values(last)
+        return list(zip(timestamps, values))
+
+    def clear(self):
+        """清空所有历史数据"""
+        with self._lock:
+            for buffer in self._buffers.values():
+                buffer.clear()
+            self._process_identity = None
@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+定时重启模块 - 在cron格式的时间窗口内重启服务器，优先选择无人在线的时刻，
+有玩家在线时先通过RCON广播倒计时；多个服务器实例的重启错开进行
+"""
+
+import time
+import datetime
+import threading
+from ..common.qt_compat import QObject, Signal
+from ..common.constants import (DEFAULT_SERVER_CONFIG, RESTART_SCHEDULE_TICK, RESTART_PLAYER_POLL_INTERVAL,
+                                RESTART_STAGGER_SECONDS, SCHEDULED_RESTART_TIMEOUT)
+from .task_scheduler import TaskScheduler
+
+# 各服务器实例的定时重启状态
+RESTART_IDLE = 'idle'                # 等待下一个重启窗口
+RESTART_WAITING = 'waiting'          # 窗口已开始，等待无人在线或倒计时时机
+RESTART_COUNTDOWN = 'countdown'      # 正在向在线玩家广播倒计时
+RESTART_RESTARTING = 'restarting'    # 已发起重启，等待服务器重新上线
+
+
+class CronSchedule:
+    """cron表达式（分 时 日 月 周）
+
+    每个字段支持 *、*/n、a-b、a-b/n 和逗号分隔的列表，周日可写作0或7；
+    日和周都不是 * 时满足其一即可（与标准cron一致）。
+    """
+
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron表达式需要5个字段（分 时 日 月 周）: {expression}")
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (self._parse_field(field, low, high)
+                                                  for field, (low, high) in zip(fields, self.FIELD_RANGES))
+        self.minutes = minutes
+        self.hours = hours
+        self.days = days
+        self.months = months
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        """解析一个字段，返回允许的取值集合"""
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step = part.split('/', 1)
+                step = int(step)
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(value) for value in part.split('-', 1))
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"cron字段超出范围: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = moment.isoweekday() % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def matches(self, moment):
+        """检查某个时刻（精确到分钟）是否匹配"""
+        return (moment.month in self.months and self._day_matches(moment) and
+                moment.hour in self.hours and moment.minute in self.minutes)
+
+    def next_after(self, moment):
+        """返回 moment 所在分钟之后第一个匹配的时刻（本地时间），不存在时返回None"""
+        moment = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=366 * 4)  # 覆盖2月29日
+        while moment < limit:
+            if moment.month not in self.months or not self._day_matches(moment):
+                moment = (moment + datetime.timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + datetime.timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment
+        return None
+
+
+class _RestartJob:
+    """一个服务器实例的定时重启状态"""
+
+    def __init__(self, name, manager):
+        self.name = name
+        self.manager = manager
+        self.state = RESTART_IDLE
+        self.expression = None
+        self.schedule = None
+        self.next_window = None    # 下一个窗口开始时刻（datetime）
+        self.deadline = None       # 当前窗口结束时间戳
+        self.next_poll = 0.0       # 下一次查询在线玩家的时间戳
+        self.players = None        # 最近一次查询到的在线玩家数，None表示未知
+        self.polling = False       # 是否有在线玩家查询正在事件循环中进行
+        self.restart_at = None     # 倒计时结束的时间戳
+        self.notices = []          # 尚未广播的倒计时节点（秒，从大到小）
+        self.restarted_at = None
+        self.went_down = False     # 重启后是否已观察到服务器离线
+
+
+class RestartScheduler(QObject):
+    """定时重启调度器
+
+    每个服务器实例使用自己 server_config 中的 restart_schedule 等配置；
+    到达窗口后定期查询在线玩家，无人在线时立即重启，否则在窗口结束前按
+    restart_countdown 广播倒计时后重启。同一时刻只有一个实例处于倒计时或重启中，
+    且相邻两次重启至少间隔 stagger 秒。重启复用 ServerManager.restart_server 的停止/重启流程。
+
+    调度检查运行在共享的调度线程中，只推进状态；RCON查询和广播提交到各实例的事件循环异步执行，
+    某个实例的RCON响应慢不会拖住其他实例的调度。
+    """
+
+    log_message = Signal(str)          # 日志消息信号
+    state_changed = Signal(str, str)   # 状态变化信号(实例名称, 状态)
+
+    def __init__(self, scheduler=None, stagger=RESTART_STAGGER_SECONDS):
+        """
+        Args:
+            scheduler (TaskScheduler): 共享的任务调度器（通常是多实例管理器的调度器），为None时使用独立的调度器
+            stagger (float): 相邻两次定时重启的最小间隔（秒）
+        """
+        super().__init__()
+        self.stagger = stagger
+        self._jobs = {}
+        self._lock = threading.RLock()  # 查询已完成时回调会在持有锁的调度线程中直接执行
+        self.last_restart_at = 0.0  # 上一次定时重启完成的时间戳
+        self.scheduler = scheduler or TaskScheduler(name="RestartScheduler")
+
+    def add_server(self, name, manager):
+        """添加需要定时重启的服务器实例"""
+        with self._lock:
+            self._jobs[name] = _RestartJob(name, manager)
+
+    def remove_server(self, name):
+        """移除服务器实例"""
+        with self._lock:
+            self._jobs.pop(name, None)
+
+    def start(self):
+        """开始调度"""
+        self.scheduler.call_every(RESTART_SCHEDULE_TICK, self._tick, name='restart_schedule', initial_delay=0)
+
+    def stop(self):
+        """停止调度"""
+        self.scheduler.cancel('restart_schedule')
+
+    def get_status(self):
+        """获取各实例的定时重启状态"""
+        with self._lock:
+            return [{
+                'name': job.name,
+                'state': job.state,
+                'schedule': job.expression,
+                'next_window': job.next_window.strftime('%Y-%m-%d %H:%M') if job.next_window else None,
+                'players': job.players,
+                'restart_at': job.restart_at
+            } for job in self._jobs.values()]
+
+    def _tick(self, now=None):
+        """调度检查（调度器线程中执行）"""
+        now = now or time.time()
+        with self._lock:
+            for job in list(self._jobs.values()):
+                try:
+                    self._update_job(job, now)
+                except Exception as e:
+                    self.log_message.emit(f"⚠️ [{job.name}] 定时重启检查出错: {str(e)}")
+        return True
+
+    def _config(self, job, key):
+        return job.manager.server_config.get(key, DEFAULT_SERVER_CONFIG[key])
+
+    def _update_job(self, job, now):
+        """推进一个实例的状态"""
+        self._refresh_schedule(job, now)
+        manager = job.manager
+
+        if job.state == RESTART_IDLE:
+            if job.next_window and datetime.datetime.fromtimestamp(now) >= job.next_window:
+                if not manager.is_running:
+                    self.log_message.emit(f"⏰ [{job.name}] 到达定时重启窗口，但服务器未运行，跳过本次重启")
+                    self._finish_window(job, now)
+                    return
+                job.deadline = job.next_window.timestamp() + self._config(job, 'restart_window_minutes') * 60
+                job.next_poll = now
+                job.players = None
+                self.log_message.emit(f"⏰ [{job.name}] 进入定时重启窗口，"
+                                      f"将在 {datetime.datetime.fromtimestamp(job.deadline).strftime('%H:%M')} 前完成重启")
+                self._set_state(job, RESTART_WAITING)
+
+        elif job.state == RESTART_WAITING:
+            if not manager.is_running:
+                self.log_message.emit(f"⏰ [{job.name}] 服务器已停止，取消本次定时重启")
+                self._finish_window(job, now)
+                return
+            if now >= job.next_poll:
+                self._poll_players(job, now)
+            if now >= job.deadline:
+                # 窗口已结束：轮不到本实例，或有玩家在线而来不及倒计时，都跳过本次重启，不在窗口外开始倒计时
+                if not self._slot_free(job, now):
+                    self.log_message.emit(f"⏰ [{job.name}] 重启窗口已结束，其他实例仍在重启，跳过本次定时重启")
+                    self._finish_window(job, now)
+                    return
+                if job.players != 0 and self._config(job, 'restart_countdown'):
+                    self.log_message.emit(f"⏰ [{job.name}] 重启窗口已结束，未能在窗口内完成倒计时，跳过本次定时重启")
+                    self._finish_window(job, now)
+                    return
+            if not self._slot_free(job, now):
+                return
+            if job.players == 0:
+                self._restart(job, now, "当前没有玩家在线")
+                return
+            countdown = sorted(self._config(job, 'restart_countdown'), reverse=True)
+            longest = countdown[0] if countdown else 0
+            if now >= job.deadline - longest:
+                if not countdown:
+                    self._restart(job, now, "重启窗口即将结束")
+                    return
+                job.restart_at = now + longest
+                job.notices = countdown
+                self.log_message.emit(f"📢 [{job.name}] 有玩家在线，开始重启倒计时（{self._format_remaining(longest)}）")
+                self._set_state(job, RESTART_COUNTDOWN)
+                self._update_job(job, now)
+
+        elif job.state == RESTART_COUNTDOWN:
+            remaining = job.restart_at - now
+            if remaining <= 0:
+                self._restart(job, now, "倒计时结束")
+                return
+            # 广播已到达的最近一个倒计时节点，跳过已错过的节点
+            due = [notice for notice in job.notices if notice >= remaining - RESTART_SCHEDULE_TICK / 2]
+            if due:
+                job.notices = job.notices[len(due):]
+                self._broadcast(job, remaining)
+            if job.players == 0:
+                self._restart(job, now, "玩家已全部下线")
+                return
+            if now >= job.next_poll:
+                self._poll_players(job, now)
+
+        elif job.state == RESTART_RESTARTING:
+            if not manager.is_running:
+                job.went_down = True
+            elif job.went_down and not getattr(manager, 'startup_in_progress', False):
+                self.log_message.emit(f"✅ [{job.name}] 定时重启完成，用时 {now - job.restarted_at:.0f} 秒")
+                self._finish_window(job, now)
+                return
+            if now - job.restarted_at > SCHEDULED_RESTART_TIMEOUT:
+                self.log_message.emit(f"⚠️ [{job.name}] 定时重启后 {SCHEDULED_RESTART_TIMEOUT} 秒内服务器未重新上线")
+                self._finish_window(job, now)
+
+    def _refresh_schedule(self, job, now):
+        """配置中的重启计划变化时重新解析"""
+        expression = (self._config(job, 'restart_schedule') or '').strip()
+        if expression == job.expression:
+            return
+        job.expression = expression
+        job.schedule = None
+        job.next_window = None
+        if expression:
+            try:
+                job.schedule = CronSchedule(expression)
+            except ValueError as e:
+                self.log_message.emit(f"❌ [{job.name}] 定时重启计划无效: {str(e)}")
+                return
+            job.next_window = job.schedule.next_after(datetime.datetime.fromtimestamp(now))
+            if job.next_window:
+                self.log_message.emit(f"⏰ [{job.name}] 下次定时重启窗口: {job.next_window.strftime('%Y-%m-%d %H:%M')}")
+
+    def _slot_free(self, job, now):
+        """是否轮到该实例重启：没有其他实例在倒计时或重启中，且距上次重启已超过错开间隔"""
+        for other in self._jobs.values():
+            if other is not job and other.state in (RESTART_COUNTDOWN, RESTART_RESTARTING):
+                return False
+        return now - self.last_restart_at >= self.stagger
+
+    def _poll_players(self, job, now):
+        """在实例的事件循环中查询在线玩家数量，结果写入 job.players（调度检查持有锁时调用）"""
+        job.next_poll = now + RESTART_PLAYER_POLL_INTERVAL
+        if job.polling:
+            return
+        job.polling = True
+
+        def on_done(future):
+            players = None if future.cancelled() or future.exception() is not None else future.result()
+            with self._lock:
+                job.players = players
+                job.polling = False
+        job.manager.async_core.submit(self._count_players(job)).add_done_callback(on_done)
+
+    async def _count_players(self, job):
+        """通过RCON查询在线玩家数量，无法查询时返回None（事件循环中执行）"""
+        manager = job.manager
+        if not manager.is_rcon_connected and not await manager._connect_rcon_async():
+            return None
+        players = await manager._query_online_players_async()
+        return len(players) if manager.is_rcon_connected else None
+
+    def _broadcast(self, job, remaining):
+        """向在线玩家广播重启倒计时（在实例的事件循环中发送，不等待结果）"""
+        text = self._config(job, 'restart_countdown_message').format(time=self._format_remaining(remaining))
+        self.log_message.emit(f"📢 [{job.name}] {text}")
+        if job.manager.is_rcon_connected:
+            job.manager.async_core.submit(job.manager._execute_rcon_command_async(
+                f"broadcast {text}", log_command=False, log_response=False))
+
+    @staticmethod
+    def _format_remaining(seconds):
+        seconds = int(round(seconds))
+        minutes, seconds = divmod(seconds, 60)
+        if minutes and seconds:
+            return f"{minutes} 分 {seconds} 秒"
+        return f"{minutes} 分钟" if minutes else f"{seconds} 秒"
+
+    def _restart(self, job, now, reason):
+        """调用ServerManager的重启流程"""
+        self.log_message.emit(f"🔄 [{job.name}] 定时重启服务器（{reason}）")
+        job.restarted_at = now
+        job.went_down = False
+        job.restart_at = None
+        job.notices = []
+        self._set_state(job, RESTART_RESTARTING)
+        job.manager.restart_server()
+
+    def _finish_window(self, job, now):
+        """结束本次窗口，计算下一个窗口"""
+        if job.state == RESTART_RESTARTING:
+            self.last_restart_at = now
+        job.deadline = None
+        job.restart_at = None
+        job.notices = []
+        job.next_window = job.schedule.next_after(datetime.datetime.fromtimestamp(now)) if job.schedule else None
+        self._set_state(job, RESTART_IDLE)
+
+    def _set_state(self, job, state):
+        if state != job.state:
+            job.state = state
+            self.state_changed.emit(job.name, state)
@@ -7,14 +7,52 @@
 
 import os
 import time
+import asyncio
 import datetime
-import subprocess
 import threading
+import collections
+import subprocess
 import socket
-import struct
-from PySide6.QtWidgets import QMessageBox
-from PySide6.QtCore import QObject, Signal
-from ..common.constants import DEFAULT_SERVER_CONFIG, DEFAULT_SERVER_EXE
+from ..common.qt_compat import QObject, Signal
+from ..common.constants import (DEFAULT_SERVER_CONFIG, DEFAULT_SERVER_EXE, SHIPPING_DISCOVERY_TIMEOUT,
+                                SHIPPING_DISCOVERY_MIN_DELAY, SHIPPING_DISCOVERY_MAX_DELAY,
+                                RESOURCE_SAMPLE_INTERVAL, RESOURCE_HISTORY_HOURS,
+                                DEFAULT_STARTUP_TIMELINE_DB, STARTUP_TIMEOUT,
+                                STARTUP_PROBE_INTERVAL, STOP_HISTORY_SIZE, RESTART_READY_POLL_INTERVAL,
+                                DEFAULT_BACKUP_DIR, LOG_BATCH_INTERVAL, LOG_BATCH_MAX_LINES, DEFAULT_LOG_ARCHIVE_DB,
+                                LOG_ARCHIVE_SEARCH_LIMIT, DEFAULT_LOG_OFFSETS_FILE, LOG_TAIL_RESUME_WINDOW,
+                                LOG_OFFSET_SAVE_INTERVAL, PLAYER_RECONCILE_INTERVAL, PLAYER_RECONCILE_INITIAL_DELAY,
+                                TICK_BUCKET_SECONDS, TICK_HISTORY_HOURS, TICK_LONG_FRAME_MS, TICK_SUMMARY_WINDOW,
+                                LOG_RATE_MAX_CATEGORIES, LOG_RATE_BASELINE_ALPHA, LOG_RATE_ALERT_SIGMA,
+                                LOG_RATE_ALERT_MIN_LINES, LOG_RATE_WARMUP_MINUTES, LOG_RATE_ALERT_COOLDOWN, LOG_RATE_TOP,
+                                DEFAULT_SERVER_LOG_ARCHIVE_DIR, LOG_RETENTION_INTERVAL, LOG_RETENTION_INITIAL_DELAY,
+                                LOG_RETENTION_MIN_AGE, PLAYER_LOGIN_PENDING_TTL, PLAYER_LOGIN_PENDING_MAX, STOP_STAGES)
+from ..common.utils import is_port_free, get_world_save_files, is_file_locked
+from .preflight import (launch_ports, check_port, check_disk_space, check_leftover_process, check_save_locks,
+                        run_preflight)
+from .process_registry import ProcessRegistry
+from .resource_sampler import ResourceSampler
+from .resource_governor import ResourceGovernor, PHASE_STARTUP, PHASE_RUNNING
+from .startup_timeline import StartupTimeline, parse_log_timestamp, probe_tcp, probe_a2s_info
+from .task_scheduler import TaskScheduler
+from .async_core import (AsyncLoopThread, QtEventBridge, wait_for_process_exit, wait_for_processes_exit,
+                         signal_processes)
+from .async_rcon import AsyncRconClient
+from .crash_watchdog import CrashWatchdog, read_log_tail
+from .log_tailer import (LogTailer, CheckpointStore, RESET_ROTATED, START_CHECKPOINT, START_TAIL,
+                         file_identity)
+from .log_watcher import create_log_watcher
+from .log_archive import LogArchive, parse_since
+from .player_roster import PlayerRoster
+from .tick_telemetry import TickTelemetry
+from .log_rates import LogRateMonitor, KIND_CATEGORY
+from .log_retention import LogRetention
+from .log_events import (LogEventEngine, STARTUP_COMPLETE_MARKER, EVENT_MOD_LOADED, EVENT_STARTUP_COMPLETE,
+                         EVENT_PLAYER_LOGIN, EVENT_PLAYER_JOIN, EVENT_PLAYER_LEAVE, EVENT_SAVE_COMPLETE, EVENT_FATAL_ERROR,
+                         EVENT_SERVER_HITCH)
+
+# 停止阶梯各阶段（按执行顺序）
+STAGE_SAVE_BROADCAST, STAGE_RCON_CLOSE, STAGE_WAIT_EXIT, STAGE_TERMINATE, STAGE_KILL = STOP_STAGES
 
 
 class ServerManager(QObject):
@@ -26,14 +64,27 @@ class ServerManager(QObject):
     rcon_connected = Signal()     # RCON连接成功信号
     rcon_disconnected = Signal()  # RCON断开连接信号
     rcon_error = Signal(str)      # RCON错误信号
-    players_updated = Signal(str) # 玩家数量更新信号
+    players_updated = Signal(list) # 在线玩家名单变化信号(玩家列表)
     mod_loaded = Signal(str, str) # mod加载信号(mod_name, mod_id)
+    log_event = Signal(str, dict) # WS.log事件信号(事件类型, 字段)
+    log_batch = Signal(list)      # WS.log原始日志批量信号(行列表)
 
     gui_streaming_changed = Signal(bool)   # GUI流式输出状态变化信号
+    watchdog_state_changed = Signal(str)   # 崩溃看门狗状态变化信号
     
-    def __init__(self, config_manager=None):
+    def __init__(self, config_manager=None, instance_name="default", scheduler=None, async_core=None,
+                 process_scanner=None):
+        """
+        Args:
+            config_manager: 配置管理器
+            instance_name (str): 实例名称，多实例时用于区分任务和日志
+            scheduler (TaskScheduler): 共享的任务调度器，为None时使用独立的调度器
+            async_core (AsyncLoopThread): 共享的事件循环，为None时使用独立的事件循环
+            process_scanner (ProcessScanner): 共享的系统进程快照
+        """
         super().__init__()
         self.config_manager = config_manager
+        self.instance_name = instance_name
         self.server_path = ""
         self.server_process = None
         self.real_server_pid = None
@@ -41,11 +92,100 @@ class ServerManager(QObject):
         self.is_running = False
         self.server_config = DEFAULT_SERVER_CONFIG.copy()
         
+        # 服务器进程注册表，缓存WSServer-Win64-Shipping.exe身份，避免重复全量扫描
+        self.process_registry = ProcessRegistry(scanner=process_scanner)
+        
+        # 资源策略：CPU亲和性、启动/运行阶段的优先级和内存上限
+        self.resource_governor = ResourceGovernor(instance_name, log_callback=self.log_message.emit)
+        self.resource_governor.configure(self.server_config)
+        
+        # 资源采样器，定时采集服务器进程的CPU/内存/句柄/IO数据
+        self.resource_sampler = ResourceSampler(interval=RESOURCE_SAMPLE_INTERVAL,
+                                                history_hours=RESOURCE_HISTORY_HOURS)
+        
+        # 服务器帧率遥测，从WS.log推算帧率、长帧和卡顿次数
+        self.tick_telemetry = TickTelemetry(bucket_seconds=TICK_BUCKET_SECONDS, history_hours=TICK_HISTORY_HOURS,
+                                            long_frame_ms=TICK_LONG_FRAME_MS)
+        
+        # 日志速率统计，按分类/级别计算滑动窗口行数，明显高于基线时告警
+        self.log_rates = LogRateMonitor(max_keys=LOG_RATE_MAX_CATEGORIES, alpha=LOG_RATE_BASELINE_ALPHA,
+                                        sigma=LOG_RATE_ALERT_SIGMA, min_lines=LOG_RATE_ALERT_MIN_LINES,
+                                        warmup_minutes=LOG_RATE_WARMUP_MINUTES, cooldown=LOG_RATE_ALERT_COOLDOWN)
+        
+        # 启动时间线，记录每次启动各阶段的耗时
+        self.startup_timeline = StartupTimeline(DEFAULT_STARTUP_TIMELINE_DB, instance=instance_name)
+        
+        # WS.log全文归档，每次日志监控对应一个运行会话
+        self.log_archive = LogArchive(DEFAULT_LOG_ARCHIVE_DB)
+        self._log_session_id = None
+        self._log_archive_failed = False
+        self._log_archive_flushing = False
+        
+        # 最近的停止记录（各阶段结果和耗时）
+        self.stop_history = collections.deque(maxlen=STOP_HISTORY_SIZE)
+        # 最近的重启记录（停机时长），以及正在进行的重启
+        self.restart_history = collections.deque(maxlen=STOP_HISTORY_SIZE)
+        self._pending_restart = None
+        
+        # 统一的后台任务调度器，负责所有周期任务和延迟任务（多实例时共享调度线程，任务名按实例区分）
+        self.scheduler = scheduler.scoped(instance_name) if scheduler else TaskScheduler(name="ServerManagerScheduler")
+        
+        # asyncio事件循环：RCON通信、进程等待、WS.log读取以及停止/重启流程都在这里执行
+        self.async_core = async_core.scoped(instance_name) if async_core else AsyncLoopThread(name="ServerManagerLoop")
+        # 共享调度器时资源采样由多实例管理器的周期汇总统一执行
+        self.shared_polling = scheduler is not None
+        # 事件循环到Qt主线程的桥接（需在主线程中创建）
+        self.event_bridge = QtEventBridge()
+        
+        # 崩溃看门狗：服务器异常退出后按退避时间自动重启，识别崩溃循环
+        self.watchdog = CrashWatchdog(
+            restart_callback=lambda: self.async_core.submit(self._watchdog_recover(), name='crash_recovery'),
+            log_callback=self.log_message.emit,
+            state_callback=self.watchdog_state_changed.emit)
+        
         # RCON相关
         self.rcon_client = None
         self.is_rcon_connected = False
         self.current_players = 0
         self.max_players = DEFAULT_SERVER_CONFIG['max_players']
+        self.online_players = []        # 当前在线玩家列表
+        self.players_updated_at = None  # 在线玩家名单最近一次变化或校正的时间戳
+        # 在线玩家名单：由WS.log的进入/断开事件实时维护，RCON连接时定期用lp校正
+        self.player_roster = PlayerRoster(pending_ttl=PLAYER_LOGIN_PENDING_TTL, max_pending=PLAYER_LOGIN_PENDING_MAX)
+        
+        # 启动前检查结果；多实例时由多实例管理器提供空闲端口分配
+        self.last_preflight = None
+        self.last_start_error = None
+        self.port_allocator = None
+        self._stale_log_identity = None  # 启动前已存在的WS.log的文件身份
+        
+        # WS.log读取位置检查点，重新接管服务器时从上次的位置继续读取
+        self.log_offsets = CheckpointStore(DEFAULT_LOG_OFFSETS_FILE)
+        self._log_checkpoint_saved = None
+        self._log_checkpoint_saved_at = 0.0
+        
+        # UE轮换出的WS-backup-*.log定期压缩到按日期分的归档中，不再随世界存档一起备份
+        self.log_retention = LogRetention(os.path.join(DEFAULT_SERVER_LOG_ARCHIVE_DIR, instance_name),
+                                          min_age=LOG_RETENTION_MIN_AGE)
+        self._log_retention_scheduled = False  # 由管理服务器的进程调用 start_log_retention 后才定期执行
+        
+        # WS.log原始日志批次（只在事件循环线程中访问）
+        self._log_batch = []
+        self._log_batch_timer = None
+        
+        # WS.log事件规则表，每行一次匹配出所有事件后分发给对应的处理函数
+        self.log_events = LogEventEngine()
+        self._log_event_handlers = {
+            EVENT_MOD_LOADED: self._on_mod_loaded_event,
+            EVENT_STARTUP_COMPLETE: self._on_startup_complete_event,
+            EVENT_PLAYER_LOGIN: self._on_player_login_event,
+            EVENT_SERVER_HITCH: self._on_server_hitch_event,
+            EVENT_PLAYER_JOIN: self._on_player_join_event,
+            EVENT_PLAYER_LEAVE: self._on_player_leave_event,
+            EVENT_SAVE_COMPLETE: self._on_save_complete_event,
+            EVENT_FATAL_ERROR: self._on_fatal_error_event
+        }
+        self.rcon_latency = None        # 最近一次RCON命令的往返耗时（秒）
         
         # GUI流式输出控制开关
         self.enable_gui_streaming = False  # 默认关闭GUI流式输出
@@ -62,10 +202,13 @@ class ServerManager(QObject):
     def set_server_path(self, path):
         """设置服务器路径"""
         self.server_path = path
+        # 按名称查找已有进程时只接受本服务器目录下的进程
+        self.process_registry.server_path = path or None
     
     def set_server_config(self, config):
         """设置服务器配置"""
         self.server_config = config
+        self.resource_governor.configure(config)
         # 更新最大玩家数
         if 'max_players' in config:
             self.max_players = config['max_players']
@@ -105,8 +248,24 @@ class ServerManager(QObject):
             self.log_message.emit("⚠️ 检测到服务器已在运行，无需重复启动")
             return True
         
+        self.last_start_error = None
+        # 使用正确的服务器可执行文件名
+        server_exe = os.path.join(self.server_path, DEFAULT_SERVER_EXE)
+        
+        # 检查服务器可执行文件是否存在
+        if not os.path.exists(server_exe):
+            self.log_message.emit(f"错误: 服务器可执行文件不存在: {server_exe}")
+            self.last_start_error = "服务器可执行文件不存在"
+            return False
+        
+        # 启动前并行检查端口、磁盘空间、残留进程和存档锁定
+        if not self._preflight(self._build_launch_command(server_exe)):
+            return False
+        cmd = self._build_launch_command(server_exe)  # 端口可能已被重新分配
+        
         self.log_message.emit("🚀 开始启动服务器进程...")
         self.log_message.emit(f"📍 服务器状态: is_running={self.is_running}")
+        self._arm_watchdog()
         
         try:
             # 重置启动状态标志
@@ -116,61 +275,24 @@ class ServerManager(QObject):
             self.log_message.emit("🔒 服务器状态已锁定为启动中")
             self.status_changed.emit(True)
             
-            # 使用正确的服务器可执行文件名
-            server_exe = os.path.join(self.server_path, DEFAULT_SERVER_EXE)
-            
-            # 检查服务器可执行文件是否存在
-            if not os.path.exists(server_exe):
-                self.log_message.emit(f"错误: 服务器可执行文件不存在: {server_exe}")
-                return False
-            
-            # 构建启动命令 - 按照用户正常工作的命令顺序
-            cmd = [
-                server_exe,
-                "Level01_Main",
-                "-server",
-                "-log",
-                "-UTF8Output",
-                f"-MULTIHOME={self.server_config.get('multihome', DEFAULT_SERVER_CONFIG['multihome'])}",
-                "-EchoPort=18888",
-                "-forcepassthrough",
-                f"-PORT={self.server_config.get('port', DEFAULT_SERVER_CONFIG['port'])}",
-                f"-MaxPlayers={self.server_config.get('max_players', DEFAULT_SERVER_CONFIG['max_players'])}",
-                f"-SteamServerName=\"{self.server_config.get('server_name', DEFAULT_SERVER_CONFIG['server_name'])}\"",
-                "-QueryPort=27015"
-            ]
-            
-            # 添加游戏模式参数
-            game_mode = self.server_config.get('game_mode', DEFAULT_SERVER_CONFIG['game_mode'])
-            cmd.append(f"-{game_mode}")
-            
-            # 添加额外启动参数（包含gamedistindex和mod等重要参数）
-            extra_args = self.server_config.get('extra_args', '')
-            if extra_args:
-                # 分割额外参数并添加到命令行
-                for arg in extra_args.split():
-                    cmd.append(arg)
-            
-            # 添加RCON参数（放在最后，与用户命令顺序一致）
-            if self.server_config.get("rcon_enabled", DEFAULT_SERVER_CONFIG['rcon_enabled']):
-                cmd.append(f"-rconpsw={self.server_config.get('rcon_password', DEFAULT_SERVER_CONFIG['rcon_password'])}")
-                cmd.append(f"-rconport={self.server_config.get('rcon_port', DEFAULT_SERVER_CONFIG['rcon_port'])}")
-                cmd.append(f"-rconaddr={self.server_config.get('rcon_addr', DEFAULT_SERVER_CONFIG['rcon_addr'])}")
-            
             # 打印完整启动命令到服务器日志区
             cmd_str = ' '.join(f'"{arg}"' if ' ' in arg else arg for arg in cmd)
             self.log_message.emit(f"启动命令: {cmd_str}")
             
+            # 记录启动前已存在的旧日志，日志监控会跳过它的内容
+            self._stale_log_identity = file_identity(os.path.join(self.server_path, 'WS', 'Saved', 'Logs', 'WS.log'))
+            
             # 启动服务器进程
             self.server_process = subprocess.Popen(
                 cmd,
                 cwd=self.server_path,
                 stdout=None,
                 stderr=None,
-                creationflags=subprocess.CREATE_NO_WINDOW  # 不显示cmd窗口
+                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)  # 不显示cmd窗口（仅Windows）
             )
             
             self.log_message.emit(f"📋 服务器进程已创建，PID: {self.server_process.pid}")
+            self._begin_startup_timeline()
             self.log_message.emit("⏳ 服务器状态已锁定为启动中，等待进程检测...")
             
             # 注意：这里不设置 is_running = True，等待关键字符串检测
@@ -178,12 +300,13 @@ class ServerManager(QObject):
             # 记录启动时间
             self.start_time = datetime.datetime.now()
             
-            # 启动后等待一段时间，然后尝试查找真正的服务器进程
-            threading.Timer(5.0, self._find_real_server_process).start()
+            # 沿启动进程的进程树查找真正的服务器进程，子进程出现后立即挂接
+            self.process_registry.invalidate()
+            self._find_real_server_process()
             self.log_message.emit("✅ WSServer.exe进程启动成功，等待WSServer-Win64-Shipping.exe进程...")
             
-            # 启动进程监控线程
-            threading.Thread(target=self._monitor_process_status, daemon=True).start()
+            # 启动进程监控任务
+            self._monitor_process_status()
             
             return True
             
@@ -192,62 +315,247 @@ class ServerManager(QObject):
             self.startup_in_progress = False
             return False
     
+    def _build_launch_command(self, server_exe):
+        """构建启动命令 - 按照用户正常工作的命令顺序"""
+        cmd = [
+            server_exe,
+            "Level01_Main",
+            "-server",
+            "-log",
+            "-UTF8Output",
+            f"-MULTIHOME={self.server_config.get('multihome', DEFAULT_SERVER_CONFIG['multihome'])}",
+            f"-EchoPort={self.server_config.get('echo_port', DEFAULT_SERVER_CONFIG['echo_port'])}",
+            "-forcepassthrough",
+            f"-PORT={self.server_config.get('port', DEFAULT_SERVER_CONFIG['port'])}",
+            f"-MaxPlayers={self.server_config.get('max_players', DEFAULT_SERVER_CONFIG['max_players'])}",
+            f"-SteamServerName=\"{self.server_config.get('server_name', DEFAULT_SERVER_CONFIG['server_name'])}\"",
+            f"-QueryPort={self.server_config.get('query_port', DEFAULT_SERVER_CONFIG['query_port'])}"
+        ]
+        
+        # 添加游戏模式参数
+        game_mode = self.server_config.get('game_mode', DEFAULT_SERVER_CONFIG['game_mode'])
+        cmd.append(f"-{game_mode}")
+        
+        # 添加额外启动参数（包含gamedistindex和mod等重要参数）
+        extra_args = self.server_config.get('extra_args', '')
+        if extra_args:
+            # 分割额外参数并添加到命令行
+            for arg in extra_args.split():
+                cmd.append(arg)
+        
+        # 添加RCON参数（放在最后，与用户命令顺序一致）
+        if self.server_config.get("rcon_enabled", DEFAULT_SERVER_CONFIG['rcon_enabled']):
+            cmd.append(f"-rconpsw={self.server_config.get('rcon_password', DEFAULT_SERVER_CONFIG['rcon_password'])}")
+            cmd.append(f"-rconport={self.server_config.get('rcon_port', DEFAULT_SERVER_CONFIG['rcon_port'])}")
+            cmd.append(f"-rconaddr={self.server_config.get('rcon_addr', DEFAULT_SERVER_CONFIG['rcon_addr'])}")
+        return cmd
+    
+    def _preflight(self, cmd):
+        """启动前检查，失败时记录具体原因；多实例中端口冲突时给出（或自动应用）空闲端口
+        
+        Returns:
+            bool: 全部通过返回True
+        """
+        result = self._run_preflight_checks(cmd)
+        if self.port_allocator and any(name.startswith('port:') for name, _ in result['failures']):
+            allocated = self.port_allocator(self.server_config)
+            suggested = {key: port for key, port in allocated.items()
+                         if int(self.server_config.get(key, DEFAULT_SERVER_CONFIG[key])) != port}
+            if suggested:
+                suggestion = ', '.join(f"{key}={port}" for key, port in suggested.items())
+                if self.server_config.get('preflight_auto_reassign_ports',
+                                          DEFAULT_SERVER_CONFIG['preflight_auto_reassign_ports']):
+                    self.server_config.update(suggested)
+                    self.log_message.emit(f"🔀 端口被占用，已自动改用: {suggestion}")
+                    result = self._run_preflight_checks(self._build_launch_command(cmd[0]))
+                else:
+                    result['suggested_ports'] = suggested
+                    self.log_message.emit(f"💡 可以改用以下空闲端口: {suggestion}")
+        self.last_preflight = result
+        
+        if result['ok']:
+            self.log_message.emit(f"✅ 启动前检查通过（{result['checks']} 项，用时 {result['duration'] * 1000:.0f} 毫秒）")
+            return True
+        for _, reason in result['failures']:
+            self.log_message.emit(f"❌ 启动前检查失败: {reason}")
+        self.log_message.emit(f"⏱️ 启动前检查用时 {result['duration'] * 1000:.0f} 毫秒")
+        self.last_start_error = '; '.join(reason for _, reason in result['failures'])
+        return False
+    
+    def _run_preflight_checks(self, cmd):
+        """并行执行所有启动前检查"""
+        min_free_mb = int(self.server_config.get('preflight_min_free_mb', DEFAULT_SERVER_CONFIG['preflight_min_free_mb']))
+        backup_dir = self.server_config.get('backup_dir') or DEFAULT_BACKUP_DIR
+        checks = [(f"port:{name}", check_port, (name, port, protocol, host))
+                  for name, port, protocol, host in launch_ports(cmd)]
+        checks += [
+            ('disk:saved', check_disk_space, (os.path.join(self.server_path, "WS", "Saved"), min_free_mb, "存档目录")),
+            ('disk:backup', check_disk_space, (backup_dir, min_free_mb, "备份目录")),
+            ('leftover', check_leftover_process, (self.process_registry, self.server_path)),
+            ('save_lock', check_save_locks, (self.server_path,))
+        ]
+        return run_preflight(checks)
+    
+    def apply_suggested_ports(self):
+        """应用最近一次启动前检查建议的空闲端口
+        
+        Returns:
+            dict: 已应用的端口配置项，没有建议时为空
+        """
+        suggested = (self.last_preflight or {}).get('suggested_ports') or {}
+        self.server_config.update(suggested)
+        return dict(suggested)
+    
+    def get_preflight_result(self):
+        """最近一次启动前检查的结果"""
+        return self.last_preflight
+    
     def stop_server(self):
-        """停止服务器 - 直接使用RCON关闭，不分状态"""
-        self.log_message.emit("正在通过RCON关闭服务器...")
-        # 在后台线程中执行关闭操作，避免GUI无响应
-        threading.Thread(target=self._stop_server_async, daemon=True).start()
+        """停止服务器 - 按停止阶梯逐级升级：保存/广播 -> RCON关闭 -> 等待退出 -> terminate -> kill"""
+        self.log_message.emit("正在停止服务器...")
+        self._disarm_watchdog()
+        # 在事件循环中执行关闭流程，避免GUI无响应
+        self.async_core.submit(self._stop_server_async(), name='stop_server')
         return True
+    
+    async def _stop_server_async(self):
+        """按停止阶梯异步停止服务器
         
-    def _stop_server_async(self):
-        """异步停止服务器，避免GUI阻塞 - 统一使用RCON关闭"""
-        try:
-            import psutil
-        except ImportError:
-            self.log_message.emit("警告: 未安装psutil模块，部分进程管理功能可能受限")
-            return False
+        每个阶段有独立的超时（见配置项 stop_*），等待由进程退出事件唤醒而不是轮询；
+        RCON不可用时跳过前两个阶段，直接terminate。各阶段耗时记录在 stop_history 中。
         
+        Returns:
+            bool: 服务器进程已全部退出返回True
+        """
         # 停止日志监控
         if hasattr(self, 'log_monitor_running'):
             self.log_monitor_running = False
+            self.async_core.cancel('log_tail')
             self.log_message.emit("📋 停止日志文件监控")
         
-        # 检查RCON连接状态，如果未连接则尝试连接
-        if not self.is_rcon_connected or not self.rcon_client:
-            self.log_message.emit("RCON未连接，尝试连接RCON...")
-            if not self.connect_rcon():
-                self.log_message.emit("❌ RCON连接失败，无法通过RCON关闭服务器")
-                self._reset_server_state()
-                return False
-            self.log_message.emit("✅ RCON连接成功")
+        report = {'started_at': time.time(), 'stages': [], 'stopped': False, 'total': 0.0}
+        started = time.monotonic()
+        stopped = False
+        try:
+            # 记录需要停止的进程身份，用于等待其退出
+            targets = self._collect_stop_targets()
+            stopped = not targets
+            if stopped:
+                self.log_message.emit("ℹ️ 未找到正在运行的服务器进程")
+            
+            # 检查RCON连接状态，如果未连接则尝试连接
+            rcon_ready = bool(self.is_rcon_connected and self.rcon_client)
+            if not stopped and not rcon_ready:
+                self.log_message.emit("RCON未连接，尝试连接RCON...")
+                rcon_ready = await self._connect_rcon_async()
+                if rcon_ready:
+                    self.log_message.emit("✅ RCON连接成功")
+                else:
+                    self.log_message.emit("❌ RCON连接失败，将直接终止服务器进程")
+            
+            if not stopped and rcon_ready:
+                await self._run_stop_stage(report, STAGE_SAVE_BROADCAST, self._stop_save_and_broadcast(),
+                                           self._stop_option('stop_save_timeout'))
+                close_delay = int(self._stop_option('stop_close_delay'))
+                result = await self._run_stop_stage(report, STAGE_RCON_CLOSE, self._stop_rcon_close(close_delay),
+                                                    self._stop_option('stop_save_timeout'))
+                if result == 'ok':
+                    self.log_message.emit("⏳ 等待服务器进程结束...")
+                    result = await self._run_stop_stage(report, STAGE_WAIT_EXIT, self._wait_stop_targets(targets),
+                                                        close_delay + self._stop_option('stop_exit_timeout'))
+                    stopped = result == 'exited'
+            
+            if not stopped:
+                self.log_message.emit("⚠️ 服务器未正常关闭，发送terminate...")
+                result = await self._run_stop_stage(report, STAGE_TERMINATE, self._signal_stop_targets(targets, kill=False),
+                                                    self._stop_option('stop_terminate_timeout'))
+                stopped = result == 'exited'
+            
+            if not stopped:
+                self.log_message.emit("⚠️ 服务器未响应terminate，强制kill...")
+                result = await self._run_stop_stage(report, STAGE_KILL, self._signal_stop_targets(targets, kill=True),
+                                                    self._stop_option('stop_kill_timeout'))
+                stopped = result == 'exited'
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.log_message.emit(f"❌ 停止服务器时出错: {str(e)}")
         
-        # 通过RCON发送关闭命令
+        report['stopped'] = stopped
+        report['total'] = time.monotonic() - started
+        self.stop_history.append(report)
+        if stopped:
+            self.log_message.emit(f"✅ 服务器进程已在 {report['total']:.1f} 秒后全部结束")
+        else:
+            self.log_message.emit("⚠️ 服务器进程未能结束，可能需要手动检查")
+        
+        # 重置服务器状态
+        self._reset_server_state()
+        self.log_message.emit("🔴 服务器已停止")
+        return stopped
+    
+    def _stop_option(self, key):
+        """读取停止流程配置项"""
+        return self.server_config.get(key, DEFAULT_SERVER_CONFIG[key])
+    
+    def _collect_stop_targets(self):
+        """收集需要停止的进程身份：WSServer-Win64-Shipping.exe 和本启动器创建的启动进程"""
+        targets = []
+        if self._locate_shipping_process(force_rescan=True):
+            targets.append(self.process_registry.identity)
+        if self.server_process and self.server_process.poll() is None:
+            targets.append((self.server_process.pid, None))
+        return targets
+    
+    async def _run_stop_stage(self, report, stage, coro, timeout):
+        """执行一个停止阶段并记录结果和耗时"""
+        started = time.monotonic()
         try:
-            self.log_message.emit("📤 正在通过RCON发送关闭命令: close 10")
-            result = self.execute_rcon_command("close 10")
-            self.log_message.emit(f"📥 RCON关闭命令结果: {result}")
-            
-            # 等待服务器进程结束
-            self.log_message.emit("⏳ 等待服务器进程结束...")
-            for i in range(30):  # 最多等待30秒
-                if not self._check_server_status_with_psutil():
-                    # 进程已结束
-                    self.log_message.emit(f"✅ 服务器进程已在 {i+1} 秒后正常结束")
-                    break
-                time.sleep(1)
-            else:
-                # 超时，进程仍在运行
-                self.log_message.emit("⚠️ 服务器未在预期时间内关闭，可能需要手动检查")
-            
-            # 重置服务器状态
-            self._reset_server_state()
-            self.log_message.emit("🔴 服务器已停止")
-            return True
-            
+            result = await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            result = 'timeout'
         except Exception as e:
-            self.log_message.emit(f"❌ 通过RCON关闭服务器时出错: {str(e)}")
-            self._reset_server_state()
-            return False
+            result = f"error: {str(e)}"
+        duration = time.monotonic() - started
+        report['stages'].append({'stage': stage, 'result': result, 'duration': duration})
+        self.log_message.emit(f"⏱️ 停止阶段 {stage}: {result}，用时 {duration:.1f} 秒")
+        return result
+    
+    async def _stop_save_and_broadcast(self):
+        """停止阶段：广播停服消息并保存世界"""
+        message = self._stop_option('stop_broadcast_message')
+        save_command = self._stop_option('stop_save_command')
+        if not message and not save_command:
+            return 'skipped'
+        if message:
+            await self._execute_rcon_command_async(f"broadcast {message}")
+        if save_command:
+            await self._execute_rcon_command_async(save_command)
+        return 'ok'
+    
+    async def _stop_rcon_close(self, close_delay):
+        """停止阶段：通过RCON发送关闭命令"""
+        self.log_message.emit(f"📤 正在通过RCON发送关闭命令: close {close_delay}")
+        result = await self._execute_rcon_command_async(f"close {close_delay}")
+        self.log_message.emit(f"📥 RCON关闭命令结果: {result}")
+        return 'failed' if result.startswith("错误") else 'ok'
+    
+    async def _wait_stop_targets(self, targets):
+        """停止阶段：等待所有服务器进程退出"""
+        await wait_for_processes_exit(targets)
+        return 'exited'
+    
+    async def _signal_stop_targets(self, targets, kill):
+        """停止阶段：向服务器进程发送terminate/kill并等待退出"""
+        signalled = signal_processes(targets, kill=kill)
+        if signalled:
+            self.log_message.emit(f"{'kill' if kill else 'terminate'} 已发送: {signalled}")
+        await wait_for_processes_exit(targets)
+        return 'exited'
+    
+    def get_stop_history(self):
+        """获取最近的停止记录（每个阶段的结果和耗时），用于调整维护窗口"""
+        return list(self.stop_history)
     
     def _reset_server_state(self):
         """重置服务器状态"""
@@ -256,9 +564,16 @@ class ServerManager(QObject):
         # 清除启动标志
         if hasattr(self, 'startup_in_progress'):
             self.startup_in_progress = False
+        # 结束启动时间线记录
+        self.async_core.cancel('startup_probe')
+        self.startup_timeline.close_launch()
         # 断开RCON连接
         if self.is_rcon_connected:
             self.disconnect_rcon()
+        if self.player_roster.clear():
+            self._publish_players()
+        self.resource_governor.reset()
+        self.tick_telemetry.reset()
         # 发送状态更新信号
         self.status_changed.emit(False)
         self.server_stopped.emit()
@@ -272,6 +587,7 @@ class ServerManager(QObject):
         self.server_process = None
         if hasattr(self, 'real_server_pid'):
             self.real_server_pid = None
+        self.process_registry.invalidate()
         
         # 断开RCON连接
         if self.is_rcon_connected:
@@ -285,6 +601,7 @@ class ServerManager(QObject):
     def restart_server(self):
         """重启服务器"""
         self.log_message.emit("正在重启服务器...")
+        self._disarm_watchdog()
         
         # 保存当前进程ID，用于后续检查
         old_process_pid = None
@@ -300,70 +617,207 @@ class ServerManager(QObject):
         if hasattr(self, 'real_server_pid') and self.real_server_pid:
             real_server_pid = self.real_server_pid
         
-        # 先尝试通过RCON优雅停止
-        stop_result = self.stop_server()
-        if stop_result:
-            self.log_message.emit("服务器已通过RCON停止，等待进程结束...")
-        else:
-            self.log_message.emit("RCON停止失败，将强制终止进程...")
-            # 强制终止进程
-            self._force_stop_server_processes()
+        # 整个重启流程在事件循环中执行
+        self.async_core.submit(self._restart_server_async(old_process_pid, real_server_pid),
+                               name='restart_server')
+        return True
+    
+    async def _restart_server_async(self, old_process_pid, real_server_pid):
+        """重启流程：停止阶梯 -> 等待旧进程退出 -> 等待端口释放和存档解锁 -> 在主线程中重新启动"""
+        restart = {'requested_at': time.time(), 'stop': 0.0, 'ready_wait': 0.0, 'startup': None, 'downtime': None}
+        started = time.monotonic()
+        try:
+            # 按停止阶梯停止服务器
+            self.log_message.emit("正在停止服务器...")
+            if await self._stop_server_async():
+                self.log_message.emit("服务器已停止，确认进程结束...")
+            else:
+                self.log_message.emit("停止流程未能结束服务器进程，将强制终止进程...")
+                # 强制终止进程
+                self._force_stop_server_processes()
+            
+            # 等待所有相关进程结束
+            processes_to_wait = []
+            if old_process_pid:
+                processes_to_wait.append(old_process_pid)
+            if real_server_pid and real_server_pid != old_process_pid:
+                processes_to_wait.append(real_server_pid)
+            
+            if processes_to_wait:
+                self.log_message.emit(f"等待进程结束: {processes_to_wait}")
+                # 并发等待所有进程的退出事件，最多等待30秒
+                results = await asyncio.gather(*(wait_for_process_exit(pid, timeout=30)
+                                                 for pid in processes_to_wait))
+                if all(results):
+                    self.log_message.emit("✅ 所有服务器进程已完全结束")
+                else:
+                    self.log_message.emit("⚠️ 部分进程可能仍在运行，继续启动")
             
-        # 只有在成功停止服务器后才继续
+            restart['stop'] = time.monotonic() - started
             
-        # 创建一个线程来等待进程结束并启动服务器
-        def wait_and_start():
-            try:
-                import psutil
-                # 等待所有相关进程结束
-                processes_to_wait = []
-                if old_process_pid:
-                    processes_to_wait.append(old_process_pid)
-                if real_server_pid and real_server_pid != old_process_pid:
-                    processes_to_wait.append(real_server_pid)
-                
-                if processes_to_wait:
-                    self.log_message.emit(f"等待进程结束: {processes_to_wait}")
-                    # 检查进程是否真正结束
-                    for _ in range(30):  # 最多等待30秒
-                        all_stopped = True
-                        for pid in processes_to_wait:
-                            try:
-                                process = psutil.Process(pid)
-                                if process.is_running():
-                                    all_stopped = False
-                                    break
-                            except psutil.NoSuchProcess:
-                                # 进程已结束，这是我们想要的
-                                continue
-                        
-                        if all_stopped:
-                            self.log_message.emit("✅ 所有服务器进程已完全结束")
-                            break
-                        time.sleep(1)
-                    else:
-                        self.log_message.emit("⚠️ 部分进程可能仍在运行，继续启动")
-                
-                # 等待60秒后启动服务器
-                self.log_message.emit("等待60秒后重新启动服务器...")
-                time.sleep(60)
-                
-                # 在主线程中启动服务器
-                from PySide6.QtCore import QMetaObject, Qt
-                QMetaObject.invokeMethod(self, "_restart_server_impl", 
-                                       Qt.QueuedConnection)
-            except Exception as e:
-                self.log_message.emit(f"等待并启动服务器时出错: {str(e)}")
-        
-        # 启动等待线程
-        threading.Thread(target=wait_and_start, daemon=True).start()
-        return True
+            # 旧进程退出后，等待端口释放、存档解锁即可立即启动
+            self.log_message.emit("⏳ 等待端口释放和存档解锁...")
+            ready_started = time.monotonic()
+            blockers = await self._wait_restart_ready(self._stop_option('restart_ready_timeout'))
+            restart['ready_wait'] = time.monotonic() - ready_started
+            if blockers:
+                self.log_message.emit(f"⚠️ 等待超时，仍有未就绪项: {'; '.join(blockers)}，继续启动")
+            else:
+                self.log_message.emit(f"✅ 端口和存档已就绪，用时 {restart['ready_wait']:.1f} 秒，立即重新启动服务器")
+            
+            # 在主线程中启动服务器，上线后报告停机时长
+            self._pending_restart = (restart, started)
+            self.event_bridge.call_in_main_thread(self._restart_server_impl)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.log_message.emit(f"等待并启动服务器时出错: {str(e)}")
+    
+    def _server_ports(self):
+        """服务器使用的端口列表：(名称, 端口, 协议)"""
+        return [
+            ('game', int(self.server_config.get('port', DEFAULT_SERVER_CONFIG['port'])), 'udp'),
+            ('query', int(self.server_config.get('query_port', DEFAULT_SERVER_CONFIG['query_port'])), 'udp'),
+            ('rcon', int(self.server_config.get('rcon_port', DEFAULT_SERVER_CONFIG['rcon_port'])), 'tcp'),
+            ('echo', int(self.server_config.get('echo_port', DEFAULT_SERVER_CONFIG['echo_port'])), 'tcp')
+        ]
+    
+    def _restart_blockers(self):
+        """检查重新启动前尚未就绪的条件（端口被占用、存档被锁定）"""
+        blockers = []
+        host = self.server_config.get('multihome', DEFAULT_SERVER_CONFIG['multihome']) or '0.0.0.0'
+        for name, port, protocol in self._server_ports():
+            if not is_port_free(port, host, protocol):
+                blockers.append(f"{name}端口 {port}/{protocol} 被占用")
+        if self.server_path:
+            for save_file in get_world_save_files(self.server_path):
+                if is_file_locked(save_file):
+                    blockers.append(f"存档被锁定: {os.path.basename(save_file)}")
+        return blockers
+    
+    async def _wait_restart_ready(self, timeout):
+        """等待端口释放、存档解锁
+        
+        Returns:
+            list: 超时时仍未就绪的项目，全部就绪时为空列表
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            blockers = self._restart_blockers()
+            if not blockers or time.monotonic() >= deadline:
+                return blockers
+            await asyncio.sleep(RESTART_READY_POLL_INTERVAL)
+    
+    def _report_restart_downtime(self):
+        """服务器重新上线后报告本次重启的停机时长"""
+        pending, self._pending_restart = self._pending_restart, None
+        if not pending:
+            return
+        restart, started = pending
+        restart['downtime'] = time.monotonic() - started
+        restart['startup'] = restart['downtime'] - restart['stop'] - restart['ready_wait']
+        self.restart_history.append(restart)
+        self.log_message.emit(f"⏱️ 重启停机时长 {restart['downtime']:.1f} 秒"
+                              f"（停止 {restart['stop']:.1f} 秒，等待就绪 {restart['ready_wait']:.1f} 秒，"
+                              f"启动 {restart['startup']:.1f} 秒）")
+    
+    def get_restart_history(self):
+        """获取最近的重启记录（停机时长及各部分耗时）"""
+        return list(self.restart_history)
+    
+    def _arm_watchdog(self):
+        """按当前配置启用崩溃看门狗"""
+        self.watchdog.configure(
+            enabled=self._stop_option('watchdog_enabled'),
+            backoff_initial=self._stop_option('watchdog_backoff_initial'),
+            backoff_max=self._stop_option('watchdog_backoff_max'),
+            crash_loop_count=self._stop_option('watchdog_crash_loop_count'),
+            crash_loop_window=self._stop_option('watchdog_crash_loop_window') * 60)
+        self.watchdog.arm()
+    
+    def _disarm_watchdog(self):
+        """手动停止/重启前调用：之后的进程退出不再视为崩溃，并取消正在等待的自动重启"""
+        self.watchdog.expect_exit()
+        self.async_core.cancel('crash_watch')
+        self.async_core.cancel('crash_recovery')
+    
+    def _watch_server_process(self):
+        """在事件循环中等待WSServer-Win64-Shipping.exe退出，异常退出时交给看门狗处理"""
+        identity = self.process_registry.identity
+        if identity:
+            self.async_core.submit(self._watch_server_exit(identity, self.server_process), name='crash_watch')
+    
+    async def _watch_server_exit(self, identity, launcher_process):
+        """等待服务器进程退出，收集退出码和日志末尾后判断是否崩溃"""
+        pid, create_time = identity
+        await wait_for_process_exit(pid, create_time=create_time)
+        if self.watchdog.expected_exit:
+            return  # 手动停止或重启，由停止流程处理
+        
+        # 启动进程会在服务器进程退出后随之退出，从它获取退出码
+        exit_code = None
+        if launcher_process and await wait_for_process_exit(launcher_process.pid, timeout=5):
+            exit_code = launcher_process.poll()
+        log_tail = read_log_tail(os.path.join(self.server_path, "WS", "Saved", "Logs", "WS.log"))
+        
+        self.log_message.emit("🔍 [离线判断] WSServer-Win64-Shipping.exe进程已退出")
+        self._handle_server_exit()
+        await self.watchdog.handle_exit(exit_code, log_tail)
+    
+    def _handle_server_exit(self):
+        """服务器进程意外退出后清理监控任务和状态"""
+        if getattr(self, 'startup_in_progress', False):
+            self.startup_timeline.finish('crashed')
+        self._pending_restart = None
+        self.scheduler.cancel('shipping_discovery')
+        self.log_monitor_running = False
+        self.async_core.cancel('log_tail')
+        if self.scheduler.cancel('existing_process_monitor'):
+            self._stop_existing_process_monitor()
+        self.process_registry.invalidate()
+        self.real_server_pid = None
+        self._reset_server_state()
+    
+    def _report_startup_failure(self, reason):
+        """启动失败时通知看门狗（手动启动失败同样计入崩溃次数）"""
+        self.async_core.submit(self.watchdog.handle_exit(reason=f"启动失败：{reason}"), name='crash_watch')
+    
+    async def _watchdog_recover(self):
+        """看门狗自动重启：清理残留进程，等待端口释放和存档解锁后在主线程中启动服务器"""
+        try:
+            if self._collect_stop_targets():
+                self.log_message.emit("🧹 正在清理残留的服务器进程...")
+                if not await self._stop_server_async():
+                    self._force_stop_server_processes()
+            blockers = await self._wait_restart_ready(self._stop_option('restart_ready_timeout'))
+            if blockers:
+                self.log_message.emit(f"⚠️ 以下项目仍未就绪，继续启动: {', '.join(blockers)}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 自动重启前清理失败: {str(e)}")
+        self.event_bridge.call_in_main_thread(self._watchdog_restart_server)
+    
+    def _watchdog_restart_server(self):
+        """看门狗发起的自动重启（主线程）"""
+        if self.watchdog.expected_exit:
+            return  # 等待期间用户已手动停止
+        self.log_message.emit("🔁 看门狗正在自动重启服务器...")
+        if not self.start_server():
+            self.startup_in_progress = False
+            self.status_changed.emit(False)
+            self._report_startup_failure(self.last_start_error or "服务器进程未能创建")
+    
+    def get_crash_incidents(self):
+        """获取最近的崩溃事故记录（检测时间、原因、退出码、恢复耗时）"""
+        return self.watchdog.get_incidents()
     
     def _force_stop_server_processes(self):
         """强制终止所有服务器相关进程"""
         try:
             import psutil
             terminated_processes = []
+            instance_processes = self._instance_processes()
             
             # 终止启动进程
             if self.server_process:
@@ -373,12 +827,13 @@ class ServerManager(QObject):
                 except:
                     pass
             
-            # 查找并终止所有WSServer相关进程
-            for proc in psutil.process_iter(['pid', 'name']):
+            # 查找并终止本实例的WSServer相关进程（不影响同一主机上的其他服务器）
+            for proc in instance_processes:
+                if self.server_process and proc.pid == self.server_process.pid:
+                    continue
                 try:
-                    if 'WSServer' in proc.info['name']:
-                        proc.terminate()
-                        terminated_processes.append(f"{proc.info['name']} PID: {proc.info['pid']}")
+                    proc.terminate()
+                    terminated_processes.append(f"{proc.name()} PID: {proc.pid}")
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
             
@@ -392,6 +847,7 @@ class ServerManager(QObject):
             self.server_process = None
             if hasattr(self, 'real_server_pid'):
                 delattr(self, 'real_server_pid')
+            self.process_registry.invalidate()
             self.status_changed.emit(False)
             
         except Exception as e:
@@ -404,21 +860,36 @@ class ServerManager(QObject):
             if result:
                 self.log_message.emit("✅ 服务器重启成功")
             else:
+                self._pending_restart = None
                 self.log_message.emit("❌ 重启服务器失败")
         except Exception as e:
+            self._pending_restart = None
             self.log_message.emit(f"❌ 重启服务器时出错: {str(e)}")
     
     def _monitor_process_status(self):
-        """监控服务器进程状态"""
+        """监控服务器进程状态（在事件循环中等待启动进程退出）"""
         if not self.server_process:
             return
         
         try:
-            # 启动日志文件监控线程
+            # 启动日志文件监控
             self._start_log_file_monitor()
             
-            # 在独立线程中等待进程结束
-            self.server_process.wait()
+            self.async_core.submit(self._wait_launcher_exit(self.server_process), name='process_status')
+        except Exception as e:
+            self.log_message.emit(f"监控服务器进程时出错: {str(e)}")
+    
+    async def _wait_launcher_exit(self, launcher_process):
+        """等待启动进程退出后更新服务器状态"""
+        try:
+            await wait_for_process_exit(launcher_process.pid)
+            launcher_process.poll()  # 回收已退出的子进程
+            if self.server_process is not launcher_process:
+                # 服务器已停止或已重新启动，由新的监控任务接管
+                return
+            if self.async_core.is_active('crash_watch'):
+                # 服务器进程的退出由崩溃监视任务处理
+                return
             
             # 进程结束
             if self.is_running:
@@ -428,11 +899,16 @@ class ServerManager(QObject):
                 self.status_changed.emit(False)
                 self.log_message.emit("服务器已停止")
                 self.server_stopped.emit()
-                
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             self.log_message.emit(f"监控服务器进程时出错: {str(e)}")
     
     def connect_rcon(self):
+        """连接到RCON服务器（在事件循环中执行，调用方等待结果）"""
+        return self.async_core.run(self._connect_rcon_async())
+    
+    async def _connect_rcon_async(self):
         """连接到RCON服务器"""
         # 如果已经连接，先断开
         if self.is_rcon_connected and self.rcon_client:
@@ -455,238 +931,112 @@ class ServerManager(QObject):
                 return False
             
             # 创建RCON客户端
-            self.rcon_client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.rcon_client.settimeout(5)  # 设置超时时间
+            self.rcon_client = AsyncRconClient()
             
             try:
                 # 尝试连接
-                self.rcon_client.connect((rcon_addr, int(rcon_port)))
+                await self.rcon_client.connect(rcon_addr, int(rcon_port), timeout=5)
                 # TCP连接成功，但还需要进行RCON认证
             except ConnectionRefusedError:
                 self.rcon_error.emit("连接被拒绝")
-                if self.rcon_client:
-                    self.rcon_client.close()
-                    self.rcon_client = None
+                self._close_rcon_client()
                 return False
-            except socket.timeout:
+            except asyncio.TimeoutError:
                 self.rcon_error.emit("连接超时")
-                if self.rcon_client:
-                    self.rcon_client.close()
-                    self.rcon_client = None
+                self._close_rcon_client()
                 return False
             except socket.gaierror:
                 self.rcon_error.emit("地址解析失败")
-                if self.rcon_client:
-                    self.rcon_client.close()
-                    self.rcon_client = None
+                self._close_rcon_client()
                 return False
             
-            # 发送认证请求（不记录密码到日志）
-            if not self._send_rcon_packet(3, rcon_password, log_command=False):
-                self.rcon_error.emit("发送认证请求失败")
-                self.rcon_client.close()
-                self.rcon_client = None
-                return False
-                
-            # 接收认证响应
-            auth_response = self._receive_rcon_packet()
-            
-            if not auth_response:
+            # 发送认证请求（不记录密码到日志），认证请求和响应作为一次完整往返
+            # 直接根据第一个认证响应判断是否成功，不等待第二个响应包：响应ID与请求ID匹配即认证成功
+            try:
+                authenticated = await self.rcon_client.authenticate(rcon_password)
+            except (asyncio.TimeoutError, OSError):
                 self.rcon_error.emit("未收到服务器响应")
-                self.rcon_client.close()
-                self.rcon_client = None
+                self._close_rcon_client()
                 return False
             
-            # 直接根据第一个认证响应判断是否成功，不等待第二个响应包
-            # 如果认证响应ID与请求ID匹配，则认证成功
-            request_id = 1  # 与_send_rcon_packet中的request_id保持一致
-            if auth_response and auth_response['id'] == request_id:
+            if authenticated:
                 self.log_message.emit("RCON认证成功，连接已建立")
                 self.is_rcon_connected = True
                 self.rcon_connected.emit()
                 
-                # RCON连接验证已完成，无需发送额外命令
-                
-                # 不再自动启动线程获取玩家数量，改为手动点击"在线玩家"按钮获取
-                # threading.Thread(target=self._update_players_count, daemon=True).start()
+                # 在线玩家由WS.log实时维护，只低频发送lp校正
+                self.scheduler.call_every(PLAYER_RECONCILE_INTERVAL, self._reconcile_players, name='player_reconcile',
+                                          initial_delay=PLAYER_RECONCILE_INITIAL_DELAY, replace=True)
                 
                 return True
             else:
                 self.rcon_error.emit("认证失败")
-                self.rcon_client.close()
-                self.rcon_client = None
+                self._close_rcon_client()
                 return False
                 
         except Exception as e:
             # RCON连接错误不记录到日志
             self.rcon_error.emit(str(e))
-            if self.rcon_client:
-                self.rcon_client.close()
-                self.rcon_client = None
+            self._close_rcon_client()
             return False
     
+    def _close_rcon_client(self):
+        """关闭RCON客户端连接（在事件循环线程中执行）"""
+        client = self.rcon_client
+        self.rcon_client = None
+        if client:
+            self.async_core.call(client.close)
+    
     def disconnect_rcon(self):
         """断开RCON连接"""
         if not self.is_rcon_connected or not self.rcon_client:
             return False
             
         try:
-            self.rcon_client.close()
-            self.rcon_client = None
+            self._close_rcon_client()
             self.is_rcon_connected = False
+            self.scheduler.cancel('player_reconcile')
             self.log_message.emit("RCON已断开连接")
             self.rcon_disconnected.emit()
             return True
         except Exception as e:
             return False
     
-    def _send_rcon_packet(self, packet_type, payload, timeout=5, log_command=True):
-        """发送RCON数据包
-        
-        Args:
-            packet_type (int): 数据包类型，2=命令，3=认证
-            payload (str): 数据包载荷，如命令内容或密码
-            timeout (int): 发送超时时间，单位为秒
-            log_command (bool): 是否记录命令到日志，默认为True
-            
-        Returns:
-            bool: 发送成功返回True，否则返回False
-        """
-        if not self.rcon_client:
-            return False
-            
-        # 保存原始超时设置
-        original_timeout = self.rcon_client.gettimeout()
-        
-        try:
-            # 设置新的超时时间
-            self.rcon_client.settimeout(timeout)
-            
-            # 生成随机请求ID
-            request_id = 1  # 简化处理，使用固定ID
-            
-            # 确保payload是字符串
-            if not isinstance(payload, str):
-                payload = str(payload)
-            
-            # 编码payload
-            try:
-                payload_bytes = payload.encode('utf-8')
-                if log_command:
-                    self.log_message.emit(f"RCON已发送: {payload}")
-            except UnicodeEncodeError as e:
-                return False
-            
-            # 构建数据包
-            # 数据包格式: [长度(4)][请求ID(4)][类型(4)][载荷(变长)][0(1)][0(1)]
-            # 注意：长度是指从请求ID开始到结尾的长度，不包括长度字段本身
-            packet_size = 4 + 4 + len(payload_bytes) + 2  # 4(ID) + 4(类型) + payload长度 + 2(两个结尾空字节)
-            packet = struct.pack('<III', packet_size, request_id, packet_type) + payload_bytes + b'\x00\x00'
-            
-            # 发送数据包
-            self.rcon_client.sendall(packet)
-            return True
-        except socket.timeout:
-            # 发送超时
-            return False
-        except Exception as e:
-            # 发送RCON数据包时出错
-            return False
-        finally:
-            # 恢复原始超时设置
-            try:
-                self.rcon_client.settimeout(original_timeout)
-            except:
-                pass
+    def _rcon_round_trip(self, command, log_command=True, log_response=True):
+        """执行RCON命令并返回响应内容（同步接口，在事件循环中执行）"""
+        return self.async_core.run(self._rcon_round_trip_async(command, log_command, log_response))
     
-    def _receive_rcon_packet(self, timeout=5, log_response=True):
-        """接收RCON数据包
+    async def _rcon_round_trip_async(self, command, log_command=True, log_response=True):
+        """在连接锁内完成一次命令往返，往返失败时连接已不可用，标记RCON断开
         
-        Args:
-            timeout (int): 接收超时时间，单位为秒
-            log_response (bool): 是否记录响应到日志，默认为True
-            
         Returns:
-            dict or None: 解析后的数据包，如果接收失败则返回None
+            str or None: 响应内容，RCON未连接或往返失败时返回None
         """
-        if not self.rcon_client:
+        client = self.rcon_client
+        if not self.is_rcon_connected or not client:
             return None
-            
-        # 保存原始超时设置
-        original_timeout = self.rcon_client.gettimeout()
-        
+        if log_command:
+            self.log_message.emit(f"RCON已发送: {command}")
         try:
-            # 设置新的超时时间
-            self.rcon_client.settimeout(timeout)
-            
-            # 接收数据包大小
-            size_data = self.rcon_client.recv(4)
-            if not size_data or len(size_data) < 4:
-                return None
-                
-            packet_size = struct.unpack('<i', size_data)[0]
-            
-            # 验证数据包大小是否合理，防止恶意数据
-            if packet_size < 8 or packet_size > 4096:  # 4KB是一个合理的上限
-                return None
-            
-            # 接收剩余数据
-            packet_data = b''
-            remaining = packet_size
-            
-            # 分块接收数据，避免大数据包问题
-            while remaining > 0:
-                chunk = self.rcon_client.recv(min(remaining, 1024))
-                if not chunk:
-                    # 连接已关闭
-                    return None
-                packet_data += chunk
-                remaining -= len(chunk)
-            
-            # 确保接收到足够的数据进行解析
-            if len(packet_data) < 8:  # 至少需要ID和类型字段
-                return None
-            
-            # 解析数据包
-            response_id = struct.unpack('<I', packet_data[0:4])[0]  # 使用无符号整数格式
-            response_type = struct.unpack('<I', packet_data[4:8])[0]  # 使用无符号整数格式
-            
-            # 解析负载（去除末尾的两个空字节）
-            response_body = ""
-            if len(packet_data) > 8:
-                try:
-                    # 直接去除末尾的两个空字节
-                    response_body = packet_data[8:-2].decode('utf-8')
-                    
-                    # 记录响应体（如果需要）
-                    if response_body and log_response:
-                        # 清理响应中可能包含的表格格式
-                        cleaned_response = response_body.strip()
-                        self.log_message.emit(f"RCON已接收: {cleaned_response}")
-                except UnicodeDecodeError as e:
-                    try:
-                        # 尝试使用latin-1编码，它可以解码任何字节序列
-                        response_body = packet_data[8:-2].decode('latin-1')  # 同样去除末尾两个空字节
-                    except Exception:
-                        response_body = ""
-            
-            return {
-                'id': response_id,
-                'type': response_type,
-                'body': response_body
-            }
-        except socket.timeout:
-            # 接收超时
-            return None
-        except Exception as e:
-            # 接收RCON数据包时出错
+            sent_at = time.monotonic()
+            body = await client.command(command)
+        except (asyncio.TimeoutError, OSError) as e:
+            self._on_rcon_connection_lost(client, str(e) or "响应超时")
             return None
-        finally:
-            # 恢复原始超时设置
-            try:
-                self.rcon_client.settimeout(original_timeout)
-            except:
-                pass
+        self.rcon_latency = time.monotonic() - sent_at
+        if body and log_response:
+            self.log_message.emit(f"RCON已接收: {body.strip()}")
+        return body
+    
+    def _on_rcon_connection_lost(self, client, reason):
+        """RCON往返失败（客户端已关闭连接）：标记断开，停止玩家校正"""
+        if self.rcon_client is not client:
+            return
+        self.rcon_client = None
+        self.is_rcon_connected = False
+        self.scheduler.cancel('player_reconcile')
+        self.log_message.emit(f"⚠️ RCON连接已失效，已断开: {reason}")
+        self.rcon_disconnected.emit()
     
     def get_players_count(self, log_command=True, log_response=True):
         """通过RCON获取玩家数量
@@ -704,12 +1054,10 @@ class ServerManager(QObject):
             
         try:
             # 发送lp命令获取在线玩家
-            self._send_rcon_packet(2, "lp", log_command=log_command)
-            response = self._receive_rcon_packet(log_response=log_response)
+            players_info = self._rcon_round_trip("lp", log_command=log_command, log_response=log_response)
             
-            if response and response['body']:
+            if players_info:
                 # 解析响应获取玩家数量
-                players_info = response['body']
                 # 玩家信息不记录到日志
                 
                 # 计算玩家数量 - 通过表格行数计算
@@ -749,11 +1097,10 @@ class ServerManager(QObject):
             
         try:
             # 发送lap命令获取注册玩家
-            self._send_rcon_packet(2, "lap")
-            response = self._receive_rcon_packet()
+            response = self._rcon_round_trip("lap")
             
-            if response and response['body']:
-                return response['body']
+            if response:
+                return response
             else:
                 return "无法获取注册玩家信息：未收到响应"
                 
@@ -761,81 +1108,86 @@ class ServerManager(QObject):
             # 获取注册玩家时出错不记录到日志
             return f"获取注册玩家信息失败：{str(e)}"
     
-    def _update_players_count(self):
-        """定期更新玩家数量 - 已禁用自动发送lp命令"""
-        while self.is_rcon_connected and self.rcon_client:
-            try:
-                # 不再自动发送lp命令获取玩家数量
-                # 仅显示最大玩家数，当前玩家数由在线玩家按钮获取
-                max_players = int(self.server_config.get('max_players', DEFAULT_SERVER_CONFIG['max_players']))
-                players_count = f"0/{max_players}"
-                self.players_updated.emit(players_count)
-                time.sleep(30)  # 每30秒更新一次
-            except Exception as e:
-                # 更新玩家数量时出错不记录到日志
-                time.sleep(30)  # 出错后等待30秒再尝试
+    def _reconcile_players(self):
+        """低频用RCON lp 校正在线玩家名单（调度器线程，RCON断开后停止）"""
+        if not self.is_rcon_connected:
+            return False
+        self.get_online_players()
+        return True
     
-
+    def _locate_shipping_process(self, force_rescan=False):
+        """定位服务器进程：本启动器创建的服务器只在其进程树中查找，重新挂接已有进程时才按名称全局查找"""
+        root_pid = self.server_process.pid if self.server_process else None
+        return self.process_registry.find(root_pid=root_pid, force_rescan=force_rescan)
     
-
+    def _find_real_server_process(self):
+        """沿启动进程的进程树查找真正的服务器进程PID（由调度器短间隔退避重试）"""
+        launcher_process = self.server_process
+        if not launcher_process:
+            return
+        
+        self.log_message.emit(f"⏳ 正在WSServer.exe(PID: {launcher_process.pid})的进程树中等待WSServer-Win64-Shipping.exe...")
+        deadline = time.monotonic() + SHIPPING_DISCOVERY_TIMEOUT
+        self.scheduler.call_later(0, self._discover_real_server_process, launcher_process,
+                                  deadline, SHIPPING_DISCOVERY_MIN_DELAY,
+                                  name='shipping_discovery')
     
-    def _find_real_server_process(self, attempt_count=1):
-        """查找真正的服务器进程PID，找到后立即设置状态为启动中"""
+    def _discover_real_server_process(self, launcher_process, deadline, delay):
+        """查找一次真正的服务器进程，找到后立即设置状态为启动中，否则按退避间隔重新调度"""
         try:
-            import psutil
-            # 查找WSServer-Win64-Shipping.exe进程
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    proc_name = proc.info['name']
-                    if proc_name == 'WSServer-Win64-Shipping.exe':
-                        real_pid = proc.info['pid']
-                        # 不替换self.server_process，保持原始的subprocess.Popen对象用于进程管理
-                        # 只记录真实进程的PID用于其他操作
-                        self.real_server_pid = real_pid
-                        
-                        # 更新启动时间为真实进程的创建时间
-                        try:
-                            real_process = psutil.Process(real_pid)
-                            self.start_time = datetime.datetime.fromtimestamp(real_process.create_time())
-                            self.log_message.emit(f"🔍 找到WSServer-Win64-Shipping.exe进程 PID: {real_pid}")
-                            self.log_message.emit(f"⏰ 更新服务器启动时间为: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                        except Exception as e:
-                            self.log_message.emit(f"⚠️ 获取进程创建时间失败: {str(e)}，使用当前时间")
-                            # 如果获取失败，保持原有的启动时间
-                        
-
-                            # 正常流程：等待关键字检测
-                            # 保持启动标志为True，等待关键字检测
-                            # 不在这里清除startup_in_progress，让它保持启动中状态
-                            
-                            # 立即设置状态为启动中
-                            self.log_message.emit("⏳ 服务器状态锁定为启动中")
-                            self.status_changed.emit(True)
-                            
-                            # 等待关键字检测来设置为在线
-                            self.log_message.emit("⏰ 等待检测到关键字'Create Dungeon Successed: DiXiaChengLv50, Index = 2'后设置为在线")
-                            
-                            # 启动日志文件监控
-                            self._start_log_file_monitor()
-                        
-                        return
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+            if self.server_process is not launcher_process:
+                # 启动已被取消（服务器已停止或重新启动）
+                return
             
-            # 如果没有找到WSServer-Win64-Shipping.exe进程
-            if attempt_count <= 12:  # 最多尝试12次（60秒）
-                self.log_message.emit(f"⏳ 第{attempt_count}次尝试：未找到WSServer-Win64-Shipping.exe进程，继续等待...")
-                # 5秒后再次尝试查找
-                threading.Timer(5.0, lambda: self._find_real_server_process(attempt_count + 1)).start()
-            else:
-                # 超过12次尝试（60秒）仍未找到进程，判断为启动失败
-                self.log_message.emit("🔍 [离线判断] 60秒内未找到WSServer-Win64-Shipping.exe进程，判断为启动失败")
-                self.log_message.emit("❌ 服务器启动失败：WSServer-Win64-Shipping.exe进程未启动")
-                self.log_message.emit("💡 建议检查服务器配置或查看完整日志排查问题")
+            # 只在本次启动的进程树中查找，避免同一主机上的其他服务器抢占PID
+            proc = self.process_registry.find(root_pid=launcher_process.pid, force_rescan=True)
+            if not proc and time.monotonic() < deadline:
+                self.scheduler.call_later(delay, self._discover_real_server_process, launcher_process,
+                                          deadline, min(delay * 2, SHIPPING_DISCOVERY_MAX_DELAY),
+                                          name='shipping_discovery')
+                return
+            
+            if proc:
+                real_pid = self.process_registry.pid
+                # 不替换self.server_process，保持原始的subprocess.Popen对象用于进程管理
+                # 只记录真实进程的PID用于其他操作
+                self.real_server_pid = real_pid
+                self.resource_governor.apply_server(real_pid, PHASE_STARTUP)
+                self._start_resource_sampling()
+                self._watch_server_process()
+                self._mark_startup_phase('shipping_spawned', self.process_registry.create_time)
+                
+                # 更新启动时间为真实进程的创建时间
+                try:
+                    self.start_time = datetime.datetime.fromtimestamp(self.process_registry.create_time)
+                    self.log_message.emit(f"🔍 找到WSServer-Win64-Shipping.exe进程 PID: {real_pid}")
+                    self.log_message.emit(f"⏰ 更新服务器启动时间为: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                except Exception as e:
+                    self.log_message.emit(f"⚠️ 获取进程创建时间失败: {str(e)}，使用当前时间")
+                    # 如果获取失败，保持原有的启动时间
                 
-                # 清除启动标志
-                if hasattr(self, 'startup_in_progress'):
-                    self.startup_in_progress = False
+                # 正常流程：保持启动标志为True，等待关键字检测来设置为在线
+                # 不在这里清除startup_in_progress，让它保持启动中状态
+                self.log_message.emit("⏳ 服务器状态锁定为启动中")
+                self.status_changed.emit(True)
+                self.log_message.emit("⏰ 等待检测到关键字'Create Dungeon Successed: DiXiaChengLv50, Index = 2'后设置为在线")
+                
+                # 启动日志文件监控
+                self._start_log_file_monitor()
+                
+                return
+            
+            # 超时仍未找到WSServer-Win64-Shipping.exe进程，判断为启动失败
+            self.log_message.emit(f"🔍 [离线判断] {SHIPPING_DISCOVERY_TIMEOUT}秒内未找到WSServer-Win64-Shipping.exe进程，判断为启动失败")
+            self.log_message.emit("❌ 服务器启动失败：WSServer-Win64-Shipping.exe进程未启动")
+            self.log_message.emit("💡 建议检查服务器配置或查看完整日志排查问题")
+            self.startup_timeline.finish('failed')
+            self._pending_restart = None
+            self._report_startup_failure("WSServer-Win64-Shipping.exe进程未启动")
+            
+            # 清除启动标志
+            if hasattr(self, 'startup_in_progress'):
+                self.startup_in_progress = False
         except Exception as e:
             self.log_message.emit(f"❌ 查找服务器进程时发生错误: {str(e)}")
             # 清除启动标志
@@ -845,31 +1197,38 @@ class ServerManager(QObject):
     def _check_server_status_with_psutil(self):
         """使用psutil检查服务器进程状态"""
         try:
-            import psutil
-            # 检查WSServer-Win64-Shipping.exe进程是否存在
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    if proc.info['name'] == 'WSServer-Win64-Shipping.exe':
-                        return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            return False
+            # 检查WSServer-Win64-Shipping.exe进程是否存在（身份有效时无需全量扫描）
+            return self._locate_shipping_process(force_rescan=True) is not None
         except Exception as e:
             self.log_message.emit(f"检查进程状态时出错: {str(e)}")
             return False
              
+    def _instance_processes(self):
+        """本实例的服务器进程：WSServer-Win64-Shipping.exe 以及启动进程和它的子进程"""
+        import psutil
+        processes = {}
+        if self._locate_shipping_process(force_rescan=True):
+            processes[self.process_registry.pid] = self.process_registry.process
+        if self.server_process and self.server_process.poll() is None:
+            try:
+                launcher = psutil.Process(self.server_process.pid)
+                for proc in [launcher] + launcher.children(recursive=True):
+                    processes.setdefault(proc.pid, proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return list(processes.values())
+    
     def _force_kill_server_processes(self):
         """强制终止所有服务器相关进程"""
         try:
             import psutil
             killed_processes = []
             
-            # 查找并终止所有WSServer相关进程
-            for proc in psutil.process_iter(['pid', 'name']):
+            # 查找并终止本实例的WSServer相关进程
+            for proc in self._instance_processes():
                 try:
-                    if 'WSServer' in proc.info['name']:
-                        proc.terminate()
-                        killed_processes.append(f"{proc.info['name']} (PID: {proc.info['pid']})")
+                    proc.terminate()
+                    killed_processes.append(f"{proc.name()} (PID: {proc.pid})")
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
                     
@@ -882,159 +1241,371 @@ class ServerManager(QObject):
              self.log_message.emit(f"强制终止进程时出错: {str(e)}")
                  
     def _start_log_file_monitor(self):
-        """启动日志文件监控线程（等待WSServer-Win64-Shipping.exe进程启动后）"""
+        """启动日志文件监控：文件一出现就开始读取，由文件变化通知驱动"""
         if hasattr(self, 'log_monitor_running') and self.log_monitor_running:
             return  # 避免重复启动
         
-        # 等待WSServer-Win64-Shipping.exe进程启动后再开始监控日志
-        def wait_for_shipping_process():
-            import psutil
-            import time
-            
-            self.log_message.emit("⏳ 等待WSServer-Win64-Shipping.exe进程启动...")
-            
-            # 最多等待60秒
-            for _ in range(60):
-                try:
-                    # 查找WSServer-Win64-Shipping.exe进程
-                    for proc in psutil.process_iter(['pid', 'name']):
-                        if proc.info['name'] == 'WSServer-Win64-Shipping.exe':
-                             self.log_message.emit(f"✅ 检测到WSServer-Win64-Shipping.exe进程 PID: {proc.info['pid']}")
-                             self.log_message.emit("⏳ 等待30秒后开始监控日志文件...")
-                             time.sleep(30)  # 等待30秒
-                             self.log_message.emit("🚀 开始监控日志文件")
-                             # 启动日志监控
-                             if not hasattr(self, 'log_monitor_running') or not self.log_monitor_running:
-                                 self.log_monitor_running = True
-                                 # 自动开启日志显示
-                                 self.show_server_logs = True
-                                 threading.Thread(target=self._monitor_server_log_file, daemon=True).start()
-                                 self.log_message.emit("📋 启动服务器日志文件监控...")
-                                 self.log_message.emit("✅ 自动开启服务器日志显示")
-                             return
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-                
-                time.sleep(1)
-            
-            # 超时后仍然启动日志监控
-            self.log_message.emit("⚠️ 等待WSServer-Win64-Shipping.exe进程超时，直接启动日志监控")
-            if not hasattr(self, 'log_monitor_running') or not self.log_monitor_running:
-                self.log_monitor_running = True
-                self.show_server_logs = True
-                threading.Thread(target=self._monitor_server_log_file, daemon=True).start()
-                self.log_message.emit("📋 启动服务器日志文件监控...")
-                self.log_message.emit("✅ 自动开启服务器日志显示")
-        
-        # 在后台线程中等待
-        threading.Thread(target=wait_for_shipping_process, daemon=True).start()
+        self.log_monitor_running = True
+        # 自动开启日志显示
+        self.show_server_logs = True
+        self._monitor_server_log_file()
+        self.log_message.emit("📋 启动服务器日志文件监控...")
+        self.log_message.emit("✅ 自动开启服务器日志显示")
     
     def _monitor_server_log_file(self):
-        """监控服务器日志文件WS.log"""
+        """启动服务器日志文件WS.log的监控任务（在事件循环中每秒读取一次新增内容）"""
         try:
             # 使用self.server_path而不是从配置中获取
             server_path = self.server_path
             if not server_path:
                 self.log_message.emit("❌ 服务器路径未配置，无法监控日志文件")
+                self.log_monitor_running = False
                 return
             
-            ws_log_path = os.path.join(server_path, 'WS', 'Saved', 'Logs', 'WS.log')
-            self.log_message.emit(f"📋 监控日志文件: {ws_log_path}")
+            self.ws_log_path = os.path.join(server_path, 'WS', 'Saved', 'Logs', 'WS.log')
+            self.log_message.emit(f"📋 监控日志文件: {self.ws_log_path}")
             self.log_message.emit(f"📋 日志显示开关状态: {self.show_server_logs}")
             
-            server_started_emitted = False
-            last_position = 0
-            
-            while self.log_monitor_running:
-                try:
-                    if os.path.exists(ws_log_path):
-                        # 使用非阻塞方式读取文件，避免锁定
-                        new_lines = []
-                        try:
-                            # 快速读取文件内容，立即关闭以避免锁定
-                            with open(ws_log_path, 'r', encoding='utf-8', errors='ignore') as temp_f:
-                                temp_f.seek(last_position)
-                                file_content = temp_f.read()
-                                new_position = temp_f.tell()
-                            
-                            # 处理读取的内容
-                            if file_content:
-                                new_lines = file_content.splitlines(keepends=True)
-                                last_position = new_position
-                        except (PermissionError, IOError) as e:
-                            # 如果文件被锁定，跳过这次读取
-                            time.sleep(0.1)
-                            continue
-                        except Exception as e:
-                            # 其他错误，跳过这次读取
-                            continue
-                        
-                        # 处理读取到的新行
-                        if new_lines:
-                            for line in new_lines:
-                                line_text = line.strip()
-                                if line_text:
-                                    # 如果启用了服务器日志显示开关，输出日志内容到GUI
-                                    if self.show_server_logs:
-                                        self.log_message.emit(f"[WS.log] {line_text}")
-                                    
-                                    # 检测MOD加载日志
-                                    import re
-                                    mod_pattern = r'LogUGCRegistry: Display: LoadModulesForEnabledPluginsBegin: ModName:([^,]+), ModID:(\d+)\.?'
-                                    mod_match = re.search(mod_pattern, line_text)
-                                    if mod_match:
-                                        mod_name = mod_match.group(1).strip()
-                                        mod_id = mod_match.group(2).strip()
-                                        self.mod_loaded.emit(mod_name, mod_id)
-                                        self.log_message.emit(f"🔧 检测到MOD加载: {mod_name} (ID: {mod_id})")
-                                    
-                                    # 检测服务器启动完成关键字符串（仅在启动过程中检测，已有进程时跳过）
-                                    if (not server_started_emitted and 
-                                        hasattr(self, 'startup_in_progress') and self.startup_in_progress and 
-                                        'Create Dungeon Successed: DiXiaChengLv50, Index = 2' in line_text):
-                                        self.log_message.emit("✅ 从WS.log检测到服务器启动完成信号：Create Dungeon Successed: DiXiaChengLv50, Index = 2")
-                                        
-                                        # 清除启动标志，设置为正式在线状态
-                                        if hasattr(self, 'startup_in_progress'):
-                                            self.startup_in_progress = False
-                                        
-                                        self.is_running = True
-                                        self.status_changed.emit(True)
-                                        self.server_started.emit()
-                                        server_started_emitted = True
-                                        self.log_message.emit("🎉 服务器已正式上线！")
-                                        
-                                        # 启动完成后，尝试连接RCON
-                                        self._auto_connect_rcon_after_startup()
-                                        break
-                    else:
-                        # 文件不存在时的调试信息，每10秒提示一次
-                        if self.show_server_logs and int(time.time()) % 10 == 0:
-                            self.log_message.emit(f"⚠️ WS.log文件不存在: {ws_log_path}")
-                            # 检查服务器路径是否存在
-                            ws_dir = os.path.join(server_path, 'WS')
-                            if not os.path.exists(ws_dir):
-                                self.log_message.emit(f"⚠️ 服务器WS目录不存在: {ws_dir}")
-                            else:
-                                saved_dir = os.path.join(ws_dir, 'Saved')
-                                if not os.path.exists(saved_dir):
-                                    self.log_message.emit(f"⚠️ 服务器Saved目录不存在: {saved_dir}")
-                                else:
-                                    logs_dir = os.path.join(saved_dir, 'Logs')
-                                    if not os.path.exists(logs_dir):
-                                        self.log_message.emit(f"⚠️ 服务器Logs目录不存在: {logs_dir}")
-                    
-                    time.sleep(1)  # 每秒检查一次
-                    
-                except Exception as e:
-                    self.log_message.emit(f"读取WS.log文件时出错: {str(e)}")
-                    time.sleep(5)  # 出错时等待5秒再重试
-                    
+            self._server_started_emitted = False
+            self._log_archive_failed = False
+            self.tick_telemetry.reset()
+            self.log_rates.reset()
+            # 启动过程中跳过启动前就存在的旧日志，服务端轮换出新的WS.log后从头读取；
+            # 重新接管已在运行的服务器时从上次保存的位置继续读取，检查点无效时只读取末尾一段
+            if getattr(self, 'startup_in_progress', False):
+                self._log_tailer = LogTailer(self.ws_log_path, on_reset=self._on_server_log_reset,
+                                             skip_identity=self._stale_log_identity)
+            else:
+                self._log_tailer = LogTailer(self.ws_log_path, on_reset=self._on_server_log_reset,
+                                             resume=self._load_log_checkpoint(), tail_window=LOG_TAIL_RESUME_WINDOW)
+            self.async_core.submit(self._tail_server_log_file(self._log_tailer), name='log_tail')
         except Exception as e:
             self.log_message.emit(f"监控WS.log文件时出错: {str(e)}")
-        finally:
             self.log_monitor_running = False
     
+    async def _tail_server_log_file(self, tailer):
+        """持续读取WS.log新增内容，直到日志监控被关闭"""
+        watcher = create_log_watcher(tailer.path)
+        resume = tailer.resume
+        reported = False
+        try:
+            while self._read_server_log_file(tailer):
+                if not reported and tailer.start_mode is not None:
+                    reported = True
+                    self._report_log_start(tailer, resume)
+                self._save_log_checkpoint(tailer)
+                self._schedule_log_archive_flush()
+                if tailer.has_more:
+                    await asyncio.sleep(0)  # 积压的日志没读完时立即继续读取
+                else:
+                    await watcher.wait(tailer.last_read > 0)
+        finally:
+            self._flush_log_batch()
+            self._save_log_checkpoint(tailer, force=True)
+            self._end_log_archive_session()
+            watcher.close()
+            tailer.close()
+    
+    def _load_log_checkpoint(self):
+        """读取本实例保存的WS.log检查点"""
+        try:
+            return self.log_offsets.load(self.instance_name)
+        except Exception:
+            return None
+    
+    def _save_log_checkpoint(self, tailer, force=False):
+        """按间隔保存WS.log读取位置（位置没有变化时不写文件）"""
+        now = time.monotonic()
+        if not force and now - self._log_checkpoint_saved_at < LOG_OFFSET_SAVE_INTERVAL:
+            return
+        self._log_checkpoint_saved_at = now
+        checkpoint = tailer.checkpoint()
+        if checkpoint is None or checkpoint == self._log_checkpoint_saved:
+            return
+        try:
+            self.log_offsets.save(self.instance_name, checkpoint)
+            self._log_checkpoint_saved = checkpoint
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 保存WS.log读取位置失败: {str(e)}")
+    
+    def _report_log_start(self, tailer, resume):
+        """输出重新接管时WS.log从哪里开始读取"""
+        if tailer.start_mode == START_CHECKPOINT:
+            self.log_message.emit(f"📍 从上次保存的位置继续读取WS.log（偏移 {resume['position'] / 1048576:.1f} MB）")
+        elif tailer.start_mode == START_TAIL:
+            self.log_message.emit(f"📍 WS.log没有可用的读取位置记录，只读取最后 {LOG_TAIL_RESUME_WINDOW // 1024} KB")
+    
+    def _on_server_log_reset(self, reason):
+        """WS.log被轮换或截断，从新文件开头读取"""
+        if reason == RESET_ROTATED:
+            self.log_message.emit("🔄 检测到WS.log已轮换，从新日志开头读取")
+        else:
+            self.log_message.emit("🔄 检测到WS.log被截断，从头读取")
+    
+    def _read_server_log_file(self, tailer):
+        """读取一次WS.log新增内容（返回False时停止监控）"""
+        if not self.log_monitor_running:
+            return False
+        
+        ws_log_path = self.ws_log_path
+        try:
+            if tailer.is_open or os.path.exists(ws_log_path):
+                # 保持句柄打开，只读取上次之后新增的完整行
+                new_lines = tailer.read_lines()
+                
+                # 处理读取到的新行
+                for line in new_lines:
+                    line_text = line.strip()
+                    if line_text:
+                        self._handle_server_log_line(line_text)
+            else:
+                # 文件不存在时的调试信息，每10秒提示一次
+                if self.show_server_logs and int(time.time()) % 10 == 0:
+                    self.log_message.emit(f"⚠️ WS.log文件不存在: {ws_log_path}")
+                    # 检查服务器路径是否存在
+                    ws_dir = os.path.join(self.server_path, 'WS')
+                    if not os.path.exists(ws_dir):
+                        self.log_message.emit(f"⚠️ 服务器WS目录不存在: {ws_dir}")
+                    else:
+                        saved_dir = os.path.join(ws_dir, 'Saved')
+                        if not os.path.exists(saved_dir):
+                            self.log_message.emit(f"⚠️ 服务器Saved目录不存在: {saved_dir}")
+                        else:
+                            logs_dir = os.path.join(saved_dir, 'Logs')
+                            if not os.path.exists(logs_dir):
+                                self.log_message.emit(f"⚠️ 服务器Logs目录不存在: {logs_dir}")
+            
+        except Exception as e:
+            self.log_message.emit(f"读取WS.log文件时出错: {str(e)}")
+        return True
+    
+    def _handle_server_log_line(self, line_text):
+        """处理WS.log中的一行：显示、归档、记录启动阶段，并按规则表一次匹配出所有事件"""
+        self._archive_log_line(line_text)
+        self.tick_telemetry.feed(line_text)
+        rate_alerts = self.log_rates.add(line_text)
+        if rate_alerts:
+            self._report_log_rate_alerts(rate_alerts)
+        
+        # 如果启用了服务器日志显示开关，输出日志内容到GUI（攒批发送）
+        if self.show_server_logs:
+            self._queue_log_line(f"[WS.log] {line_text}")
+        
+        # 记录第一行日志的时间
+        if self.startup_timeline.active and not self.startup_timeline.has_phase('first_log_line'):
+            self._mark_startup_phase('first_log_line', self._log_line_time(line_text))
+        
+        events = self.log_events.match(line_text)
+        if events:
+            self._flush_log_batch()  # 先发出之前的原始日志，保持与事件消息的先后顺序
+        for event_type, fields in events:
+            handler = self._log_event_handlers.get(event_type)
+            if handler:
+                handler(line_text, fields)
+            self.log_event.emit(event_type, fields)
+    
+    def _queue_log_line(self, message):
+        """把一行原始日志加入批次：攒满 LOG_BATCH_MAX_LINES 行或等待 LOG_BATCH_INTERVAL 秒后一次发送"""
+        self._log_batch.append(message)
+        if len(self._log_batch) >= LOG_BATCH_MAX_LINES:
+            self._flush_log_batch()
+        elif self._log_batch_timer is None:
+            self._log_batch_timer = asyncio.get_running_loop().call_later(LOG_BATCH_INTERVAL, self._flush_log_batch)
+    
+    def _flush_log_batch(self):
+        """发送当前批次"""
+        if self._log_batch_timer is not None:
+            self._log_batch_timer.cancel()
+            self._log_batch_timer = None
+        if self._log_batch:
+            batch, self._log_batch = self._log_batch, []
+            self.log_batch.emit(batch)
+    
+    def _archive_log_line(self, line_text):
+        """把一行日志加入归档批次（第一行时开始新的运行会话）"""
+        if self._log_archive_failed or not self.server_config.get(
+                'log_archive_enabled', DEFAULT_SERVER_CONFIG['log_archive_enabled']):
+            return
+        try:
+            if self._log_session_id is None:
+                self.log_archive.retention_days = self.server_config.get(
+                    'log_archive_retention_days', DEFAULT_SERVER_CONFIG['log_archive_retention_days'])
+                self._log_session_id = self.log_archive.begin_session(self.instance_name, self.ws_log_path)
+            self.log_archive.add(self._log_session_id, line_text)
+        except Exception as e:
+            self._log_archive_failed = True  # 本次监控不再归档，避免每行都报错
+            self.log_message.emit(f"⚠️ 写入日志归档失败，已停止归档: {str(e)}")
+    
+    def _schedule_log_archive_flush(self):
+        """归档批次攒满或到时间后放到工作线程写入数据库，不阻塞事件循环"""
+        if self._log_archive_flushing or not self.log_archive.flush_due():
+            return
+        self._log_archive_flushing = True
+        asyncio.get_running_loop().run_in_executor(None, self._flush_log_archive)
+    
+    def _flush_log_archive(self):
+        """写入归档批次（工作线程）"""
+        try:
+            self.log_archive.flush()
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 写入日志归档失败: {str(e)}")
+        finally:
+            self._log_archive_flushing = False
+    
+    def _end_log_archive_session(self):
+        """日志监控结束时写入剩余记录并结束运行会话"""
+        session_id, self._log_session_id = self._log_session_id, None
+        if session_id is None:
+            return
+        try:
+            self.log_archive.end_session(session_id)
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 结束日志归档会话失败: {str(e)}")
+    
+    def start_log_retention(self):
+        """开始定期归档轮换日志
+
+        只应由实际管理服务器的进程调用（有守护进程时界面不调用），避免两个进程同时归档同一目录。
+        """
+        if self._log_retention_scheduled:
+            return
+        self._log_retention_scheduled = True
+        self.scheduler.call_every(LOG_RETENTION_INTERVAL, self._run_log_retention, name='log_retention',
+                                  initial_delay=LOG_RETENTION_INITIAL_DELAY)
+    
+    def _run_log_retention(self):
+        """定期归档轮换日志（调度任务）：压缩可能需要较长时间，提交到事件循环后在工作线程中执行，上一次未完成时跳过"""
+        if self.async_core.is_active('log_retention') or not self.server_path or not self.server_config.get(
+                'log_retention_enabled', DEFAULT_SERVER_CONFIG['log_retention_enabled']):
+            return True
+        self.async_core.submit(self._log_retention_async(), name='log_retention')
+        return True
+    
+    async def _log_retention_async(self):
+        """与日志归档写入一样放到事件循环的工作线程池中执行，不阻塞事件循环"""
+        await asyncio.get_running_loop().run_in_executor(None, self._archive_rotated_logs)
+    
+    def _archive_rotated_logs(self):
+        """压缩归档轮换日志并清理旧归档（工作线程）"""
+        try:
+            self.log_retention.retention_days = self.server_config.get(
+                'log_retention_days', DEFAULT_SERVER_CONFIG['log_retention_days'])
+            self.log_retention.max_bytes = self.server_config.get(
+                'log_retention_max_mb', DEFAULT_SERVER_CONFIG['log_retention_max_mb']) * 1024 * 1024
+            result = self.log_retention.run(os.path.join(self.server_path, 'WS', 'Saved', 'Logs'))
+            if result['archived']:
+                self.log_message.emit(f"🗜️ 已压缩归档 {result['archived']} 个轮换日志: "
+                                      f"{result['original_bytes'] / 1024 / 1024:.1f} MB → "
+                                      f"{result['compressed_bytes'] / 1024 / 1024:.1f} MB")
+            if result['removed']:
+                self.log_message.emit(f"🗜️ 已清理 {result['removed']} 天的旧日志归档")
+            if result['failed']:
+                self.log_message.emit(f"⚠️ {result['failed']} 个轮换日志暂时无法归档，下次重试")
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 归档轮换日志失败: {str(e)}")
+    
+    def _report_log_rate_alerts(self, alerts):
+        """输出日志速率告警"""
+        self._flush_log_batch()
+        for alert in alerts:
+            subject = alert['name'] if alert['kind'] == KIND_CATEGORY else f"{alert['name']} 级别"
+            self.log_message.emit(f"🚨 日志量异常: {subject} 最近1分钟 {alert['lines_1m']} 行 "
+                                  f"({alert['bytes_1m'] / 1024:.0f} KB)，基线约 {alert['baseline']:.0f} 行/分钟")
+    
+    def get_log_rates(self, top=LOG_RATE_TOP):
+        """获取1秒/1分钟/15分钟窗口内各分类和级别的日志行数、最活跃的分类和最近的告警（可在任意线程调用）"""
+        stats = self.log_rates.stats(top=int(top))
+        new_alerts = stats.pop('new_alerts')
+        if new_alerts:
+            self.async_core.call(self._report_log_rate_alerts, new_alerts)
+        return stats
+    
+    def search_logs(self, text=None, category=None, verbosity=None, since=None, until=None,
+                    limit=LOG_ARCHIVE_SEARCH_LIMIT):
+        """检索本实例归档的WS.log（可在任意线程调用）
+        
+        Args:
+            text (str): 内容包含的文本
+            category (str): UE日志分类，例如 LogNet
+            verbosity (str or list): 级别，例如 Error 或 ['Error', 'Fatal']
+            since: 起始时间，Unix时间戳或 7d / 12h / 30m 这样的相对时间
+            until: 结束时间，Unix时间戳
+            limit (int): 最多返回的记录数
+        """
+        return self.log_archive.search(text=text, category=category, verbosity=verbosity,
+                                       since=parse_since(since), until=parse_since(until),
+                                       instance=self.instance_name, limit=limit)
+    
+    def _on_mod_loaded_event(self, line_text, fields):
+        """检测到MOD加载"""
+        mod_name = fields['mod_name'].strip()
+        mod_id = fields['mod_id']
+        self.mod_loaded.emit(mod_name, mod_id)
+        self.log_message.emit(f"🔧 检测到MOD加载: {mod_name} (ID: {mod_id})")
+        if self.startup_timeline.active:
+            self.startup_timeline.note_mod_loaded(self._log_line_time(line_text))
+    
+    def _on_startup_complete_event(self, line_text, fields):
+        """检测到服务器启动完成关键字符串（仅在启动过程中处理，已有进程时跳过）"""
+        if self._server_started_emitted or not getattr(self, 'startup_in_progress', False):
+            return
+        self.log_message.emit(f"✅ 从WS.log检测到服务器启动完成信号：{STARTUP_COMPLETE_MARKER}")
+        self._mark_startup_phase('dungeons_created', self._log_line_time(line_text))
+        self.startup_timeline.finish('online')
+        self._report_restart_downtime()
+        self.watchdog.on_server_online()
+        self.resource_governor.set_phase(PHASE_RUNNING)
+        
+        # 清除启动标志，设置为正式在线状态
+        self.startup_in_progress = False
+        self.is_running = True
+        self.status_changed.emit(True)
+        self.server_started.emit()
+        self._server_started_emitted = True
+        self.log_message.emit("🎉 服务器已正式上线！")
+        
+        # 启动完成后，尝试连接RCON
+        self._auto_connect_rcon_after_startup()
+    
+    def _on_server_hitch_event(self, line_text, fields):
+        """服务器卡顿（只计入帧率遥测，不输出到日志区）"""
+        self.tick_telemetry.note_hitch(line_text, float(fields['duration_ms']))
+    
+    def _on_player_login_event(self, line_text, fields):
+        """玩家登录请求（记下玩家名和账号的对应关系）"""
+        self.player_roster.login(fields['name'], fields['player_id'])
+    
+    def _on_player_join_event(self, line_text, fields):
+        """玩家进入游戏"""
+        self.log_message.emit(f"👤 玩家进入游戏: {fields['name']}")
+        if self.player_roster.join(fields['name'], self._log_line_time(line_text)):
+            self._publish_players()
+    
+    def _on_player_leave_event(self, line_text, fields):
+        """玩家断开连接"""
+        player = self.player_roster.leave(fields['player_id'])
+        if player is None:
+            self.log_message.emit(f"👋 玩家断开连接: {fields['player_id']}")
+            return
+        self.log_message.emit(f"👋 玩家断开连接: {player['name']} ({fields['player_id']})")
+        self._publish_players()
+    
+    def _publish_players(self):
+        """在线玩家名单变化后更新玩家数并发出信号"""
+        self.online_players = self.player_roster.players()
+        self.current_players = len(self.online_players)
+        self.tick_telemetry.player_count = self.current_players
+        self.players_updated_at = time.time()
+        self.players_updated.emit(self.online_players)
+    
+    def _on_save_complete_event(self, line_text, fields):
+        """世界保存完成"""
+        self.log_message.emit("💾 世界保存完成")
+    
+    def _on_fatal_error_event(self, line_text, fields):
+        """服务器日志中出现致命错误（进程退出后由崩溃看门狗处理）"""
+        self.log_message.emit(f"💥 服务器日志出现致命错误: {line_text}")
+    
     def set_auto_rcon_enabled(self, enabled):
         """设置RCON自动连接开关"""
         self.auto_rcon_enabled = enabled
@@ -1047,7 +1618,7 @@ class ServerManager(QObject):
         """服务器启动完成后自动连接RCON"""
         if self.auto_rcon_enabled and self.server_config.get("rcon_enabled", DEFAULT_SERVER_CONFIG['rcon_enabled']):
             self.log_message.emit("🔗 服务器在线，尝试自动连接RCON...")
-            threading.Timer(3.0, self._auto_connect_rcon).start()
+            self.scheduler.call_later(3.0, self._auto_connect_rcon, name='auto_connect_rcon')
         else:
             if not self.auto_rcon_enabled:
                 self.log_message.emit("ℹ️ RCON自动连接已关闭，请手动连接")
@@ -1071,26 +1642,17 @@ class ServerManager(QObject):
             silent_mode (bool): 静默模式，不输出"检测到已有进程"相关日志
         """
         try:
-            import psutil
+            # 查找服务器进程（通过进程注册表，身份有效时无需全量扫描）
             shipping_pid = None
-            
-            # 查找服务器进程
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    proc_name = proc.info['name']
-                    if proc_name == 'WSServer-Win64-Shipping.exe':
-                        shipping_pid = proc.info['pid']
-                        break
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+            if self.process_registry.find(force_rescan=True):
+                shipping_pid = self.process_registry.pid
             
             # 检查服务器进程状态
             if shipping_pid:
                 # 服务器进程存在，直接设置为在线状态
-                process = psutil.Process(shipping_pid)
                 self.real_server_pid = shipping_pid
                 self.is_running = True  # 直接设置为在线状态
-                self.start_time = datetime.datetime.fromtimestamp(process.create_time())
+                self.start_time = datetime.datetime.fromtimestamp(self.process_registry.create_time)
                 
                 if not silent_mode:
                     self.log_message.emit("🔍 检测到已有进程，准备加载...")
@@ -1104,11 +1666,15 @@ class ServerManager(QObject):
                 self.server_started.emit()
                 
                 # 启动持续日志监控
-                threading.Thread(target=self._monitor_existing_process_logs, daemon=True).start()
+                self._monitor_existing_process_logs()
+                self.resource_governor.apply_server(shipping_pid, PHASE_RUNNING)
+                self._start_resource_sampling()
+                self._arm_watchdog()
+                self._watch_server_process()
                 
                 # 启动WS.log文件监控来读取mod信息
                 self.log_monitor_running = True
-                threading.Thread(target=self._monitor_server_log_file, daemon=True).start()
+                self._monitor_server_log_file()
                 
                 if not silent_mode:
                     # 检测到已有进程时，不自动尝试连接RCON，避免在RCON未启动时显示连接成功
@@ -1132,123 +1698,226 @@ class ServerManager(QObject):
             pass
     
     def _monitor_existing_process_logs(self):
-        """监控已存在进程的日志输出（仅监控 WSServer-Win64-Shipping.exe）"""
+        """启动已存在进程的监控任务（仅监控 WSServer-Win64-Shipping.exe，由调度器每5秒检查一次）"""
+        if self.scheduler.is_active('existing_process_monitor'):
+            return  # 避免重复启动
         try:
-            import os
-            import time
-            from datetime import datetime
-            
             # 创建专门的监控日志文件
             log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logs")
-            monitor_log = os.path.join(log_dir, "process_monitor.log")
+            log_name = "process_monitor.log" if self.instance_name == "default" else f"process_monitor_{self.instance_name}.log"
+            monitor_log = os.path.join(log_dir, log_name)
             os.makedirs(log_dir, exist_ok=True)
             
-            with open(monitor_log, 'a', encoding='utf-8') as log_file:
-                log_file.write(f"\n=== 开始监控已存在进程（仅监控 WSServer-Win64-Shipping.exe） {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
-                log_file.flush()
+            self._process_monitor_file = open(monitor_log, 'a', encoding='utf-8')
+            self._process_monitor_file.write(f"\n=== 开始监控已存在进程（仅监控 WSServer-Win64-Shipping.exe） {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
+            self._process_monitor_file.flush()
+            
+            # 持续监控服务器进程状态
+            self.scheduler.call_every(5.0, self._check_existing_process_status,
+                                      name='existing_process_monitor', initial_delay=0)
+        except Exception as e:
+            self.log_message.emit(f"监控已存在进程时出错: {str(e)}")
+    
+    def _check_existing_process_status(self):
+        """检查一次已存在进程的状态（调度任务，返回False时停止监控）"""
+        try:
+            # 检查服务器进程是否在运行（O(1)身份校验，身份丢失时才重新扫描）
+            shipping_running = self._locate_shipping_process() is not None
+            
+            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._process_monitor_file.write(f"[{timestamp}] [MONITOR] WSServer-Win64-Shipping.exe: {'运行' if shipping_running else '停止'}\n")
+            self._process_monitor_file.flush()
+            
+            # 根据服务器进程状态更新服务器状态
+            if shipping_running:
+                # 进程重新出现，清理宽容期标记
+                if hasattr(self, 'process_missing_start_time'):
+                    self.log_message.emit("✅ WSServer-Win64-Shipping.exe进程已恢复，取消宽容期")
+                    delattr(self, 'process_missing_start_time')
                 
-                # 持续监控服务器进程状态
-                import psutil
-                while True:
-                    try:
-                        shipping_running = False
-                        
-                        # 检查服务器进程是否在运行
-                        for proc in psutil.process_iter(['pid', 'name']):
-                            try:
-                                proc_name = proc.info['name']
-                                if proc_name == 'WSServer-Win64-Shipping.exe':
-                                    shipping_running = True
-                                    break
-                            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                                continue
-                        
-                        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        log_file.write(f"[{timestamp}] [MONITOR] WSServer-Win64-Shipping.exe: {'运行' if shipping_running else '停止'}\n")
-                        log_file.flush()
-                        
-                        # 根据服务器进程状态更新服务器状态
-                        if shipping_running:
-                            # 进程重新出现，清理宽容期标记
+                # 服务器进程在运行，但不自动设置为在线
+                # 只有通过关键字符串检测才能设置为在线状态
+                if not self.is_running:
+                    # 只有在真正启动过程中才显示启动计时和超时检查
+                    if hasattr(self, 'startup_in_progress') and self.startup_in_progress and hasattr(self, 'start_time'):
+                        running_time = datetime.datetime.now() - self.start_time.replace(tzinfo=None)
+                        # 如果超过10分钟仍未检测到启动关键字，则认为启动失败
+                        if running_time.total_seconds() > 600:  # 10分钟 = 600秒
+                            self.log_message.emit("❌ 服务器启动超时（10分钟），未检测到启动完成信号，启动失败")
+                            self.log_message.emit("💡 建议检查服务器配置或查看完整日志排查问题")
+                            # 设置为离线状态
+                            self.log_message.emit("🔍 [离线判断] 服务器启动超时（超过10分钟未检测到启动完成）")
+                            
+                            # 清除启动标志
+                            self.startup_in_progress = False
+                            self.startup_timeline.finish('failed')
+                            self._pending_restart = None
+                            self._report_startup_failure("启动超时（10分钟），未检测到启动完成信号")
+                            
+                            self.is_running = False
+                            self.status_changed.emit(False)
+                            self._process_monitor_file.write(f"[{timestamp}] [MONITOR] 服务器启动超时，设置为离线状态\n")
+                            self._process_monitor_file.flush()
+                            return self._stop_existing_process_monitor()  # 退出监控
+                        else:
+                            # 仍在等待启动完成，保持启动中状态
+                            elapsed_minutes = int(running_time.total_seconds() // 60)
+                            if elapsed_minutes > 0 and running_time.total_seconds() % 60 < 5:  # 每分钟提示一次
+                                self.log_message.emit(f"⏳ 服务器启动中...已等待 {elapsed_minutes} 分钟，最多等待10分钟")
+            else:
+                # 服务器进程缺失 - 增加宽容期，避免误判
+                if self.is_running:
+                    # 检查是否已经记录了进程缺失的时间
+                    if not hasattr(self, 'process_missing_start_time'):
+                        self.process_missing_start_time = datetime.datetime.now()
+                        self.log_message.emit("⚠️ 检测到WSServer-Win64-Shipping.exe进程缺失，开始30秒宽容期...")
+                        self._process_monitor_file.write(f"[{timestamp}] [MONITOR] 进程缺失，开始宽容期\n")
+                        self._process_monitor_file.flush()
+                    else:
+                        # 检查宽容期是否已过
+                        missing_duration = datetime.datetime.now() - self.process_missing_start_time
+                        if missing_duration.total_seconds() > 30:  # 30秒宽容期
+                            self.log_message.emit("🔍 [离线判断] WSServer-Win64-Shipping.exe进程缺失超过30秒，判断为服务器停止")
+                            self.log_message.emit(f"❌ 服务器进程已停止")
+                            self.log_message.emit("💡 如果服务器仍在运行但进程名不同，请检查服务器配置")
+                            self.is_running = False
+                            self.status_changed.emit(False)
+                            self._process_monitor_file.write(f"[{timestamp}] [MONITOR] 进程缺失超过宽容期，设置为离线\n")
+                            self._process_monitor_file.flush()
+                            # 清理宽容期标记
                             if hasattr(self, 'process_missing_start_time'):
-                                self.log_message.emit("✅ WSServer-Win64-Shipping.exe进程已恢复，取消宽容期")
                                 delattr(self, 'process_missing_start_time')
-                            
-                            # 服务器进程在运行，但不自动设置为在线
-                            # 只有通过关键字符串检测才能设置为在线状态
-                            if not self.is_running:
-                                # 只有在真正启动过程中才显示启动计时和超时检查
-                                if hasattr(self, 'startup_in_progress') and self.startup_in_progress and hasattr(self, 'start_time'):
-                                    running_time = datetime.now() - self.start_time.replace(tzinfo=None)
-                                    # 如果超过10分钟仍未检测到启动关键字，则认为启动失败
-                                    if running_time.total_seconds() > 600:  # 10分钟 = 600秒
-                                        self.log_message.emit("❌ 服务器启动超时（10分钟），未检测到启动完成信号，启动失败")
-                                        self.log_message.emit("💡 建议检查服务器配置或查看完整日志排查问题")
-                                        # 设置为离线状态
-                                        self.log_message.emit("🔍 [离线判断] 服务器启动超时（超过10分钟未检测到启动完成）")
-                                        
-                                        # 清除启动标志
-                                        self.startup_in_progress = False
-                                        
-                                        self.is_running = False
-                                        self.status_changed.emit(False)
-                                        log_file.write(f"[{timestamp}] [MONITOR] 服务器启动超时，设置为离线状态\n")
-                                        log_file.flush()
-                                        break  # 退出监控循环
-                                    else:
-                                        # 仍在等待启动完成，保持启动中状态
-                                        elapsed_minutes = int(running_time.total_seconds() // 60)
-                                        if elapsed_minutes > 0 and running_time.total_seconds() % 60 < 5:  # 每分钟提示一次
-                                            self.log_message.emit(f"⏳ 服务器启动中...已等待 {elapsed_minutes} 分钟，最多等待10分钟")
+                            return self._stop_existing_process_monitor()
                         else:
-                            # 服务器进程缺失 - 增加宽容期，避免误判
-                            if self.is_running:
-                                # 检查是否已经记录了进程缺失的时间
-                                if not hasattr(self, 'process_missing_start_time'):
-                                    self.process_missing_start_time = datetime.now()
-                                    self.log_message.emit("⚠️ 检测到WSServer-Win64-Shipping.exe进程缺失，开始30秒宽容期...")
-                                    log_file.write(f"[{timestamp}] [MONITOR] 进程缺失，开始宽容期\n")
-                                    log_file.flush()
-                                else:
-                                    # 检查宽容期是否已过
-                                    missing_duration = datetime.now() - self.process_missing_start_time
-                                    if missing_duration.total_seconds() > 30:  # 30秒宽容期
-                                        self.log_message.emit("🔍 [离线判断] WSServer-Win64-Shipping.exe进程缺失超过30秒，判断为服务器停止")
-                                        self.log_message.emit(f"❌ 服务器进程已停止")
-                                        self.log_message.emit("💡 如果服务器仍在运行但进程名不同，请检查服务器配置")
-                                        self.is_running = False
-                                        self.status_changed.emit(False)
-                                        log_file.write(f"[{timestamp}] [MONITOR] 进程缺失超过宽容期，设置为离线\n")
-                                        log_file.flush()
-                                        # 清理宽容期标记
-                                        if hasattr(self, 'process_missing_start_time'):
-                                            delattr(self, 'process_missing_start_time')
-                                        break
-                                    else:
-                                        # 仍在宽容期内
-                                        remaining_seconds = 30 - int(missing_duration.total_seconds())
-                                        if int(missing_duration.total_seconds()) % 10 == 0:  # 每10秒提示一次
-                                            self.log_message.emit(f"⏳ 进程缺失宽容期：还有 {remaining_seconds} 秒")
-                            else:
-                                # 服务器本来就不在运行状态，清理宽容期标记
-                                if hasattr(self, 'process_missing_start_time'):
-                                    delattr(self, 'process_missing_start_time')
-                        
-                        time.sleep(5)  # 每5秒检查一次
-                        
-                    except Exception as e:
-                        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        log_file.write(f"[{timestamp}] [MONITOR] 监控出错: {str(e)}\n")
-                        log_file.flush()
-                        time.sleep(5)
-                
-                log_file.write(f"=== 监控结束 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
-                
+                            # 仍在宽容期内
+                            remaining_seconds = 30 - int(missing_duration.total_seconds())
+                            if int(missing_duration.total_seconds()) % 10 == 0:  # 每10秒提示一次
+                                self.log_message.emit(f"⏳ 进程缺失宽容期：还有 {remaining_seconds} 秒")
+                else:
+                    # 服务器本来就不在运行状态，清理宽容期标记
+                    if hasattr(self, 'process_missing_start_time'):
+                        delattr(self, 'process_missing_start_time')
+            
+        except Exception as e:
+            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._process_monitor_file.write(f"[{timestamp}] [MONITOR] 监控出错: {str(e)}\n")
+            self._process_monitor_file.flush()
+        return True
+    
+    def _stop_existing_process_monitor(self):
+        """结束已存在进程的监控，关闭监控日志文件"""
+        try:
+            self._process_monitor_file.write(f"=== 监控结束 {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
+            self._process_monitor_file.close()
         except Exception as e:
             self.log_message.emit(f"监控已存在进程时出错: {str(e)}")
+        return False
     
     # 已删除 _monitor_server_log_file 方法，改用日志文件监控
     
+    def _begin_startup_timeline(self):
+        """开始记录本次启动的时间线，并在事件循环中探测RCON/查询端口"""
+        try:
+            self.startup_timeline.begin(self.server_path)
+            self.async_core.submit(self._probe_startup_endpoints(), name='startup_probe')
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 记录启动时间线失败: {str(e)}")
+    
+    def _mark_startup_phase(self, phase, at=None, launch_id=None):
+        """记录启动阶段并输出耗时"""
+        try:
+            offset = self.startup_timeline.mark(phase, at, launch_id=launch_id)
+            if offset is not None:
+                self.log_message.emit(f"⏱️ 启动阶段 {phase}: {offset:.1f} 秒")
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 记录启动阶段失败: {str(e)}")
+    
+    def _log_line_time(self, line_text):
+        """日志行的写入时间：优先使用行首时间戳，没有或早于本次启动时使用当前时间"""
+        now = time.time()
+        timestamp = parse_log_timestamp(line_text, now)
+        started_at = self.startup_timeline.started_at
+        if timestamp is None or (started_at and timestamp < started_at - 5):
+            return now
+        return min(timestamp, now)
+    
+    async def _probe_startup_endpoints(self):
+        """启动期间并发探测RCON端口和查询端口，记录它们开始响应的时间"""
+        host = self.server_config.get('multihome', DEFAULT_SERVER_CONFIG['multihome'])
+        if not host or host == '0.0.0.0':
+            host = '127.0.0.1'
+        query_port = self.server_config.get('query_port', DEFAULT_SERVER_CONFIG['query_port'])
+        probes = {'query_port': lambda: probe_a2s_info(host, query_port)}
+        if self.server_config.get('rcon_enabled', DEFAULT_SERVER_CONFIG['rcon_enabled']):
+            rcon_addr = self.server_config.get('rcon_addr', DEFAULT_SERVER_CONFIG['rcon_addr'])
+            rcon_port = self.server_config.get('rcon_port', DEFAULT_SERVER_CONFIG['rcon_port'])
+            probes['rcon_reachable'] = lambda: probe_tcp(rcon_addr, rcon_port)
+        
+        # 端口可能在启动完成关键字之后才响应，服务器上线后继续探测并补记到本次启动
+        launch_id = self.startup_timeline.launch_id
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while probes and self.startup_timeline.accepts(launch_id) and time.monotonic() < deadline:
+            phases = list(probes)
+            results = await asyncio.gather(*(probes[phase]() for phase in phases))
+            for phase, reachable in zip(phases, results):
+                if reachable:
+                    self._mark_startup_phase(phase, launch_id=launch_id)
+                    del probes[phase]
+            await asyncio.sleep(STARTUP_PROBE_INTERVAL)
+    
+    def get_startup_history(self, limit=20):
+        """获取最近的启动时间线记录"""
+        return self.startup_timeline.recent_launches(limit)
+    
+    def get_startup_summary(self):
+        """按buildid和MOD数量汇总各启动阶段的平均耗时"""
+        return self.startup_timeline.phase_summary()
+    
+    def _start_resource_sampling(self):
+        """开始定时采集服务器进程资源（同名任务已在运行时不会重复启动）"""
+        if self.shared_polling:
+            return
+        self.scheduler.call_every(RESOURCE_SAMPLE_INTERVAL, self._sample_resources,
+                                  name='resource_sampler', initial_delay=0)
+    
+    def _sample_resources(self):
+        """采集一次资源数据（调度任务，服务器进程退出后自动停止）"""
+        if not self.process_registry.is_alive():
+            return False
+        return self.resource_sampler.sample(self.process_registry.process)
+    
+    def get_resource_history(self, field, last=None):
+        """获取资源指标历史数据
+        
+        Args:
+            field (str): 指标名称，见 ResourceSampler.FIELDS
+            last (int): 只返回最近的若干个样本
+        
+        Returns:
+            list: (时间戳, 数值) 列表
+        """
+        return self.resource_sampler.history(field, last)
+    
+    def get_tick_history(self, field, last=None):
+        """获取服务器帧率遥测历史数据
+        
+        Args:
+            field (str): 指标名称，见 TickTelemetry.FIELDS
+            last (int): 只返回最近的若干个数据点
+        
+        Returns:
+            list: (时间戳, 数值) 列表
+        """
+        return self.tick_telemetry.history(field, last)
+    
+    def get_background_tasks(self):
+        """获取后台调度任务的运行统计
+        
+        Returns:
+            dict: 任务名 -> 统计信息（是否活动、运行次数、平均/最大耗时、错误数等）
+        """
+        return self.scheduler.get_stats()
+    
     def get_server_status(self):
         """获取服务器状态"""
         # 检查是否正在启动中
@@ -1259,7 +1928,14 @@ class ServerManager(QObject):
             'starting': is_starting,  # 添加启动中状态
             'process': self.server_process is not None,
             'path': self.server_path,
-            'rcon_connected': self.is_rcon_connected
+            'rcon_connected': self.is_rcon_connected,
+            'tasks': self.scheduler.live_tasks(),  # 当前活动的后台任务
+            'watchdog': self.watchdog.state,  # 崩溃看门狗状态
+            'operations': self.async_core.live_operations(),  # 事件循环中正在执行的操作
+            'rcon_latency': self.rcon_latency,  # 最近一次RCON命令往返耗时（秒）
+            'uptime_seconds': 0,
+            'player_count': 0,
+            'rss': 0
         }
         
         # 如果服务器正在运行，添加更多状态信息
@@ -1280,6 +1956,7 @@ class ServerManager(QObject):
                     # 确保运行时间不为负数
                     if uptime_seconds < 0:
                         uptime_seconds = 0
+                    status['uptime_seconds'] = uptime_seconds
                     
                     hours, remainder = divmod(uptime_seconds, 3600)
                     minutes, seconds = divmod(remainder, 60)
@@ -1295,6 +1972,7 @@ class ServerManager(QObject):
             # 使用保存的玩家数量或默认值
             if hasattr(self, 'current_players') and hasattr(self, 'max_players'):
                 status['players'] = f"{self.current_players}/{self.max_players}"
+                status['player_count'] = self.current_players
             else:
                 # 使用配置中的最大玩家数
                 try:
@@ -1306,59 +1984,52 @@ class ServerManager(QObject):
                     self.log_message.emit(f"获取玩家数量时出错: {str(e)}")
                     status['players'] = "0/0"
             
-            # 获取内存使用情况
-            try:
-                import psutil
-                # 优先使用真实服务器进程PID，如果没有则使用启动进程PID
-                target_pid = getattr(self, 'real_server_pid', None) or (self.server_process.pid if self.server_process else None)
-                
-                if target_pid:
-                    try:
-                        process = psutil.Process(target_pid)
-                        # 检查进程是否仍然存在且正在运行
-                        if process.is_running():
-                            memory_info = process.memory_info()
-                            memory_mb = memory_info.rss / 1024 / 1024  # 转换为MB
-                            status['memory'] = f"{memory_mb:.2f} MB"
-                            status['memory_percent'] = min(int((memory_mb / 1000) * 100), 100)  # 假设最大内存为1000MB，确保不超过100%
-                        else:
-                            # 进程已停止
-                            status['memory'] = "-- MB"
-                            status['memory_percent'] = 0
-                    except psutil.NoSuchProcess:
-                        # 进程不存在
-                        status['memory'] = "-- MB"
-                        status['memory_percent'] = 0
-                    except psutil.AccessDenied:
-                        # 权限不足
-                        status['memory'] = "权限不足"
-                        status['memory_percent'] = 0
-                    except Exception as e:
-                        # 其他异常
-                        status['memory'] = f"错误: {str(e)[:20]}"
-                        status['memory_percent'] = 0
-                else:
-                    status['memory'] = "-- MB"
-                    status['memory_percent'] = 0
-            except ImportError:
-                # psutil未安装
-                status['memory'] = "-- MB"
-                status['memory_percent'] = 0
-            except Exception:
-                # 其他异常
+            # 资源占用读取采样器的最近一次样本，不直接查询操作系统
+            sample = self.resource_sampler.latest()
+            if sample:
+                status['memory'] = f"{sample['rss'] / 1024 / 1024:.2f} MB"
+                status['rss'] = int(sample['rss'])
+                status['memory_percent'] = min(int(sample['memory_percent']), 100)  # 占物理内存的百分比
+                status['cpu'] = f"{sample['cpu_percent']:.1f}%"
+                status['cpu_percent'] = sample['cpu_percent']
+                status['threads'] = int(sample['threads'])
+                status['handles'] = int(sample['handles'])
+            else:
                 status['memory'] = "-- MB"
                 status['memory_percent'] = 0
+                status['cpu'] = "--%"
+                status['cpu_percent'] = 0
+            
+            # 帧率读取遥测的最近一个数据点，卡顿和长帧为最近 TICK_SUMMARY_WINDOW 秒内的次数
+            tick = self.tick_telemetry.summary(TICK_SUMMARY_WINDOW)
+            if tick:
+                status['tick'] = f"{tick['fps']:.1f} FPS"
+                if tick['hitches'] or tick['long_frames']:
+                    status['tick'] += f" · 卡顿 {tick['hitches']} · 长帧 {tick['long_frames']}"
+                status['server_fps'] = tick['fps']
+                status['max_frame_ms'] = tick['max_frame_ms']
+                status['hitches'] = tick['hitches']
+                status['long_frames'] = tick['long_frames']
+            else:
+                status['tick'] = "-- FPS"
         else:
             status['uptime'] = "--:--:--"
             status['players'] = "--"
+            status['tick'] = "-- FPS"
             status['memory'] = "-- MB"
             status['memory_percent'] = 0
+            status['cpu'] = "--%"
+            status['cpu_percent'] = 0
             
         return status
     
 
     
     def execute_rcon_command(self, command, log_command=True, log_response=True):
+        """执行RCON命令并返回结果（同步接口，在事件循环中执行）"""
+        return self.async_core.run(self._execute_rcon_command_async(command, log_command, log_response))
+    
+    async def _execute_rcon_command_async(self, command, log_command=True, log_response=True):
         """执行RCON命令并返回结果
         
         Args:
@@ -1373,34 +2044,34 @@ class ServerManager(QObject):
             return "错误: RCON未连接"
             
         try:
-            # 发送命令
-            if log_command:
-                self.log_message.emit(f"RCON已发送: {command}")
-            self._send_rcon_packet(2, command, log_command=False)  # 避免重复日志输出
-            response = self._receive_rcon_packet(log_response=log_response)
-            
-            if response:
-                # 处理响应内容，确保返回正确的命令结果
-                response_body = response['body'].strip()
-                
-                # 直接返回服务器的响应，不进行特殊处理
-                # 这样用户输入的命令会直接发送到服务器，并显示服务器返回的原始响应
-                
-                return response_body
-            else:
+            # 请求ID固定，同一连接上的命令由客户端逐个往返，否则并发读取会拿到彼此的响应
+            response_body = await self._rcon_round_trip_async(command, log_command, log_response)
+            if response_body is None:
                 return "命令执行失败，未收到响应"
+            # 直接返回服务器的响应，不进行特殊处理
+            # 这样用户输入的命令会直接发送到服务器，并显示服务器返回的原始响应
+            return response_body.strip()
                 
         except Exception as e:
             return f"错误: {str(e)}"
     
     def get_online_players(self):
-        """获取在线玩家列表（GUI调用的方法）"""
+        """获取在线玩家列表（GUI调用的方法）
+        
+        RCON已连接时发送lp查询并校正在线玩家名单，未连接或查询失败时返回由WS.log维护的名单。
+        """
         if not self.is_rcon_connected:
-            return []
+            return self.player_roster.players()
+        return self.async_core.run(self._query_online_players_async())
+    
+    async def _query_online_players_async(self):
+        """发送lp查询并校正在线玩家名单（事件循环中执行），返回校正后的名单"""
+        if not self.is_rcon_connected:
+            return self.player_roster.players()
         
         try:
             # 使用RCON命令获取玩家列表，不记录到服务器日志区
-            response = self.execute_rcon_command("lp", log_command=False, log_response=False)
+            response = await self._execute_rcon_command_async("lp", log_command=False, log_response=False)
             if response and "错误" not in response:
                 # 解析玩家列表响应，不输出调试信息到服务器日志区
                 players = []
@@ -1432,9 +2103,14 @@ class ServerManager(QObject):
                                     'status': 'online'  # 在线状态
                                 }
                                 players.append(player_info)
-                return players
+                if self.player_roster.reconcile(players):
+                    self.log_message.emit(f"🔄 已根据lp校正在线玩家名单: {len(players)} 人")
+                    self._publish_players()
+                else:
+                    self.players_updated_at = time.time()
+                return self.player_roster.players()
             else:
-                return []
+                return self.player_roster.players()
         except Exception as e:
             # 获取玩家列表失败时不记录到服务器日志区
-            return []
\ No newline at end of file
+            return self.player_roster.players()
\ No newline at end of file
@@ -7,7 +7,7 @@
 
 import os
 import json
-from PySide6.QtCore import QObject, Signal
+from ..common.qt_compat import QObject, Signal
 from ..common.utils import get_app_dir
 from ..common.constants import DEFAULT_CONFIG_FILE, DEFAULT_SERVER_CONFIG
 
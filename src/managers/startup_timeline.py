@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+启动时间线模块 - 把每次启动各阶段的耗时记录到本地SQLite数据库
+"""
+
+import os
+import re
+import time
+import sqlite3
+import asyncio
+import datetime
+import threading
+from ..common.constants import GAME_APP_ID
+from ..common.utils import get_world_save_files
+
+# 启动阶段（按正常顺序）
+STARTUP_PHASES = (
+    'popen',              # 启动进程已创建
+    'shipping_spawned',   # WSServer-Win64-Shipping.exe 已出现
+    'first_log_line',     # WS.log 写入第一行
+    'mods_loaded',        # 最后一个MOD加载完成
+    'dungeons_created',   # 检测到启动完成关键字（地下城创建完成）
+    'rcon_reachable',     # RCON端口可连接
+    'query_port'          # 查询端口响应A2S_INFO
+)
+
+# UE日志行首时间戳，例如 [2024.05.08-10.19.23:519][  0]
+UE_LOG_TIMESTAMP = re.compile(r'^\[(\d{4})\.(\d{2})\.(\d{2})-(\d{2})\.(\d{2})\.(\d{2}):(\d{3})\]')
+
+# A2S_INFO 查询请求
+A2S_INFO_REQUEST = b'\xFF\xFF\xFF\xFFTSource Engine Query\x00'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS launches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instance TEXT NOT NULL DEFAULT 'default',
+    started_at REAL NOT NULL,
+    buildid TEXT,
+    mod_count INTEGER,
+    world_db_size INTEGER,
+    outcome TEXT,
+    total_seconds REAL
+);
+CREATE TABLE IF NOT EXISTS phases (
+    launch_id INTEGER NOT NULL REFERENCES launches(id),
+    phase TEXT NOT NULL,
+    offset_seconds REAL NOT NULL,
+    PRIMARY KEY (launch_id, phase)
+);
+"""
+
+
+def read_build_id(server_path):
+    """从SteamCMD的appmanifest中读取服务端buildid
+
+    服务端安装在 steamapps/common/<游戏目录>，清单文件位于 steamapps 目录下
+    """
+    steamapps_dir = os.path.dirname(os.path.dirname(os.path.normpath(server_path)))
+    manifest = os.path.join(steamapps_dir, f"appmanifest_{GAME_APP_ID}.acf")
+    try:
+        with open(manifest, 'r', encoding='utf-8', errors='ignore') as f:
+            match = re.search(r'"buildid"\s+"(\d+)"', f.read())
+            return match.group(1) if match else None
+    except OSError:
+        return None
+
+
+def get_world_db_size(server_path):
+    """统计存档数据库文件（WS/Saved/Worlds 下的 *.db）的总大小（字节）"""
+    total = 0
+    for path in get_world_save_files(server_path):
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            continue
+    return total
+
+
+def parse_log_timestamp(line, observed_at):
+    """解析UE日志行首时间戳
+
+    UE日志时间可能是UTC也可能是本地时间，取两种解释中最接近读取时刻的一个。
+
+    Args:
+        line (str): 日志行
+        observed_at (float): 读取到该行的时间戳
+
+    Returns:
+        float or None: 日志时间戳，行首没有时间戳时返回None
+    """
+    match = UE_LOG_TIMESTAMP.match(line)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, millis = (int(value) for value in match.groups())
+    try:
+        naive = datetime.datetime(year, month, day, hour, minute, second, millis * 1000)
+    except ValueError:
+        return None
+    as_local = naive.timestamp()
+    as_utc = naive.replace(tzinfo=datetime.timezone.utc).timestamp()
+    return min((as_local, as_utc), key=lambda ts: abs(observed_at - ts))
+
+
+async def probe_tcp(host, port, timeout=1.0):
+    """检查TCP端口是否可以建立连接"""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port)), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+class _DatagramProbe(asyncio.DatagramProtocol):
+    """收到任意UDP响应即完成"""
+
+    def __init__(self, future):
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if not self.future.done():
+            self.future.set_result(data)
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+async def probe_a2s_info(host, port, timeout=1.0):
+    """向查询端口发送A2S_INFO请求，收到响应（包括挑战包）即认为端口已就绪"""
+    loop = asyncio.get_running_loop()
+    response = loop.create_future()
+    try:
+        transport, _ = await loop.create_datagram_endpoint(lambda: _DatagramProbe(response),
+                                                           remote_addr=(host, int(port)))
+    except OSError:
+        return False
+    try:
+        transport.sendto(A2S_INFO_REQUEST)
+        await asyncio.wait_for(response, timeout)
+        return True
+    except (OSError, asyncio.TimeoutError):
+        return False
+    finally:
+        transport.close()
+
+
+class StartupTimeline:
+    """启动时间线记录器
+
+    每次启动对应 launches 表中的一行，各阶段相对进程创建时刻的偏移记录在 phases 表中；
+    同一阶段默认只记录第一次，mods_loaded 等需要取最后一次的阶段使用 overwrite=True。
+    多个实例共用一个数据库，启动记录按 instance 区分。
+    finish() 之后不再修改该次启动已记录的阶段；成功上线的启动仍可由端口探测通过
+    mark(..., launch_id=...) 补记尚未记录的阶段（端口可能在启动完成关键字之后才响应）。
+    """
+
+    def __init__(self, db_path, instance="default"):
+        self.db_path = db_path
+        self.instance = instance
+        self._lock = threading.Lock()
+        self._conn = None
+        self.launch_id = None
+        self.started_at = None
+        self.mod_count = 0
+        self._phases = {}
+        self._finished = None  # 最近一次成功上线的启动 (ID, 启动时刻, 已记录的阶段)
+
+    @property
+    def active(self):
+        """是否有正在记录的启动"""
+        return self.launch_id is not None
+
+    def begin(self, server_path, started_at=None):
+        """开始记录一次启动（记录 popen 阶段）
+
+        Returns:
+            int: 启动记录ID
+        """
+        started_at = started_at or time.time()
+        buildid = read_build_id(server_path)
+        world_db_size = get_world_db_size(server_path)
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "INSERT INTO launches (instance, started_at, buildid, world_db_size, outcome) VALUES (?, ?, ?, ?, ?)",
+                (self.instance, started_at, buildid, world_db_size, 'starting'))
+            self.launch_id = cursor.lastrowid
+            self.started_at = started_at
+            self.mod_count = 0
+            self._phases = {}
+            self._finished = None
+            conn.commit()
+        self.mark('popen', started_at)
+        return self.launch_id
+
+    def mark(self, phase, at=None, overwrite=False, launch_id=None):
+        """记录阶段到达时间
+
+        Args:
+            phase (str): 阶段名称，见 STARTUP_PHASES
+            at (float): 到达时间戳，默认为当前时间
+            overwrite (bool): 是否覆盖已记录的时间（只对正在记录的启动有效）
+            launch_id (int): 指定启动记录，可以是刚成功上线的启动；默认为正在记录的启动
+
+        Returns:
+            float or None: 相对启动时刻的秒数，未在记录或阶段已记录时返回None
+        """
+        with self._lock:
+            if launch_id is None or launch_id == self.launch_id:
+                if self.launch_id is None or (phase in self._phases and not overwrite):
+                    return None
+                launch_id, started_at, phases = self.launch_id, self.started_at, self._phases
+            elif self._finished is not None and self._finished[0] == launch_id:
+                launch_id, started_at, phases = self._finished
+                if phase in phases:
+                    return None
+            else:
+                return None
+            offset = max(0.0, (at or time.time()) - started_at)
+            phases[phase] = offset
+            self._conn.execute("INSERT OR REPLACE INTO phases (launch_id, phase, offset_seconds) VALUES (?, ?, ?)",
+                               (launch_id, phase, offset))
+            self._conn.commit()
+            return offset
+
+    def accepts(self, launch_id):
+        """该启动记录是否还可以记录阶段（正在记录，或刚成功上线）"""
+        with self._lock:
+            return launch_id is not None and (launch_id == self.launch_id or
+                                              (self._finished is not None and self._finished[0] == launch_id))
+
+    def has_phase(self, phase):
+        """本次启动是否已记录该阶段"""
+        with self._lock:
+            return phase in self._phases
+
+    def note_mod_loaded(self, at=None):
+        """记录一次MOD加载"""
+        with self._lock:
+            if self.launch_id is None:
+                return
+            self.mod_count += 1
+            self._conn.execute("UPDATE launches SET mod_count = ? WHERE id = ?", (self.mod_count, self.launch_id))
+        self.mark('mods_loaded', at, overwrite=True)
+
+    def finish(self, outcome):
+        """结束本次启动记录
+
+        Args:
+            outcome (str): 结果，如 online / failed / aborted
+        """
+        with self._lock:
+            if self.launch_id is None:
+                return
+            total = self._phases.get('dungeons_created') if outcome == 'online' else None
+            self._conn.execute("UPDATE launches SET outcome = ?, total_seconds = ? WHERE id = ?",
+                               (outcome, total, self.launch_id))
+            self._conn.commit()
+            self._finished = (self.launch_id, self.started_at, self._phases) if outcome == 'online' else None
+            self.launch_id = None
+
+    def close_launch(self):
+        """停止记录当前启动（未结束的启动标记为aborted）"""
+        with self._lock:
+            self._finished = None
+            if self.launch_id is None:
+                return
+            self._conn.execute("UPDATE launches SET outcome = 'aborted' WHERE id = ? AND outcome = 'starting'",
+                               (self.launch_id,))
+            self._conn.commit()
+            self.launch_id = None
+
+    def recent_launches(self, limit=20):
+        """获取本实例最近的启动记录
+
+        Returns:
+            list: 每次启动的信息字典，phases 为 阶段 -> 秒数
+        """
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT id, started_at, buildid, mod_count, world_db_size, outcome, total_seconds "
+                "FROM launches WHERE instance = ? ORDER BY id DESC LIMIT ?", (self.instance, limit)).fetchall()
+            launches = []
+            for row in rows:
+                phases = dict(conn.execute("SELECT phase, offset_seconds FROM phases WHERE launch_id = ?",
+                                           (row[0],)).fetchall())
+                launches.append({
+                    'id': row[0],
+                    'started_at': row[1],
+                    'buildid': row[2],
+                    'mod_count': row[3],
+                    'world_db_size': row[4],
+                    'outcome': row[5],
+                    'total_seconds': row[6],
+                    'phases': phases
+                })
+            return launches
+
+    def phase_summary(self):
+        """按buildid和MOD数量汇总本实例成功启动的各阶段平均耗时，便于比较更新或新MOD对冷启动的影响
+
+        Returns:
+            list: [{'buildid', 'mod_count', 'launches', 'phases': {阶段: 平均秒数}}]
+        """
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT l.buildid, l.mod_count, p.phase, AVG(p.offset_seconds), COUNT(DISTINCT l.id) "
+                "FROM launches l JOIN phases p ON p.launch_id = l.id "
+                "WHERE l.outcome = 'online' AND l.instance = ? GROUP BY l.buildid, l.mod_count, p.phase",
+                (self.instance,)).fetchall()
+        summary = {}
+        for buildid, mod_count, phase, avg_offset, launches in rows:
+            entry = summary.setdefault((buildid, mod_count), {
+                'buildid': buildid, 'mod_count': mod_count, 'launches': 0, 'phases': {}})
+            entry['launches'] = max(entry['launches'], launches)
+            entry['phases'][phase] = avg_offset
+        return list(summary.values())
+
+    def _connect(self):
+        """按需打开数据库（调用方需持有锁）"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(launches)")}
+            if 'instance' not in columns:
+                # 旧版本数据库没有实例列，已有记录都属于默认实例
+                self._conn.execute("ALTER TABLE launches ADD COLUMN instance TEXT NOT NULL DEFAULT 'default'")
+                self._conn.commit()
+        return self._conn
@@ -8,8 +8,7 @@ SteamCMD管理模块
 import os
 import subprocess
 import zipfile
-import requests
-from PySide6.QtCore import QObject, Signal, QThread
+from ..common.qt_compat import QObject, Signal, QThread
 from ..common.constants import DEFAULT_STEAMCMD_DIR, DEFAULT_STEAMCMD_EXE, STEAMCMD_DOWNLOAD_URLS, GAME_APP_ID
 
 
@@ -25,6 +24,7 @@ class SteamCMDDownloadThread(QThread):
     
     def run(self):
         try:
+            import requests  # 只在下载时导入，无界面模式启动时不加载
             response = requests.get(self.download_url, stream=True)
             response.raise_for_status()
             
@@ -62,6 +62,7 @@ class SteamCMDManager(QObject):
         self.steamcmd_dir = DEFAULT_STEAMCMD_DIR
         self.steamcmd_exe = DEFAULT_STEAMCMD_EXE
         self.download_thread = None
+        self.resource_governor = None  # 资源策略，设置后SteamCMD运行在后台核心上并降低I/O优先级
         
         # SteamCMD下载链接
         self.steamcmd_urls = STEAMCMD_DOWNLOAD_URLS
@@ -179,9 +180,11 @@ class SteamCMDManager(QObject):
                     text=True,
                     encoding='utf-8',
                     errors='replace',
-                    creationflags=subprocess.CREATE_NO_WINDOW,
+                    creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
                     bufsize=0  # 无缓冲模式，实现实时输出
                 )
+                if self.resource_governor:
+                    self.resource_governor.apply_background(process.pid)
                 
                 # 实时读取输出并显示在GUI日志窗口中
                 self.installation_progress.emit("正在安装/更新游戏...")
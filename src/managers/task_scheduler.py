@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务调度模块 - 用单个后台线程统一执行所有周期任务和延迟任务
+"""
+
+import time
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from ..common.constants import TASK_STATS_HISTORY_SIZE
+
+
+class ScheduledTask:
+    """调度任务句柄，可用于取消任务和查看运行统计"""
+
+    def __init__(self, scheduler, name, callback, args, interval, next_run, stats_name=None):
+        self._scheduler = scheduler
+        self.name = name
+        self.stats_name = stats_name or name  # 累计统计使用的名称（未命名任务按回调名合并）
+        self.callback = callback
+        self.args = args
+        self.interval = interval  # None表示一次性任务
+        self.next_run = next_run
+        self.cancelled = False
+        self.finished = False
+
+        # 运行统计
+        self.runs = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_duration = 0.0
+        self.last_run = None  # 最近一次运行的时间戳
+        self.errors = 0
+        self.last_error = None
+
+    @property
+    def active(self):
+        """任务是否仍在调度队列中"""
+        return not self.cancelled and not self.finished
+
+    def cancel(self):
+        """取消任务（正在运行的回调会执行完，但不会再被调度）"""
+        self._scheduler._cancel(self)
+
+    def get_stats(self):
+        """获取任务运行统计"""
+        return {
+            'name': self.name,
+            'periodic': self.interval is not None,
+            'interval': self.interval,
+            'active': self.active,
+            'runs': self.runs,
+            'total_time': self.total_time,
+            'avg_time': self.total_time / self.runs if self.runs else 0.0,
+            'max_time': self.max_time,
+            'last_duration': self.last_duration,
+            'last_run': self.last_run,
+            'next_run_in': max(0.0, self.next_run - time.monotonic()) if self.active else None,
+            'errors': self.errors,
+            'last_error': self.last_error
+        }
+
+
+class TaskScheduler:
+    """单线程定时任务调度器
+
+    所有任务按到期时间放入最小堆，由一个后台线程依次执行；
+    任务回调应尽量短小，长时间阻塞会推迟其他任务。
+    周期任务的回调返回 False 时自动停止。
+    """
+
+    def __init__(self, name="TaskScheduler"):
+        self.name = name
+        self._queue = []
+        self._tasks = {}  # name -> ScheduledTask（周期任务结束后仍保留，便于查看统计；一次性任务运行或取消后移除）
+        self._history = OrderedDict()  # 任务名 -> 一次性任务的累计统计（按最近更新保留 TASK_STATS_HISTORY_SIZE 个）
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def call_later(self, delay, callback, *args, name=None, replace=True):
+        """延迟执行一次任务
+
+        Args:
+            delay (float): 延迟秒数
+            callback (callable): 任务回调
+            name (str): 任务名称，同名的活动任务只会存在一个
+            replace (bool): 已有同名活动任务时是否取消旧任务；为False时直接返回旧任务
+
+        Returns:
+            ScheduledTask: 任务句柄
+        """
+        return self._schedule(name, callback, args, None, delay, replace)
+
+    def call_every(self, interval, callback, *args, name=None, initial_delay=None, replace=False):
+        """周期执行任务
+
+        Args:
+            interval (float): 执行间隔秒数（从上一次回调结束开始计算）
+            callback (callable): 任务回调，返回 False 时停止后续执行
+            name (str): 任务名称，同名的活动任务只会存在一个
+            initial_delay (float): 首次执行的延迟，默认等于 interval
+            replace (bool): 已有同名活动任务时是否取消旧任务；默认直接返回旧任务，避免重复监控
+
+        Returns:
+            ScheduledTask: 任务句柄
+        """
+        delay = interval if initial_delay is None else initial_delay
+        return self._schedule(name, callback, args, interval, delay, replace)
+
+    def cancel(self, name):
+        """按名称取消任务
+
+        Returns:
+            bool: 存在该活动任务并已取消返回True
+        """
+        with self._condition:
+            task = self._tasks.get(name)
+            if task and task.active:
+                task.cancelled = True
+                self._forget(task)
+                self._condition.notify()
+                return True
+            return False
+
+    def is_active(self, name):
+        """检查指定名称的任务是否仍在调度中"""
+        with self._condition:
+            task = self._tasks.get(name)
+            return bool(task and task.active)
+
+    def get_task(self, name):
+        """获取任务句柄"""
+        with self._condition:
+            return self._tasks.get(name)
+
+    def live_tasks(self):
+        """获取所有活动任务的名称列表"""
+        with self._condition:
+            return sorted(name for name, task in self._tasks.items() if task.active)
+
+    def get_stats(self):
+        """获取所有任务的运行统计（一次性任务的统计按任务名累计，任务运行或取消后仍保留）"""
+        with self._condition:
+            stats = {task.name: task.get_stats() for task in self._tasks.values()}
+            history = {name: dict(totals) for name, totals in self._history.items()}
+        for name, totals in history.items():
+            current = stats.get(name)
+            if current is None:
+                stats[name] = current = {'name': name, 'periodic': False, 'interval': None, 'active': False,
+                                         'runs': 0, 'total_time': 0.0, 'max_time': 0.0, 'last_duration': 0.0,
+                                         'last_run': None, 'next_run_in': None, 'errors': 0, 'last_error': None}
+            elif current['periodic']:
+                continue  # 同名的周期任务自己保留统计
+            current['runs'] += totals['runs']
+            current['total_time'] += totals['total_time']
+            current['max_time'] = max(current['max_time'], totals['max_time'])
+            current['errors'] += totals['errors']
+            if current['last_run'] is None:
+                current['last_run'] = totals['last_run']
+                current['last_duration'] = totals['last_duration']
+            if current['last_error'] is None:
+                current['last_error'] = totals['last_error']
+            current['avg_time'] = current['total_time'] / current['runs'] if current['runs'] else 0.0
+        return stats
+
+    def scoped(self, prefix):
+        """获取带名称前缀的调度视图，多个服务器实例共享同一个调度线程时任务名互不冲突"""
+        return ScopedScheduler(self, prefix)
+
+    def shutdown(self):
+        """停止调度线程并取消所有任务"""
+        with self._condition:
+            self._running = False
+            for task in self._tasks.values():
+                if task.active:
+                    task.cancelled = True
+            self._queue.clear()
+            self._condition.notify()
+
+    def _schedule(self, name, callback, args, interval, delay, replace):
+        """将任务放入调度队列"""
+        with self._condition:
+            stats_name = None
+            if name is None:
+                stats_name = getattr(callback, '__name__', 'task')
+                name = f"{stats_name}#{next(self._counter)}"
+            existing = self._tasks.get(name)
+            if existing and existing.active:
+                if not replace:
+                    return existing
+                existing.cancelled = True
+
+            task = ScheduledTask(self, name, callback, args, interval, time.monotonic() + max(0.0, delay), stats_name)
+            self._tasks[name] = task
+            heapq.heappush(self._queue, (task.next_run, next(self._counter), task))
+            self._ensure_thread()
+            self._condition.notify()
+            return task
+
+    def _cancel(self, task):
+        """取消任务句柄"""
+        with self._condition:
+            task.cancelled = True
+            self._forget(task)
+            self._condition.notify()
+
+    def _record(self, task, duration, error):
+        """把一次性任务的一次运行计入按任务名累计的统计（调用方需持有锁）"""
+        totals = self._history.pop(task.stats_name, None) or {
+            'runs': 0, 'total_time': 0.0, 'max_time': 0.0, 'last_duration': 0.0,
+            'last_run': None, 'errors': 0, 'last_error': None}
+        totals['runs'] += 1
+        totals['total_time'] += duration
+        totals['max_time'] = max(totals['max_time'], duration)
+        totals['last_duration'] = duration
+        totals['last_run'] = task.last_run
+        if error is not None:
+            totals['errors'] += 1
+            totals['last_error'] = error
+        self._history[task.stats_name] = totals
+        while len(self._history) > TASK_STATS_HISTORY_SIZE:
+            self._history.popitem(last=False)
+
+    def _forget(self, task):
+        """一次性任务运行或取消后从任务表中移除，避免任务表随运行时间增长（调用方需持有锁）"""
+        if task.interval is None and self._tasks.get(task.name) is task:
+            del self._tasks[task.name]
+
+    def _ensure_thread(self):
+        """按需启动调度线程（调用方需持有锁）"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """调度线程主循环"""
+        while True:
+            with self._condition:
+                task = None
+                while self._running:
+                    # 丢弃已取消的任务
+                    while self._queue and not self._queue[0][2].active:
+                        heapq.heappop(self._queue)
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+                    wait_time = self._queue[0][0] - time.monotonic()
+                    if wait_time > 0:
+                        self._condition.wait(wait_time)
+                        continue
+                    task = heapq.heappop(self._queue)[2]
+                    break
+                if not self._running:
+                    return
+
+            self._execute(task)
+
+    def _execute(self, task):
+        """执行任务回调并记录统计"""
+        started = time.monotonic()
+        result = None
+        error = None
+        try:
+            result = task.callback(*task.args)
+        except Exception as e:
+            error = str(e)
+            task.errors += 1
+            task.last_error = error
+        duration = time.monotonic() - started
+
+        with self._condition:
+            task.runs += 1
+            task.total_time += duration
+            task.last_duration = duration
+            task.max_time = max(task.max_time, duration)
+            task.last_run = time.time()
+            if task.interval is None:
+                self._record(task, duration, error)
+
+            if task.cancelled:
+                return
+            if task.interval is None or result is False:
+                task.finished = True
+                self._forget(task)
+                return
+            task.next_run = time.monotonic() + task.interval
+            heapq.heappush(self._queue, (task.next_run, next(self._counter), task))
+
+
+class ScopedScheduler:
+    """共享调度器的命名空间视图
+
+    接口与 TaskScheduler 相同，任务名自动加上 "<前缀>:"，
+    live_tasks/get_stats 只返回本视图的任务，shutdown 只取消本视图的任务。
+    """
+
+    def __init__(self, scheduler, prefix):
+        self.scheduler = scheduler
+        self.prefix = f"{prefix}:"
+
+    def _name(self, name):
+        return self.prefix + name if name else name
+
+    def call_later(self, delay, callback, *args, name=None, replace=True):
+        return self.scheduler.call_later(delay, callback, *args, name=self._name(name), replace=replace)
+
+    def call_every(self, interval, callback, *args, name=None, initial_delay=None, replace=False):
+        return self.scheduler.call_every(interval, callback, *args, name=self._name(name),
+                                         initial_delay=initial_delay, replace=replace)
+
+    def cancel(self, name):
+        return self.scheduler.cancel(self._name(name))
+
+    def is_active(self, name):
+        return self.scheduler.is_active(self._name(name))
+
+    def get_task(self, name):
+        return self.scheduler.get_task(self._name(name))
+
+    def live_tasks(self):
+        return [name[len(self.prefix):] for name in self.scheduler.live_tasks() if name.startswith(self.prefix)]
+
+    def get_stats(self):
+        return {name[len(self.prefix):]: stats for name, stats in self.scheduler.get_stats().items()
+                if name and name.startswith(self.prefix)}
+
+    def shutdown(self):
+        """取消本视图的所有任务（共享的调度线程继续运行）"""
+        for name in self.live_tasks():
+            self.cancel(name)
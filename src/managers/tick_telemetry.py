@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+服务器帧率遥测模块 - 从WS.log行首的 [时间][帧号] 推算服务器帧率和长帧，
+结合卡顿(hitch)日志按固定时间段汇总，保存在定长环形缓冲区中
+"""
+
+import re
+import time
+import calendar
+import threading
+
+from .resource_sampler import RingBuffer
+from .startup_timeline import parse_log_timestamp
+
+# 行首的 [2024.01.01-12.00.00:123][456]，帧号是 GFrameCounter % 1000
+_FRAME_PREFIX = re.compile(r'^\[(\d{4})\.(\d{2})\.(\d{2})-(\d{2})\.(\d{2})\.(\d{2}):(\d{3})\]\[\s*(\d+)\]')
+
+FRAME_COUNTER_WRAP = 1000
+WRAP_RATE_TOLERANCE = 0.2  # 估算回绕次数时允许帧率与上一段相差的比例
+
+
+class TickTelemetry:
+    """服务器帧率遥测
+
+    同一帧可能写出多行日志，只记录每一帧第一次出现的时间；相邻两次记录之间的
+    时间差除以前进的帧数就是这段时间的平均帧耗时，只前进一帧时就是该帧本身的耗时，
+    只有这种情况才会按 long_frame_ms 计为长帧（多帧的平均值不能说明其中某一帧是长帧）。
+    帧号每1000帧回绕一次，两行日志间隔较长时用最近的帧率估算中间回绕了几次；
+    帧率允许的误差范围内对应不止一种（或没有）回绕次数时无法确定，跳过这段间隔而不是猜测。
+    结果按 bucket_seconds 秒一段汇总，每个字段保存在独立的环形缓冲区中。
+    """
+
+    FIELDS = ('timestamp', 'fps', 'max_frame_ms', 'long_frames', 'hitches', 'max_hitch_ms', 'players')
+
+    def __init__(self, bucket_seconds=10, history_hours=72, long_frame_ms=250, max_gap=600):
+        self.bucket_seconds = bucket_seconds
+        self.long_frame_ms = long_frame_ms
+        self.max_gap = max_gap  # 两行日志间隔超过这么多秒（服务器挂起或重新接管）时不计入帧率
+        self.capacity = max(1, int(history_hours * 3600 / bucket_seconds))
+        self.player_count = 0  # 汇总时记录的在线玩家数，由调用方更新
+        self._lock = threading.Lock()
+        self._buffers = {field: RingBuffer(self.capacity, 'd' if field == 'timestamp' else 'f')
+                         for field in self.FIELDS}
+        self._seconds = {}  # 'YYYY.MM.DD-hh.mm.ss' 对应的UTC秒数缓存，同一秒内的行不重复换算
+        self._offset = None  # 日志时间换算为本机时间戳的偏移（UTC日志为0，本地时间日志为时区偏移）
+        self._last = None  # 最近一帧第一次出现的 (日志时间, 帧号)
+        self._fps_estimate = None  # 上一个时间段的帧率，用于估算长间隔内的帧号回绕次数
+        self._bucket = None
+
+    def feed(self, line, observed_at=None):
+        """处理一行日志（没有 [时间][帧号] 前缀的行直接忽略）"""
+        parsed = self._parse(line, observed_at)
+        if parsed is None:
+            return
+        log_time, frame = parsed
+        with self._lock:
+            last = self._last
+            if last is not None and frame == last[1]:
+                return  # 同一帧的后续行
+            self._last = (log_time, frame)
+            if last is None:
+                return
+            elapsed = log_time - last[0]
+            if elapsed < 0 or elapsed > self.max_gap:
+                return
+            bucket = self._bucket_for(log_time)
+            frames = (frame - last[1]) % FRAME_COUNTER_WRAP
+            fps = bucket['frames'] / bucket['seconds'] if bucket['seconds'] >= 1 else self._fps_estimate
+            if fps and elapsed * fps >= FRAME_COUNTER_WRAP / 2:
+                frames = self._unwrap(frames, elapsed * fps)
+                if frames is None:
+                    return  # 回绕次数不确定（例如卡住后帧率变化），不计入这段间隔
+            bucket['frames'] += frames
+            bucket['seconds'] += elapsed
+            frame_ms = elapsed * 1000 / frames
+            bucket['max_frame_ms'] = max(bucket['max_frame_ms'], frame_ms)
+            if frames == 1 and frame_ms >= self.long_frame_ms:
+                bucket['long_frames'] += 1
+
+    @staticmethod
+    def _unwrap(frames, expected):
+        """在帧率误差范围内找出唯一与帧号差吻合的实际帧数
+
+        Args:
+            frames (int): 帧号差（对1000取模）
+            expected (float): 按上一段帧率估算的帧数
+
+        Returns:
+            int or None: 实际帧数，误差范围内没有或有多个候选时返回None
+        """
+        margin = expected * WRAP_RATE_TOLERANCE
+        low = max(frames, expected - margin)
+        first = frames + FRAME_COUNTER_WRAP * max(0, -(-(low - frames) // FRAME_COUNTER_WRAP))
+        candidates = [count for count in (first, first + FRAME_COUNTER_WRAP) if count <= expected + margin]
+        return int(candidates[0]) if len(candidates) == 1 else None
+
+    def note_hitch(self, line, duration_ms, observed_at=None):
+        """记录一次卡顿日志"""
+        parsed = self._parse(line, observed_at)
+        with self._lock:
+            if parsed is not None:
+                bucket = self._bucket_for(parsed[0])
+            elif self._bucket is not None:
+                bucket = self._bucket
+            else:
+                return
+            bucket['hitches'] += 1
+            bucket['max_hitch_ms'] = max(bucket['max_hitch_ms'], duration_ms or 0.0)
+
+    def reset(self):
+        """新的日志流开始（服务器重新启动或重新接管）：保存当前时间段，清除帧号状态，保留历史"""
+        with self._lock:
+            self._close_bucket()
+            self._offset = None
+            self._last = None
+            self._fps_estimate = None
+
+    def summary(self, window=300):
+        """最近的帧率和最近 window 秒内的长帧/卡顿统计
+
+        Returns:
+            dict or None: 没有数据时返回None
+        """
+        with self._lock:
+            if not len(self._buffers['timestamp']):
+                return None
+            last = max(1, int(window / self.bucket_seconds))
+            timestamps = self._buffers['timestamp'].values(last)
+            latest = timestamps[-1]
+            recent = {field: [value for stamp, value in zip(timestamps, self._buffers[field].values(last))
+                              if stamp > latest - window]
+                      for field in ('max_frame_ms', 'long_frames', 'hitches', 'max_hitch_ms')}
+            fps = self._buffers['fps'].latest()
+        return {
+            'timestamp': latest,
+            'fps': fps,
+            'max_frame_ms': max(recent['max_frame_ms']),
+            'long_frames': int(sum(recent['long_frames'])),
+            'hitches': int(sum(recent['hitches'])),
+            'max_hitch_ms': max(recent['max_hitch_ms'])
+        }
+
+    def history(self, field, last=None):
+        """获取某个指标的历史数据（按时间顺序）
+
+        Args:
+            field (str): 指标名称，见 FIELDS
+            last (int): 只返回最近的若干个时间段
+
+        Returns:
+            list: (时间段开始时间戳, 数值) 列表
+        """
+        with self._lock:
+            timestamps = self._buffers['timestamp'].values(last)
+            values = self._buffers[field].values(last)
+        return list(zip(timestamps, values))
+
+    def clear(self):
+        """清空所有历史数据"""
+        with self._lock:
+            for buffer in self._buffers.values():
+                buffer.clear()
+            self._bucket = None
+            self._last = None
+            self._offset = None
+            self._fps_estimate = None
+
+    def _parse(self, line, observed_at):
+        """解析行首时间和帧号
+
+        Returns:
+            tuple or None: (本机时间戳, 帧号)
+        """
+        match = _FRAME_PREFIX.match(line)
+        if match is None:
+            return None
+        key = line[1:20]
+        seconds = self._seconds.get(key)
+        if seconds is None:
+            year, month, day, hour, minute, second = (int(value) for value in match.groups()[:6])
+            try:
+                seconds = calendar.timegm((year, month, day, hour, minute, second, 0, 0, 0))
+            except (ValueError, OverflowError):
+                return None
+            if len(self._seconds) > 4096:
+                self._seconds.clear()
+            self._seconds[key] = seconds
+        log_time = seconds + int(match.group(7)) / 1000
+        if self._offset is None:
+            # 每个日志流只判断一次日志时间是UTC还是本地时间
+            local = parse_log_timestamp(line, observed_at or time.time())
+            self._offset = round(local - log_time) if local is not None else 0
+        return log_time + self._offset, int(match.group(8))
+
+    def _bucket_for(self, timestamp):
+        """时间戳所在的汇总时间段，进入新时间段时保存上一段（调用方持有锁）"""
+        start = timestamp - timestamp % self.bucket_seconds
+        bucket = self._bucket
+        if bucket is not None and start > bucket['start']:
+            self._close_bucket()
+            bucket = None
+        if bucket is None:
+            bucket = self._bucket = {'start': start, 'frames': 0, 'seconds': 0.0, 'max_frame_ms': 0.0,
+                                     'long_frames': 0, 'hitches': 0, 'max_hitch_ms': 0.0}
+        return bucket
+
+    def _close_bucket(self):
+        """把当前时间段写入环形缓冲区（调用方持有锁）"""
+        bucket, self._bucket = self._bucket, None
+        if bucket is None or (not bucket['seconds'] and not bucket['hitches']):
+            return
+        values = {
+            'timestamp': bucket['start'],
+            'fps': bucket['frames'] / bucket['seconds'] if bucket['seconds'] else 0.0,
+            'max_frame_ms': bucket['max_frame_ms'],
+            'long_frames': bucket['long_frames'],
+            'hitches': bucket['hitches'],
+            'max_hitch_ms': bucket['max_hitch_ms'],
+            'players': self.player_count
+        }
+        for field, value in values.items():
+            self._buffers[field].append(value)
+        if bucket['seconds'] >= 1:
+            self._fps_estimate = values['fps']
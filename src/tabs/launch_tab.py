@@ -11,8 +11,8 @@ from PySide6.QtWidgets import (
     QTableWidgetItem, QHeaderView, QCheckBox
 )
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QIcon
-from ..common.constants import UI_BUTTON_TEXTS
+from PySide6.QtGui import QIcon, QTextCursor
+from ..common.constants import UI_BUTTON_TEXTS, MAX_LOG_LINES
 
 
 class LaunchTab(QWidget):
@@ -219,6 +219,81 @@ class LaunchTab(QWidget):
         memory_container_layout.addStretch()
         status_info_layout.addWidget(memory_container)
         
+        # CPU占用
+        cpu_container = QFrame()
+        cpu_container.setStyleSheet("""
+            QFrame {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, 
+                    stop:0 #fff3e0, stop:1 #ffe0b2);
+                border: 2px solid #ff9800;
+                border-radius: 8px;
+                padding: 8px;
+                margin: 2px;
+            }
+        """)
+        cpu_container_layout = QHBoxLayout(cpu_container)
+        cpu_container_layout.setContentsMargins(8, 6, 8, 6)
+        
+        cpu_title = QLabel("CPU:")
+        cpu_title.setStyleSheet("font-weight: bold; color: #f57c00; background: transparent; border: none;")
+        self.cpu_label = QLabel("--%")
+        self.cpu_label.setStyleSheet("font-weight: bold; background: transparent; border: none;")
+        
+        cpu_container_layout.addWidget(cpu_title)
+        cpu_container_layout.addWidget(self.cpu_label)
+        cpu_container_layout.addStretch()
+        status_info_layout.addWidget(cpu_container)
+        
+        # 在线玩家数
+        players_container = QFrame()
+        players_container.setStyleSheet("""
+            QFrame {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, 
+                    stop:0 #e0f2f1, stop:1 #b2dfdb);
+                border: 2px solid #009688;
+                border-radius: 8px;
+                padding: 8px;
+                margin: 2px;
+            }
+        """)
+        players_container_layout = QHBoxLayout(players_container)
+        players_container_layout.setContentsMargins(8, 6, 8, 6)
+        
+        players_title = QLabel("玩家:")
+        players_title.setStyleSheet("font-weight: bold; color: #00796b; background: transparent; border: none;")
+        self.players_label = QLabel("--")
+        self.players_label.setStyleSheet("font-weight: bold; background: transparent; border: none;")
+        
+        players_container_layout.addWidget(players_title)
+        players_container_layout.addWidget(self.players_label)
+        players_container_layout.addStretch()
+        status_info_layout.addWidget(players_container)
+        
+        # 服务器帧率（从WS.log推算），和玩家数放在一起方便对照卡顿时的负载
+        tick_container = QFrame()
+        tick_container.setStyleSheet("""
+            QFrame {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:1, 
+                    stop:0 #fce4ec, stop:1 #f8bbd0);
+                border: 2px solid #e91e63;
+                border-radius: 8px;
+                padding: 8px;
+                margin: 2px;
+            }
+        """)
+        tick_container_layout = QHBoxLayout(tick_container)
+        tick_container_layout.setContentsMargins(8, 6, 8, 6)
+        
+        tick_title = QLabel("帧率:")
+        tick_title.setStyleSheet("font-weight: bold; color: #c2185b; background: transparent; border: none;")
+        self.tick_label = QLabel("-- FPS")
+        self.tick_label.setStyleSheet("font-weight: bold; background: transparent; border: none;")
+        
+        tick_container_layout.addWidget(tick_title)
+        tick_container_layout.addWidget(self.tick_label)
+        tick_container_layout.addStretch()
+        status_info_layout.addWidget(tick_container)
+        
         status_layout.addWidget(status_frame)
         layout.addWidget(status_group)
         
@@ -229,6 +304,7 @@ class LaunchTab(QWidget):
         
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.document().setMaximumBlockCount(MAX_LOG_LINES)  # 超出后自动丢弃最早的行
         self.log_text.setStyleSheet("""
             QTextEdit {
                 background-color: #f8f9fa;
@@ -375,6 +451,18 @@ class LaunchTab(QWidget):
         """更新内存使用"""
         self.memory_label.setText(memory)
     
+    def update_cpu(self, cpu):
+        """更新CPU占用"""
+        self.cpu_label.setText(cpu)
+    
+    def update_players_count(self, players):
+        """更新在线玩家数"""
+        self.players_label.setText(players)
+    
+    def update_tick(self, tick):
+        """更新服务器帧率"""
+        self.tick_label.setText(tick)
+    
     def add_log(self, message):
         """添加日志"""
         self.log_text.append(message)
@@ -396,6 +484,22 @@ class LaunchTab(QWidget):
         self.log_text.setTextCursor(cursor)
         self.log_text.ensureCursorVisible()
     
+    def add_log_batch(self, messages):
+        """批量添加日志：一次插入、一次滚动，避免日志突增时界面卡顿"""
+        if not messages:
+            return
+        document = self.log_text.document()
+        text = '\n'.join(messages[-MAX_LOG_LINES:])
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        cursor.insertText(text if document.isEmpty() else '\n' + text)
+        cursor.endEditBlock()
+        
+        # 滚动到底部
+        scrollbar = self.log_text.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+    
     def add_log_with_players(self, message):
         """添加日志（不再显示在线玩家信息，因为已移除在线玩家区域）"""
         self.log_text.append(message)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+界面日志刷新性能测试 - 后台线程以指定速率产生WS.log日志，对比逐行发送信号+逐行append
+与攒批发送（每50毫秒或500行）+ LaunchTab.add_log_batch 时界面主线程的帧间隔
+
+用法:
+    QT_QPA_PLATFORM=offscreen python3 tools/bench_gui_log.py [--rate 10000] [--seconds 5]
+
+主线程用16毫秒的定时器模拟60帧刷新，统计实际帧间隔；日志全部显示完所需的时间反映积压情况。
+后台线程把日志放入队列，由主线程定时取出（PySide6从普通Python线程高频发送信号会崩溃），
+逐行方式对每一行单独调用 add_log，与原来每行一个排队信号时界面线程的工作量相同。
+"""
+
+import os
+import sys
+import time
+import argparse
+import queue
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QTimer  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+from src.common.constants import LOG_BATCH_INTERVAL, LOG_BATCH_MAX_LINES  # noqa: E402
+
+FRAME_INTERVAL_MS = 16
+
+
+def produce(output, rate, seconds, batched):
+    """按速率产生日志放入队列（攒批方式每50毫秒或500行放入一个列表）"""
+    total = int(rate * seconds)
+    started = time.perf_counter()
+    pending = []
+    last_flush = started
+    for index in range(total):
+        text = (f"[WS.log] [2026.10.16-08.00.00:123][{index % 1000:3d}]LogTemp: Display: "
+                f"synthetic line {index} with some payload text")
+        if batched:
+            pending.append(text)
+            now = time.perf_counter()
+            if len(pending) >= LOG_BATCH_MAX_LINES or now - last_flush >= LOG_BATCH_INTERVAL:
+                output.put(pending)
+                pending = []
+                last_flush = now
+        else:
+            output.put(text)
+        # 按速率节流
+        delay = started + (index + 1) / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    if pending:
+        output.put(pending)
+
+
+def run(mode, rate, seconds):
+    from src.tabs.launch_tab import LaunchTab
+    app = QApplication.instance() or QApplication(sys.argv)
+    tab = LaunchTab()
+    tab.resize(1000, 700)
+    tab.show()
+
+    received = [0]
+    expected = int(rate * seconds)
+    frames = []
+    last = [time.perf_counter()]
+    done = [None]
+
+    pending = queue.Queue()
+    # 部分PySide6版本的 ensureCursorVisible/movePosition 每次调用会少计一次None/True/False的引用，
+    # 逐行方式调用数万次后解释器会崩溃；这里预先多持有引用，只影响本测试
+    keep_alive = [None, True, False] * (expected * 20)  # noqa: F841
+
+    def on_drain():
+        # 每次只处理已到达的部分，让帧定时器有机会执行
+        for _ in range(pending.qsize()):
+            item = pending.get_nowait()
+            if isinstance(item, list):
+                tab.add_log_batch(item)
+                received[0] += len(item)
+            else:
+                tab.add_log(item)
+                received[0] += 1
+
+    def on_frame():
+        now = time.perf_counter()
+        frames.append((now - last[0]) * 1000)
+        last[0] = now
+        if received[0] >= expected and done[0] is None:
+            done[0] = now
+            app.quit()
+
+    drain = QTimer()
+    drain.timeout.connect(on_drain)
+    drain.start(0)
+    timer = QTimer()
+    timer.timeout.connect(on_frame)
+    timer.start(FRAME_INTERVAL_MS)
+
+    started = time.perf_counter()
+    worker = threading.Thread(target=produce, args=(pending, rate, seconds, mode == 'batch'), daemon=True)
+    worker.start()
+    app.exec()
+    timer.stop()
+
+    frames.sort()
+    p95 = frames[int(len(frames) * 0.95)] if frames else 0
+    slow = sum(1 for frame in frames if frame > 1000 / 60 * 1.5)
+    print(f"{mode:>6}: 显示完 {received[0]} 行用时 {done[0] - started:.2f} 秒（产生用时 {seconds} 秒）, "
+          f"帧间隔 p95 {p95:.1f} ms, 最大 {max(frames, default=0):.1f} ms, "
+          f"超过25 ms的帧 {slow}/{len(frames)}", flush=True)
+    os._exit(0)  # 跳过Qt对象析构
+
+
+def main():
+    parser = argparse.ArgumentParser(description="界面日志刷新性能测试")
+    parser.add_argument('--rate', type=int, default=10000, help="每秒产生的日志行数")
+    parser.add_argument('--seconds', type=float, default=5, help="产生日志的时长（秒）")
+    parser.add_argument('--mode', choices=('line', 'batch'), help="只测试一种方式")
+    args = parser.parse_args()
+    if args.mode:
+        run(args.mode, args.rate, args.seconds)
+        return
+    # 每种方式在独立进程中测试，避免互相影响
+    import subprocess
+    for mode in ('line', 'batch'):
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode,
+                        '--rate', str(args.rate), '--seconds', str(args.seconds)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+日志归档性能测试 - 把模拟的WS.log写入LogArchive，输出批量写入速度和几种检索的耗时，
+并与逐行扫描同样内容的日志文件（旧的子串过滤方式）对比
+
+用法:
+    python3 tools/bench_log_archive.py [--lines 1000000] [--days 14] [--dir <临时目录>]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.managers.log_archive import LogArchive  # noqa: E402
+from src.common.constants import LOG_ARCHIVE_BATCH_SIZE  # noqa: E402
+
+TEMPLATES = (
+    "LogNet: Verbose: Server heartbeat {index}",
+    "LogNet: Warning: Connection timed out from 10.0.{a}.{b}:{port}",
+    "LogNet: Error: UNetConnection::Close: RemoteAddr: 10.0.{a}.{b}:{port}, UniqueId: Steam:7656119800{player:07d}",
+    "LogStreaming: Warning: Failed to read file '../../../WS/Content/Maps/Level{a:02d}.umap'",
+    "LogTemp: Display: AI spawn group {index} finished in 0.{b} ms",
+    "LogWS: Display: 动物数量 {a}/1600，区域 {b}",
+    "LogPhysics: Warning: Body setup has no collision {index}",
+    "LogWS: SaveWorld finished",
+)
+
+
+def generate(lines, days, rng):
+    """生成按时间均匀分布在最近若干天内的日志行"""
+    now = time.time()
+    start = now - days * 86400
+    step = days * 86400 / lines
+    for index in range(lines):
+        moment = datetime.datetime.fromtimestamp(start + index * step)
+        text = rng.choice(TEMPLATES).format(index=index, a=rng.randrange(256), b=rng.randrange(256),
+                                            port=rng.randrange(1024, 65535), player=rng.randrange(5000))
+        yield (f"[{moment:%Y.%m.%d-%H.%M.%S}:{moment.microsecond // 1000:03d}][{index % 1000:3d}]" + text,
+               start + index * step)
+
+
+def timed(func, repeat=5):
+    """执行多次，返回(结果, 最短耗时毫秒)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def scan_file(path, predicate):
+    """逐行扫描日志文件"""
+    matched = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if predicate(line):
+                matched.append(line)
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日志归档性能测试")
+    parser.add_argument('--lines', type=int, default=1000000, help="模拟日志行数")
+    parser.add_argument('--days', type=float, default=14, help="日志覆盖的天数")
+    parser.add_argument('--dir', default=None, help="临时文件所在目录")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(dir=args.dir)
+    db_path = os.path.join(directory, 'log_archive.db')
+    text_path = os.path.join(directory, 'WS.log')
+    archive = LogArchive(db_path, retention_days=args.days + 1)
+    session_id = archive.begin_session('bench', text_path)
+    rng = random.Random(1)
+
+    started = time.perf_counter()
+    with open(text_path, 'w', encoding='utf-8') as text_file:
+        for line, observed_at in generate(args.lines, args.days, rng):
+            text_file.write(line + '\n')
+            archive.add(session_id, line, observed_at)
+            if archive.pending_count >= LOG_ARCHIVE_BATCH_SIZE:
+                archive.flush()
+    archive.end_session(session_id)
+    elapsed = time.perf_counter() - started
+    print(f"写入: {args.lines / elapsed:,.0f} 行/秒（{elapsed:.1f} 秒），"
+          f"数据库 {os.path.getsize(db_path) / 1048576:.0f} MB，日志文件 {os.path.getsize(text_path) / 1048576:.0f} MB，"
+          f"分词 {archive.tokenizer}")
+
+    week_ago = time.time() - 7 * 86400
+    player = "Steam:76561198000000042"
+    queries = (
+        ("最近7天的LogNet错误（前500条）",
+         lambda: archive.search(category='LogNet', verbosity=('Error', 'Fatal'), since=week_ago),
+         lambda line: 'LogNet: Error:' in line),
+        (f"内容包含 {player}",
+         lambda: archive.search(text=player),
+         lambda line: player in line),
+        ("内容包含 区域 17（中文子串）",
+         lambda: archive.search(text="区域 17"),
+         lambda line: "区域 17" in line),
+    )
+    for name, query, predicate in queries:
+        rows, archive_ms = timed(query)
+        matched, scan_ms = timed(lambda: scan_file(text_path, predicate), repeat=1)
+        print(f"{name}: 归档 {len(rows)} 条 {archive_ms:.1f} ms，逐行扫描文件 {len(matched)} 条 {scan_ms:.0f} ms")
+
+    archive.close()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+日志事件匹配性能测试 - 对比旧的逐行匹配（每行 import re + re.search MOD正则 + 启动关键字子串判断）
+和 LogEventEngine（按分类查规则表、字面量过滤后才执行预编译正则，识别全部7种事件）的每秒处理行数
+
+用法:
+    python3 tools/bench_log_events.py [--lines 2000000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.managers.log_events import LogEventEngine  # noqa: E402
+
+# 模拟的日志组成：绝大多数是与事件无关的普通日志
+NOISE_LINES = (
+    "[2026.10.16-08.00.00:123][  1]LogNet: Verbose: Server heartbeat",
+    "[2026.10.16-08.00.00:123][  2]LogStreaming: Warning: Failed to read file '../../../WS/Content/Maps/Level01.umap'",
+    "[2026.10.16-08.00.00:123][  3]LogTemp: Display: AI spawn group 42 finished in 0.8 ms",
+    "[2026.10.16-08.00.00:123][  4]LogPhysics: Warning: Body setup has no collision",
+    "[2026.10.16-08.00.00:123][  5]LogWS: Display: Animal population 1532/1600",
+    "[2026.10.16-08.00.00:123][  6]LogNet: NotifyAcceptingConnection accepted from: 10.0.0.7:50234",
+)
+EVENT_LINES = (
+    "[2026.10.16-08.00.00:124][  7]LogUGCRegistry: Display: LoadModulesForEnabledPluginsBegin: ModName:测试MOD, ModID:123456.",
+    "[2026.10.16-08.00.00:125][  8]LogWS: Create Dungeon Successed: DiXiaChengLv50, Index = 2",
+    "[2026.10.16-08.00.00:126][  9]LogNet: Login request: ?Name=Player1?SplitscreenCount=1 userId: Steam:76561198000000001 platform: Steam",
+    "[2026.10.16-08.00.00:127][ 10]LogNet: Join succeeded: Player1",
+    "[2026.10.16-08.00.00:128][ 11]LogNet: UNetConnection::Close: [UNetConnection] RemoteAddr: 10.0.0.7:50234, UniqueId: Steam:76561198000000001, Channels: 12",
+    "[2026.10.16-08.00.00:129][ 12]LogWS: SaveWorld finished",
+    "[2026.10.16-08.00.00:130][ 13]LogWindows: Error: Fatal error: out of memory",
+)
+
+
+def legacy_match(line_text):
+    """旧的逐行匹配方式（只能识别MOD加载和启动完成）"""
+    import re
+    events = 0
+    mod_pattern = r'LogUGCRegistry: Display: LoadModulesForEnabledPluginsBegin: ModName:([^,]+), ModID:(\d+)\.?'
+    mod_match = re.search(mod_pattern, line_text)
+    if mod_match:
+        mod_match.group(1).strip()
+        mod_match.group(2).strip()
+        events += 1
+    if 'Create Dungeon Successed: DiXiaChengLv50, Index = 2' in line_text:
+        events += 1
+    return events
+
+
+def measure(name, func, lines):
+    """执行并输出每秒处理行数"""
+    started = time.perf_counter()
+    events = 0
+    for line in lines:
+        events += len(func(line)) if name == 'engine' else func(line)
+    elapsed = time.perf_counter() - started
+    print(f"{name:>7}: {len(lines) / elapsed:,.0f} 行/秒（{elapsed:.2f} 秒，识别 {events} 个事件）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日志事件匹配性能测试")
+    parser.add_argument('--lines', type=int, default=2000000, help="模拟日志行数")
+    parser.add_argument('--event-ratio', type=float, default=0.01, help="事件行所占比例")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    lines = [rng.choice(EVENT_LINES) if rng.random() < args.event_ratio else rng.choice(NOISE_LINES)
+             for _ in range(args.lines)]
+    measure('legacy', legacy_match, lines)
+    measure('engine', LogEventEngine().match, lines)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+WS.log读取延迟测试 - 对比旧的每秒轮询、inotify通知和自适应轮询从写入到读到一行的延迟及CPU占用
+
+用法:
+    python3 tools/bench_log_latency.py [--seconds 20] [--rate 5] [--dir <临时目录>]
+
+父进程按指定频率向模拟日志写入带时间戳的行（中途模拟一次日志轮换），
+每种读取方式在独立子进程中读取，输出延迟分布和子进程CPU时间。
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+END_MARKER = "BENCH_END"
+
+
+def percentile(values, fraction):
+    """简单百分位数"""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def record(line, latencies):
+    """解析一行中的写入时间，返回是否读到结束标记"""
+    if END_MARKER in line:
+        return True
+    if 'stamp=' in line:
+        latencies.append(time.time() - float(line.rsplit('stamp=', 1)[1]))
+    return False
+
+
+def read_legacy(path, deadline):
+    """旧的读取方式：每秒以文本模式重新打开文件，不识别轮换（轮换后可能读不到结束标记，到期后返回）"""
+    latencies = []
+    position = 0
+    while time.time() < deadline:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                f.seek(position)
+                content = f.read()
+                position = f.tell()
+            for line in content.splitlines():
+                if record(line, latencies):
+                    return latencies, True
+        time.sleep(1)
+    return latencies, False
+
+
+async def read_watched(path, force_poll):
+    """LogTailer + 文件变化通知"""
+    from src.managers.log_tailer import LogTailer
+    from src.managers.log_watcher import create_log_watcher, PollingWatcher
+    latencies = []
+    tailer = LogTailer(path)
+    watcher = PollingWatcher(path) if force_poll else create_log_watcher(path)
+    try:
+        while True:
+            for line in tailer.read_lines():
+                if record(line, latencies):
+                    return latencies, True
+            if tailer.has_more:
+                await asyncio.sleep(0)
+            else:
+                await watcher.wait(tailer.last_read > 0)
+    finally:
+        watcher.close()
+        tailer.close()
+
+
+def run_mode(mode, path, deadline):
+    """在子进程中执行一种读取方式（CPU时间不含解释器启动和导入模块）"""
+    import src.managers.log_watcher  # noqa: F401
+    started = os.times()
+    if mode == 'legacy':
+        latencies, complete = read_legacy(path, deadline)
+    else:
+        latencies, complete = asyncio.run(read_watched(path, force_poll=(mode == 'poll')))
+    times = os.times()
+    cpu = times.user + times.system - started.user - started.system
+    print(json.dumps({'latencies': latencies, 'complete': complete, 'cpu': cpu}))
+
+
+def write_log(path, seconds, rate):
+    """按频率写入带时间戳的行，中途把日志改名轮换一次"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    f = open(path, 'a', encoding='utf-8')
+    deadline = time.time() + seconds
+    rotate_at = time.time() + seconds / 2
+    index = 0
+    while time.time() < deadline:
+        if rotate_at and time.time() >= rotate_at:
+            f.close()
+            os.replace(path, path + '.1')
+            f = open(path, 'a', encoding='utf-8')
+            rotate_at = None
+        index += 1
+        f.write(f"[2026.10.16-08.00.00:000][{index:3d}]LogTemp: Display: line {index} stamp={time.time():.6f}\n")
+        f.flush()
+        time.sleep(random.expovariate(rate))
+    f.write(END_MARKER + "\n")
+    f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WS.log读取延迟测试")
+    parser.add_argument('--seconds', type=float, default=20, help="每种方式的测试时长（秒）")
+    parser.add_argument('--rate', type=float, default=5, help="平均每秒写入的行数")
+    parser.add_argument('--dir', default=None, help="模拟日志所在目录")
+    parser.add_argument('--mode', choices=('legacy', 'inotify', 'poll'), help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    parser.add_argument('--deadline', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.path, args.deadline)
+        return
+
+    directory = tempfile.mkdtemp(dir=args.dir)
+    path = os.path.join(directory, 'Logs', 'WS.log')
+    for mode in ('legacy', 'inotify', 'poll'):
+        for leftover in (path, path + '.1'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        deadline = time.time() + args.seconds + 5
+        reader = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--mode', mode, '--path', path,
+                                   '--deadline', str(deadline)], stdout=subprocess.PIPE, text=True)
+        time.sleep(0.5)  # 先让读取进程开始等待，验证文件出现后立即开始读取
+        write_log(path, args.seconds, args.rate)
+        output, _ = reader.communicate(timeout=args.seconds + 30)
+        result = json.loads(output)
+        latencies = [value * 1000 for value in result['latencies']]
+        print(f"{mode:>7}: {len(latencies)} 行, 延迟 p50 {percentile(latencies, 0.5):.1f} ms, "
+              f"p95 {percentile(latencies, 0.95):.1f} ms, 最大 {max(latencies, default=0):.1f} ms, "
+              f"CPU {result['cpu'] * 1000:.0f} ms" + ("" if result['complete'] else "（轮换后丢失了日志）"))
+    for leftover in (path, path + '.1'):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    os.rmdir(os.path.dirname(path))
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+重新接管服务器时的WS.log读取耗时测试 - 对比从头读取（原来的方式）、从检查点继续读取和
+检查点无效时只读取末尾一段，需要多久才能追上日志末尾、期间输出了多少行
+
+用法:
+    python3 tools/bench_log_resume.py [--size-mb 512] [--dir <临时目录>]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.managers.log_tailer import LogTailer  # noqa: E402
+from src.common.constants import LOG_TAIL_RESUME_WINDOW  # noqa: E402
+
+LINE = "[2026.10.16-08.00.00:123][{frame:3d}]LogTemp: Display: AI spawn group {index} finished in 0.8 ms\n"
+
+
+def write_log(path, size):
+    """生成指定大小的模拟日志"""
+    written = 0
+    index = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < size:
+            chunk = ''.join(LINE.format(frame=(index + i) % 1000, index=index + i) for i in range(10000))
+            f.write(chunk)
+            written += len(chunk)
+            index += 10000
+
+
+def catch_up(path, **kwargs):
+    """打开日志并读到末尾，返回(耗时毫秒, 输出行数, 起始方式, 检查点)"""
+    started = time.perf_counter()
+    tailer = LogTailer(path, **kwargs)
+    count = 0
+    while True:
+        count += len(tailer.read_lines())
+        if not tailer.has_more:
+            break
+    elapsed = (time.perf_counter() - started) * 1000
+    checkpoint = tailer.checkpoint()
+    tailer.close()
+    return elapsed, count, tailer.start_mode, checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重新接管时的WS.log读取耗时测试")
+    parser.add_argument('--size-mb', type=int, default=512, help="模拟日志大小（MB）")
+    parser.add_argument('--dir', default=None, help="模拟日志所在目录")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(dir=args.dir)
+    path = os.path.join(directory, 'WS.log')
+    write_log(path, args.size_mb * 1048576)
+
+    elapsed, count, mode, checkpoint = catch_up(path)
+    print(f"从头读取: {elapsed:,.0f} ms, 输出 {count:,} 行")
+    # 上次退出后服务器又写了一些日志
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(''.join(LINE.format(frame=i % 1000, index=i) for i in range(200)))
+    elapsed, count, mode, _ = catch_up(path, resume=checkpoint, tail_window=LOG_TAIL_RESUME_WINDOW)
+    print(f"检查点（{mode}）: {elapsed:.1f} ms, 输出 {count:,} 行")
+    elapsed, count, mode, _ = catch_up(path, resume=dict(checkpoint, head_hash=''),
+                                       tail_window=LOG_TAIL_RESUME_WINDOW)
+    print(f"检查点无效（{mode}）: {elapsed:.1f} ms, 输出 {count:,} 行")
+
+    os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
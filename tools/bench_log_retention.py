@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+轮换日志归档测试 - 生成带有多个 WS-backup-*.log 的模拟 WS/Saved 目录，对比备份包含轮换日志
+（原来遍历整个Saved目录的方式）和排除后的备份大小/耗时，并输出日志压缩归档的压缩率、
+按索引读取单个日志的耗时和超出大小上限后的清理结果
+
+用法:
+    python3 tools/bench_log_retention.py [--logs 8] [--log-mb 64] [--world-mb 64] [--dir <临时目录>]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import zipfile
+import argparse
+import tempfile
+import warnings
+import datetime
+
+os.environ.setdefault('SMSL_HEADLESS', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.managers.backup_manager import BackupManager  # noqa: E402
+from src.managers.log_retention import LogRetention  # noqa: E402
+
+LINE = "[{stamp}][{frame:3d}]LogNet: Warning: Connection timed out from 10.0.{a}.{b}:{port}, UniqueId: Steam:7656{player:013d}\n"
+
+
+def write_log(path, size, rng, mtime):
+    """生成指定大小的模拟轮换日志，并把修改时间设为 mtime"""
+    written = 0
+    index = 0
+    stamp = datetime.datetime.fromtimestamp(mtime).strftime('%Y.%m.%d-%H.%M.%S:000')
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < size:
+            chunk = ''.join(LINE.format(stamp=stamp, frame=(index + i) % 1000, a=rng.randrange(256),
+                                        b=rng.randrange(256), port=rng.randrange(1024, 65535),
+                                        player=rng.randrange(5000)) for i in range(5000))
+            f.write(chunk)
+            written += len(chunk)
+            index += 5000
+    os.utime(path, (mtime, mtime))
+
+
+def build_server(directory, args, rng):
+    """模拟服务器目录：世界存档 + 当前WS.log + 若干轮换日志"""
+    saved = os.path.join(directory, 'server', 'WS', 'Saved')
+    worlds = os.path.join(saved, 'Worlds', 'Dedicated', 'Level01_Main')
+    logs = os.path.join(saved, 'Logs')
+    os.makedirs(worlds)
+    os.makedirs(logs)
+    with open(os.path.join(worlds, 'world.db'), 'wb') as f:
+        for _ in range(args.world_mb):
+            f.write(rng.randbytes(512 * 1024) + bytes(512 * 1024))  # 一半随机数据，一半空白页
+    now = time.time()
+    write_log(os.path.join(logs, 'WS.log'), 4 * 1048576, rng, now)
+    for index in range(args.logs):
+        mtime = now - (args.logs - index) * 86400
+        stamp = datetime.datetime.fromtimestamp(mtime).strftime('%Y.%m.%d-%H.%M.%S')
+        write_log(os.path.join(logs, f'WS-backup-{stamp}.log'), args.log_mb * 1048576, rng, mtime)
+    return os.path.join(directory, 'server'), logs
+
+
+def zip_whole_saved(server_path, backup_file):
+    """原来的备份方式：遍历整个Saved目录，include_logs 时再写一遍日志"""
+    saved = os.path.join(server_path, 'WS', 'Saved')
+    with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for root, dirs, files in os.walk(saved):
+            for file in files:
+                path = os.path.join(root, file)
+                zipf.write(path, os.path.relpath(path, server_path))
+        for root, dirs, files in os.walk(os.path.join(saved, 'Logs')):
+            for file in files:
+                path = os.path.join(root, file)
+                zipf.write(path, os.path.relpath(path, server_path))
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="轮换日志归档测试")
+    parser.add_argument('--logs', type=int, default=8, help="轮换日志数量")
+    parser.add_argument('--log-mb', type=int, default=64, help="每个轮换日志的大小（MB）")
+    parser.add_argument('--world-mb', type=int, default=64, help="世界存档大小（MB）")
+    parser.add_argument('--dir', default=None, help="临时文件所在目录")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    directory = tempfile.mkdtemp(dir=args.dir)
+    server_path, logs_dir = build_server(directory, args, rng)
+
+    old_file = os.path.join(directory, 'old.zip')
+    warnings.filterwarnings('ignore', 'Duplicate name')  # 原来的方式会把日志重复写入同一个备份
+    _, elapsed = timed(lambda: zip_whole_saved(server_path, old_file))
+    print(f"备份（包含轮换日志）: {os.path.getsize(old_file) / 1048576:.1f} MB，{elapsed:.1f} 秒")
+
+    manager = BackupManager()
+    manager.set_server_path(server_path)
+    new_file = os.path.join(directory, 'new.zip')
+    _, elapsed = timed(lambda: manager._create_backup_thread(new_file, True))
+    print(f"备份（排除轮换日志）: {os.path.getsize(new_file) / 1048576:.1f} MB，{elapsed:.1f} 秒")
+
+    retention = LogRetention(os.path.join(directory, 'server_logs'), retention_days=0, max_bytes=0)
+    names = sorted(name for name in os.listdir(logs_dir) if name.startswith('WS-backup-'))
+    result, elapsed = timed(lambda: retention.run(logs_dir))
+    print(f"压缩归档 {result['archived']} 个轮换日志: {result['original_bytes'] / 1048576:.0f} MB → "
+          f"{result['compressed_bytes'] / 1048576:.1f} MB，{elapsed:.1f} 秒，剩余 {os.listdir(logs_dir)}")
+
+    entry = next(entry for entry in retention.entries() if entry['name'] == names[len(names) // 2])
+    data, elapsed = timed(lambda: retention.read(entry['day'], entry['name']))
+    print(f"按索引读取 {entry['name']}: {len(data) / 1048576:.0f} MB，{elapsed * 1000:.0f} ms")
+
+    retention.max_bytes = retention.total_size() // 2
+    removed = retention.prune()
+    print(f"大小上限减半后清理 {removed} 天的归档，剩余 {retention.total_size() / 1048576:.1f} MB")
+
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
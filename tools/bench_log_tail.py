@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+WS.log读取性能测试 - 对比旧的读取方式（每轮以文本模式重新打开、seek后整段read再splitlines）
+和 LogTailer（保持二进制句柄、分块读取）
+
+用法:
+    python3 tools/bench_log_tail.py [--size-mb 2048] [--dir <临时目录>] [--keep]
+
+生成指定大小的模拟UE日志后，每种方式在独立子进程中读完整个文件，输出耗时、吞吐量和峰值内存。
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_LINES = (
+    "[2026.10.16-08.00.00:123][  1]LogNet: Display: SteamNetDriver_2147482543 IpNetDriver listening on port 7777\n",
+    "[2026.10.16-08.00.00:124][  2]LogUGCRegistry: Display: LoadModulesForEnabledPluginsBegin: ModName:测试MOD, ModID:123456.\n",
+    "[2026.10.16-08.00.00:125][  3]LogStreaming: Warning: Failed to read file '../../../WS/Content/Maps/Level01.umap'\n",
+    "[2026.10.16-08.00.00:126][  4]LogWS: Create Dungeon Successed: DiXiaChengLv50, Index = 2\n",
+    "[2026.10.16-08.00.00:127][  5]LogOnline: 玩家 Player_42 加入了游戏，当前在线 12/20\n",
+)
+
+
+def generate_log(path, size_mb):
+    """生成指定大小的模拟日志"""
+    block = ''.join(SAMPLE_LINES * 200).encode('utf-8')
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'wb') as f:
+        while written < target:
+            f.write(block)
+            written += len(block)
+    return written
+
+
+def peak_rss_mb():
+    """当前进程的峰值内存（MB）"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 if sys.platform != 'darwin' else peak / 1024 / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+
+
+def read_legacy(path):
+    """旧的读取方式"""
+    position = 0
+    count = 0
+    while True:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            f.seek(position)
+            content = f.read()
+            new_position = f.tell()
+        if not content:
+            return count
+        position = new_position
+        for line in content.splitlines(keepends=True):
+            if line.strip():
+                count += 1
+
+
+def read_tailer(path):
+    """LogTailer"""
+    from src.managers.log_tailer import LogTailer
+    tailer = LogTailer(path)
+    count = 0
+    while True:
+        for line in tailer.read_lines():
+            if line.strip():
+                count += 1
+        if not tailer.has_more:
+            tailer.close()
+            return count
+
+
+def run_mode(mode, path):
+    """在子进程中执行一种读取方式"""
+    started = time.perf_counter()
+    lines = {'legacy': read_legacy, 'tailer': read_tailer}[mode](path)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({'lines': lines, 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WS.log读取性能测试")
+    parser.add_argument('--size-mb', type=int, default=2048, help="模拟日志大小（MB）")
+    parser.add_argument('--dir', default=None, help="生成模拟日志的目录")
+    parser.add_argument('--keep', action='store_true', help="保留模拟日志")
+    parser.add_argument('--mode', choices=('legacy', 'tailer'), help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.path)
+        return
+
+    directory = args.dir or tempfile.gettempdir()
+    path = os.path.join(directory, 'bench_WS.log')
+    print(f"生成 {args.size_mb} MB 模拟日志: {path}")
+    size = generate_log(path, args.size_mb)
+    try:
+        for mode in ('legacy', 'tailer'):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode, '--path', path],
+                                    capture_output=True, text=True)
+            if output.returncode != 0:
+                error = output.stderr.strip().splitlines()[-1:] or [f"退出码 {output.returncode}（可能内存不足）"]
+                print(f"{mode:>7}: 失败 {error[0]}")
+                continue
+            result = json.loads(output.stdout)
+            print(f"{mode:>7}: {result['lines']} 行, {result['seconds']:.2f} 秒, "
+                  f"{size / 1024 / 1024 / result['seconds']:.0f} MB/s, 峰值内存 {result['peak_rss_mb']:.0f} MB")
+    finally:
+        if not args.keep:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+定时重启检查 - 用模拟的服务器实例（RCON查询和广播在真实的事件循环中以协程执行）按模拟时钟
+逐秒推进 RestartScheduler，检查重启窗口、无人在线时立即重启、有玩家时的倒计时广播，
+以及多个实例之间的错开和窗口结束后的跳过，结果不符合预期时断言失败
+
+用法:
+    python3 tools/check_restart_scheduler.py
+"""
+
+import os
+import sys
+import asyncio
+import datetime
+
+os.environ.setdefault('SMSL_HEADLESS', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.common.constants import DEFAULT_SERVER_CONFIG  # noqa: E402
+from src.managers.async_core import AsyncLoopThread  # noqa: E402
+from src.managers.restart_scheduler import (RestartScheduler, RESTART_IDLE, RESTART_WAITING,  # noqa: E402
+                                            RESTART_COUNTDOWN, RESTART_RESTARTING)
+
+WINDOW_START = datetime.datetime(2026, 1, 5, 4, 0)
+
+
+class FakeManager:
+    """模拟的 ServerManager：只实现定时重启用到的属性和RCON协程"""
+
+    def __init__(self, clock, async_core, players=0, window_minutes=10, countdown=(60, 10)):
+        self.clock = clock
+        self.async_core = async_core
+        self.players = players
+        self.server_config = dict(DEFAULT_SERVER_CONFIG, restart_schedule='0 4 * * *',
+                                  restart_window_minutes=window_minutes, restart_countdown=list(countdown),
+                                  restart_countdown_message='{time}')
+        self.is_running = True
+        self.is_rcon_connected = False
+        self.startup_in_progress = False
+        self.queries = 0
+        self.broadcasts = []   # (模拟时间, 广播内容)
+        self.restarts = []     # 发起重启的模拟时间
+
+    async def _connect_rcon_async(self):
+        await asyncio.sleep(0)
+        self.is_rcon_connected = True
+        return True
+
+    async def _query_online_players_async(self):
+        await asyncio.sleep(0)
+        self.queries += 1
+        return [f"player{index}" for index in range(self.players)]
+
+    async def _execute_rcon_command_async(self, command, log_command=True, log_response=True):
+        await asyncio.sleep(0)
+        self.broadcasts.append((self.clock.now, command))
+        return ""
+
+    def restart_server(self):
+        self.restarts.append(self.clock.now)
+        self.is_running = False
+
+
+class Clock:
+    """模拟时钟：每一步调用一次调度检查，并等事件循环中的查询和广播完成"""
+
+    def __init__(self, scheduler, async_core):
+        self.scheduler = scheduler
+        self.async_core = async_core
+        self.now = WINDOW_START.timestamp() - 60
+
+    def settle(self):
+        for _ in range(3):
+            self.async_core.run(asyncio.sleep(0.001))
+
+    def step(self, seconds=1):
+        for _ in range(int(seconds)):
+            self.now += 1
+            self.scheduler._tick(self.now)
+            self.settle()
+
+    def until(self, moment):
+        self.step(moment - self.now)
+
+
+def offset(seconds):
+    return WINDOW_START.timestamp() + seconds
+
+
+def make(stagger=300):
+    async_core = AsyncLoopThread(name="RestartCheckLoop")
+    scheduler = RestartScheduler(stagger=stagger)  # 不调用start()，由模拟时钟直接驱动 _tick
+    return scheduler, Clock(scheduler, async_core), async_core
+
+
+def state(scheduler, name):
+    return scheduler._jobs[name].state
+
+
+def come_back(clock, manager):
+    """模拟重启完成：服务器下线一步后重新上线"""
+    clock.step()
+    manager.is_running = True
+    manager.is_rcon_connected = False
+    clock.step()
+
+
+def check_window():
+    scheduler, clock, core = make()
+    manager = FakeManager(clock, core, players=0)
+    scheduler.add_server('a', manager)
+    clock.until(offset(-1))
+    assert state(scheduler, 'a') == RESTART_IDLE and not manager.queries, "窗口开始前不应查询或重启"
+    assert scheduler._jobs['a'].next_window == WINDOW_START
+    clock.step()
+    assert state(scheduler, 'a') in (RESTART_WAITING, RESTART_RESTARTING), "到达窗口后应进入等待"
+    print("重启窗口: 04:00 前保持空闲，04:00 进入窗口")
+
+
+def check_zero_players():
+    scheduler, clock, core = make()
+    manager = FakeManager(clock, core, players=0)
+    scheduler.add_server('a', manager)
+    clock.until(offset(2))
+    assert manager.restarts == [offset(1)], f"无人在线时应在第一次查询后立即重启: {manager.restarts}"
+    assert not manager.broadcasts, "无人在线时不应广播倒计时"
+    assert state(scheduler, 'a') == RESTART_RESTARTING
+    come_back(clock, manager)
+    job = scheduler._jobs['a']
+    assert state(scheduler, 'a') == RESTART_IDLE and scheduler.last_restart_at == clock.now
+    assert job.next_window == WINDOW_START + datetime.timedelta(days=1), "重启完成后应等待下一天的窗口"
+    print("无人在线: 进入窗口1秒后重启，完成后下次窗口为次日04:00")
+
+
+def check_countdown():
+    scheduler, clock, core = make()
+    manager = FakeManager(clock, core, players=3, window_minutes=10, countdown=(60, 10))
+    scheduler.add_server('a', manager)
+    clock.until(offset(9 * 60 - 1))
+    assert state(scheduler, 'a') == RESTART_WAITING and not manager.broadcasts, "倒计时开始前不应广播"
+    assert manager.queries >= 9 * 60 // 30, f"等待期间应定期查询在线玩家: {manager.queries}"
+    clock.until(offset(10 * 60 + 2))
+    assert [text for _, text in manager.broadcasts] == ["broadcast 1 分钟", "broadcast 10 秒"], manager.broadcasts
+    assert [when for when, _ in manager.broadcasts] == [offset(9 * 60), offset(9 * 60 + 50)]
+    assert manager.restarts == [offset(10 * 60)], f"倒计时结束应在窗口结束时重启: {manager.restarts}"
+    print("倒计时: 窗口结束前60秒开始广播（1 分钟、10 秒），04:10 重启")
+
+
+def check_players_leave():
+    scheduler, clock, core = make()
+    manager = FakeManager(clock, core, players=2, window_minutes=10, countdown=(60, 10))
+    scheduler.add_server('a', manager)
+    clock.until(offset(9 * 60 + 5))
+    assert state(scheduler, 'a') == RESTART_COUNTDOWN
+    manager.players = 0
+    clock.until(offset(9 * 60 + 40))
+    assert len(manager.restarts) == 1 and manager.restarts[0] < offset(10 * 60), "玩家全部下线后应提前重启"
+    print(f"倒计时中玩家下线: 在 04:09:{int(manager.restarts[0] - offset(9 * 60)):02d} 提前重启")
+
+
+def check_stagger():
+    scheduler, clock, core = make(stagger=300)
+    first = FakeManager(clock, core, players=0, window_minutes=10)
+    second = FakeManager(clock, core, players=0, window_minutes=10)
+    scheduler.add_server('a', first)
+    scheduler.add_server('b', second)
+    clock.until(offset(2))
+    assert first.restarts == [offset(1)] and not second.restarts, "同一时刻只能有一个实例重启"
+    come_back(clock, first)
+    finished = scheduler.last_restart_at
+    clock.until(offset(10 * 60))
+    assert len(second.restarts) == 1, f"第二个实例应在窗口内重启: {second.restarts}"
+    assert second.restarts[0] - finished == 300, f"两次重启应间隔 stagger 秒: {second.restarts[0] - finished}"
+    print(f"错开重启: 第二个实例在第一个完成后 {second.restarts[0] - finished:.0f} 秒重启")
+
+
+def check_skip_after_window():
+    scheduler, clock, core = make(stagger=600)
+    first = FakeManager(clock, core, players=0, window_minutes=5)
+    second = FakeManager(clock, core, players=0, window_minutes=5)
+    scheduler.add_server('a', first)
+    scheduler.add_server('b', second)
+    clock.until(offset(2))
+    come_back(clock, first)
+    clock.until(offset(6 * 60))
+    assert not second.restarts, "窗口结束前轮不到的实例应跳过本次重启"
+    assert state(scheduler, 'b') == RESTART_IDLE
+    assert scheduler._jobs['b'].next_window == WINDOW_START + datetime.timedelta(days=1)
+    print("窗口结束: 错开间隔超过窗口长度时第二个实例跳过本次重启")
+
+
+def main():
+    check_window()
+    check_zero_players()
+    check_countdown()
+    check_players_leave()
+    check_stagger()
+    check_skip_after_window()
+    print("全部通过")
+
+
+if __name__ == '__main__':
+    main()
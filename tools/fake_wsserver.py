@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模拟服务端 - 在Linux上代替WSServer.exe，用于测试启动、停止、重启和崩溃看门狗
+
+用法:
+    python3 tools/fake_wsserver.py install <服务器目录>
+
+安装后把启动器的服务器路径指向该目录即可。与真实服务端一样，WSServer.exe 会再启动一个
+名为 WSServer-Win64-Shipping.exe 的子进程，子进程写入 WS/Saved/Logs/WS.log，
+并提供RCON、A2S查询端口、游戏端口和EchoPort。
+
+RCON命令:
+    lp                  输出玩家列表
+    saveworld           保存世界
+    broadcast <消息>    广播消息
+    close <秒>          倒计时后正常退出（写入 LogExit: Exiting.，退出码0）
+    crash               立即崩溃（写入 Fatal error，退出码3）
+    kick <玩家名>       踢出玩家（写入 UNetConnection::Close）
+
+额外启动参数（写在启动器的"额外启动参数"中）:
+    -FakeStartupDelay=<秒>   加载MOD前等待的时间，默认2
+    -FakeMods=<数量>         模拟加载的MOD数量，默认3
+    -FakeCrashAfter=<秒>     上线后若干秒自动崩溃，用于测试崩溃循环
+    -FakePlayers=<数量>      上线后进入游戏的玩家数量（写入 Login request / Join succeeded），默认0
+    -FakeTickRate=<帧/秒>    服务器帧率，日志行首的帧号按该帧率增长，默认30
+    -FakeHitchEvery=<秒>     每隔若干秒卡顿一次（帧号停止增长并写入卡顿日志），默认不卡顿
+"""
+
+import os
+import sys
+import stat
+import shutil
+import time
+import ctypes
+import struct
+import asyncio
+import datetime
+import subprocess
+
+SHIPPING_PROCESS_NAME = "WSServer-Win64-Shipping.exe"
+ONLINE_MARKER = "LogWS: Create Dungeon Successed: DiXiaChengLv50, Index = 2"
+
+RCON_PACKET_RESPONSE = 0
+RCON_PACKET_COMMAND = 2
+RCON_PACKET_AUTH = 3
+
+
+def parse_args(argv):
+    """解析 -Key=Value 形式的参数（键不区分大小写）"""
+    options = {}
+    for arg in argv:
+        if arg.startswith('-') and '=' in arg:
+            key, value = arg[1:].split('=', 1)
+            options[key.lower()] = value.strip('"')
+    return options
+
+
+def install(target_dir):
+    """把模拟服务端安装为 <目录>/WSServer.exe"""
+    os.makedirs(target_dir, exist_ok=True)
+    target = os.path.join(target_dir, "WSServer.exe")
+    shutil.copyfile(os.path.abspath(__file__), target)
+    os.chmod(target, os.stat(target).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    print(f"已安装模拟服务端: {target}")
+
+
+def run_launcher(argv):
+    """启动进程：创建 WSServer-Win64-Shipping.exe 子进程并返回其退出码"""
+    child = subprocess.Popen([SHIPPING_PROCESS_NAME, os.path.abspath(__file__), '--shipping'] + argv,
+                             executable=sys.executable)
+    try:
+        return child.wait()
+    except KeyboardInterrupt:
+        child.terminate()
+        return child.wait()
+
+
+class FakeShippingServer:
+    """模拟 WSServer-Win64-Shipping.exe"""
+
+    def __init__(self, server_dir, options):
+        self.options = options
+        self.log_path = os.path.join(server_dir, "WS", "Saved", "Logs", "WS.log")
+        self.tick_origin = time.monotonic()  # 帧号按 (当前时间 - tick_origin) * 帧率 计算，卡顿时后移
+        self.log_file = None
+        self.exit_code = None
+        self.exit_event = None
+        self.players = {}  # 玩家名 -> Account
+
+    def option(self, key, default):
+        return type(default)(self.options.get(key.lower(), default))
+
+    def open_log(self):
+        """打开新的WS.log，旧日志按UE的方式改名为 WS-backup-<时间>.log"""
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        if os.path.exists(self.log_path):
+            stamp = datetime.datetime.fromtimestamp(os.path.getmtime(self.log_path)).strftime('%Y.%m.%d-%H.%M.%S')
+            os.replace(self.log_path, os.path.join(os.path.dirname(self.log_path), f"WS-backup-{stamp}.log"))
+        self.log_file = open(self.log_path, 'a', encoding='utf-8')
+        self.log_file.write(f"Log file open, {datetime.datetime.now().strftime('%m/%d/%y %H:%M:%S')}\n")
+        self.log_file.flush()
+
+    def log(self, text):
+        """按UE格式写入一行日志：[时间][帧号]类别: 内容"""
+        now = datetime.datetime.utcnow()
+        stamp = now.strftime('%Y.%m.%d-%H.%M.%S') + f":{now.microsecond // 1000:03d}"
+        frame = int((time.monotonic() - self.tick_origin) * self.option('FakeTickRate', 30.0)) % 1000
+        self.log_file.write(f"[{stamp}][{frame:3d}]{text}\n")
+        self.log_file.flush()
+
+    def exit(self, code):
+        if self.exit_code is None:
+            self.exit_code = code
+            self.exit_event.set()
+
+    def crash(self, reason):
+        self.log("LogWindows: Error: === Critical error: ===")
+        self.log(f"LogWindows: Error: Fatal error: {reason}")
+        self.exit(3)
+
+    async def startup(self):
+        """模拟加载MOD和创建地下城"""
+        self.log("LogInit: Display: Starting Game.")
+        await asyncio.sleep(self.option('FakeStartupDelay', 2.0))
+        for index in range(self.option('FakeMods', 3)):
+            self.log(f"LogUGCRegistry: Display: LoadModulesForEnabledPluginsBegin: "
+                     f"ModName:FakeMod{index + 1}, ModID:{3000000 + index}.")
+            await asyncio.sleep(0.1)
+        self.log(ONLINE_MARKER)
+        for index in range(self.option('FakePlayers', 0)):
+            name, account = f"Player{index}", f"7656119800000000{index}"
+            self.log(f"LogNet: Login request: ?Name={name}?SplitscreenCount=1 userId: Steam:{account} platform: Steam")
+            self.log(f"LogNet: Join succeeded: {name}")
+            self.players[name] = account
+        crash_after = self.option('FakeCrashAfter', -1.0)
+        if crash_after >= 0:
+            await asyncio.sleep(crash_after)
+            self.crash("FakeCrashAfter")
+            return
+        hitch_every = self.option('FakeHitchEvery', 0.0)
+        if hitch_every > 0:
+            asyncio.get_running_loop().create_task(self.hitch_loop(hitch_every))
+        while True:
+            await asyncio.sleep(5)
+            self.log("LogNet: Verbose: Server heartbeat")
+
+    async def hitch_loop(self, interval):
+        """定期模拟一次卡顿：这段时间内帧号不增长，结束后写入卡顿日志"""
+        while True:
+            await asyncio.sleep(interval)
+            duration = 0.4
+            self.log("LogTemp: Display: Spawning large AI wave")
+            await asyncio.sleep(duration)
+            self.tick_origin += duration
+            self.log(f"LogStats: Warning: GameThread hitch detected, frame time {duration * 1000:.2f}ms")
+
+    async def close(self, delay):
+        self.log(f"LogWS: Server will close in {delay} seconds")
+        await asyncio.sleep(delay)
+        self.log("LogWS: SaveWorld finished")
+        self.log("LogExit: Exiting.")
+        self.exit(0)
+
+    def rcon_command(self, command):
+        parts = command.strip().split(None, 1)
+        name = parts[0].lower() if parts else ''
+        argument = parts[1] if len(parts) > 1 else ''
+        if name == 'lp':
+            rows = ["| Account | PlayerName | PawnID | Position |", "|---|---|---|---|"]
+            rows += [f"| {account} | '{name}' | {1000 + index} | X=0 Y=0 Z=0 |"
+                     for index, (name, account) in enumerate(self.players.items())]
+            return '\n'.join(rows)
+        if name == 'kick':
+            account = self.players.pop(argument, None)
+            if account is None:
+                return f"Player not found: {argument}"
+            self.log(f"LogNet: UNetConnection::Close: [UNetConnection] RemoteAddr: 127.0.0.1:50000, "
+                     f"Name: SteamNetConnection_0, Driver: GameNetDriver SteamNetDriver_0, IsServer: YES, "
+                     f"UniqueId: Steam:{account}, Channels: 12")
+            return f"Kicked {argument}"
+        if name == 'saveworld':
+            self.log("LogWS: SaveWorld finished")
+            return "World saved"
+        if name == 'broadcast':
+            self.log(f"LogWS: Broadcast: {argument}")
+            return "ok"
+        if name == 'close':
+            delay = int(argument) if argument.isdigit() else 0
+            asyncio.get_running_loop().create_task(self.close(delay))
+            return f"Server will close in {delay} seconds"
+        if name == 'crash':
+            asyncio.get_running_loop().call_later(0.1, self.crash, "crash requested over RCON")
+            return "ok"
+        return f"Unknown command: {command}"
+
+    async def handle_rcon(self, reader, writer):
+        password = self.options.get('rconpsw', '')
+        authenticated = False
+        try:
+            while True:
+                size = struct.unpack('<i', await reader.readexactly(4))[0]
+                data = await reader.readexactly(size)
+                request_id, packet_type = struct.unpack('<II', data[:8])
+                body = data[8:-2].decode('utf-8', errors='ignore')
+                if packet_type == RCON_PACKET_AUTH:
+                    authenticated = body == password
+                    response_id, response_type, response = (request_id if authenticated else 0xFFFFFFFF,
+                                                             RCON_PACKET_COMMAND, '')
+                elif not authenticated:
+                    response_id, response_type, response = request_id, RCON_PACKET_RESPONSE, "Not authenticated"
+                else:
+                    response_id, response_type, response = request_id, RCON_PACKET_RESPONSE, self.rcon_command(body)
+                payload = response.encode('utf-8')
+                writer.write(struct.pack('<III', len(payload) + 10, response_id, response_type) + payload + b'\x00\x00')
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_echo(self, reader, writer):
+        writer.close()
+
+    async def run(self):
+        self.exit_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        host = self.options.get('multihome', '0.0.0.0')
+        servers = [
+            await asyncio.start_server(self.handle_rcon, self.options.get('rconaddr', '127.0.0.1'),
+                                       self.option('rconport', 25575)),
+            await asyncio.start_server(self.handle_echo, host, self.option('EchoPort', 18888))
+        ]
+        transports = []
+        for port, protocol in ((self.option('PORT', 7777), asyncio.DatagramProtocol),
+                               (self.option('QueryPort', 27015), A2sProtocol)):
+            transport, _ = await loop.create_datagram_endpoint(protocol, local_addr=(host, port))
+            transports.append(transport)
+        startup = loop.create_task(self.startup())
+        await self.exit_event.wait()
+        startup.cancel()
+        for server in servers:
+            server.close()
+        for transport in transports:
+            transport.close()
+        return self.exit_code
+
+
+class A2sProtocol(asyncio.DatagramProtocol):
+    """对任何A2S_INFO请求返回挑战包"""
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if data.startswith(b'\xFF\xFF\xFF\xFFT'):
+            self.transport.sendto(b'\xFF\xFF\xFF\xFFA\x00\x00\x00\x00', addr)
+
+
+def set_process_name(name):
+    """设置Linux进程名（/proc/<pid>/comm 最多15个字符），使psutil按可执行文件名识别进程"""
+    try:
+        libc = ctypes.CDLL(None)
+        libc.prctl(15, name.encode()[:15], 0, 0, 0)  # PR_SET_NAME
+    except (OSError, AttributeError):
+        pass
+
+
+def run_shipping(argv):
+    set_process_name(SHIPPING_PROCESS_NAME)
+    server = FakeShippingServer(os.path.dirname(os.path.abspath(__file__)), parse_args(argv))
+    server.open_log()
+    try:
+        return asyncio.run(server.run())
+    finally:
+        server.log_file.close()
+
+
+def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == 'install':
+        install(sys.argv[2])
+        return 0
+    if len(sys.argv) >= 2 and sys.argv[1] == '--shipping':
+        return run_shipping(sys.argv[2:])
+    return run_launcher(sys.argv[1:])
+
+
+if __name__ == '__main__':
+    sys.exit(main())